@@ -0,0 +1,8 @@
+import os
+
+# Response templates by name, loaded at startup. The TTS service pre-renders
+# the same file at its startup, so keep every fixed sentence in it rather than
+# in code. "{name}" fields are filled in per turn.
+STATIC_RESPONSES_FILE = os.getenv("STATIC_RESPONSES_FILE",
+                                  os.path.join(os.path.dirname(os.path.abspath(__file__)), "rules",
+                                               "static_responses.json"))
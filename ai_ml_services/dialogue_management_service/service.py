@@ -2,6 +2,9 @@
 
 import grpc
 from concurrent import futures
+import json
+import os
+import sys
 import time # Required for server.wait_for_termination() in a loop
 
 # Import generated protobuf and gRPC modules for DM Service
@@ -11,36 +14,67 @@ import dialogue_management_service_pb2_grpc
 # Import NLU message definitions (needed for request.nlu_result)
 import nlu_service_pb2
 
-# Import generated protobuf and gRPC modules for TextToSpeech Service (client)
-import tts_service_pb2
-import tts_service_pb2_grpc
+from config import STATIC_RESPONSES_FILE
+
+# Shared observability package at the repository root
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from observability import admin, deadlines, logs, metrics, tracing
+
+log = logs.get_logger("dialogue_management")
+
+DECISION_SECONDS = metrics.histogram(
+    "revo_dm_decision_seconds", "Time from receiving the NLU result to choosing the text response.")
+
+
+# Templates ManageTurn needs; a file without them fails at startup, not mid-call.
+REQUIRED_RESPONSES = ("greeting", "get_help", "get_weather", "rephrase", "fallback")
+
+
+def load_responses(path: str = STATIC_RESPONSES_FILE) -> dict:
+    """The response templates in `path`, {name: template}; raises ValueError when one is missing."""
+    with open(path, encoding="utf-8") as f:
+        responses = json.load(f)
+    missing = [name for name in REQUIRED_RESPONSES if name not in responses]
+    if missing:
+        raise ValueError(f"{path} has no response for {', '.join(missing)}")
+    return responses
+
+
+def _format_entities(entities) -> str:
+    return ', '.join(f"{e.name}='{e.value}' (conf: {e.confidence:.2f})" for e in entities)
 
 class DialogueManagementServicer(dialogue_management_service_pb2_grpc.DialogueManagementServiceServicer):
     """
     Implements the DialogueManagementService gRPC interface.
-    After determining a response, it calls the TextToSpeechService.
+    A leaf service: the SessionOrchestratorService has the response synthesized.
     """
-    def __init__(self):
-        # Configuration for TextToSpeech service endpoint
-        self.tts_service_address = 'localhost:50055' # Make this configurable
+
+    def __init__(self, responses: dict = None):
+        self.responses = responses or load_responses()
 
     def ManageTurn(self, request: dialogue_management_service_pb2.DialogueRequest, context):
         """
-        Manages a turn in the conversation based on NLU input,
-        determines a text response, and then calls TextToSpeechService.
+        Manages a turn in the conversation based on NLU input
+        and determines the text response.
         """
+        if deadlines.expired(context, "dialogue_management", "ManageTurn", session_id=request.session_id):
+            return dialogue_management_service_pb2.DialogueResponse(session_id=request.session_id)
+
+        decision_start = time.perf_counter()
         nlu_result = request.nlu_result
         session_id = request.session_id
         
-        entities_str = ', '.join([f"{e.name}='{e.value}' (conf: {e.confidence:.2f})" for e in nlu_result.entities])
-        print(f"DialogueManagementService: Received NLU for SID '{session_id}': Intent='{nlu_result.intent}' (Conf: {nlu_result.intent_confidence:.2f}), Entities=[{entities_str}]")
+        log.info("request", "Received NLU: Intent='%s' (Conf: %.2f), Entities=[%s]",
+                 nlu_result.intent, nlu_result.intent_confidence, logs.lazy(_format_entities, nlu_result.entities),
+                 session_id=session_id, stage="dm")
         
-        text_response = "I'm sorry, I didn't quite understand that. Could you say it again?"
+        responses = self.responses
+        text_response = responses["fallback"]
 
         if nlu_result.intent == "greeting":
-            text_response = "Hello there! How can I help you today?"
+            text_response = responses["greeting"]
         elif nlu_result.intent == "get_help":
-            text_response = "I understand you need help. I'll do my best to assist you."
+            text_response = responses["get_help"]
         elif nlu_result.intent == "get_weather":
             location = "your area"
             date_info = ""
@@ -49,37 +83,13 @@ class DialogueManagementServicer(dialogue_management_service_pb2_grpc.DialogueMa
                     location = entity.value
                 elif entity.name == "date":
                     date_info = f" for {entity.value}"
-            text_response = f"I'm sorry, I can't fetch the actual weather for {location}{date_info} right now, but I hope it's a pleasant day!"
+            text_response = responses["get_weather"].format(location=location, date_info=date_info)
         elif not nlu_result.intent:
-             text_response = "I'm not sure what you mean. Can you try rephrasing?"
-
-        print(f"DialogueManagementService: Determined text response for SID '{session_id}': '{text_response}'")
-
-        # Call TextToSpeechService
-        try:
-            with grpc.insecure_channel(self.tts_service_address) as channel:
-                tts_stub = tts_service_pb2_grpc.TextToSpeechServiceStub(channel)
-                tts_request = tts_service_pb2.TTSRequest(
-                    text_to_synthesize=text_response,
-                    session_id=session_id,
-                    voice_config_id="default_voice" # Example voice config
-                )
-
-                print(f"DialogueManagementService: Calling TextToSpeechService at {self.tts_service_address} for SID '{session_id}' with text: '{text_response}'")
-                tts_response = tts_stub.SynthesizeText(tts_request, timeout=10) # Adding a timeout
-
-                if tts_response:
-                    print(f"DialogueManagementService: Received TTS response for SID '{tts_response.session_id}': Status='{tts_response.status_message}'")
-                else:
-                    print(f"DialogueManagementService: Received no response from TextToSpeechService for SID '{session_id}'")
-
-        except grpc.RpcError as e:
-            print(f"DialogueManagementService: Error calling TextToSpeechService for SID '{session_id}': Code={e.code()}, Details='{e.details()}'")
-        except Exception as e:
-            print(f"DialogueManagementService: An unexpected Python error occurred while calling TTS for SID '{session_id}': {e}")
-        
-        # The DM Service still returns its own DialogueResponse (containing the determined text)
-        # to its original caller (e.g., NLUService).
+             text_response = responses["rephrase"]
+        DECISION_SECONDS.observe(time.perf_counter() - decision_start)
+
+        log.info("request", "Determined text response: '%s'", text_response, session_id=session_id, stage="dm")
+
         return dialogue_management_service_pb2.DialogueResponse(
             session_id=session_id,
             text_response=text_response
@@ -89,25 +99,35 @@ def serve():
     """
     Starts the gRPC server for the DialogueManagementService.
     """
-    server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
+    logs.configure()
+    tracing.init_tracer("dialogue_management")
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=10),
+                         interceptors=metrics.server_interceptors("dialogue_management") + tracing.server_interceptors())
+    servicer = DialogueManagementServicer()
+    log.info("lifecycle", "Loaded %d response templates from %s", len(servicer.responses), STATIC_RESPONSES_FILE)
     dialogue_management_service_pb2_grpc.add_DialogueManagementServiceServicer_to_server(
-        DialogueManagementServicer(), server
+        servicer, server
     )
+    admin.add_to_server(server, "dialogue_management")
 
     port = "50054"
     listen_addr = f'[::]:{port}'
     server.add_insecure_port(listen_addr)
 
     server.start()
-    print(f"DialogueManagementService server started, listening on port {port}")
+    metrics.start_http_server("dialogue_management", 51054)
+    log.info("lifecycle", "DialogueManagementService server started, listening on port %s", port)
 
     try:
         while True:
             time.sleep(86400)
     except KeyboardInterrupt:
-        print("DialogueManagementService server stopping...")
+        log.info("lifecycle", "DialogueManagementService server stopping...")
         server.stop(0)
-        print("DialogueManagementService server stopped.")
+        metrics.shutdown()
+        tracing.shutdown()
+        log.info("lifecycle", "DialogueManagementService server stopped.")
+        logs.shutdown()
 
 if __name__ == '__main__':
     serve()
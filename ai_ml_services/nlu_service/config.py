@@ -12,6 +12,53 @@ DIALOGFLOW_LOCATION_ID = os.getenv("DIALOGFLOW_LOCATION_ID", "global")
 # Default to 'en-US' for language code if not explicitly set.
 DIALOGFLOW_LANGUAGE_CODE = os.getenv("DIALOGFLOW_LANGUAGE_CODE", "en-US")
 
+# Optional: override the Dialogflow CX API endpoint (host:port), e.g. to point the
+# service at the local stand-in in benchmarks/dialogflow_stand_in.py.
+DIALOGFLOW_API_ENDPOINT = os.getenv("DIALOGFLOW_API_ENDPOINT")
+# Use a plaintext gRPC channel without Google credentials. Only for local stand-ins.
+DIALOGFLOW_USE_INSECURE_CHANNEL = os.getenv("DIALOGFLOW_USE_INSECURE_CHANNEL", "false").lower() == "true"
+
+# Deadline of the Dialogflow DetectIntent call: the caller's remaining deadline
+# less NLU_RESERVED_SECONDS for mapping the result, at most DIALOGFLOW_TIMEOUT_SECONDS
+# (also the timeout when the caller set no deadline; the client library's own
+# default is minutes). A request that arrives with no more than
+# NLU_RESERVED_SECONDS left is dropped.
+DIALOGFLOW_TIMEOUT_SECONDS = float(os.getenv("DIALOGFLOW_TIMEOUT_SECONDS", "5"))
+NLU_RESERVED_SECONDS = float(os.getenv("NLU_RESERVED_SECONDS", "0.02"))
+
+# Local fast path (intent_classifier.py): a hashed n-gram intent model trained
+# offline from logged Dialogflow results (train_intent_classifier.py). Text it
+# classifies with at least NLU_LOCAL_CONFIDENCE_THRESHOLD is answered without
+# calling Dialogflow; the rest falls back to Dialogflow. Off while there is no
+# model at NLU_LOCAL_MODEL_PATH (or it is set to "").
+NLU_LOCAL_MODEL_PATH = os.getenv("NLU_LOCAL_MODEL_PATH",
+                                 os.path.join(os.path.dirname(os.path.abspath(__file__)), "models", "intent_classifier.npz"))
+NLU_LOCAL_CONFIDENCE_THRESHOLD = float(os.getenv("NLU_LOCAL_CONFIDENCE_THRESHOLD", "0.9"))
+
+# Cache of Dialogflow results (result_cache.py), keyed by the normalized text and
+# the Dialogflow page of the caller's session. Only results without parameters are
+# cached (parameters may be session-scoped), "no_intent_matched" for
+# NLU_CACHE_NEGATIVE_TTL_SECONDS instead of NLU_CACHE_TTL_SECONDS, and never errors.
+# Off by default: a turn answered from the cache is not sent to Dialogflow. The
+# session's next Dialogflow query carries the page the cached answer led to, but
+# Dialogflow then drops the session parameters collected earlier in the call.
+CACHE_NLU_RESULTS = os.getenv("CACHE_NLU_RESULTS", "false").lower() == "true"
+NLU_CACHE_MAX_ENTRIES = int(os.getenv("NLU_CACHE_MAX_ENTRIES", "10000"))
+NLU_CACHE_TTL_SECONDS = float(os.getenv("NLU_CACHE_TTL_SECONDS", "600"))
+NLU_CACHE_NEGATIVE_TTL_SECONDS = float(os.getenv("NLU_CACHE_NEGATIVE_TTL_SECONDS", "60"))
+
+# Server: the threaded gRPC server holds a worker thread (of NLU_MAX_WORKERS) for each
+# turn, blocked on DetectIntent for most of it. With NLU_ASYNC_SERVER, a grpc.aio
+# server runs ProcessText as a coroutine on one event loop and DetectIntent goes
+# through one shared SessionsAsyncClient, so a call in flight holds no thread. At most
+# NLU_MAX_CONCURRENT_DIALOGFLOW_CALLS DetectIntent calls are in flight; further turns
+# wait for a slot within their deadline and are answered "error_calling_dialogflow"
+# past it (Dialogflow's quota is per project, so an unbounded burst only moves the
+# errors there).
+NLU_ASYNC_SERVER = os.getenv("NLU_ASYNC_SERVER", "false").lower() == "true"
+NLU_MAX_WORKERS = int(os.getenv("NLU_MAX_WORKERS", "10"))
+NLU_MAX_CONCURRENT_DIALOGFLOW_CALLS = int(os.getenv("NLU_MAX_CONCURRENT_DIALOGFLOW_CALLS", "200"))
+
 # GOOGLE_APPLICATION_CREDENTIALS should be set in the server's environment directly
 # for the Google Cloud client libraries to automatically find and use service account keys.
 # This script checks if it's set and provides a warning to the developer if not.
@@ -24,7 +71,7 @@ if not DIALOGFLOW_PROJECT_ID:
     print("Warning: DIALOGFLOW_PROJECT_ID environment variable not set. NLUService may not function correctly with Dialogflow CX.")
 if not DIALOGFLOW_AGENT_ID:
     print("Warning: DIALOGFLOW_AGENT_ID environment variable not set. NLUService may not function correctly with Dialogflow CX.")
-if not GOOGLE_APP_CREDS:
+if not GOOGLE_APP_CREDS and not DIALOGFLOW_USE_INSECURE_CHANNEL:
     print("Warning: GOOGLE_APPLICATION_CREDENTIALS environment variable not set. NLUService will likely fail to authenticate with Google Cloud Dialogflow CX.")
 else:
     # Optionally print the path to the credentials file if set, for verification (be careful with logging sensitive paths).
@@ -34,5 +81,3 @@ else:
 
 # Example of other NLU related configurations that could be added:
 # NLU_PROVIDER = os.getenv("NLU_PROVIDER", "dialogflow_cx") # To switch between NLU providers
-# DEFAULT_CONFIDENCE_THRESHOLD = float(os.getenv("DEFAULT_CONFIDENCE_THRESHOLD", "0.3"))
-# CACHE_NLU_RESULTS = os.getenv("CACHE_NLU_RESULTS", "false").lower() == "true"
@@ -0,0 +1,172 @@
+# ai_ml_services/nlu_service/intent_classifier.py
+
+"""
+The NLUService's local fast path: a linear intent classifier over hashed
+n-gram features, answering the short, parameter-free turns of a call ("yes",
+"no", "agent", "hello") in well under a millisecond instead of a Dialogflow
+CX round trip.
+
+    classifier = IntentClassifier.load("models/intent_classifier.npz")
+    intent, confidence = classifier.classify("Yeah, that's right")
+
+* Features: the text is normalized (NFKC, case-folded, only letters, digits
+  and apostrophes kept) and split into word unigrams, word bigrams (with
+  start and end markers) and character 3-5-grams. Each n-gram is hashed
+  (CRC-32) into one of `n_features` buckets; the counts are log-scaled and
+  the vector L2-normalized. There is no vocabulary to store or look up.
+* Model: multinomial logistic regression, one weight column per label. Only
+  the rows of the buckets a text hits are read, so classifying costs the
+  hashing plus a (n-grams x labels) product, whatever the size of the table.
+  The weights are stored as float16 in an `.npz` file (no pickles); rows of
+  buckets no training text hit stay zero and compress away.
+* FALLBACK is a label like the others, learned from the texts the local
+  model must not answer: intents that carry parameters (the classifier does
+  not extract entities), texts Dialogflow matched to no intent or to
+  different intents on different pages. A text classified FALLBACK, or below
+  the service's confidence threshold, goes to Dialogflow.
+
+Models are trained offline from logged Dialogflow results with
+train_intent_classifier.py.
+"""
+
+import collections
+import re
+import unicodedata
+import zlib
+
+import numpy as np
+
+FALLBACK = "__dialogflow__" # The label of texts that are left to Dialogflow
+
+DEFAULT_N_FEATURES = 1 << 16
+CHAR_NGRAMS = (3, 4, 5)
+
+_TOKEN = re.compile(r"[^\W_]+(?:'[^\W_]+)*")
+
+
+def normalize(text: str) -> str:
+    """`text` as the classifier (and a cache key) sees it: "Yes, I'm SURE!" -> "yes i'm sure"."""
+    text = unicodedata.normalize("NFKC", text).casefold().replace("\u2019", "'")
+    return " ".join(_TOKEN.findall(text))
+
+
+def _ngrams(normalized: str) -> list:
+    words = normalized.split()
+    grams = ["w " + word for word in words]
+    grams += [f"b {first} {second}" for first, second in zip(["<s>"] + words, words + ["</s>"])]
+    padded = f" {normalized} "
+    for n in CHAR_NGRAMS:
+        grams += ["c" + padded[i:i + n] for i in range(len(padded) - n + 1)]
+    return grams
+
+
+def features(normalized: str, n_features: int = DEFAULT_N_FEATURES):
+    """
+    The sparse feature vector of a normalized text: (bucket indices, values),
+    indices unique and sorted, values L2-normalized. Empty for an empty text.
+    `n_features` is a power of two.
+    """
+    if not normalized:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+    mask = n_features - 1
+    hashed = np.fromiter((zlib.crc32(gram.encode("utf-8")) & mask for gram in _ngrams(normalized)), dtype=np.int64)
+    indices, counts = np.unique(hashed, return_counts=True)
+    values = (1.0 + np.log(counts)).astype(np.float32)
+    return indices, values / np.sqrt(values @ values)
+
+
+def _softmax(scores):
+    scores = np.exp(scores - scores.max(axis=-1, keepdims=True))
+    return scores / scores.sum(axis=-1, keepdims=True)
+
+
+class IntentClassifier:
+    """
+    A trained model: `weights` (n_features x labels, float16), `bias` (labels)
+    and the `labels`. Read-only once built, so one instance serves every thread.
+    """
+
+    def __init__(self, weights, bias, labels):
+        n_features, n_labels = weights.shape
+        if n_features & (n_features - 1) or n_labels != len(labels) or bias.shape != (n_labels,):
+            raise ValueError(f"Inconsistent intent model: weights {weights.shape}, bias {bias.shape}, "
+                             f"{len(labels)} labels")
+        self.weights = weights.astype(np.float16)
+        self.bias = bias.astype(np.float32)
+        self.labels = list(labels)
+
+    @property
+    def n_features(self) -> int:
+        return self.weights.shape[0]
+
+    def classify(self, text: str):
+        """(label, probability) of the most likely label of `text`; the label may be FALLBACK."""
+        indices, values = features(normalize(text), self.n_features)
+        probabilities = _softmax(values @ self.weights[indices].astype(np.float32) + self.bias)
+        best = int(probabilities.argmax())
+        return self.labels[best], float(probabilities[best])
+
+    def save(self, path: str):
+        np.savez_compressed(path, weights=self.weights, bias=self.bias, labels=np.array(self.labels, dtype=str))
+
+    @classmethod
+    def load(cls, path: str) -> "IntentClassifier":
+        """The model saved at `path`; OSError if it cannot be read, ValueError if it is not a model."""
+        with np.load(path, allow_pickle=False) as saved:
+            try:
+                return cls(saved["weights"], saved["bias"], saved["labels"].tolist())
+            except KeyError as e:
+                raise ValueError(f"{path}: not an intent model ({e})") from e
+
+
+def train(texts: list, labels: list, n_features: int = DEFAULT_N_FEATURES, epochs: int = 100,
+          learning_rate: float = 0.1, l2: float = 1e-5) -> IntentClassifier:
+    """
+    Fits a model to `texts` and their `labels` (softmax regression, full-batch
+    Adam for `epochs` steps, L2 penalty `l2`). Texts with nothing left after
+    normalization are skipped; repeated (text, label) pairs are trained once,
+    weighted by how often they occur.
+    """
+    label_names = sorted(set(labels))
+    label_index = {label: i for i, label in enumerate(label_names)}
+    examples = collections.Counter((normalize(text), label) for text, label in zip(texts, labels))
+    rows, columns, values, targets, counts = [], [], [], [], []
+    for (normalized, label), count in examples.items():
+        indices, vector = features(normalized, n_features)
+        if len(indices):
+            rows.append(np.full(len(indices), len(targets)))
+            columns.append(indices)
+            values.append(vector)
+            targets.append(label_index[label])
+            counts.append(count)
+    if not targets:
+        raise ValueError("No training text has any features")
+    rows, columns, values = np.concatenate(rows), np.concatenate(columns), np.concatenate(values)[:, None]
+    targets = np.array(targets)
+    sample_weights = np.array(counts, dtype=np.float64)[:, None] / sum(counts)
+    # Only the buckets some text hits are trained; `used[column_of[k]]` is the bucket of entry k
+    used, column_of = np.unique(columns, return_inverse=True)
+    row_starts = np.flatnonzero(np.r_[True, rows[1:] != rows[:-1]])
+    by_column = np.argsort(column_of, kind="stable")
+    column_starts = np.flatnonzero(np.r_[True, np.diff(column_of[by_column]) != 0])
+
+    n, n_labels = len(targets), len(label_names)
+    parameters = [np.zeros((len(used), n_labels)), np.zeros(n_labels)]
+    moments = [[np.zeros_like(p), np.zeros_like(p)] for p in parameters]
+    beta1, beta2, epsilon = 0.9, 0.999, 1e-8
+    for step in range(1, epochs + 1):
+        weights, bias = parameters
+        scores = np.add.reduceat(values * weights[column_of], row_starts) + bias
+        error = _softmax(scores)
+        error[np.arange(n), targets] -= 1.0
+        error *= sample_weights
+        weight_gradient = np.add.reduceat((values * error[rows])[by_column], column_starts) + l2 * weights
+        for parameter, gradient, moment in zip(parameters, (weight_gradient, error.sum(axis=0)), moments):
+            moment[0] = beta1 * moment[0] + (1 - beta1) * gradient
+            moment[1] = beta2 * moment[1] + (1 - beta2) * gradient ** 2
+            parameter -= (learning_rate * moment[0] / (1 - beta1 ** step)
+                          / (np.sqrt(moment[1] / (1 - beta2 ** step)) + epsilon))
+
+    weights = np.zeros((n_features, n_labels), dtype=np.float16)
+    weights[used] = parameters[0]
+    return IntentClassifier(weights, parameters[1], label_names)
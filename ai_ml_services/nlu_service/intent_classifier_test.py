@@ -0,0 +1,117 @@
+import json
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+import intent_classifier
+from intent_classifier import FALLBACK, IntentClassifier, features, normalize
+from train_intent_classifier import evaluate, label_examples, read_results
+
+EXAMPLES = {
+    "confirm": ["yes", "yeah", "yes please", "yep that's right", "sure", "correct", "yes it is"],
+    "deny": ["no", "nope", "no thanks", "no thank you", "not really", "no it isn't"],
+    "get_help": ["agent", "talk to an agent", "i need help", "representative please", "support"],
+    FALLBACK: ["weather in paris", "what's the weather in london", "book a table for two",
+               "my account number is five", "the blue one i think"],
+}
+
+
+def train_example_model(**kwargs):
+    texts = [text for texts in EXAMPLES.values() for text in texts]
+    labels = [label for label, texts in EXAMPLES.items() for _ in texts]
+    return intent_classifier.train(texts * 5, labels * 5, n_features=1 << 12, **kwargs)
+
+
+class TestFeatures(unittest.TestCase):
+
+    def test_normalize_keeps_words_and_apostrophes_only(self):
+        self.assertEqual(normalize("  Yes, I’m SURE!!  [pause] ok_then "), "yes i'm sure pause ok then")
+        self.assertEqual(normalize("?! ..."), "")
+
+    def test_features_are_unique_sorted_and_unit_length(self):
+        indices, values = features(normalize("no no no thank you"), 1 << 10)
+        self.assertTrue(np.all(np.diff(indices) > 0))
+        self.assertTrue(np.all((indices >= 0) & (indices < 1 << 10)))
+        self.assertAlmostEqual(float(values @ values), 1.0, places=5)
+        np.testing.assert_array_equal(features("no no no thank you", 1 << 10)[0], indices) # Deterministic
+
+    def test_an_empty_text_has_no_features(self):
+        indices, values = features("")
+        self.assertEqual((len(indices), len(values)), (0, 0))
+
+
+class TestIntentClassifier(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.model = train_example_model()
+
+    def test_known_answers_are_classified_confidently(self):
+        for text, intent in (("Yes please!", "confirm"), ("No, thank you.", "deny"), ("Agent.", "get_help")):
+            label, confidence = self.model.classify(text)
+            self.assertEqual(label, intent, text)
+            self.assertGreater(confidence, 0.9, text)
+
+    def test_texts_with_parameters_are_left_to_dialogflow(self):
+        self.assertEqual(self.model.classify("what's the weather in rome")[0], FALLBACK)
+
+    def test_nothing_to_classify_gets_the_bias_alone(self):
+        label, confidence = self.model.classify("...")
+        self.assertIn(label, self.model.labels)
+        self.assertLess(confidence, 0.9)
+
+    def test_saved_model_is_float16_and_loads_identically(self):
+        path = os.path.join(tempfile.mkdtemp(), "model.npz")
+        self.model.save(path)
+        loaded = IntentClassifier.load(path)
+        self.assertEqual(loaded.weights.dtype, np.float16)
+        self.assertEqual((loaded.labels, loaded.n_features), (self.model.labels, 1 << 12))
+        for text in ("yes please", "weather in oslo", "hmm"):
+            self.assertEqual(loaded.classify(text), self.model.classify(text))
+
+    def test_inconsistent_models_are_rejected(self):
+        with self.assertRaises(ValueError):
+            IntentClassifier(np.zeros((100, 2)), np.zeros(2), ["a", "b"]) # Not a power of two
+        with self.assertRaises(ValueError):
+            IntentClassifier(np.zeros((128, 2)), np.zeros(3), ["a", "b"])
+
+
+class TestTraining(unittest.TestCase):
+
+    def test_read_results_takes_the_dialogflow_result_events(self):
+        path = os.path.join(tempfile.mkdtemp(), "nlu.jsonl")
+        events = [
+            {"category": "dialogflow_result", "text": "yes", "intent": "confirm", "parameters": ""},
+            {"category": "request", "msg": "Received ProcessText request, Text: 'yes'"},
+            {"category": "dialogflow_result", "text": "weather in oslo", "intent": "get_weather",
+             "parameters": "location"},
+        ]
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("\n".join(json.dumps(event) for event in events) + "\nnot json dialogflow_result\n")
+        self.assertEqual(list(read_results([path])),
+                         [("yes", "confirm", []), ("weather in oslo", "get_weather", ["location"])])
+
+    def test_labels_leave_what_the_model_cannot_answer_to_dialogflow(self):
+        results = ([("yes", "confirm", [])] * 30 + [("weather in oslo", "get_weather", ["location"])] * 30
+                   + [("hmm", "no_intent_matched", [])] * 30 + [("rare", "rare_intent", [])] * 3
+                   + [("okay", "confirm", [])] * 10 + [("okay", "acknowledge", [])] * 20 + [("...", "confirm", [])])
+        texts, labels, reasons = label_examples(results, min_examples=20)
+        by_text = dict(zip(texts, labels))
+        self.assertEqual(by_text["yes"], "confirm")
+        self.assertEqual({by_text[t] for t in ("weather in oslo", "hmm", "rare", "okay")}, {FALLBACK})
+        self.assertNotIn("...", by_text)
+        self.assertEqual(reasons["get_weather"], "has parameters")
+        self.assertEqual(reasons["rare_intent"], "3 examples")
+
+    def test_evaluate_counts_only_confident_local_answers(self):
+        model = train_example_model()
+        result = evaluate(model, ["yes", "no thanks", "weather in oslo"], ["confirm", "confirm", FALLBACK], 0.9)
+        self.assertAlmostEqual(result["answered"], 2 / 3)
+        self.assertAlmostEqual(result["accuracy"], 1 / 2)
+        self.assertAlmostEqual(result["coverage"], 1 / 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,213 @@
+# ai_ml_services/nlu_service/result_cache.py
+
+"""
+A cache of Dialogflow CX results in front of the NLUService's DetectIntent
+calls. The short answers of an IVR ("yes", "no", "agent", "two") repeat
+across calls, and Dialogflow answers the same text on the same page the same
+way; a cached result costs a dictionary lookup instead of a 100-400 ms paid
+call.
+
+* Key: the normalized text (intent_classifier.normalize) and the Dialogflow
+  page (resource name, so the flow too) the caller's session is on, which is
+  what Dialogflow matches against. `SessionPages` follows each session's
+  page from its Dialogflow results, and from its cached answers (a cached
+  value carries the page its result led to).
+* Bounded and fresh: at most `max_entries` results, least recently used out
+  first; a result expires `ttl` seconds after it was fetched, so an agent
+  change is picked up within a TTL. "No intent matched" is cached too (callers
+  repeat unmatched text as well), for a shorter TTL.
+* Single-flight: concurrent misses of the same key make one call; the others
+  wait for its result (up to their own timeout) instead of calling too.
+* No leaks: what is stored is decided by the caller's `load`, which returns
+  a session-free template (the NLUService stores only results without
+  parameters; Dialogflow's parameters include session parameters collected
+  earlier in the call). A load whose result is not cacheable is not shared
+  either: the waiters make their own calls.
+
+    cache = ResultCache(max_entries=10000, ttl=600, negative_ttl=60)
+    value, source = cache.fetch(key, load, timeout=0.5) # source: HIT, SHARED or MISS
+    value, source = await cache.fetch_async(key, async_load, timeout=0.5) # On an event loop
+
+Lookups are counted in `revo_nlu_cache_lookups_total{result}`; the size is
+`revo_nlu_cache_entries`.
+"""
+
+import asyncio
+import collections
+import os
+import sys
+import threading
+import time
+
+# Shared observability package at the repository root
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from observability import metrics
+
+LOOKUPS = metrics.counter("revo_nlu_cache_lookups_total", "NLU result cache lookups by result.", ("result",))
+ENTRIES = metrics.gauge("revo_nlu_cache_entries", "Cached NLU results.")
+
+# fetch() sources
+HIT = "hit"       # A fresh cached value
+SHARED = "shared" # The value of a concurrent load of the same key
+MISS = "miss"     # This caller's own load
+
+
+class _Flight:
+    """One load in progress; the lookups of its key that arrive meanwhile wait for it."""
+
+    __slots__ = ("done", "value")
+
+    def __init__(self, done):
+        self.done = done # A threading.Event, or an asyncio.Event for fetch_async()
+        self.value = None # The cacheable value, if the load produced one
+
+
+class ResultCache:
+    """
+    Values by key, least recently used out first beyond `max_entries`, each
+    expiring `ttl` (negative values `negative_ttl`) seconds after it was
+    stored; a TTL of 0 caches nothing. `clock` is for tests. Thread-safe;
+    fetch_async() is for a single event loop.
+    """
+
+    def __init__(self, max_entries: int, ttl: float, negative_ttl: float, clock=time.monotonic):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._clock = clock
+        self._entries = collections.OrderedDict() # {key: (expires, value)}
+        self._flights = {}
+        self._lock = threading.Lock()
+        self._hit = LOOKUPS.labels(HIT).inc
+        ENTRIES.set_function(lambda: len(self._entries))
+
+    def __len__(self):
+        return len(self._entries)
+
+    def fetch(self, key, load, timeout: float = None):
+        """
+        (value, source). On a miss, `load()` is called and returns (result,
+        value, negative): `result` is what this caller gets; `value`, if not
+        None, is cached (for the negative TTL if `negative`) and handed to
+        the concurrent callers of the same key, which wait for it up to
+        `timeout` seconds and otherwise load themselves.
+        """
+        value, flight, leader = self._begin(key, threading.Event)
+        if flight is None:
+            return value, HIT
+        if not leader and flight.done.wait(timeout) and flight.value is not None:
+            LOOKUPS.labels(SHARED).inc()
+            return flight.value, SHARED
+        LOOKUPS.labels(MISS).inc()
+        try:
+            return self._loaded(key, flight, leader, load()), MISS
+        finally:
+            self._land(key, flight, leader)
+
+    async def fetch_async(self, key, load, timeout: float = None):
+        """
+        fetch() for asyncio callers: `load` is a coroutine function, and
+        waiting for a concurrent load of the key does not block the loop. A
+        cache is used through fetch() or through fetch_async(), not both.
+        """
+        value, flight, leader = self._begin(key, asyncio.Event)
+        if flight is None:
+            return value, HIT
+        if not leader:
+            try:
+                await asyncio.wait_for(flight.done.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+            if flight.done.is_set() and flight.value is not None:
+                LOOKUPS.labels(SHARED).inc()
+                return flight.value, SHARED
+        LOOKUPS.labels(MISS).inc()
+        try:
+            return self._loaded(key, flight, leader, await load()), MISS
+        finally:
+            self._land(key, flight, leader)
+
+    def _begin(self, key, event_type):
+        """
+        (value, None, False) for a fresh entry; otherwise (None, flight,
+        leader): the flight loading the key, which this caller leads (a new
+        one, done when `event_type` is set) or joins.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] > self._clock():
+                    self._entries.move_to_end(key)
+                    self._hit()
+                    return entry[1], None, False
+                del self._entries[key]
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight(event_type())
+        return None, flight, leader
+
+    def _loaded(self, key, flight, leader: bool, loaded):
+        result, value, negative = loaded
+        if value is not None:
+            self._store(key, value, self.negative_ttl if negative else self.ttl)
+            if leader:
+                flight.value = value
+        return result
+
+    def _land(self, key, flight, leader: bool):
+        if leader:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    def _store(self, key, value, ttl: float):
+        if ttl <= 0:
+            return
+        with self._lock:
+            self._entries[key] = (self._clock() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class SessionPages:
+    """
+    The Dialogflow page each session is on ("" before the first result), for
+    up to `max_sessions` recently active sessions. Thread-safe.
+
+    `update()` records the page of a Dialogflow result. `advance()` records
+    the page of a cached answer: Dialogflow's own session did not move, so
+    `override()` returns that page until the session's next Dialogflow
+    result, for the NLUService to send as the query's current page.
+    """
+
+    def __init__(self, max_sessions: int = 100000):
+        self.max_sessions = max_sessions
+        self._pages = collections.OrderedDict() # {session_id: (page, Dialogflow's session is behind)}
+        self._lock = threading.Lock()
+
+    def get(self, session_id: str) -> str:
+        with self._lock:
+            return self._pages.get(session_id, ("", False))[0]
+
+    def override(self, session_id: str) -> str:
+        """The page Dialogflow's session must be moved to before its next query, or ""."""
+        with self._lock:
+            page, behind = self._pages.get(session_id, ("", False))
+        return page if behind else ""
+
+    def update(self, session_id: str, page: str):
+        with self._lock:
+            self._set_locked(session_id, page, False)
+
+    def advance(self, session_id: str, page: str):
+        with self._lock:
+            current, behind = self._pages.get(session_id, ("", False))
+            self._set_locked(session_id, page, behind or page != current)
+
+    def _set_locked(self, session_id: str, page: str, behind: bool):
+        self._pages[session_id] = (page, behind)
+        self._pages.move_to_end(session_id)
+        if len(self._pages) > self.max_sessions:
+            self._pages.popitem(last=False)
@@ -0,0 +1,183 @@
+import asyncio
+import threading
+import time
+import unittest
+
+from result_cache import HIT, MISS, SHARED, ResultCache, SessionPages
+
+
+class FakeClock:
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestResultCache(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.cache = ResultCache(max_entries=2, ttl=60, negative_ttl=5, clock=self.clock)
+        self.loads = []
+
+    def loader(self, value, negative=False, result=None):
+        def load():
+            self.loads.append(value)
+            return (result or f"result of {value}"), value, negative
+        return load
+
+    def test_a_miss_loads_and_stores_the_value_for_the_next_callers(self):
+        self.assertEqual(self.cache.fetch("yes", self.loader("confirm")), ("result of confirm", MISS))
+        self.assertEqual(self.cache.fetch("yes", self.loader("other")), ("confirm", HIT))
+        self.assertEqual(self.loads, ["confirm"])
+
+    def test_values_expire_after_their_ttl(self):
+        self.cache.fetch("yes", self.loader("confirm"))
+        self.cache.fetch("hmm", self.loader("no match", negative=True))
+        self.clock.now += 6 # Past the negative TTL only
+        self.assertEqual(self.cache.fetch("yes", self.loader("x"))[1], HIT)
+        self.assertEqual(self.cache.fetch("hmm", self.loader("no match", negative=True))[1], MISS)
+        self.clock.now += 60
+        self.assertEqual(self.cache.fetch("yes", self.loader("confirm"))[1], MISS)
+
+    def test_the_least_recently_used_value_is_dropped_beyond_max_entries(self):
+        for key in ("a", "b"):
+            self.cache.fetch(key, self.loader(key))
+        self.cache.fetch("a", self.loader("a")) # b is now the least recently used
+        self.cache.fetch("c", self.loader("c"))
+        self.assertEqual(len(self.cache), 2)
+        self.assertEqual(self.cache.fetch("a", self.loader("a"))[1], HIT)
+        self.assertEqual(self.cache.fetch("b", self.loader("b"))[1], MISS)
+
+    def test_uncacheable_results_are_not_stored(self):
+        load = lambda: ("private result", None, False)
+        self.assertEqual(self.cache.fetch("my pin is 1234", load), ("private result", MISS))
+        self.assertEqual(len(self.cache), 0)
+
+    def test_concurrent_misses_of_a_key_load_once(self):
+        started, release = threading.Event(), threading.Event()
+
+        def slow_load():
+            self.loads.append("confirm")
+            started.set()
+            release.wait(5)
+            return "leader result", "confirm", False
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(self.cache.fetch("yes", slow_load)))
+                   for _ in range(4)]
+        threads[0].start()
+        started.wait(5)
+        for thread in threads[1:]:
+            thread.start()
+        time.sleep(0.05) # For the others to join the flight
+        release.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(self.loads, ["confirm"])
+        self.assertEqual(sorted(value for value, _ in results), ["confirm"] * 3 + ["leader result"])
+        self.assertIn(("confirm", SHARED), results)
+
+    def test_waiters_load_themselves_when_the_result_is_not_cacheable(self):
+        started, release = threading.Event(), threading.Event()
+        calls = []
+
+        def load():
+            calls.append(threading.current_thread().name)
+            if len(calls) == 1:
+                started.set()
+                release.wait(5)
+            return "private result", None, False
+
+        leader = threading.Thread(target=self.cache.fetch, args=("my pin", load), name="leader")
+        leader.start()
+        started.wait(5)
+        waiter = threading.Thread(target=self.cache.fetch, args=("my pin", load), name="waiter")
+        waiter.start()
+        release.set()
+        leader.join()
+        waiter.join()
+        self.assertEqual(calls, ["leader", "waiter"])
+
+    def test_a_waiter_stops_waiting_at_its_timeout(self):
+        started, release = threading.Event(), threading.Event()
+
+        def slow_load():
+            started.set()
+            release.wait(5)
+            return "leader result", "confirm", False
+
+        leader = threading.Thread(target=self.cache.fetch, args=("yes", slow_load))
+        leader.start()
+        try:
+            started.wait(5)
+            self.assertEqual(self.cache.fetch("yes", self.loader("own"), timeout=0.01), ("result of own", MISS))
+        finally:
+            release.set()
+            leader.join()
+
+
+class TestResultCacheAsync(unittest.TestCase):
+
+    def test_concurrent_misses_of_a_key_load_once_without_blocking_the_loop(self):
+        cache = ResultCache(max_entries=10, ttl=60, negative_ttl=5)
+        loads = []
+
+        async def slow_load():
+            loads.append("confirm")
+            await asyncio.sleep(0.05)
+            return "leader result", "confirm", False
+
+        async def run():
+            results = await asyncio.gather(*(cache.fetch_async("yes", slow_load) for _ in range(4)))
+            return results + [await cache.fetch_async("yes", slow_load)]
+
+        results = asyncio.run(run())
+        self.assertEqual(loads, ["confirm"])
+        self.assertEqual(results, [("leader result", MISS)] + [("confirm", SHARED)] * 3 + [("confirm", HIT)])
+
+    def test_a_waiter_loads_itself_at_its_timeout(self):
+        cache = ResultCache(max_entries=10, ttl=60, negative_ttl=5)
+
+        async def load(value, seconds):
+            await asyncio.sleep(seconds)
+            return f"result of {value}", value, False
+
+        async def run():
+            leader = asyncio.ensure_future(cache.fetch_async("yes", lambda: load("leader", 0.2)))
+            await asyncio.sleep(0)
+            waiter = await cache.fetch_async("yes", lambda: load("own", 0), timeout=0.01)
+            return waiter, await leader
+
+        self.assertEqual(asyncio.run(run()), (("result of own", MISS), ("result of leader", MISS)))
+
+
+class TestSessionPages(unittest.TestCase):
+
+    def test_pages_of_the_most_recent_sessions_are_kept(self):
+        pages = SessionPages(max_sessions=2)
+        self.assertEqual(pages.get("s1"), "")
+        pages.update("s1", "flows/default/pages/start")
+        pages.update("s2", "flows/billing/pages/amount")
+        pages.update("s1", "flows/default/pages/menu")
+        pages.update("s3", "flows/default/pages/start")
+        self.assertEqual([pages.get(s) for s in ("s1", "s2", "s3")],
+                         ["flows/default/pages/menu", "", "flows/default/pages/start"])
+
+    def test_a_page_reached_from_the_cache_is_overridden_until_dialogflow_answers(self):
+        pages = SessionPages()
+        pages.update("s1", "flows/default/pages/start")
+        pages.advance("s1", "flows/default/pages/start") # Same page: nothing to catch up
+        self.assertEqual(pages.override("s1"), "")
+        pages.advance("s1", "flows/default/pages/menu")
+        pages.advance("s1", "flows/default/pages/menu") # Still behind
+        self.assertEqual((pages.get("s1"), pages.override("s1")),
+                         ("flows/default/pages/menu", "flows/default/pages/menu"))
+        pages.update("s1", "flows/billing/pages/amount")
+        self.assertEqual(pages.override("s1"), "")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,19 +1,26 @@
 # ai_ml_services/nlu_service/service.py
 
+import asyncio
 import grpc
 from concurrent import futures
+import os
+import re
+import signal
+import sys
 import time
 
 # Import generated protobuf and gRPC modules for NLU Service
 import nlu_service_pb2
 import nlu_service_pb2_grpc
-
-# Import generated protobuf and gRPC modules for Dialogue Management Service (client)
-import dialogue_management_service_pb2
-import dialogue_management_service_pb2_grpc
+import intent_classifier
+import result_cache
 
 # Google Cloud Dialogflow CX specific imports
 from google.cloud import dialogflowcx_v3beta1 as dialogflowcx
+from google.cloud.dialogflowcx_v3beta1.services.sessions.transports import (
+    SessionsGrpcAsyncIOTransport,
+    SessionsGrpcTransport,
+)
 # from google.protobuf import struct_pb2 # For complex parameters, if needed later
 
 # Import configuration
@@ -22,49 +29,158 @@ from .config import (
     DIALOGFLOW_AGENT_ID,
     DIALOGFLOW_LOCATION_ID,
     DIALOGFLOW_LANGUAGE_CODE,
+    DIALOGFLOW_API_ENDPOINT,
+    DIALOGFLOW_USE_INSECURE_CHANNEL,
+    DIALOGFLOW_TIMEOUT_SECONDS,
+    NLU_RESERVED_SECONDS,
+    NLU_LOCAL_MODEL_PATH,
+    NLU_LOCAL_CONFIDENCE_THRESHOLD,
+    CACHE_NLU_RESULTS,
+    NLU_CACHE_MAX_ENTRIES,
+    NLU_CACHE_TTL_SECONDS,
+    NLU_CACHE_NEGATIVE_TTL_SECONDS,
+    NLU_ASYNC_SERVER,
+    NLU_MAX_WORKERS,
+    NLU_MAX_CONCURRENT_DIALOGFLOW_CALLS,
     GOOGLE_APP_CREDS # Used here for an initial check/warning
 )
 
+# Shared observability package at the repository root
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from observability import admin, deadlines, logs, loop_monitor, metrics, tracing
+
+log = logs.get_logger("nlu")
+
+DETECT_INTENT_SECONDS = metrics.histogram(
+    "revo_nlu_dialogflow_detect_intent_seconds", "Dialogflow CX DetectIntent latency, including failed calls.")
+ANSWERS = metrics.counter(
+    "revo_nlu_answers_total", "ProcessText results by where they came from (local, cache, dialogflow, blank).",
+    ("source",))
+LOCAL_CLASSIFY_SECONDS = metrics.histogram(
+    "revo_nlu_local_classify_seconds", "Local intent classifier latency, answered or not.",
+    buckets=metrics.log_linear_buckets(0.00001, 0.05))
+DIALOGFLOW_CALLS_IN_FLIGHT = metrics.gauge(
+    "revo_nlu_dialogflow_calls_in_flight", "DetectIntent calls in flight (asyncio server).")
+DIALOGFLOW_CALLS_WAITING = metrics.gauge(
+    "revo_nlu_dialogflow_calls_waiting", "Turns waiting for a DetectIntent call slot (asyncio server).")
+DIALOGFLOW_SLOT_TIMEOUTS = metrics.counter(
+    "revo_nlu_dialogflow_slot_timeouts_total", "Turns whose deadline passed while waiting for a DetectIntent call slot.")
+
+NO_INTENT = "no_intent_matched"
+_ERROR_INTENTS = ("error_calling_dialogflow", "error_no_dialogflow_client")
+# Nothing to classify: blank, or an upstream placeholder such as "[STT Timeout]"
+_NOTHING_SAID = re.compile(r"\s*(\[[^\]]*\]\s*)?")
+
+
+def _format_entities(entities) -> str:
+    return ', '.join(f"{e.name}='{e.value}' (conf: {e.confidence:.2f})" for e in entities)
+
+
+def _load_classifier(path: str):
+    """The local intent model at `path`, or None (fast path off) if there is none or it cannot be loaded."""
+    if not path or not os.path.exists(path):
+        log.info("lifecycle", "No local intent model at '%s'; every turn goes to Dialogflow CX.", path)
+        return None
+    try:
+        classifier = intent_classifier.IntentClassifier.load(path)
+    except (OSError, ValueError) as e:
+        log.error("lifecycle", "Could not load the local intent model '%s': %s. Every turn goes to Dialogflow CX.",
+                  path, e)
+        return None
+    log.info("lifecycle", "Local intent model '%s' loaded (%d labels, %d feature buckets); answering at confidence >= %.2f.",
+             path, len(classifier.labels), classifier.n_features, NLU_LOCAL_CONFIDENCE_THRESHOLD)
+    return classifier
+
+
+def _create_sessions_client(name: str, client_class, transport_class, insecure_channel):
+    """
+    A Dialogflow CX sessions client of `client_class` (SessionsClient, or
+    SessionsAsyncClient with the asyncio transport and channel), or None if
+    it is not configured or cannot be created.
+    """
+    if DIALOGFLOW_USE_INSECURE_CHANNEL and DIALOGFLOW_API_ENDPOINT and DIALOGFLOW_PROJECT_ID and DIALOGFLOW_AGENT_ID:
+        # Local stand-in (e.g. for offline benchmarks): plaintext channel, no Google credentials.
+        try:
+            client = client_class(transport=transport_class(channel=insecure_channel(DIALOGFLOW_API_ENDPOINT)))
+            log.info("lifecycle", "Dialogflow CX %s using insecure channel to %s.", name, DIALOGFLOW_API_ENDPOINT)
+            return client
+        except Exception as e:
+            log.error("lifecycle", "Failed to initialize Dialogflow CX %s for %s: %s", name, DIALOGFLOW_API_ENDPOINT, e)
+            return None
+    if GOOGLE_APP_CREDS and DIALOGFLOW_PROJECT_ID and DIALOGFLOW_AGENT_ID:
+        try:
+            client_options = None
+            if DIALOGFLOW_API_ENDPOINT:
+                client_options = {"api_endpoint": DIALOGFLOW_API_ENDPOINT}
+            elif DIALOGFLOW_LOCATION_ID and DIALOGFLOW_LOCATION_ID.lower() != "global":
+                client_options = {"api_endpoint": f"{DIALOGFLOW_LOCATION_ID}-dialogflow.googleapis.com"}
+
+            client = client_class(client_options=client_options)
+            log.info("lifecycle", "Dialogflow CX %s initialized successfully.", name)
+            return client
+        except Exception as e:
+            log.error("lifecycle", "Failed to initialize Dialogflow CX %s: %s", name, e)
+            return None
+    log.warning("lifecycle", "Dialogflow CX client not initialized due to missing configuration (PROJECT_ID, AGENT_ID, or GOOGLE_APPLICATION_CREDENTIALS). NLUService will use placeholder logic or fail.")
+    return None
+
+
+def _cache_template(nlu_response, page: str):
+    """
+    The session-free part of a Dialogflow result to cache, with `page`, the
+    page the result left the session on; or None if it must not be cached:
+    errors, and results with parameters, which may be session-scoped
+    (collected earlier in the caller's call).
+    """
+    if nlu_response.entities or nlu_response.intent in _ERROR_INTENTS:
+        return None
+    return (nlu_service_pb2.NLUResponse(intent=nlu_response.intent, intent_confidence=nlu_response.intent_confidence),
+            page)
+
+
 class NLUServiceServicer(nlu_service_pb2_grpc.NLUServiceServicer):
     """
-    Implements the NLUService gRPC interface using Dialogflow CX.
-    After processing text with Dialogflow CX, it calls the DialogueManagementService.
+    Implements the NLUService gRPC interface using Dialogflow CX, with a local
+    fast path: text the local intent model (`classifier`, by default loaded
+    from NLU_LOCAL_MODEL_PATH) is confident about is answered without calling
+    Dialogflow. With a result `cache` (by default one if CACHE_NLU_RESULTS),
+    Dialogflow results are reused across callers. A leaf service: the
+    SessionOrchestratorService passes the result on to the
+    DialogueManagementService.
     """
-    def __init__(self):
-        self.sessions_client = None
-        if GOOGLE_APP_CREDS and DIALOGFLOW_PROJECT_ID and DIALOGFLOW_AGENT_ID:
-            try:
-                client_options = None
-                if DIALOGFLOW_LOCATION_ID and DIALOGFLOW_LOCATION_ID.lower() != "global":
-                    client_options = {"api_endpoint": f"{DIALOGFLOW_LOCATION_ID}-dialogflow.googleapis.com"}
-
-                self.sessions_client = dialogflowcx.SessionsClient(client_options=client_options)
-                print("NLUService: Dialogflow CX SessionsClient initialized successfully.")
-            except Exception as e:
-                print(f"NLUService Error: Failed to initialize Dialogflow CX SessionsClient: {e}")
-                self.sessions_client = None # Ensure it's None if init fails
-        else:
-            print("NLUService Warning: Dialogflow CX client not initialized due to missing configuration (PROJECT_ID, AGENT_ID, or GOOGLE_APPLICATION_CREDENTIALS). NLUService will use placeholder logic or fail.")
-
-        # Configuration for Dialogue Management service endpoint
-        self.dm_service_address = 'localhost:50054' # Make this configurable
-        # Consider creating the channel once if NLUServiceServicer is long-lived,
-        # or per-call if requests are infrequent or to handle transient DM issues.
-        # For now, per-call via 'with' statement is robust.
-
-    def _call_dialogflow_cx(self, request_text: str, request_session_id: str) -> nlu_service_pb2.NLUResponse:
+    def __init__(self, classifier=None, cache=None):
+        self.classifier = classifier if classifier is not None else _load_classifier(NLU_LOCAL_MODEL_PATH)
+        if cache is None and CACHE_NLU_RESULTS:
+            cache = result_cache.ResultCache(NLU_CACHE_MAX_ENTRIES, NLU_CACHE_TTL_SECONDS, NLU_CACHE_NEGATIVE_TTL_SECONDS)
+        self.result_cache = cache
+        self.session_pages = result_cache.SessionPages() # The cache key's Dialogflow context
+        self.sessions_client = self._create_sessions_client()
+
+    def _create_sessions_client(self):
+        return _create_sessions_client("SessionsClient", dialogflowcx.SessionsClient, SessionsGrpcTransport,
+                                       grpc.insecure_channel)
+
+    def _call_dialogflow_cx(self, request_text: str, request_session_id: str,
+                            timeout: float = DIALOGFLOW_TIMEOUT_SECONDS) -> nlu_service_pb2.NLUResponse:
         """
         Helper method to call Dialogflow CX and map its response.
+        `timeout` is the DetectIntent deadline in seconds.
         """
         if not self.sessions_client:
-            print("NLUService Error: Dialogflow CX client not available. Returning error response.")
-            return nlu_service_pb2.NLUResponse(
-                session_id=request_session_id,
-                intent="error_no_dialogflow_client",
-                processed_text=request_text,
-                intent_confidence=0.0
-            )
+            return self._no_client_response(request_text, request_session_id)
+
+        df_request = self._detect_intent_request(request_text, request_session_id)
+        try:
+            log.info("request", "Sending request to Dialogflow CX: Text='%s'", request_text,
+                     session_id=request_session_id, stage="nlu")
+            with tracing.span("dialogflow.detect_intent"), DETECT_INTENT_SECONDS.time():
+                df_response = self.sessions_client.detect_intent(request=df_request, timeout=timeout)
+            return self._map_query_result(df_response.query_result, request_text, request_session_id)
+        except Exception as e:
+            log.error("request", "Dialogflow API error: %s", e, session_id=request_session_id, stage="nlu")
+            return self._error_response(request_text, request_session_id, e)
 
+    def _detect_intent_request(self, request_text: str, request_session_id: str):
         session_path = self.sessions_client.session_path(
             project=DIALOGFLOW_PROJECT_ID,
             location=DIALOGFLOW_LOCATION_ID,
@@ -77,107 +193,317 @@ class NLUServiceServicer(nlu_service_pb2_grpc.NLUServiceServicer):
             text=text_input,
             language_code=DIALOGFLOW_LANGUAGE_CODE
         )
+        df_request = dialogflowcx.DetectIntentRequest(session=session_path, query_input=query_input)
+        # Turns answered from the cache moved the session on without Dialogflow: catch its session up
+        page = self.session_pages.override(request_session_id) if self.result_cache is not None else ""
+        if "/pages/" in page: # A page resource name, not just a display name
+            df_request.query_params = dialogflowcx.QueryParameters(current_page=page)
+        return df_request
 
-        try:
-            df_request = dialogflowcx.DetectIntentRequest(session=session_path, query_input=query_input)
-            print(f"NLUService: Sending request to Dialogflow CX for session {session_path}: Text='{request_text}'")
-            df_response = self.sessions_client.detect_intent(request=df_request)
-            query_result = df_response.query_result
-
-            print(f"NLUService: Received Dialogflow CX response: Intent='{query_result.intent.display_name if query_result.intent else 'N/A'}', Confidence={query_result.intent_detection_confidence:.2f}")
-
-            nlu_entities = []
-            if query_result.parameters and query_result.parameters.fields:
-                for entity_name, entity_value_struct in query_result.parameters.fields.items():
-                    entity_value_str = ""
-                    kind = entity_value_struct.WhichOneof('kind') # 'string_value', 'number_value', 'bool_value', 'struct_value', 'list_value', 'null_value'
-
-                    if kind == 'string_value':
-                        entity_value_str = entity_value_struct.string_value
-                    elif kind == 'number_value':
-                        entity_value_str = str(entity_value_struct.number_value)
-                    elif kind == 'bool_value':
-                        entity_value_str = str(entity_value_struct.bool_value).lower()
-                    elif kind == 'struct_value' or kind == 'list_value':
-                         # For complex types, serialize to JSON string or handle specific structures
-                        from google.protobuf.json_format import MessageToJson
-                        entity_value_str = MessageToJson(entity_value_struct)
-                    elif kind == 'null_value':
-                        entity_value_str = "null"
-                    else: # Parameter has a value, but its kind is not one of the simple ones above
-                        entity_value_str = "[Complex Value]"
-
-
-                    nlu_entities.append(nlu_service_pb2.Entity(
-                        name=entity_name,
-                        value=entity_value_str,
-                        confidence=1.0 # DF CX parameters usually don't have per-param confidence. Intent confidence is key.
-                    ))
-
-            return nlu_service_pb2.NLUResponse(
-                session_id=request_session_id,
-                intent=query_result.intent.display_name if query_result.intent else "no_intent_matched",
-                entities=nlu_entities,
-                processed_text=query_result.text if query_result.text else request_text,
-                intent_confidence=query_result.intent_detection_confidence if query_result.intent else 0.0
-            )
+    def _map_query_result(self, query_result, request_text: str, request_session_id: str) -> nlu_service_pb2.NLUResponse:
+        """The NLUResponse of a Dialogflow CX QueryResult; logs it and follows the session's page."""
+        if self.result_cache is not None:
+            self.session_pages.update(request_session_id,
+                                      query_result.current_page.name or query_result.current_page.display_name)
 
-        except Exception as e:
-            print(f"NLUService: Dialogflow API error for session {request_session_id}: {e}")
-            return nlu_service_pb2.NLUResponse(
-                session_id=request_session_id,
-                intent="error_calling_dialogflow",
-                processed_text=request_text,
-                intent_confidence=0.0,
-                entities=[nlu_service_pb2.Entity(name="error_message", value=str(e))]
-            )
+        nlu_entities = []
+        # query_result.parameters is a proto-plus MapComposite; use the raw google.protobuf.Struct
+        # so each value's 'kind' can be inspected.
+        parameters = dialogflowcx.QueryResult.pb(query_result).parameters
+        if parameters and parameters.fields:
+            for entity_name, entity_value_struct in parameters.fields.items():
+                entity_value_str = ""
+                kind = entity_value_struct.WhichOneof('kind') # 'string_value', 'number_value', 'bool_value', 'struct_value', 'list_value', 'null_value'
+
+                if kind == 'string_value':
+                    entity_value_str = entity_value_struct.string_value
+                elif kind == 'number_value':
+                    entity_value_str = str(entity_value_struct.number_value)
+                elif kind == 'bool_value':
+                    entity_value_str = str(entity_value_struct.bool_value).lower()
+                elif kind == 'struct_value' or kind == 'list_value':
+                     # For complex types, serialize to JSON string or handle specific structures
+                    from google.protobuf.json_format import MessageToJson
+                    entity_value_str = MessageToJson(entity_value_struct)
+                elif kind == 'null_value':
+                    entity_value_str = "null"
+                else: # Parameter has a value, but its kind is not one of the simple ones above
+                    entity_value_str = "[Complex Value]"
+
+
+                nlu_entities.append(nlu_service_pb2.Entity(
+                    name=entity_name,
+                    value=entity_value_str,
+                    confidence=1.0 # DF CX parameters usually don't have per-param confidence. Intent confidence is key.
+                ))
+
+        # Also the training data of the local intent model (train_intent_classifier.py reads these events)
+        log.info("dialogflow_result", "Received Dialogflow CX response: Intent='%s', Confidence=%.2f",
+                 query_result.intent.display_name if query_result.intent else 'N/A', query_result.intent_detection_confidence,
+                 session_id=request_session_id, stage="nlu", text=request_text,
+                 intent=query_result.intent.display_name if query_result.intent else NO_INTENT,
+                 confidence=query_result.intent_detection_confidence,
+                 page=query_result.current_page.display_name,
+                 parameters=",".join(entity.name for entity in nlu_entities))
+
+        return nlu_service_pb2.NLUResponse(
+            session_id=request_session_id,
+            intent=query_result.intent.display_name if query_result.intent else NO_INTENT,
+            entities=nlu_entities,
+            processed_text=query_result.text if query_result.text else request_text,
+            intent_confidence=query_result.intent_detection_confidence if query_result.intent else 0.0
+        )
 
+    def _no_client_response(self, request_text: str, request_session_id: str) -> nlu_service_pb2.NLUResponse:
+        log.error("request", "Dialogflow CX client not available. Returning error response.",
+                  session_id=request_session_id, stage="nlu")
+        return nlu_service_pb2.NLUResponse(
+            session_id=request_session_id,
+            intent="error_no_dialogflow_client",
+            processed_text=request_text,
+            intent_confidence=0.0
+        )
+
+    def _error_response(self, request_text: str, request_session_id: str, error) -> nlu_service_pb2.NLUResponse:
+        return nlu_service_pb2.NLUResponse(
+            session_id=request_session_id,
+            intent="error_calling_dialogflow",
+            processed_text=request_text,
+            intent_confidence=0.0,
+            entities=[nlu_service_pb2.Entity(name="error_message", value=str(error))]
+        )
 
     def ProcessText(self, request: nlu_service_pb2.NLURequest, context):
-        print(f"NLUService: Received ProcessText request for SID '{request.session_id}', Text: '{request.text}'")
+        log.info("request", "Received ProcessText request, Text: '%s'", request.text, session_id=request.session_id, stage="nlu")
+
+        if deadlines.expired(context, "nlu", "ProcessText", NLU_RESERVED_SECONDS, request.session_id):
+            return nlu_service_pb2.NLUResponse(session_id=request.session_id)
+
+        source, nlu_response = self._answer_locally(request)
+        if nlu_response is None:
+            source, nlu_response = self._detect_intent(request, context)
+        return self._answered(source, nlu_response)
+
+    def _answered(self, source: str, nlu_response):
+        ANSWERS.labels(source).inc()
+        log.info("request", "NLU Response from %s: Intent='%s' (Conf: %.2f), Entities=[%s]",
+                 source, nlu_response.intent, nlu_response.intent_confidence,
+                 logs.lazy(_format_entities, nlu_response.entities),
+                 session_id=nlu_response.session_id, stage="nlu")
+        return nlu_response
+
+    def _detect_intent(self, request, context):
+        """("dialogflow" or "cache", NLUResponse) of Dialogflow CX, within what is left of the caller's deadline."""
+        def call():
+            return self._call_dialogflow_cx(
+                request.text, request.session_id,
+                timeout=deadlines.remaining(context, DIALOGFLOW_TIMEOUT_SECONDS, NLU_RESERVED_SECONDS))
+
+        if self.result_cache is None:
+            return "dialogflow", call()
+
+        def load():
+            return self._cache_entry(request, call())
 
-        # Use Dialogflow CX for NLU processing
-        nlu_response = self._call_dialogflow_cx(request.text, request.session_id)
+        cached, source = self.result_cache.fetch(
+            self._cache_key(request), load,
+            timeout=deadlines.remaining(context, DIALOGFLOW_TIMEOUT_SECONDS, NLU_RESERVED_SECONDS))
+        return self._cached_answer(request, cached, source)
 
-        entities_str = ', '.join([f"{e.name}='{e.value}' (conf: {e.confidence:.2f})" for e in nlu_response.entities])
-        print(f"NLUService: NLU Response from Dialogflow for SID {nlu_response.session_id}: Intent='{nlu_response.intent}' (Conf: {nlu_response.intent_confidence:.2f}), Entities=[{entities_str}]")
+    def _cache_key(self, request):
+        return intent_classifier.normalize(request.text), self.session_pages.get(request.session_id)
 
-        # Call DialogueManagementService
+    def _cache_entry(self, request, nlu_response):
+        """ResultCache load() result of this turn's Dialogflow result (which moved the session to its page)."""
+        return (nlu_response, _cache_template(nlu_response, self.session_pages.get(request.session_id)),
+                nlu_response.intent == NO_INTENT)
+
+    def _cached_answer(self, request, cached, source):
+        """
+        ("dialogflow", this turn's own result) on a miss; ("cache", the shared
+        result made the request's) otherwise, moving the session to the page
+        the result leads to.
+        """
+        if source == result_cache.MISS:
+            return "dialogflow", cached
+        template, page = cached
+        self.session_pages.advance(request.session_id, page)
+        nlu_response = nlu_service_pb2.NLUResponse()
+        nlu_response.CopyFrom(template)
+        nlu_response.session_id = request.session_id
+        nlu_response.processed_text = request.text
+        return "cache", nlu_response
+
+    def _answer_locally(self, request):
+        """
+        (source, NLUResponse) for text that needs no Dialogflow call: nothing
+        said, or an intent the local model is confident about; (None, None)
+        for the rest.
+        """
+        if _NOTHING_SAID.fullmatch(request.text):
+            return "blank", nlu_service_pb2.NLUResponse(
+                session_id=request.session_id, intent=NO_INTENT, processed_text=request.text, intent_confidence=0.0)
+        if self.classifier is None:
+            return None, None
+        with LOCAL_CLASSIFY_SECONDS.time():
+            intent, confidence = self.classifier.classify(request.text)
+        if intent == intent_classifier.FALLBACK or confidence < NLU_LOCAL_CONFIDENCE_THRESHOLD:
+            return None, None
+        return "local", nlu_service_pb2.NLUResponse(
+            session_id=request.session_id, intent=intent, processed_text=request.text, intent_confidence=confidence)
+
+class AsyncNLUServiceServicer(NLUServiceServicer):
+    """
+    The NLUServiceServicer of the asyncio server (NLU_ASYNC_SERVER):
+    ProcessText is a coroutine, and Dialogflow CX is called through one
+    SessionsAsyncClient, one channel multiplexing every call, so a turn
+    waiting on Dialogflow holds no thread. At most `max_concurrent_calls`
+    DetectIntent calls are in flight; a turn waits for a call slot within its
+    deadline. Create it on the event loop that serves it.
+    """
+    def __init__(self, classifier=None, cache=None, max_concurrent_calls: int = NLU_MAX_CONCURRENT_DIALOGFLOW_CALLS):
+        super().__init__(classifier, cache)
+        self.call_slots = asyncio.Semaphore(max_concurrent_calls)
+        self.calls_in_flight = 0
+        self.calls_waiting = 0
+        DIALOGFLOW_CALLS_IN_FLIGHT.set_function(lambda: self.calls_in_flight)
+        DIALOGFLOW_CALLS_WAITING.set_function(lambda: self.calls_waiting)
+
+    def _create_sessions_client(self):
+        return _create_sessions_client("SessionsAsyncClient", dialogflowcx.SessionsAsyncClient,
+                                       SessionsGrpcAsyncIOTransport, grpc.aio.insecure_channel)
+
+    async def ProcessText(self, request: nlu_service_pb2.NLURequest, context):
+        log.info("request", "Received ProcessText request, Text: '%s'", request.text, session_id=request.session_id, stage="nlu")
+
+        if deadlines.expired(context, "nlu", "ProcessText", NLU_RESERVED_SECONDS, request.session_id):
+            return nlu_service_pb2.NLUResponse(session_id=request.session_id)
+
+        source, nlu_response = self._answer_locally(request)
+        if nlu_response is None:
+            source, nlu_response = await self._detect_intent_async(request, context)
+        return self._answered(source, nlu_response)
+
+    async def _detect_intent_async(self, request, context):
+        """_detect_intent() on the event loop."""
+        def call():
+            return self._call_dialogflow_cx_async(
+                request.text, request.session_id,
+                timeout=deadlines.remaining(context, DIALOGFLOW_TIMEOUT_SECONDS, NLU_RESERVED_SECONDS))
+
+        if self.result_cache is None:
+            return "dialogflow", await call()
+
+        async def load():
+            return self._cache_entry(request, await call())
+
+        cached, source = await self.result_cache.fetch_async(
+            self._cache_key(request), load,
+            timeout=deadlines.remaining(context, DIALOGFLOW_TIMEOUT_SECONDS, NLU_RESERVED_SECONDS))
+        return self._cached_answer(request, cached, source)
+
+    async def _call_dialogflow_cx_async(self, request_text: str, request_session_id: str,
+                                        timeout: float = DIALOGFLOW_TIMEOUT_SECONDS) -> nlu_service_pb2.NLUResponse:
+        """_call_dialogflow_cx() on the async client, once a call slot is free; `timeout` covers the wait too."""
+        if not self.sessions_client:
+            return self._no_client_response(request_text, request_session_id)
+
+        df_request = self._detect_intent_request(request_text, request_session_id)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        if not await self._acquire_call_slot(timeout):
+            DIALOGFLOW_SLOT_TIMEOUTS.inc()
+            log.warning("request", "No Dialogflow CX call slot free within %.3f s (%d calls in flight, %d waiting).",
+                        timeout, self.calls_in_flight, self.calls_waiting, session_id=request_session_id, stage="nlu")
+            return self._error_response(request_text, request_session_id, "Too many concurrent Dialogflow CX calls")
+        self.calls_in_flight += 1
         try:
-            with grpc.insecure_channel(self.dm_service_address) as channel:
-                dm_stub = dialogue_management_service_pb2_grpc.DialogueManagementServiceStub(channel)
-                dialogue_request = dialogue_management_service_pb2.DialogueRequest(
-                    session_id=nlu_response.session_id,
-                    nlu_result=nlu_response
-                )
-                print(f"NLUService: Calling DMService at {self.dm_service_address} for SID {dialogue_request.session_id}")
-                dm_response = dm_stub.ManageTurn(dialogue_request, timeout=10)
-                if dm_response:
-                    print(f"NLUService: Received DM response for SID {dm_response.session_id}: TextResponse='{dm_response.text_response}'")
-                else:
-                    print(f"NLUService: No response from DMService for SID {dialogue_request.session_id}")
-        except grpc.RpcError as e:
-            print(f"NLUService: Error calling DMService for SID {request.session_id}: Code={e.code()}, Details='{e.details()}'")
+            log.info("request", "Sending request to Dialogflow CX: Text='%s'", request_text,
+                     session_id=request_session_id, stage="nlu")
+            with tracing.span("dialogflow.detect_intent"), DETECT_INTENT_SECONDS.time():
+                df_response = await self.sessions_client.detect_intent(
+                    request=df_request, timeout=max(deadline - loop.time(), 0.001))
+            return self._map_query_result(df_response.query_result, request_text, request_session_id)
         except Exception as e:
-            print(f"NLUService: Unexpected Python error calling DMService for SID {request.session_id}: {e}")
+            log.error("request", "Dialogflow API error: %s", e, session_id=request_session_id, stage="nlu")
+            return self._error_response(request_text, request_session_id, e)
+        finally:
+            self.calls_in_flight -= 1
+            self.call_slots.release()
+
+    async def _acquire_call_slot(self, timeout: float) -> bool:
+        if not self.call_slots.locked():
+            await self.call_slots.acquire() # Free: returns without yielding
+            return True
+        self.calls_waiting += 1
+        try:
+            await asyncio.wait_for(self.call_slots.acquire(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+        finally:
+            self.calls_waiting -= 1
 
-        return nlu_response # Return the NLU response obtained from Dialogflow
 
 def serve():
-    server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
+    if NLU_ASYNC_SERVER:
+        asyncio.run(serve_async())
+        return
+    logs.configure()
+    tracing.init_tracer("nlu")
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=NLU_MAX_WORKERS),
+                         interceptors=metrics.server_interceptors("nlu") + tracing.server_interceptors())
     nlu_service_pb2_grpc.add_NLUServiceServicer_to_server(NLUServiceServicer(), server)
+    admin.add_to_server(server, "nlu")
     port = "50053"
     listen_addr = f'[::]:{port}'
     server.add_insecure_port(listen_addr)
     server.start()
-    print(f"NLUService server started, listening on port {port}")
+    metrics.start_http_server("nlu", 51053)
+    log.info("lifecycle", "NLUService server started, listening on port %s", port)
     try:
         while True:
             time.sleep(86400)
     except KeyboardInterrupt:
-        print("NLUService server stopping...")
+        log.info("lifecycle", "NLUService server stopping...")
         server.stop(0)
-        print("NLUService server stopped.")
+        metrics.shutdown()
+        tracing.shutdown()
+        log.info("lifecycle", "NLUService server stopped.")
+        logs.shutdown()
+
+
+async def serve_async():
+    """serve() on a grpc.aio server; the synchronous admin methods run in a small thread pool."""
+    logs.configure()
+    tracing.init_tracer("nlu")
+    loop = asyncio.get_running_loop()
+    monitor = loop_monitor.monitor(loop, "nlu")
+    stopping = asyncio.Event()
+    # Not asyncio.run()'s cancellation on Ctrl-C: it would cancel server.stop() too
+    loop.add_signal_handler(signal.SIGINT, stopping.set)
+    admin_pool = futures.ThreadPoolExecutor(max_workers=2)
+    server = grpc.aio.server(migration_thread_pool=admin_pool,
+                             interceptors=metrics.aio_server_interceptors("nlu") + tracing.aio_server_interceptors())
+    nlu_service_pb2_grpc.add_NLUServiceServicer_to_server(AsyncNLUServiceServicer(), server)
+    admin.add_to_server(server, "nlu")
+    port = "50053"
+    listen_addr = f'[::]:{port}'
+    server.add_insecure_port(listen_addr)
+    await server.start()
+    metrics.start_http_server("nlu", 51053)
+    log.info("lifecycle", "NLUService asyncio server started, listening on port %s (at most %d Dialogflow CX calls in flight)",
+             port, NLU_MAX_CONCURRENT_DIALOGFLOW_CALLS)
+    await stopping.wait()
+    log.info("lifecycle", "NLUService server stopping...")
+    await server.stop(0)
+    if monitor:
+        monitor.stop()
+    admin_pool.shutdown(wait=False)
+    metrics.shutdown()
+    tracing.shutdown()
+    log.info("lifecycle", "NLUService server stopped.")
+    logs.shutdown()
 
 if __name__ == '__main__':
     serve()
@@ -1,14 +1,13 @@
+import asyncio
 import unittest
 from unittest import mock
 import grpc
 
 # Import NLU service and message types
-from service import NLUServiceServicer
+from service import AsyncNLUServiceServicer, NLUServiceServicer, DIALOGFLOW_TIMEOUT_SECONDS, NLU_RESERVED_SECONDS
 import nlu_service_pb2
-
-# Import DM service message types (for mocking DM calls)
-import dialogue_management_service_pb2
-import dialogue_management_service_pb2_grpc
+import intent_classifier
+from result_cache import ResultCache
 
 # Import Dialogflow CX specific types for creating mock responses
 from google.cloud.dialogflowcx_v3beta1 import types as dialogflowcx_types
@@ -32,30 +31,18 @@ class TestNLUServiceServicerWithDialogflow(unittest.TestCase):
         self.mock_df_sessions_client_instance = self.MockDialogflowSessionsClientConstructor.return_value
         self.mock_df_sessions_client_instance.detect_intent = mock.Mock()
 
-        # Mock the Dialogue Management (DM) client stub
-        self.dm_channel_patcher = mock.patch('service.grpc.insecure_channel')
-        self.mock_grpc_insecure_channel = self.dm_channel_patcher.start()
-
-        self.dm_stub_patcher = mock.patch('service.dialogue_management_service_pb2_grpc.DialogueManagementServiceStub')
-        self.MockDMServiceStubConstructor = self.dm_stub_patcher.start()
-
-        self.mock_dm_channel_instance = mock.Mock()
-        self.mock_dm_channel_instance.__enter__.return_value = self.mock_dm_channel_instance
-        self.mock_grpc_insecure_channel.return_value = self.mock_dm_channel_instance
-
-        self.mock_dm_stub_instance = self.MockDMServiceStubConstructor.return_value
-        self.mock_dm_stub_instance.ManageTurn.return_value = dialogue_management_service_pb2.DialogueResponse(
-            text_response="DM mock response"
-        )
+        # NLU is a leaf service: it must not open any gRPC channel of its own
+        self.channel_patcher = mock.patch('service.grpc.insecure_channel')
+        self.mock_grpc_insecure_channel = self.channel_patcher.start()
 
         # Instantiate the servicer. This will use the mocked SessionsClient.
         self.servicer = NLUServiceServicer()
         self.mock_grpc_context = mock.Mock(spec=grpc.ServicerContext)
+        self.mock_grpc_context.time_remaining.return_value = None # The caller set no deadline
 
     def tearDown(self):
         self.sessions_client_patcher.stop()
-        self.dm_stub_patcher.stop()
-        self.dm_channel_patcher.stop()
+        self.channel_patcher.stop()
 
     def test_process_text_success_maps_dialogflow_response(self):
         # 1. Define a mock Dialogflow CX response
@@ -97,6 +84,7 @@ class TestNLUServiceServicerWithDialogflow(unittest.TestCase):
         # 4. Assert Dialogflow call
         self.mock_df_sessions_client_instance.detect_intent.assert_called_once()
         called_df_request = self.mock_df_sessions_client_instance.detect_intent.call_args[1]['request'] # request is a kwarg
+        self.assertEqual(self.mock_df_sessions_client_instance.detect_intent.call_args[1]['timeout'], DIALOGFLOW_TIMEOUT_SECONDS)
         self.assertIn(f"projects/test-project/locations/global/agents/test-agent/sessions/{nlu_request.session_id}", called_df_request.session)
         self.assertEqual(called_df_request.query_input.text.text, nlu_request.text)
         self.assertEqual(called_df_request.query_input.language_code, 'en-US')
@@ -126,27 +114,23 @@ class TestNLUServiceServicerWithDialogflow(unittest.TestCase):
                 self.assertEqual(entity.value, expected_entities[entity.name])
             self.assertAlmostEqual(entity.confidence, 1.0) # Default for DF params
 
-        # 6. Assert DM call
-        self.mock_dm_stub_instance.ManageTurn.assert_called_once()
-        called_dm_request = self.mock_dm_stub_instance.ManageTurn.call_args[0][0]
-        self.assertEqual(called_dm_request.nlu_result, nlu_response)
+        # 6. No downstream call: the orchestrator passes the result to DM
+        self.mock_grpc_insecure_channel.assert_not_called()
 
 
     def test_process_text_dialogflow_api_error(self):
         self.mock_df_sessions_client_instance.detect_intent.side_effect = Exception("Dialogflow API Error")
         nlu_request = nlu_service_pb2.NLURequest(text="test error", session_id="s_api_error")
 
-        with mock.patch('builtins.print') as mock_print:
+        with self.assertLogs("revo.nlu", level="ERROR") as logged:
             nlu_response = self.servicer.ProcessText(nlu_request, self.mock_grpc_context)
 
         self.assertEqual(nlu_response.intent, "error_calling_dialogflow")
         self.assertEqual(nlu_response.entities[0].name, "error_message")
         self.assertIn("Dialogflow API Error", nlu_response.entities[0].value)
 
-        self.mock_dm_stub_instance.ManageTurn.assert_called_once_with(
-            dialogue_management_service_pb2.DialogueRequest(session_id="s_api_error", nlu_result=nlu_response)
-        )
-        mock_print.assert_any_call("NLUService: Dialogflow API error for session s_api_error: Dialogflow API Error")
+        self.mock_grpc_insecure_channel.assert_not_called()
+        self.assertIn("ERROR:revo.nlu:Dialogflow API error: Dialogflow API Error", logged.output)
 
 
     def test_process_text_no_intent_matched(self):
@@ -178,6 +162,29 @@ class TestNLUServiceServicerWithDialogflow(unittest.TestCase):
         self.assertEqual(nlu_response.intent, "simple_intent")
 
 
+    def test_process_text_passes_the_remaining_deadline_to_dialogflow(self):
+        servicer = NLUServiceServicer(cache=None)
+        servicer.classifier = None
+        servicer.sessions_client = mock.Mock()
+        servicer.sessions_client.session_path.side_effect = lambda **kw: f"projects/p/sessions/{kw['session']}"
+        servicer.sessions_client.detect_intent.return_value = dialogflowcx_types.DetectIntentResponse()
+        self.mock_grpc_context.time_remaining.return_value = 0.5
+
+        servicer.ProcessText(nlu_service_pb2.NLURequest(text="hi", session_id="s_deadline"), self.mock_grpc_context)
+
+        timeout = servicer.sessions_client.detect_intent.call_args[1]['timeout']
+        self.assertAlmostEqual(timeout, 0.5 - NLU_RESERVED_SECONDS)
+
+    def test_process_text_past_its_deadline_is_dropped(self):
+        self.mock_grpc_context.time_remaining.return_value = 0.0
+
+        nlu_response = self.servicer.ProcessText(nlu_service_pb2.NLURequest(text="hi", session_id="s_expired"),
+                                                 self.mock_grpc_context)
+
+        self.assertEqual(nlu_response.intent, "")
+        self.mock_df_sessions_client_instance.detect_intent.assert_not_called()
+        self.mock_grpc_context.set_code.assert_called_once_with(grpc.StatusCode.DEADLINE_EXCEEDED)
+
     @mock.patch.dict('service.__dict__', {'GOOGLE_APP_CREDS': None}) # Override class-level patch
     def test_process_text_dialogflow_client_not_initialized(self, MockDialogflowSessionsClient):
         # Re-initialize servicer with GOOGLE_APP_CREDS as None to test client non-initialization
@@ -187,18 +194,217 @@ class TestNLUServiceServicerWithDialogflow(unittest.TestCase):
 
         nlu_request = nlu_service_pb2.NLURequest(text="test no client", session_id="s_no_client")
 
-        with mock.patch('builtins.print') as mock_print: # To check for the warning
+        with self.assertLogs("revo.nlu", level="ERROR") as logged:
             nlu_response = servicer_no_client.ProcessText(nlu_request, self.mock_grpc_context)
 
         self.assertEqual(nlu_response.intent, "error_no_dialogflow_client")
-        # Check that the DM call is still made with the error NLUResponse
-        self.mock_dm_stub_instance.ManageTurn.assert_called_once()
-        called_dm_request = self.mock_dm_stub_instance.ManageTurn.call_args[0][0]
-        self.assertEqual(called_dm_request.nlu_result.intent, "error_no_dialogflow_client")
-
-        # Check if the warning from __init__ was printed (if it's the first time for this config)
-        # Or check the print from _call_dialogflow_cx
-        mock_print.assert_any_call("NLUService Error: Dialogflow CX client not available. Returning error response.")
+        self.mock_grpc_insecure_channel.assert_not_called()
+
+        # Check the error logged by _call_dialogflow_cx
+        self.assertIn("ERROR:revo.nlu:Dialogflow CX client not available. Returning error response.", logged.output)
+
+
+class FakeClassifier:
+    """Stands in for an intent_classifier.IntentClassifier: a fixed answer per text."""
+
+    def __init__(self, answers):
+        self.answers = answers
+
+    def classify(self, text):
+        return self.answers.get(text, (intent_classifier.FALLBACK, 0.99))
+
+
+class TestNLUServiceLocalFastPath(unittest.TestCase):
+
+    def setUp(self):
+        self.servicer = NLUServiceServicer(classifier=FakeClassifier({
+            "yes please": ("confirm", 0.98),
+            "maybe": ("confirm", 0.55),
+        }))
+        self.servicer.sessions_client = mock.Mock()
+        self.servicer.sessions_client.session_path.return_value = "projects/p/locations/global/agents/a/sessions/s_local"
+        self.servicer.sessions_client.detect_intent.return_value = dialogflowcx_types.DetectIntentResponse(
+            query_result=dialogflowcx_types.QueryResult(
+                text="maybe", intent=dialogflowcx_types.Intent(display_name="from_dialogflow")))
+        self.context = mock.Mock(spec=grpc.ServicerContext)
+        self.context.time_remaining.return_value = None
+
+    def process(self, text):
+        return self.servicer.ProcessText(nlu_service_pb2.NLURequest(text=text, session_id="s_local"), self.context)
+
+    def test_a_confident_local_intent_skips_dialogflow(self):
+        nlu_response = self.process("yes please")
+
+        self.assertEqual((nlu_response.intent, nlu_response.processed_text), ("confirm", "yes please"))
+        self.assertAlmostEqual(nlu_response.intent_confidence, 0.98)
+        self.assertEqual(nlu_response.session_id, "s_local")
+        self.servicer.sessions_client.detect_intent.assert_not_called()
+
+    def test_low_confidence_and_fallback_texts_go_to_dialogflow(self):
+        for text in ("maybe", "what is the weather in paris"):
+            self.assertEqual(self.process(text).intent, "from_dialogflow")
+        self.assertEqual(self.servicer.sessions_client.detect_intent.call_count, 2)
+
+    def test_nothing_said_is_no_intent_without_dialogflow(self):
+        for text in ("", "  ", "[STT Timeout]", "[STT Error: ConnectionClosed]"):
+            nlu_response = self.process(text)
+            self.assertEqual((nlu_response.intent, nlu_response.intent_confidence), ("no_intent_matched", 0.0))
+        self.servicer.sessions_client.detect_intent.assert_not_called()
+
+
+class TestNLUServiceResultCache(unittest.TestCase):
+
+    def setUp(self):
+        self.servicer = NLUServiceServicer(cache=ResultCache(max_entries=100, ttl=60, negative_ttl=10))
+        self.servicer.classifier = None
+        self.servicer.sessions_client = mock.Mock()
+        self.servicer.sessions_client.session_path.side_effect = lambda **kw: f"projects/p/sessions/{kw['session']}"
+        self.context = mock.Mock(spec=grpc.ServicerContext)
+        self.context.time_remaining.return_value = None
+
+    def dialogflow_answers(self, intent="confirm", page="flows/default/pages/menu", **parameters):
+        query_result = dialogflowcx_types.QueryResult(
+            text="DF text", intent_detection_confidence=0.9,
+            current_page=dialogflowcx_types.Page(name=page))
+        if intent:
+            query_result.intent = dialogflowcx_types.Intent(display_name=intent)
+        if parameters:
+            query_result.parameters = parameters
+        self.servicer.sessions_client.detect_intent.return_value = dialogflowcx_types.DetectIntentResponse(
+            query_result=query_result)
+
+    def process(self, text, session_id):
+        return self.servicer.ProcessText(nlu_service_pb2.NLURequest(text=text, session_id=session_id), self.context)
+
+    def test_a_repeated_answer_is_served_from_the_cache_to_other_callers(self):
+        self.dialogflow_answers("confirm")
+        self.process("Yes.", "caller_a")
+        nlu_response = self.process("yes", "caller_b")
+
+        self.assertEqual((nlu_response.session_id, nlu_response.intent, nlu_response.processed_text),
+                         ("caller_b", "confirm", "yes"))
+        self.assertAlmostEqual(nlu_response.intent_confidence, 0.9)
+        self.servicer.sessions_client.detect_intent.assert_called_once()
+
+    def test_the_key_includes_the_page_the_session_is_on(self):
+        self.dialogflow_answers("confirm", page="flows/billing/pages/amount")
+        self.process("yes", "caller_a") # Start page; caller_a is on the billing page after it
+        self.process("yes", "caller_a") # Billing page: another key
+        self.assertEqual(self.servicer.sessions_client.detect_intent.call_count, 2)
+        self.process("yes", "caller_b") # Start page
+        self.process("yes", "caller_a")
+        self.assertEqual(self.servicer.sessions_client.detect_intent.call_count, 2)
+
+    def test_a_cached_answer_moves_the_session_to_its_page(self):
+        confirmed = "projects/p/locations/global/agents/a/flows/default/pages/confirmed"
+        self.dialogflow_answers("confirm", page=confirmed)
+        self.process("yes", "caller_a")
+        self.process("yes", "caller_b") # From the cache: Dialogflow's session of caller_b stays behind
+        self.assertEqual(self.servicer.session_pages.get("caller_b"), confirmed)
+        self.servicer.sessions_client.detect_intent.assert_called_once()
+
+        self.process("my order", "caller_b")
+        next_request = self.servicer.sessions_client.detect_intent.call_args.kwargs["request"]
+        self.assertEqual(next_request.query_params.current_page, confirmed)
+        self.process("cancel it", "caller_b") # Caught up: Dialogflow's session moves on by itself again
+        self.assertFalse(self.servicer.sessions_client.detect_intent.call_args.kwargs["request"].query_params.current_page)
+
+    def test_results_with_parameters_and_errors_are_not_cached(self):
+        self.dialogflow_answers("give_account", account="12345")
+        self.process("it's one two three four five", "caller_a")
+        nlu_response = self.process("it's one two three four five", "caller_b")
+        self.assertEqual([entity.value for entity in nlu_response.entities], ["12345"]) # caller_b's own call
+        self.servicer.sessions_client.detect_intent.side_effect = Exception("unavailable")
+        with self.assertLogs("revo.nlu", level="ERROR"):
+            self.process("agent", "caller_a")
+            self.process("agent", "caller_b")
+        self.assertEqual(self.servicer.sessions_client.detect_intent.call_count, 4)
+
+    def test_no_intent_matched_is_cached(self):
+        self.dialogflow_answers(intent=None)
+        self.process("purple monkey", "caller_a")
+        self.assertEqual(self.process("purple monkey", "caller_b").intent, "no_intent_matched")
+        self.servicer.sessions_client.detect_intent.assert_called_once()
+
+
+class FakeAsyncSessionsClient:
+    """Stands in for a SessionsAsyncClient: answers `intent` after `latency` seconds, counting concurrent calls."""
+
+    def __init__(self, intent="confirm", latency=0.02):
+        self.intent = intent
+        self.latency = latency
+        self.calls = []
+        self.in_flight = self.peak_in_flight = 0
+
+    def session_path(self, project, location, agent, session):
+        return f"projects/{project}/locations/{location}/agents/{agent}/sessions/{session}"
+
+    async def detect_intent(self, request, timeout):
+        self.calls.append((request.query_input.text.text, timeout))
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.latency)
+        finally:
+            self.in_flight -= 1
+        return dialogflowcx_types.DetectIntentResponse(query_result=dialogflowcx_types.QueryResult(
+            text=request.query_input.text.text, intent=dialogflowcx_types.Intent(display_name=self.intent),
+            intent_detection_confidence=0.9))
+
+
+class TestAsyncNLUService(unittest.TestCase):
+
+    def context(self, time_remaining=None):
+        context = mock.Mock(spec=grpc.aio.ServicerContext)
+        context.time_remaining.return_value = time_remaining
+        return context
+
+    def run_turns(self, texts, max_concurrent_calls=100, cache=None, time_remaining=None, client=None):
+        """The NLUResponses of `texts`, sent concurrently (one session each) to a new AsyncNLUServiceServicer."""
+        async def run():
+            self.servicer = AsyncNLUServiceServicer(classifier=FakeClassifier({}), cache=cache,
+                                                    max_concurrent_calls=max_concurrent_calls)
+            self.servicer.sessions_client = client or FakeAsyncSessionsClient()
+            return await asyncio.gather(*(
+                self.servicer.ProcessText(nlu_service_pb2.NLURequest(text=text, session_id=f"s{i}"),
+                                          self.context(time_remaining))
+                for i, text in enumerate(texts)))
+
+        return asyncio.run(run())
+
+    def test_dialogflow_results_are_mapped_within_the_callers_deadline(self):
+        nlu_response, = self.run_turns(["yes please"], time_remaining=1.0)
+
+        self.assertEqual((nlu_response.session_id, nlu_response.intent, nlu_response.processed_text),
+                         ("s0", "confirm", "yes please"))
+        (text, timeout), = self.servicer.sessions_client.calls
+        self.assertEqual(text, "yes please")
+        self.assertLessEqual(timeout, 1.0 - NLU_RESERVED_SECONDS)
+        self.assertGreater(timeout, 0.5)
+
+    def test_at_most_max_concurrent_calls_are_in_flight(self):
+        responses = self.run_turns([f"turn {i}" for i in range(10)], max_concurrent_calls=3)
+
+        self.assertEqual([r.intent for r in responses], ["confirm"] * 10)
+        self.assertEqual(self.servicer.sessions_client.peak_in_flight, 3)
+        self.assertEqual((self.servicer.calls_in_flight, self.servicer.calls_waiting), (0, 0))
+
+    def test_a_turn_that_cannot_get_a_call_slot_within_its_deadline_is_an_error(self):
+        client = FakeAsyncSessionsClient(latency=0.2)
+        with self.assertLogs("revo.nlu", level="WARNING") as logged:
+            responses = self.run_turns(["first", "second"], max_concurrent_calls=1, time_remaining=0.1, client=client)
+
+        self.assertEqual([r.intent for r in responses], ["confirm", "error_calling_dialogflow"])
+        self.assertEqual(len(client.calls), 1)
+        self.assertIn("Too many concurrent Dialogflow CX calls", responses[1].entities[0].value)
+        self.assertTrue(any("No Dialogflow CX call slot free" in line for line in logged.output))
+
+    def test_concurrent_identical_turns_make_one_call_with_the_cache(self):
+        responses = self.run_turns(["Yes.", "yes", "YES"], cache=ResultCache(max_entries=10, ttl=60, negative_ttl=10))
+
+        self.assertEqual([(r.session_id, r.intent, r.processed_text) for r in responses],
+                         [("s0", "confirm", "Yes."), ("s1", "confirm", "yes"), ("s2", "confirm", "YES")])
+        self.assertEqual(len(self.servicer.sessions_client.calls), 1)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,162 @@
+# ai_ml_services/nlu_service/train_intent_classifier.py
+
+"""
+Trains the local intent classifier (intent_classifier.py) offline from the
+Dialogflow CX results the NLUService logged. With LOG_FORMAT=json, every
+DetectIntent result is one event of category "dialogflow_result" carrying the
+text, intent, confidence, page and parameter names; Dialogflow's answers are
+the labels.
+
+Labelling, so that the model only learns to answer what it can answer:
+  * an intent Dialogflow ever returned with parameters is left to Dialogflow
+    (label FALLBACK): the classifier does not extract entities;
+  * so are texts that matched no intent, texts Dialogflow answered with
+    different intents (e.g. on different pages) less than
+    --min-agreement of the time, and intents with fewer than
+    --min-examples examples.
+
+A hold-out set (split by text, so a repeated answer is never on both sides)
+reports, at the service's confidence threshold, how many turns the model
+answers and how many of those answers agree with Dialogflow.
+
+Example:
+    python train_intent_classifier.py nlu-logs/*.jsonl --threshold 0.9
+"""
+
+import argparse
+import collections
+import json
+import os
+import sys
+import time
+import zlib
+
+import intent_classifier
+from intent_classifier import FALLBACK, IntentClassifier, normalize
+
+RESULT_CATEGORY = "dialogflow_result"
+NO_MATCH = "no_intent_matched"
+
+
+def read_results(paths: list):
+    """Yields (text, intent, parameter names) of the logged Dialogflow results in the JSON log files at `paths`."""
+    for path in paths:
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if RESULT_CATEGORY not in line:
+                    continue
+                try:
+                    event = json.loads(line)
+                except ValueError: # Interleaved non-JSON output
+                    continue
+                if event.get("category") == RESULT_CATEGORY and "text" in event:
+                    parameters = event.get("parameters", "")
+                    yield event["text"], event.get("intent", NO_MATCH), [p for p in parameters.split(",") if p]
+
+
+def label_examples(results, min_examples: int = 20, min_agreement: float = 0.95):
+    """
+    (texts, labels, left_to_dialogflow) from (text, intent, parameter names)
+    results: labels are the intents, or FALLBACK; `left_to_dialogflow` maps
+    each intent labelled FALLBACK to the reason.
+    """
+    results = [(text, intent, parameters) for text, intent, parameters in results if normalize(text)]
+    reasons = {NO_MATCH: "no intent matched"}
+    for _, intent, parameters in results:
+        if parameters:
+            reasons.setdefault(intent, "has parameters")
+    for intent, count in collections.Counter(intent for _, intent, _ in results).items():
+        if count < min_examples:
+            reasons.setdefault(intent, f"{count} examples")
+    by_text = collections.defaultdict(collections.Counter)
+    for text, intent, _ in results:
+        by_text[normalize(text)][intent] += 1
+    ambiguous = {text for text, intents in by_text.items()
+                 if intents.most_common(1)[0][1] < min_agreement * sum(intents.values())}
+
+    texts, labels = [], []
+    for text, intent, _ in results:
+        texts.append(text)
+        labels.append(FALLBACK if intent in reasons or normalize(text) in ambiguous else intent)
+    return texts, labels, reasons
+
+
+def split(texts: list, labels: list, holdout: float):
+    """(train, test) pairs of (texts, labels), split by a hash of the normalized text."""
+    train, test = ([], []), ([], [])
+    for text, label in zip(texts, labels):
+        side = test if zlib.crc32(normalize(text).encode("utf-8")) % 1000 < holdout * 1000 else train
+        side[0].append(text)
+        side[1].append(label)
+    return train, test
+
+
+def evaluate(model: IntentClassifier, texts: list, labels: list, threshold: float) -> dict:
+    """
+    How the model does as the service uses it: `answered` is the share of
+    texts it answers locally (not FALLBACK, confidence >= threshold),
+    `accuracy` the share of those answers that match the label, `coverage`
+    the share of the texts with a local label that it answers.
+    """
+    answered = correct = local = 0
+    for text, label in zip(texts, labels):
+        intent, confidence = model.classify(text)
+        local += label != FALLBACK
+        if intent != FALLBACK and confidence >= threshold:
+            answered += 1
+            correct += intent == label
+    return {
+        "examples": len(texts),
+        "answered": answered / len(texts) if texts else 0.0,
+        "accuracy": correct / answered if answered else 0.0,
+        "coverage": correct / local if local else 0.0,
+    }
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Train the NLU local intent classifier from logged Dialogflow results.")
+    parser.add_argument("logs", nargs="+", help="NLUService JSON log files (LOG_FORMAT=json).")
+    parser.add_argument("--out", default=os.path.join(os.path.dirname(os.path.abspath(__file__)), "models",
+                                                      "intent_classifier.npz"),
+                        help="Where to write the model (default: where the service loads it from).")
+    parser.add_argument("--features", type=int, default=16, help="log2 of the number of hashed feature buckets.")
+    parser.add_argument("--epochs", type=int, default=100)
+    parser.add_argument("--learning-rate", type=float, default=0.1)
+    parser.add_argument("--l2", type=float, default=1e-5)
+    parser.add_argument("--min-examples", type=int, default=20, help="Fewer examples: left to Dialogflow.")
+    parser.add_argument("--min-agreement", type=float, default=0.95,
+                        help="Texts Dialogflow labels consistently less often than this are left to it.")
+    parser.add_argument("--holdout", type=float, default=0.1, help="Share of the texts held out for evaluation.")
+    parser.add_argument("--threshold", type=float, default=0.9, help="Confidence threshold to evaluate at "
+                                                                      "(the service's NLU_LOCAL_CONFIDENCE_THRESHOLD).")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    texts, labels, reasons = label_examples(read_results(args.logs), args.min_examples, args.min_agreement)
+    if not texts:
+        sys.exit("No Dialogflow results in the logs (is LOG_FORMAT=json, and the dialogflow_result category kept?)")
+    counts = collections.Counter(labels)
+    print(f"{len(texts)} results, {len(counts) - (FALLBACK in counts)} local intents")
+    for label, count in counts.most_common():
+        print(f"  {label:<32} {count}")
+    for intent, reason in sorted(reasons.items()):
+        print(f"  left to Dialogflow: {intent} ({reason})")
+
+    (train_texts, train_labels), (test_texts, test_labels) = split(texts, labels, args.holdout)
+    start = time.perf_counter()
+    model = intent_classifier.train(train_texts, train_labels, 1 << args.features, args.epochs, args.learning_rate,
+                                    args.l2)
+    print(f"Trained on {len(train_texts)} results in {time.perf_counter() - start:.1f} s")
+    if test_texts:
+        result = evaluate(model, test_texts, test_labels, args.threshold)
+        print(f"Hold-out ({result['examples']} results) at threshold {args.threshold}: "
+              f"answered locally {result['answered']:.1%}, accuracy {result['accuracy']:.1%}, "
+              f"coverage of local intents {result['coverage']:.1%}")
+    model.save(args.out)
+    print(f"Wrote {args.out}")
+
+
+if __name__ == "__main__":
+    main()
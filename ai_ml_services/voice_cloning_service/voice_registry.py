@@ -0,0 +1,263 @@
+# ai_ml_services/voice_cloning_service/voice_registry.py
+
+"""
+Registry of the voice models, shared by voice cloning (which writes them) and
+TTS (which synthesizes with them). A per-tenant cloned voice is a few
+megabytes to a few hundred of weights; loading every voice at startup would
+take minutes and more memory than the host has, so voices are loaded on first
+use and only the recently used ones stay resident.
+
+* Layout: one directory per voice id under the registry directory, holding
+  `voice.json` (metadata) and one `.npy` file per array (weights, speaker
+  embedding). Voices are immutable: a retrained voice is saved under a new id,
+  so audio cached under the old id never goes stale.
+* Lazy, memory-mapped: `get()` maps the arrays of a voice read-only on first
+  use. Nothing is copied; pages are read from disk as the engine touches them
+  and are shared, through the OS page cache, with every process on the host
+  that maps the same voice. Concurrent first uses of a voice load it once.
+* LRU under a budget: the mapped bytes of the resident voices are kept under
+  `max_bytes`, dropping the least recently used voices. An evicted voice is
+  unmapped once the renders still using it are done.
+* Prefetch: `prefetch()` loads voices on a background thread and asks the OS
+  to read their pages ahead (`MADV_WILLNEED`), for voices calls are expected
+  to use soon.
+
+    registry = VoiceRegistry("voices", max_bytes=512 * 1024 * 1024)
+    voice = registry.get("acme-support-v2") # None if there is no such voice
+    embedding = voice.arrays["embedding"]
+
+Loads are timed in `revo_voice_load_seconds{reason}` (request or prefetch);
+the resident set is `revo_voice_resident_bytes` and `revo_voice_resident_voices`.
+"""
+
+import collections
+import json
+import mmap
+import os
+import re
+import shutil
+import sys
+import threading
+import time
+from concurrent import futures
+
+import numpy as np
+
+# Shared observability package at the repository root
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from observability import logs, metrics
+
+log = logs.get_logger("voice_registry")
+
+LOAD_SECONDS = metrics.histogram("revo_voice_load_seconds", "Time to load (map) a voice model.", ("reason",))
+LOOKUPS = metrics.counter("revo_voice_lookups_total", "Voice model lookups by result.", ("result",))
+EVICTIONS = metrics.counter("revo_voice_evictions_total", "Voice models evicted to stay under the memory budget.")
+RESIDENT_BYTES = metrics.gauge("revo_voice_resident_bytes", "Mapped bytes of the resident voice models.")
+RESIDENT_VOICES = metrics.gauge("revo_voice_resident_voices", "Resident voice models.")
+
+METADATA_FILE = "voice.json"
+_ARRAY_SUFFIX = ".npy"
+_VOICE_ID = re.compile(r"[A-Za-z0-9_-][A-Za-z0-9_.-]{0,127}") # Never a path: voice ids come from requests
+
+# Load reasons
+REQUEST = "request"
+PREFETCH = "prefetch"
+
+
+def valid_voice_id(voice_id: str) -> bool:
+    return bool(_VOICE_ID.fullmatch(voice_id))
+
+
+class Voice:
+    """A loaded voice: its metadata and its arrays, read-only views of the mapped `.npy` files."""
+
+    __slots__ = ("voice_id", "metadata", "arrays", "nbytes", "_maps")
+
+    def __init__(self, voice_id: str, metadata: dict, arrays: dict, nbytes: int, maps: list):
+        self.voice_id = voice_id
+        self.metadata = metadata
+        self.arrays = arrays
+        self.nbytes = nbytes
+        self._maps = maps
+
+    def advise_willneed(self):
+        """Asks the OS to read the voice's pages ahead, where it supports the hint."""
+        if hasattr(mmap, "MADV_WILLNEED"):
+            for mapped in self._maps:
+                mapped.madvise(mmap.MADV_WILLNEED)
+
+
+def _map_array(path: str):
+    """The array in the `.npy` file at `path` as a read-only view of a memory map, and the map."""
+    with open(path, "rb") as f:
+        version = np.lib.format.read_magic(f)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(f)
+        else:
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(f)
+        if dtype.hasobject:
+            raise ValueError(f"{path}: object arrays cannot be mapped")
+        offset = f.tell()
+        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    array = np.ndarray(shape, dtype, buffer=mapped, offset=offset, order="F" if fortran_order else "C")
+    return array, mapped
+
+
+def load_voice(directory: str, voice_id: str) -> Voice:
+    """Maps the voice `voice_id` under `directory`; OSError if it is missing, ValueError if it is malformed."""
+    path = os.path.join(directory, voice_id)
+    with open(os.path.join(path, METADATA_FILE), encoding="utf-8") as f:
+        metadata = json.load(f)
+    arrays, maps, nbytes = {}, [], 0
+    for entry in sorted(os.scandir(path), key=lambda e: e.name):
+        if entry.name.endswith(_ARRAY_SUFFIX):
+            array, mapped = _map_array(entry.path)
+            arrays[entry.name[:-len(_ARRAY_SUFFIX)]] = array
+            maps.append(mapped)
+            nbytes += len(mapped)
+    return Voice(voice_id, metadata, arrays, nbytes, maps)
+
+
+def save_voice(directory: str, voice_id: str, arrays: dict, metadata: dict = None):
+    """
+    Writes a voice: `arrays` ({name: array}) as `.npy` files and `metadata`
+    as voice.json. The voice appears at once, complete, or not at all;
+    FileExistsError if `voice_id` is taken, as voices are never changed.
+    """
+    if not valid_voice_id(voice_id):
+        raise ValueError(f"Invalid voice id '{voice_id}'")
+    path = os.path.join(directory, voice_id)
+    if os.path.exists(path):
+        raise FileExistsError(f"Voice '{voice_id}' already exists")
+    os.makedirs(directory, exist_ok=True)
+    temp = os.path.join(directory, f".{voice_id}.{os.getpid()}.{threading.get_ident()}.tmp")
+    os.makedirs(temp)
+    try:
+        for name, array in arrays.items():
+            np.save(os.path.join(temp, name + _ARRAY_SUFFIX), np.asarray(array), allow_pickle=False)
+        with open(os.path.join(temp, METADATA_FILE), "w", encoding="utf-8") as f:
+            json.dump(metadata or {}, f)
+        try:
+            os.rename(temp, path)
+        except OSError as e: # Saved concurrently under the same id
+            raise FileExistsError(f"Voice '{voice_id}' already exists") from e
+    finally:
+        shutil.rmtree(temp, ignore_errors=True)
+
+
+class _Load:
+    """One load in progress; the lookups of its voice that arrive meanwhile wait for it."""
+
+    __slots__ = ("done", "voice")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.voice = None
+
+
+class VoiceRegistry:
+    """
+    The voices under `directory`, loaded on first use and kept resident, least
+    recently used first out, up to `max_bytes` of mapped files. Prefetching
+    runs on `prefetch_workers` background threads. Thread-safe.
+    """
+
+    def __init__(self, directory: str, max_bytes: int, prefetch_workers: int = 1):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.prefetch_workers = prefetch_workers
+        self.resident_bytes = 0
+        self._resident = collections.OrderedDict() # {voice_id: Voice}
+        self._loads = {}
+        self._lock = threading.Lock()
+        self._prefetcher = futures.ThreadPoolExecutor(max_workers=prefetch_workers,
+                                                      thread_name_prefix="voice-prefetch")
+        self._resident_hit = LOOKUPS.labels("resident").inc
+        RESIDENT_BYTES.set_function(lambda: self.resident_bytes)
+        RESIDENT_VOICES.set_function(lambda: len(self._resident))
+
+    def __len__(self):
+        return len(self._resident)
+
+    def __contains__(self, voice_id):
+        return valid_voice_id(voice_id) and os.path.isfile(os.path.join(self.directory, voice_id, METADATA_FILE))
+
+    def __reduce__(self):
+        # A worker process (warm-up) gets a registry of its own, on the same directory
+        return VoiceRegistry, (self.directory, self.max_bytes, self.prefetch_workers)
+
+    def get(self, voice_id: str, reason: str = REQUEST):
+        """The voice `voice_id`, loaded now if it is not resident; None if there is no such (readable) voice."""
+        with self._lock:
+            voice = self._resident.get(voice_id)
+            if voice is not None:
+                self._resident.move_to_end(voice_id)
+                self._resident_hit()
+                return voice
+            load = self._loads.get(voice_id)
+            owner = load is None
+            if owner:
+                load = self._loads[voice_id] = _Load()
+        if not owner:
+            LOOKUPS.labels("shared").inc()
+            load.done.wait()
+            return load.voice
+        try:
+            load.voice = self._load(voice_id, reason)
+            return load.voice
+        finally:
+            with self._lock:
+                del self._loads[voice_id]
+            load.done.set()
+
+    def prefetch(self, voice_ids) -> list:
+        """
+        Starts loading `voice_ids` in the background, and marks the resident
+        ones recently used. Returns the ids of the voices that do not exist.
+        """
+        unknown = []
+        for voice_id in dict.fromkeys(voice_ids):
+            if voice_id in self:
+                self._prefetcher.submit(self._prefetch, voice_id)
+            else:
+                unknown.append(voice_id)
+        return unknown
+
+    def shutdown(self):
+        self._prefetcher.shutdown(wait=True, cancel_futures=True)
+
+    def _prefetch(self, voice_id):
+        voice = self.get(voice_id, PREFETCH)
+        if voice is not None:
+            voice.advise_willneed()
+
+    def _load(self, voice_id, reason):
+        if voice_id not in self:
+            LOOKUPS.labels("missing").inc()
+            return None
+        start = time.perf_counter()
+        try:
+            voice = load_voice(self.directory, voice_id)
+        except (OSError, ValueError) as e:
+            LOOKUPS.labels("failed").inc()
+            log.warning("voices", "Could not load voice '%s': %s", voice_id, e)
+            return None
+        seconds = time.perf_counter() - start
+        LOAD_SECONDS.labels(reason).observe(seconds)
+        LOOKUPS.labels("loaded").inc()
+        log.info("voices", "Loaded voice '%s' (%d bytes, %d arrays) in %.1f ms (%s)", voice_id, voice.nbytes,
+                 len(voice.arrays), seconds * 1000, reason)
+        if voice.nbytes > self.max_bytes: # Served, but never resident
+            return voice
+        with self._lock:
+            self._resident[voice_id] = voice
+            self.resident_bytes += voice.nbytes
+            evicted = []
+            while self.resident_bytes > self.max_bytes:
+                old_id, old = self._resident.popitem(last=False)
+                self.resident_bytes -= old.nbytes
+                evicted.append(old_id)
+        for old_id in evicted:
+            EVICTIONS.inc()
+            log.info("voices", "Evicted voice '%s'", old_id)
+        return voice
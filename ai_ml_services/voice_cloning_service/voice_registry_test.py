@@ -0,0 +1,107 @@
+import pickle
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+import numpy as np
+
+import voice_registry
+from voice_registry import VoiceRegistry, save_voice
+
+
+class TestVoiceRegistry(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.embedding = np.arange(8, dtype=np.float32)
+        save_voice(self.directory, "acme-v1", {"embedding": self.embedding, "weights": np.ones((64, 64))},
+                   {"tenant": "acme"})
+        save_voice(self.directory, "small", {"embedding": np.zeros(4, dtype=np.float32)})
+
+    def make_registry(self, max_bytes=1 << 20):
+        registry = VoiceRegistry(self.directory, max_bytes)
+        self.addCleanup(registry.shutdown)
+        return registry
+
+    def test_voices_are_mapped_read_only_on_first_use(self):
+        registry = self.make_registry()
+        self.assertEqual(len(registry), 0)
+        voice = registry.get("acme-v1")
+        self.assertEqual(voice.metadata, {"tenant": "acme"})
+        np.testing.assert_array_equal(voice.arrays["embedding"], self.embedding)
+        self.assertEqual(voice.arrays["weights"].shape, (64, 64))
+        self.assertFalse(voice.arrays["weights"].flags.writeable)
+        self.assertIs(registry.get("acme-v1"), voice)
+        self.assertEqual(registry.resident_bytes, voice.nbytes)
+
+    def test_unknown_and_invalid_voices_are_none(self):
+        registry = self.make_registry()
+        self.assertIsNone(registry.get("nobody"))
+        self.assertIsNone(registry.get("../acme-v1"))
+        self.assertIsNone(registry.get(""))
+        self.assertNotIn("../acme-v1", registry)
+        self.assertEqual(len(registry), 0)
+
+    def test_least_recently_used_voice_is_evicted_beyond_the_budget(self):
+        sizes = {voice_id: voice_registry.load_voice(self.directory, voice_id).nbytes
+                 for voice_id in ("acme-v1", "small")}
+        save_voice(self.directory, "other", {"embedding": np.zeros(4, dtype=np.float32)})
+        registry = self.make_registry(max_bytes=sizes["acme-v1"] + sizes["small"])
+        registry.get("small")
+        registry.get("acme-v1")
+        registry.get("small")   # acme-v1 is now the least recently used
+        registry.get("other")
+        self.assertEqual(list(registry._resident), ["small", "other"])
+        self.assertEqual(registry.resident_bytes, 2 * sizes["small"])
+
+    def test_a_voice_larger_than_the_budget_is_served_but_not_kept(self):
+        registry = self.make_registry(max_bytes=100)
+        self.assertIsNotNone(registry.get("acme-v1"))
+        self.assertEqual(len(registry), 0)
+
+    def test_concurrent_first_uses_load_once(self):
+        registry = self.make_registry()
+        release = threading.Event()
+        real_load = voice_registry.load_voice
+        calls = []
+
+        def slow_load(directory, voice_id):
+            calls.append(voice_id)
+            release.wait(5)
+            return real_load(directory, voice_id)
+
+        results = []
+        with mock.patch.object(voice_registry, "load_voice", slow_load):
+            threads = [threading.Thread(target=lambda: results.append(registry.get("acme-v1"))) for _ in range(4)]
+            for thread in threads:
+                thread.start()
+            release.set()
+            for thread in threads:
+                thread.join()
+        self.assertEqual(calls, ["acme-v1"])
+        self.assertEqual(len({id(voice) for voice in results}), 1)
+
+    def test_prefetch_loads_in_the_background_and_reports_unknown_voices(self):
+        registry = self.make_registry()
+        self.assertEqual(registry.prefetch(["acme-v1", "nobody", "acme-v1"]), ["nobody"])
+        registry.shutdown() # Waits for the prefetch
+        self.assertIn("acme-v1", registry._resident)
+
+    def test_voices_are_never_overwritten(self):
+        with self.assertRaises(FileExistsError):
+            save_voice(self.directory, "acme-v1", {"embedding": np.zeros(8)})
+        with self.assertRaises(ValueError):
+            save_voice(self.directory, "../escape", {"embedding": np.zeros(8)})
+
+    def test_a_pickled_registry_starts_empty_on_the_same_directory(self):
+        registry = self.make_registry()
+        registry.get("acme-v1")
+        copy = pickle.loads(pickle.dumps(registry))
+        self.addCleanup(copy.shutdown)
+        self.assertEqual((copy.directory, copy.max_bytes, len(copy)), (self.directory, 1 << 20, 0))
+        self.assertIsNotNone(copy.get("acme-v1"))
+
+
+if __name__ == "__main__":
+    unittest.main()
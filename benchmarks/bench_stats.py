@@ -0,0 +1,38 @@
+# benchmarks/bench_stats.py
+
+"""Small helpers shared by the benchmark scripts for summarising latency samples."""
+
+import math
+
+DEFAULT_PERCENTILES = (50, 90, 95, 99)
+
+
+def percentile(sorted_values: list, p: float) -> float:
+    """Nearest-rank percentile of an already sorted list (0.0 for an empty list)."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(p / 100.0 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def summarize(values: list, percentiles=DEFAULT_PERCENTILES) -> dict:
+    """
+    Summarises latency samples (in milliseconds) as count/mean/max plus the
+    requested percentiles, e.g. {"count": 10, "mean": 1.2, "p50": 1.0, ...}.
+    """
+    ordered = sorted(values)
+    summary = {
+        "count": len(ordered),
+        "mean": sum(ordered) / len(ordered) if ordered else 0.0,
+        "max": ordered[-1] if ordered else 0.0,
+    }
+    for p in percentiles:
+        summary[f"p{p:g}"] = percentile(ordered, p)
+    return summary
+
+
+def format_summary(name: str, summary: dict, width: int = 22) -> str:
+    parts = [f"{name:<{width}} n={summary['count']:<7}"]
+    parts += [f"{key}={summary[key]:8.2f}" for key in summary if key.startswith("p")]
+    parts += [f"mean={summary['mean']:8.2f}", f"max={summary['max']:8.2f}"]
+    return " ".join(parts)
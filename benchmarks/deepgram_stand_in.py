@@ -0,0 +1,244 @@
+# benchmarks/deepgram_stand_in.py
+
+"""
+Local stand-in for the Deepgram live transcription WebSocket API.
+
+Speaks enough of the `wss://api.deepgram.com/v1/listen` protocol for the
+Deepgram SDK used by the SpeechToTextService:
+
+* Query parameters (`encoding`, `sample_rate`, `channels`, `interim_results`,
+  `utterance_end_ms`, ...) are read from the connection URL.
+* Binary messages are audio. Text messages are JSON control messages:
+  `KeepAlive`, `Finalize` and `CloseStream`.
+* The server sends `Results` messages (interim and final), `UtteranceEnd`
+  and, when the stream closes, a `Metadata` message.
+
+There is no speech recognition: each connection is assigned the next
+transcript from a script (round-robin). Interim results reveal the
+transcript word by word as audio arrives; the final result is sent after
+`--endpointing-ms` without audio (or on `Finalize`/`CloseStream`), delayed by
+a sample from `--final-latency`.
+
+Point the STT service at it with:
+    DEEPGRAM_URL=http://localhost:8765 DEEPGRAM_API_KEY=local
+
+Example:
+    python benchmarks/deepgram_stand_in.py --port 8765 \\
+        --connect-latency lognormal:60,0.3 --final-latency lognormal:150,0.4 --error-rate 0.01
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import time
+import uuid
+from http import HTTPStatus
+from urllib.parse import urlparse, parse_qs
+
+from websockets.asyncio.server import serve
+
+from stand_in_common import LatencyDistribution, ErrorInjector, load_script
+
+DEFAULT_TRANSCRIPTS = [
+    "hello there",
+    "what's the weather like in London",
+    "i need some help with my account",
+    "can i speak to an agent",
+    "yes",
+    "no thank you",
+]
+
+_BYTES_PER_SAMPLE = {"linear16": 2, "mulaw": 1, "alaw": 1}
+
+
+class StandInConfig:
+
+    def __init__(self, transcripts, connect_latency, final_latency, error_rate,
+                 endpointing_ms=300, interim_every_ms=400, seed=None):
+        rng = random.Random(seed)
+        self.transcripts = transcripts
+        self.connect_latency = LatencyDistribution(connect_latency, rng)
+        self.final_latency = LatencyDistribution(final_latency, rng)
+        self.errors = ErrorInjector(error_rate, rng)
+        self.endpointing_s = endpointing_ms / 1000.0
+        self.interim_every_s = interim_every_ms / 1000.0
+        self._transcript_cycle = itertools.cycle(transcripts)
+
+    def next_transcript(self) -> str:
+        return next(self._transcript_cycle)
+
+
+class _Stream:
+    """State for one live transcription connection."""
+
+    def __init__(self, websocket, params: dict, transcript: str, config: StandInConfig):
+        self.ws = websocket
+        self.config = config
+        self.request_id = str(uuid.uuid4())
+        self.encoding = params.get("encoding", "linear16")
+        self.sample_rate = int(params.get("sample_rate", "16000"))
+        self.channels = int(params.get("channels", "1"))
+        self.interim_results = params.get("interim_results", "false").lower() == "true"
+        self.send_utterance_end = "utterance_end_ms" in params
+        self.words = transcript.split()
+        self.bytes_per_second = self.sample_rate * self.channels * _BYTES_PER_SAMPLE.get(self.encoding, 2)
+        self.audio_seconds = 0.0 # Total audio received
+        self.utterance_start = 0.0 # Audio time at which the current utterance started
+        self.pending_audio = False # Audio received since the last final result
+        self.last_interim_at = 0.0
+
+    def _results(self, words: list, is_final: bool, from_finalize: bool = False) -> dict:
+        duration = max(self.audio_seconds - self.utterance_start, 0.0)
+        step = duration / len(words) if words else 0.0
+        transcript = " ".join(words)
+        return {
+            "type": "Results",
+            "channel_index": [0, self.channels],
+            "duration": round(duration, 3),
+            "start": round(self.utterance_start, 3),
+            "is_final": is_final,
+            "speech_final": is_final,
+            "from_finalize": from_finalize,
+            "channel": {
+                "alternatives": [{
+                    "transcript": transcript,
+                    "confidence": 0.98 if is_final else 0.9,
+                    "words": [{
+                        "word": w,
+                        "start": round(self.utterance_start + i * step, 3),
+                        "end": round(self.utterance_start + (i + 1) * step, 3),
+                        "confidence": 0.98,
+                        "punctuated_word": w,
+                    } for i, w in enumerate(words)],
+                }],
+            },
+            "metadata": {
+                "request_id": self.request_id,
+                "model_info": {"name": "stand-in", "version": "local", "arch": "stand-in"},
+                "model_uuid": "00000000-0000-0000-0000-000000000000",
+            },
+        }
+
+    async def on_audio(self, chunk: bytes):
+        self.audio_seconds += len(chunk) / self.bytes_per_second
+        self.pending_audio = True
+        if not self.interim_results or not self.config.interim_every_s:
+            return
+        utterance_audio = self.audio_seconds - self.utterance_start
+        if utterance_audio - self.last_interim_at >= self.config.interim_every_s:
+            self.last_interim_at = utterance_audio
+            # Reveal roughly one word per interim interval.
+            revealed = min(len(self.words), int(utterance_audio / self.config.interim_every_s))
+            if revealed:
+                await self.ws.send(json.dumps(self._results(self.words[:revealed], is_final=False)))
+
+    async def finalize(self, from_finalize: bool = False):
+        if not self.pending_audio:
+            return
+        self.pending_audio = False
+        await asyncio.sleep(self.config.final_latency.sample())
+        await self.ws.send(json.dumps(self._results(self.words, is_final=True, from_finalize=from_finalize)))
+        if self.send_utterance_end:
+            await self.ws.send(json.dumps({
+                "type": "UtteranceEnd",
+                "channel": [0, self.channels],
+                "last_word_end": round(self.audio_seconds, 3),
+            }))
+        self.utterance_start = self.audio_seconds
+        self.last_interim_at = 0.0
+
+    def metadata(self) -> dict:
+        return {
+            "type": "Metadata",
+            "transaction_key": "deprecated",
+            "request_id": self.request_id,
+            "sha256": "",
+            "created": time.strftime("%Y-%m-%dT%H:%M:%S.000Z", time.gmtime()),
+            "duration": round(self.audio_seconds, 3),
+            "channels": self.channels,
+            "models": ["00000000-0000-0000-0000-000000000000"],
+            "model_info": {},
+        }
+
+
+def make_handlers(config: StandInConfig):
+
+    async def process_request(connection, request):
+        await asyncio.sleep(config.connect_latency.sample())
+        if urlparse(request.path).path.rstrip("/") != "/v1/listen":
+            return connection.respond(HTTPStatus.NOT_FOUND, "Unknown endpoint\n")
+        if config.errors.should_fail():
+            return connection.respond(HTTPStatus.SERVICE_UNAVAILABLE, "Injected stand-in error\n")
+        return None
+
+    async def handler(websocket):
+        params = {k: v[-1] for k, v in parse_qs(urlparse(websocket.request.path).query).items()}
+        stream = _Stream(websocket, params, config.next_transcript(), config)
+        try:
+            while True:
+                try:
+                    message = await asyncio.wait_for(websocket.recv(), timeout=config.endpointing_s)
+                except asyncio.TimeoutError:
+                    await stream.finalize() # Endpointing: no audio for a while ends the utterance
+                    continue
+                if isinstance(message, bytes):
+                    await stream.on_audio(message)
+                    continue
+                control = json.loads(message).get("type")
+                if control == "Finalize":
+                    await stream.finalize(from_finalize=True)
+                elif control == "CloseStream":
+                    await stream.finalize()
+                    await websocket.send(json.dumps(stream.metadata()))
+                    await websocket.close()
+                    return
+                # KeepAlive and unknown messages are ignored.
+        except Exception:
+            return # Client disconnected
+
+    return process_request, handler
+
+
+async def run_server(host: str, port: int, config: StandInConfig):
+    process_request, handler = make_handlers(config)
+    async with serve(handler, host, port, process_request=process_request, max_size=None) as server:
+        print(f"Deepgram stand-in listening on ws://{host}:{port}/v1/listen "
+              f"({len(config.transcripts)} scripted transcripts)")
+        await server.serve_forever()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Local Deepgram live transcription stand-in.")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--transcripts", help="JSON file with a list of transcripts, assigned round-robin per connection.")
+    parser.add_argument("--connect-latency", default="fixed:0", help="Handshake latency distribution (ms).")
+    parser.add_argument("--final-latency", default="fixed:0", help="Delay before each final result (ms).")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Probability of rejecting a connection with HTTP 503.")
+    parser.add_argument("--endpointing-ms", type=int, default=300, help="Audio inactivity that ends an utterance.")
+    parser.add_argument("--interim-every-ms", type=int, default=400, help="Audio between interim results (0 disables).")
+    parser.add_argument("--seed", type=int, help="Random seed for latency and error sampling.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    config = StandInConfig(
+        transcripts=load_script(args.transcripts, DEFAULT_TRANSCRIPTS),
+        connect_latency=args.connect_latency,
+        final_latency=args.final_latency,
+        error_rate=args.error_rate,
+        endpointing_ms=args.endpointing_ms,
+        interim_every_ms=args.interim_every_ms,
+        seed=args.seed,
+    )
+    try:
+        asyncio.run(run_server(args.host, args.port, config))
+    except KeyboardInterrupt:
+        print("Deepgram stand-in stopped.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+# benchmarks/dialogflow_stand_in.py
+
+"""
+Local stand-in for the Dialogflow CX `Sessions.DetectIntent` gRPC API.
+
+Implements `/google.cloud.dialogflow.cx.v3beta1.Sessions/DetectIntent` on a
+plain (insecure) gRPC server, using the request/response types from
+`google-cloud-dialogflow-cx`, so the NLUService's real client and transport
+code paths run unchanged against it.
+
+Intents are scripted: each rule has a regular expression matched against the
+query text (case-insensitive); named groups become intent parameters. A rule
+file is a JSON list of:
+    {"match": "weather.* in (?P<location>\\\\w+)", "intent": "get_weather",
+     "confidence": 0.92, "parameters": {"unit": "celsius"}}
+Text that matches no rule returns no intent (NLUService maps it to
+`no_intent_matched`).
+
+Point the NLU service at it with:
+    DIALOGFLOW_API_ENDPOINT=localhost:8766 DIALOGFLOW_USE_INSECURE_CHANNEL=true
+
+Example:
+    python benchmarks/dialogflow_stand_in.py --port 8766 --latency lognormal:180,0.5 --error-rate 0.01
+"""
+
+import argparse
+import random
+import re
+import threading
+import time
+import uuid
+from concurrent import futures
+
+import grpc
+from google.cloud import dialogflowcx_v3beta1 as dialogflowcx
+
+from stand_in_common import LatencyDistribution, ErrorInjector, load_script
+
+SERVICE_NAME = "google.cloud.dialogflow.cx.v3beta1.Sessions"
+
+DEFAULT_RULES = [
+    {"match": r"\b(hello|hi|hey|good (morning|afternoon|evening))\b", "intent": "greeting", "confidence": 0.95},
+    {"match": r"\bweather\b(.*\b(in|for) (?P<location>[a-z]+))?", "intent": "get_weather", "confidence": 0.91},
+    {"match": r"\b(help|agent|support|representative)\b", "intent": "get_help", "confidence": 0.88},
+    {"match": r"^\s*(yes|yeah|yep|sure|correct)\b", "intent": "confirm", "confidence": 0.97},
+    {"match": r"^\s*(no|nope|no thanks?( you)?)\b", "intent": "deny", "confidence": 0.97},
+]
+
+
+class IntentScript:
+
+    def __init__(self, rules: list):
+        self.rules = [(re.compile(rule["match"], re.IGNORECASE), rule) for rule in rules]
+
+    def match(self, text: str):
+        """Returns (rule, parameters) for the first matching rule, or (None, {})."""
+        for pattern, rule in self.rules:
+            m = pattern.search(text)
+            if m:
+                params = dict(rule.get("parameters", {}))
+                params.update({k: v for k, v in m.groupdict().items() if v is not None})
+                return rule, params
+        return None, {}
+
+
+class SessionsStandIn:
+    """Handles DetectIntent requests with scripted intents, latency and errors."""
+
+    def __init__(self, script: IntentScript, latency: LatencyDistribution, errors: ErrorInjector,
+                 error_code: grpc.StatusCode = grpc.StatusCode.UNAVAILABLE):
+        self.script = script
+        self.latency = latency
+        self.errors = errors
+        self.error_code = error_code
+        self._rng_lock = threading.Lock() # random.Random is shared across server threads
+        self.requests_served = 0
+
+    def detect_intent(self, request: dialogflowcx.DetectIntentRequest, context):
+        with self._rng_lock:
+            delay = self.latency.sample()
+            fail = self.errors.should_fail()
+        time.sleep(delay)
+        if fail:
+            context.abort(self.error_code, "Injected stand-in error")
+
+        text = request.query_input.text.text
+        language_code = request.query_input.language_code
+        rule, params = self.script.match(text)
+        query_result = dialogflowcx.QueryResult(
+            text=text,
+            language_code=language_code,
+            current_page=dialogflowcx.Page(display_name="Start Page"),
+        )
+        if rule:
+            agent_path = request.session.split("/sessions/")[0]
+            query_result.intent = dialogflowcx.Intent(
+                name=f"{agent_path}/intents/{rule['intent']}",
+                display_name=rule["intent"],
+            )
+            query_result.intent_detection_confidence = rule.get("confidence", 0.9)
+            query_result.match = dialogflowcx.Match(
+                match_type=dialogflowcx.Match.MatchType.INTENT,
+                confidence=rule.get("confidence", 0.9),
+            )
+            if params:
+                query_result.parameters = params
+        else:
+            query_result.match = dialogflowcx.Match(match_type=dialogflowcx.Match.MatchType.NO_MATCH)
+        self.requests_served += 1
+        return dialogflowcx.DetectIntentResponse(response_id=str(uuid.uuid4()), query_result=query_result)
+
+
+def build_server(stand_in: SessionsStandIn, port: int, max_workers: int = 32) -> grpc.Server:
+    handler = grpc.method_handlers_generic_handler(SERVICE_NAME, {
+        "DetectIntent": grpc.unary_unary_rpc_method_handler(
+            stand_in.detect_intent,
+            request_deserializer=dialogflowcx.DetectIntentRequest.deserialize,
+            response_serializer=dialogflowcx.DetectIntentResponse.serialize,
+        ),
+    })
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=max_workers))
+    server.add_generic_rpc_handlers((handler,))
+    server.add_insecure_port(f"[::]:{port}")
+    return server
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Local Dialogflow CX Sessions.DetectIntent stand-in.")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--rules", help="JSON file with scripted intent rules (see module docstring).")
+    parser.add_argument("--latency", default="fixed:0", help="DetectIntent latency distribution (ms).")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Probability of failing a request.")
+    parser.add_argument("--error-code", default="UNAVAILABLE", help="gRPC status code for injected errors.")
+    parser.add_argument("--max-workers", type=int, default=32, help="Server thread pool size.")
+    parser.add_argument("--seed", type=int, help="Random seed for latency and error sampling.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    rng = random.Random(args.seed)
+    stand_in = SessionsStandIn(
+        IntentScript(load_script(args.rules, DEFAULT_RULES)),
+        LatencyDistribution(args.latency, rng),
+        ErrorInjector(args.error_rate, rng),
+        error_code=grpc.StatusCode[args.error_code],
+    )
+    server = build_server(stand_in, args.port, args.max_workers)
+    server.start()
+    print(f"Dialogflow CX stand-in listening on port {args.port} ({len(stand_in.script.rules)} intent rules)")
+    try:
+        server.wait_for_termination()
+    except KeyboardInterrupt:
+        server.stop(0)
+        print("Dialogflow CX stand-in stopped.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,409 @@
+# benchmarks/e2e_latency.py
+
+"""
+End-to-end "mouth-to-ear" latency benchmark for the conversational turn
+STT -> NLU -> DM -> TTS.
+
+Starts the Deepgram and Dialogflow CX stand-ins and the six Python services
+(StreamIngest, STT, SessionOrchestrator, NLU, DM, TTS, each through
+`service_runner.py`), drives
+scripted conversations into StreamIngest at real time and reports, per turn:
+
+    eos_to_final_transcript         end of speech -> the final transcript reaches NLU
+    final_transcript_to_nlu_result  NLU start -> the NLU result reaches DM
+    nlu_result_to_dm_response       DM start -> the response text reaches TTS
+    dm_response_to_first_tts_byte   TTS start -> the first SynthesizeStream chunk is sent
+    eos_to_first_tts_byte           end of speech -> the first chunk of the reply is sent
+    eos_to_ingest_response          end of speech -> StreamIngest returns the final transcript
+
+End of speech is the send time of the utterance's `is_final` frame. Hop
+boundaries come from the RPC timing events written by `service_runner.py`: for
+each service, the first call for the session that starts at or after end of
+speech, and before the session's next end of speech, belongs to the turn (the
+SessionOrchestrator calls NLU -> DM -> TTS after StreamIngest has returned, so
+a hop is not bounded by the ingest response). Turns whose transcript is an STT
+error or timeout never reach NLU and are counted as incomplete.
+
+Results are printed and, with `--json-out`, written as JSON with percentiles
+per stage. `--compare BASELINE.json` prints the change against an earlier run
+and, with `--max-regression-pct`, exits non-zero when a stage's p95 regressed
+by more than that, so runs can gate changes.
+
+Example:
+    python benchmarks/e2e_latency.py --sessions 20 --concurrency 4 --turns 3 \\
+        --deepgram-final-latency lognormal:150,0.4 --dialogflow-latency lognormal:180,0.5 \\
+        --json-out e2e.json
+"""
+
+import argparse
+import json
+import os
+import random
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+import grpc
+
+import audio_stream_pb2
+import audio_stream_pb2_grpc
+from bench_stats import summarize, format_summary
+from load_generator import FORMATS, FRAME_MS, synthetic_utterance
+from service_runner import SERVICES
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCH_DIR)
+
+SCHEMA_VERSION = 1
+
+# Services in start-up order: each one's downstream is already listening when it starts.
+START_ORDER = ["tts", "dm", "nlu", "orchestrator", "stt", "ingest"]
+
+STAGES = [
+    "eos_to_final_transcript",
+    "final_transcript_to_nlu_result",
+    "nlu_result_to_dm_response",
+    "dm_response_to_first_tts_byte",
+    "eos_to_first_tts_byte",
+    "eos_to_ingest_response",
+]
+
+
+class Turn:
+
+    def __init__(self, session_id: str, index: int, eos_ns: int):
+        self.session_id = session_id
+        self.index = index
+        self.eos_ns = eos_ns
+        self.done_ns = 0
+        self.ok = False
+
+
+def _wait_for_port(port: int, deadline: float, process: subprocess.Popen, name: str):
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{name} exited with code {process.returncode} during start-up")
+        try:
+            with socket.create_connection(("localhost", port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"{name} did not start listening on port {port}")
+
+
+class Stack:
+    """Starts and stops the stand-ins and services as subprocesses."""
+
+    def __init__(self, args, workdir: str):
+        self.args = args
+        self.workdir = workdir
+        self.processes = [] # (name, Popen)
+
+    def events_path(self, service: str) -> str:
+        return os.path.join(self.workdir, f"events-{service}.jsonl")
+
+    def _spawn(self, name: str, argv: list, env: dict, port: int):
+        log = open(os.path.join(self.workdir, f"{name}.log"), "w", encoding="utf-8")
+        process = subprocess.Popen(argv, cwd=REPO_ROOT, env=env, stdout=log, stderr=subprocess.STDOUT)
+        self.processes.append((name, process))
+        _wait_for_port(port, time.monotonic() + self.args.startup_timeout, process, name)
+
+    def start(self):
+        args = self.args
+        env = dict(os.environ)
+        env.update({
+            "PYTHONUNBUFFERED": "1",
+            "DEEPGRAM_URL": f"http://localhost:{args.deepgram_port}",
+            "DEEPGRAM_API_KEY": env.get("DEEPGRAM_API_KEY") or "local",
+            "DIALOGFLOW_API_ENDPOINT": f"localhost:{args.dialogflow_port}",
+            "DIALOGFLOW_USE_INSECURE_CHANNEL": "true",
+            "DIALOGFLOW_PROJECT_ID": env.get("DIALOGFLOW_PROJECT_ID") or "bench-project",
+            "DIALOGFLOW_LOCATION_ID": env.get("DIALOGFLOW_LOCATION_ID") or "global",
+            "DIALOGFLOW_AGENT_ID": env.get("DIALOGFLOW_AGENT_ID") or "bench-agent",
+        })
+        env.setdefault("TTS_DISK_CACHE_DIR", os.path.join(self.workdir, "tts_cache"))
+        if args.trace_sample_rate:
+            env["TRACE_SAMPLE_RATE"] = str(args.trace_sample_rate)
+            env["TRACE_DIR"] = os.path.join(self.workdir, "traces")
+        python = sys.executable
+        self._spawn("deepgram_stand_in", [
+            python, os.path.join(BENCH_DIR, "deepgram_stand_in.py"),
+            "--port", str(args.deepgram_port),
+            "--connect-latency", args.deepgram_connect_latency,
+            "--final-latency", args.deepgram_final_latency,
+            "--endpointing-ms", str(args.endpointing_ms),
+            "--seed", str(args.seed),
+        ], env, args.deepgram_port)
+        self._spawn("dialogflow_stand_in", [
+            python, os.path.join(BENCH_DIR, "dialogflow_stand_in.py"),
+            "--port", str(args.dialogflow_port),
+            "--latency", args.dialogflow_latency,
+            "--seed", str(args.seed),
+        ], env, args.dialogflow_port)
+        for service in START_ORDER:
+            self._spawn(service, [
+                python, os.path.join(BENCH_DIR, "service_runner.py"), service,
+                "--events-out", self.events_path(service),
+            ], env, SERVICES[service][3])
+
+    def stop(self):
+        for _, process in reversed(self.processes):
+            if process.poll() is None:
+                process.send_signal(signal.SIGINT)
+        for name, process in reversed(self.processes):
+            try:
+                process.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                print(f"{name} did not stop; killing it.")
+                process.kill()
+        self.processes = []
+
+
+def drive(args, target: str) -> list:
+    """Runs the scripted conversations and returns the Turns, in no particular order."""
+    rng = random.Random(args.seed)
+    utterances = [synthetic_utterance(args.utterance_seconds, args.format, rng) for _ in range(4)]
+    audio_format = audio_stream_pb2.AudioFormat.Value(FORMATS[args.format][0])
+    run_id = f"e2e{int(time.time())}"
+    turns = []
+    turns_lock = threading.Lock()
+    next_session = iter(range(args.sessions))
+    session_lock = threading.Lock()
+
+    def run_session(stub, index: int):
+        session_id = f"{run_id}-{index:05d}"
+        media_start_ms = int(time.time() * 1000)
+        seq = 0
+        for turn_index in range(args.turns):
+            frames = utterances[(index + turn_index) % len(utterances)]
+            next_send = time.monotonic()
+            for i, frame in enumerate(frames):
+                is_final = i == len(frames) - 1
+                seq += 1
+                delay = next_send - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                next_send += FRAME_MS / 1000.0
+                segment = audio_stream_pb2.AudioSegment(
+                    session_id=session_id,
+                    timestamp=media_start_ms + (seq - 1) * FRAME_MS,
+                    audio_format=audio_format,
+                    sequence_number=seq,
+                    data=frame,
+                    is_final=is_final,
+                )
+                turn = Turn(session_id, turn_index, time.time_ns()) if is_final else None
+                try:
+                    stub.IngestAudioSegment(segment, timeout=args.timeout)
+                    if turn:
+                        turn.ok = True
+                except grpc.RpcError as e:
+                    print(f"IngestAudioSegment failed for {session_id}: {e.code()}")
+                if turn:
+                    turn.done_ns = time.time_ns()
+                    with turns_lock:
+                        turns.append(turn)
+            time.sleep(args.turn_gap_ms / 1000.0) # The caller listens to the reply
+
+    def worker():
+        with grpc.insecure_channel(target) as channel:
+            stub = audio_stream_pb2_grpc.StreamIngestStub(channel)
+            while True:
+                with session_lock:
+                    index = next(next_session, None)
+                if index is None:
+                    return
+                run_session(stub, index)
+
+    threads = [threading.Thread(target=worker, daemon=True) for _ in range(args.concurrency)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return turns
+
+
+def load_events(path: str) -> dict:
+    """Returns {session_id: [event, ...]} sorted by start time."""
+    by_session = {}
+    if not os.path.exists(path):
+        return by_session
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                event = json.loads(line)
+                by_session.setdefault(event["session_id"], []).append(event)
+    for events in by_session.values():
+        events.sort(key=lambda e: e["start_ns"])
+    return by_session
+
+
+def _first_at_or_after(events: list, t_ns: int):
+    for event in events:
+        if event["start_ns"] >= t_ns:
+            return event
+    return None
+
+
+def turn_timings(turn: Turn, events: dict, next_eos_ns: int = None) -> dict:
+    """
+    Stage latencies (ms) for one turn, or None when a hop is missing or STT
+    produced no transcript. `next_eos_ns` is the end of speech of the
+    session's next turn, if any; later calls belong to that turn.
+    """
+    hops = {}
+    for service in ("nlu", "dm", "tts"):
+        event = _first_at_or_after(events[service].get(turn.session_id, []), turn.eos_ns)
+        if event is None or (next_eos_ns is not None and event["start_ns"] >= next_eos_ns) or not event["ok"]:
+            return None
+        hops[service] = event
+    if hops["nlu"]["text"].startswith("[STT"): # "[STT Timeout]", "[STT Error: ...]"
+        return None
+    ms = lambda a, b: (b - a) / 1e6
+    return {
+        "eos_to_final_transcript": ms(turn.eos_ns, hops["nlu"]["start_ns"]),
+        "final_transcript_to_nlu_result": ms(hops["nlu"]["start_ns"], hops["dm"]["start_ns"]),
+        "nlu_result_to_dm_response": ms(hops["dm"]["start_ns"], hops["tts"]["start_ns"]),
+        "dm_response_to_first_tts_byte": ms(hops["tts"]["start_ns"], hops["tts"]["first_ns"]),
+        "eos_to_first_tts_byte": ms(turn.eos_ns, hops["tts"]["first_ns"]),
+        "eos_to_ingest_response": ms(turn.eos_ns, turn.done_ns),
+    }
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=REPO_ROOT, capture_output=True,
+                              text=True, timeout=10).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return ""
+
+
+def build_report(args, turns: list, events: dict, wall_seconds: float) -> dict:
+    per_stage = {stage: [] for stage in STAGES}
+    per_turn = []
+    incomplete = 0
+    turns = sorted(turns, key=lambda t: (t.session_id, t.index))
+    for i, turn in enumerate(turns):
+        following = turns[i + 1] if i + 1 < len(turns) else None
+        next_eos_ns = following.eos_ns if following and following.session_id == turn.session_id else None
+        timings = turn_timings(turn, events, next_eos_ns) if turn.ok else None
+        if timings is None:
+            incomplete += 1
+            continue
+        for stage, value in timings.items():
+            per_stage[stage].append(value)
+        per_turn.append({"session_id": turn.session_id, "turn": turn.index, **timings})
+    report = {
+        "benchmark": "e2e_latency",
+        "schema_version": SCHEMA_VERSION,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "git_commit": _git_commit(),
+        "config": {k: v for k, v in vars(args).items() if k not in ("json_out", "compare")},
+        "wall_seconds": wall_seconds,
+        "turns_completed": len(per_turn),
+        "turns_incomplete": incomplete,
+        "latency_ms": {stage: summarize(values) for stage, values in per_stage.items()},
+    }
+    if args.include_turns:
+        report["turns"] = per_turn
+    return report
+
+
+def print_report(report: dict):
+    print(f"Turns completed:  {report['turns_completed']} (incomplete: {report['turns_incomplete']}) "
+          f"in {report['wall_seconds']:.1f}s")
+    print("Latency per stage (ms):")
+    for stage, summary in report["latency_ms"].items():
+        print("  " + format_summary(stage, summary, width=32))
+
+
+def compare(report: dict, baseline: dict, max_regression_pct: float = None) -> bool:
+    """Prints the change against `baseline`; returns False when a p95 regressed beyond the limit."""
+    print(f"Compared with baseline {baseline.get('git_commit', '')[:12] or '(unknown commit)'}:")
+    ok = True
+    for stage, summary in report["latency_ms"].items():
+        before = baseline.get("latency_ms", {}).get(stage)
+        if not before or not before.get("count") or not summary["count"]:
+            continue
+        deltas = []
+        for key in ("p50", "p95", "p99"):
+            change = summary[key] - before[key]
+            pct = 100.0 * change / before[key] if before[key] else 0.0
+            deltas.append(f"{key} {summary[key]:8.2f} ({change:+8.2f}, {pct:+6.1f}%)")
+            if key == "p95" and max_regression_pct is not None and pct > max_regression_pct:
+                ok = False
+        print(f"  {stage:<32} " + "  ".join(deltas))
+    return ok
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="End-to-end STT -> NLU -> DM -> TTS latency benchmark.")
+    parser.add_argument("--sessions", type=int, default=10, help="Conversations to run.")
+    parser.add_argument("--concurrency", type=int, default=2, help="Conversations in flight at once.")
+    parser.add_argument("--turns", type=int, default=3, help="Caller utterances per conversation.")
+    parser.add_argument("--utterance-seconds", type=float, default=1.5, help="Length of each synthetic utterance.")
+    parser.add_argument("--turn-gap-ms", type=int, default=500, help="Pause after each turn before the caller speaks again.")
+    parser.add_argument("--format", choices=sorted(FORMATS), default="pcmu")
+    parser.add_argument("--timeout", type=float, default=30.0, help="Per-RPC timeout in seconds.")
+    parser.add_argument("--deepgram-port", type=int, default=8765)
+    parser.add_argument("--deepgram-connect-latency", default="fixed:0")
+    parser.add_argument("--deepgram-final-latency", default="fixed:0")
+    parser.add_argument("--endpointing-ms", type=int, default=300, help="Deepgram stand-in endpointing.")
+    parser.add_argument("--dialogflow-port", type=int, default=8766)
+    parser.add_argument("--dialogflow-latency", default="fixed:0")
+    parser.add_argument("--trace-sample-rate", type=float, default=0.0,
+                        help="Enable per-turn tracing in the services (spans in <events-dir>/traces).")
+    parser.add_argument("--startup-timeout", type=float, default=30.0, help="Seconds to wait for each process.")
+    parser.add_argument("--no-launch", action="store_true",
+                        help="Use already running services; pass --events-dir with their service_runner event files.")
+    parser.add_argument("--events-dir", help="Directory for event files and process logs (default: a temp dir).")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json-out", help="Write the machine-readable report here.")
+    parser.add_argument("--include-turns", action="store_true", help="Include per-turn timings in the JSON report.")
+    parser.add_argument("--compare", help="Baseline JSON report to compare against.")
+    parser.add_argument("--max-regression-pct", type=float,
+                        help="With --compare, exit non-zero if any stage's p95 regressed by more than this.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    workdir = args.events_dir or tempfile.mkdtemp(prefix="e2e-latency-")
+    os.makedirs(workdir, exist_ok=True)
+    stack = Stack(args, workdir)
+    if not args.no_launch:
+        print(f"Starting stand-ins and services (logs in {workdir})...")
+        try:
+            stack.start()
+        except Exception:
+            stack.stop()
+            raise
+    try:
+        started = time.monotonic()
+        turns = drive(args, f"localhost:{SERVICES['ingest'][3]}")
+        wall_seconds = time.monotonic() - started
+    finally:
+        stack.stop() # Also flushes the services' event files
+    events = {service: load_events(stack.events_path(service)) for service in SERVICES}
+    report = build_report(args, turns, events, wall_seconds)
+    print_report(report)
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"Report written to {args.json_out}")
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        if not compare(report, baseline, args.max_regression_pct):
+            print(f"FAIL: p95 regressed by more than {args.max_regression_pct}%")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,318 @@
+# benchmarks/load_generator.py
+
+"""
+Call replay load generator for the StreamIngest service.
+
+Replays recorded (WAV) or synthetic sessions as 20 ms AudioSegments, with
+correct sequence numbers and media timestamps, into
+StreamIngest.IngestAudioSegment at N x real time. Reports throughput, error
+rate and latency percentiles per stage:
+
+* `frame`:         IngestAudioSegment latency for mid-utterance frames
+                   (ingest + STT forwarding).
+* `utterance_end`: IngestAudioSegment latency for the `is_final` frame, i.e.
+                   STT's wait for the final transcript. StreamIngest hands the
+                   transcript to the SessionOrchestrator (HandleTranscript)
+                   without waiting, and the orchestrator runs the turn's
+                   NLU -> DM -> TTS asynchronously, so the rest of the turn is
+                   not included; `e2e_latency.py` measures it.
+
+Example:
+    python benchmarks/load_generator.py --target localhost:50051 \\
+        --concurrency 50 --sessions 500 --ramp-up 10 --speed 2 \\
+        --jitter-ms 5 --loss 0.01 --json-out results.json
+"""
+
+import argparse
+import json
+import math
+import random
+import sys
+import threading
+import time
+import wave
+
+import grpc
+
+import audio_stream_pb2
+import audio_stream_pb2_grpc
+from bench_stats import summarize, format_summary
+
+FRAME_MS = 20
+
+# Wire formats the generator can produce: (AudioFormat enum name, sample rate, bytes per sample)
+FORMATS = {
+    "pcmu": ("PCMU", 8000, 1),
+    "linear16": ("AUDIO_FORMAT_UNSPECIFIED", 16000, 2),
+}
+
+
+def _linear_to_ulaw(sample: int) -> int:
+    bias, clip = 0x84, 32635
+    sign = 0x80 if sample < 0 else 0
+    sample = min(abs(sample), clip) + bias
+    exponent, mask = 7, 0x4000
+    while exponent > 0 and not (sample & mask):
+        exponent -= 1
+        mask >>= 1
+    mantissa = (sample >> (exponent + 3)) & 0x0F
+    return ~(sign | (exponent << 4) | mantissa) & 0xFF
+
+
+_ULAW_ENCODE = None
+
+
+def _encode(samples: list, fmt: str) -> bytes:
+    global _ULAW_ENCODE
+    if fmt == "pcmu":
+        if _ULAW_ENCODE is None:
+            _ULAW_ENCODE = bytes(_linear_to_ulaw(s) for s in range(-32768, 32768))
+        return bytes(_ULAW_ENCODE[s + 32768] for s in samples)
+    return b"".join(s.to_bytes(2, "little", signed=True) for s in samples)
+
+
+def _resample(samples: list, src_rate: int, dst_rate: int) -> list:
+    """Nearest-sample resampling; good enough for load generation."""
+    if src_rate == dst_rate:
+        return samples
+    step = src_rate / dst_rate
+    return [samples[int(i * step)] for i in range(int(len(samples) / step))]
+
+
+def load_wav(path: str, fmt: str) -> list:
+    """Reads a 16-bit WAV file (mono or first channel) and returns its 20 ms frames in `fmt`."""
+    _, rate, _ = FORMATS[fmt]
+    with wave.open(path, "rb") as wav:
+        if wav.getsampwidth() != 2:
+            raise ValueError(f"{path}: only 16-bit PCM WAV files are supported")
+        channels = wav.getnchannels()
+        raw = wav.readframes(wav.getnframes())
+        samples = [int.from_bytes(raw[i:i + 2], "little", signed=True)
+                   for i in range(0, len(raw), 2 * channels)]
+        samples = _resample(samples, wav.getframerate(), rate)
+    return packetize(samples, fmt)
+
+
+def synthetic_utterance(seconds: float, fmt: str, rng: random.Random) -> list:
+    """Deterministic speech-like audio: amplitude-modulated tones with short pauses."""
+    _, rate, _ = FORMATS[fmt]
+    samples = []
+    n = int(seconds * rate)
+    freq = rng.uniform(120, 260)
+    for i in range(n):
+        t = i / rate
+        envelope = max(0.0, math.sin(2 * math.pi * 3.0 * t)) # ~3 syllables per second
+        value = envelope * (0.6 * math.sin(2 * math.pi * freq * t) + 0.3 * math.sin(2 * math.pi * 2.7 * freq * t))
+        samples.append(int(9000 * value))
+    return packetize(samples, fmt)
+
+
+def packetize(samples: list, fmt: str) -> list:
+    _, rate, _ = FORMATS[fmt]
+    per_frame = rate * FRAME_MS // 1000
+    frames = []
+    for start in range(0, len(samples), per_frame):
+        chunk = samples[start:start + per_frame]
+        chunk += [0] * (per_frame - len(chunk)) # Pad the last frame
+        frames.append(_encode(chunk, fmt))
+    return frames
+
+
+class WorkerResult:
+    """Per-worker measurements; merged after the run to avoid lock contention."""
+
+    def __init__(self):
+        self.latencies = {"frame": [], "utterance_end": []}
+        self.frames_sent = 0
+        self.frames_dropped = 0
+        self.rpc_errors = 0
+        self.downstream_errors = 0
+        self.sessions_completed = 0
+        self.audio_ms_sent = 0
+
+
+class LoadGenerator:
+
+    def __init__(self, args, utterances: list):
+        self.args = args
+        self.utterances = utterances # list of frame lists
+        self.audio_format = audio_stream_pb2.AudioFormat.Value(FORMATS[args.format][0])
+        self._next_session = 0
+        self._session_lock = threading.Lock()
+        self._run_id = f"lg{int(time.time())}"
+
+    def _claim_session(self):
+        with self._session_lock:
+            if self._next_session >= self.args.sessions:
+                return None
+            self._next_session += 1
+            return self._next_session - 1
+
+    def _run_session(self, stub, index: int, rng: random.Random, result: WorkerResult):
+        args = self.args
+        session_id = f"{self._run_id}-{index:06d}"
+        frame_interval = FRAME_MS / 1000.0 / args.speed
+        media_start_ms = int(time.time() * 1000)
+        seq = 0
+        next_send = time.monotonic()
+        for u in range(args.utterances):
+            frames = self.utterances[(index + u) % len(self.utterances)]
+            for i, frame in enumerate(frames):
+                is_final = i == len(frames) - 1
+                seq += 1
+                # Pace against an absolute schedule so the send rate does not drift.
+                jitter = rng.uniform(0, args.jitter_ms) / 1000.0 if args.jitter_ms else 0.0
+                delay = next_send + jitter - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                next_send += frame_interval
+                result.audio_ms_sent += FRAME_MS
+                if not is_final and args.loss and rng.random() < args.loss:
+                    result.frames_dropped += 1
+                    continue
+                segment = audio_stream_pb2.AudioSegment(
+                    session_id=session_id,
+                    timestamp=media_start_ms + (seq - 1) * FRAME_MS,
+                    audio_format=self.audio_format,
+                    sequence_number=seq,
+                    data=frame,
+                    is_final=is_final,
+                )
+                started = time.perf_counter()
+                try:
+                    response = stub.IngestAudioSegment(segment, timeout=args.timeout)
+                except grpc.RpcError:
+                    result.rpc_errors += 1
+                    continue
+                finally:
+                    result.frames_sent += 1
+                elapsed_ms = (time.perf_counter() - started) * 1000
+                result.latencies["utterance_end" if is_final else "frame"].append(elapsed_ms)
+                status = response.status_message.lower()
+                if "failed" in status or "error" in status:
+                    result.downstream_errors += 1
+            if is_final:
+                # After an utterance STT closes the session's stream; keep pacing continuous.
+                next_send = max(next_send, time.monotonic())
+        result.sessions_completed += 1
+
+    def _worker(self, worker_index: int, channel, result: WorkerResult):
+        args = self.args
+        stub = audio_stream_pb2_grpc.StreamIngestStub(channel)
+        rng = random.Random(args.seed * 100003 + worker_index)
+        # Ramp-up: spread worker start times evenly over the ramp period.
+        if args.ramp_up > 0:
+            time.sleep(args.ramp_up * worker_index / args.concurrency)
+        while True:
+            index = self._claim_session()
+            if index is None:
+                return
+            self._run_session(stub, index, rng, result)
+
+    def run(self) -> dict:
+        args = self.args
+        results = [WorkerResult() for _ in range(args.concurrency)]
+        with grpc.insecure_channel(args.target) as channel:
+            started = time.monotonic()
+            threads = [threading.Thread(target=self._worker, args=(i, channel, results[i]), daemon=True)
+                       for i in range(args.concurrency)]
+            for t in threads:
+                t.start()
+            for t in threads:
+                t.join()
+            wall_seconds = time.monotonic() - started
+        return self._report(results, wall_seconds)
+
+    def _report(self, results: list, wall_seconds: float) -> dict:
+        merged = WorkerResult()
+        for r in results:
+            for stage, values in r.latencies.items():
+                merged.latencies[stage].extend(values)
+            merged.frames_sent += r.frames_sent
+            merged.frames_dropped += r.frames_dropped
+            merged.rpc_errors += r.rpc_errors
+            merged.downstream_errors += r.downstream_errors
+            merged.sessions_completed += r.sessions_completed
+            merged.audio_ms_sent += r.audio_ms_sent
+        return {
+            "config": {k: v for k, v in vars(self.args).items() if k != "json_out"},
+            "wall_seconds": wall_seconds,
+            "sessions_completed": merged.sessions_completed,
+            "frames_sent": merged.frames_sent,
+            "frames_dropped": merged.frames_dropped,
+            "frames_per_second": merged.frames_sent / wall_seconds if wall_seconds else 0.0,
+            "realtime_factor": merged.audio_ms_sent / 1000.0 / wall_seconds if wall_seconds else 0.0,
+            "rpc_errors": merged.rpc_errors,
+            "downstream_errors": merged.downstream_errors,
+            "error_rate": (merged.rpc_errors + merged.downstream_errors) / merged.frames_sent if merged.frames_sent else 0.0,
+            "latency_ms": {stage: summarize(values) for stage, values in merged.latencies.items()},
+        }
+
+
+def print_report(report: dict):
+    print(f"Sessions completed:  {report['sessions_completed']} in {report['wall_seconds']:.1f}s")
+    print(f"Frames sent:         {report['frames_sent']} ({report['frames_per_second']:.1f}/s), "
+          f"dropped (loss injection): {report['frames_dropped']}")
+    print(f"Audio throughput:    {report['realtime_factor']:.2f}x real time")
+    print(f"Errors:              rpc={report['rpc_errors']} downstream={report['downstream_errors']} "
+          f"rate={report['error_rate'] * 100:.2f}%")
+    print("Latency (ms):")
+    for stage, summary in report["latency_ms"].items():
+        print("  " + format_summary(stage, summary))
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Replay sessions into StreamIngest at N x real time.")
+    parser.add_argument("--target", default="localhost:50051", help="StreamIngest address.")
+    parser.add_argument("--concurrency", type=int, default=10, help="Concurrent sessions.")
+    parser.add_argument("--sessions", type=int, default=0, help="Total sessions to run (default: --concurrency).")
+    parser.add_argument("--ramp-up", type=float, default=0.0, help="Seconds over which to start the workers.")
+    parser.add_argument("--speed", type=float, default=1.0, help="Replay speed multiplier (2 = twice real time).")
+    parser.add_argument("--jitter-ms", type=float, default=0.0, help="Uniform random send jitter per frame.")
+    parser.add_argument("--loss", type=float, default=0.0, help="Probability of dropping a non-final frame.")
+    parser.add_argument("--format", choices=sorted(FORMATS), default="pcmu", help="Wire audio format.")
+    parser.add_argument("--wav", action="append", default=[], help="16-bit WAV file to replay (repeatable).")
+    parser.add_argument("--synthetic-seconds", type=float, default=3.0,
+                        help="Length of synthetic utterances when no --wav is given.")
+    parser.add_argument("--utterances", type=int, default=1, help="Utterances (turns) per session.")
+    parser.add_argument("--timeout", type=float, default=10.0, help="Per-RPC timeout in seconds.")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed for jitter, loss and synthesis.")
+    parser.add_argument("--json-out", help="Write the machine-readable report to this file.")
+    parser.add_argument("--max-p99-ms", type=float, help="Exit non-zero if utterance_end p99 exceeds this.")
+    parser.add_argument("--max-error-rate", type=float, help="Exit non-zero if the error rate exceeds this.")
+    args = parser.parse_args(argv)
+    if args.sessions <= 0:
+        args.sessions = args.concurrency
+    if args.speed <= 0:
+        parser.error("--speed must be positive")
+    return args
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    if args.wav:
+        utterances = [load_wav(path, args.format) for path in args.wav]
+    else:
+        rng = random.Random(args.seed)
+        utterances = [synthetic_utterance(args.synthetic_seconds, args.format, rng) for _ in range(4)]
+
+    print(f"Replaying {args.sessions} sessions ({args.concurrency} concurrent, {args.speed}x) into {args.target}...")
+    report = LoadGenerator(args, utterances).run()
+    print_report(report)
+
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+    exit_code = 0
+    if args.max_p99_ms is not None and report["latency_ms"]["utterance_end"]["p99"] > args.max_p99_ms:
+        print(f"FAIL: utterance_end p99 {report['latency_ms']['utterance_end']['p99']:.1f} ms > {args.max_p99_ms} ms")
+        exit_code = 1
+    if args.max_error_rate is not None and report["error_rate"] > args.max_error_rate:
+        print(f"FAIL: error rate {report['error_rate']:.4f} > {args.max_error_rate}")
+        exit_code = 1
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,152 @@
+# benchmarks/logging_overhead.py
+
+"""
+Measures the CPU cost of per-segment logging (observability.logs) against the
+print() calls it replaced.
+
+Every 20 ms audio segment of a call used to print four lines on the hot path:
+two in StreamingDataManager (segment received, STT response) and two in
+SpeechToTextService (NLU call, NLU response). This replays those four log
+statements for `--frames` segments in three modes, all writing to the same sink:
+
+* `print`:      the original f-string print() calls
+* `logs-all`:   observability.logs with every event kept (queue + writer thread)
+* `logs`:       observability.logs with the default LOG_SAMPLE_RATES
+
+and reports CPU microseconds per frame: `caller` is the request thread (what a
+gRPC worker pays), `process` includes the background writer thread.
+
+The default sink is a line-buffered pipe drained by a reader thread, as when a
+service runs with PYTHONUNBUFFERED=1 under a container log driver or on a
+terminal (one write() per print). `--sink devnull` uses a
+block-buffered /dev/null instead, the cheapest possible destination for print.
+
+Example:
+    python benchmarks/logging_overhead.py --frames 200000
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import sys
+import threading
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) # Repository root
+from observability import config, logs
+
+
+class _Segment:
+    """Stand-in for audio_stream_pb2.AudioSegment / TranscriptionResponse / NLUResponse."""
+
+    def __init__(self, seq):
+        self.session_id = "call-0001"
+        self.sequence_number = seq
+        self.audio_format = 1
+        self.data = b"\xff" * 160
+        self.is_final = False
+        self.transcript = "what is the weather"
+        self.intent = "get_weather"
+        self.intent_confidence = 0.91
+        self.entities = ()
+
+
+def _print_frame(segment):
+    print(f"StreamingDataManager: Received AudioSegment: SID={segment.session_id}, Seq={segment.sequence_number}, Format={segment.audio_format}, DataLen={len(segment.data)}, IsFinal={segment.is_final}")
+    print(f"SpeechToTextService: Calling NLUService at localhost:50053 for SID {segment.session_id} with text: '{segment.transcript}'")
+    entities_log = [(e.name, e.value, f"{e.confidence:.2f}") for e in segment.entities]
+    print(f"SpeechToTextService: NLU response for SID {segment.session_id}: Intent='{segment.intent}' (Conf: {segment.intent_confidence:.2f}), Entities={entities_log}")
+    print(f"StreamingDataManager: Received transcription from STT: SID={segment.session_id}, Seq={segment.sequence_number}, Transcript='{segment.transcript}', IsFinal={segment.is_final}")
+
+
+def _entities_summary(entities):
+    return str([(e.name, e.value, f"{e.confidence:.2f}") for e in entities])
+
+
+_ingest_log = logs.get_logger("streaming_data_manager")
+_stt_log = logs.get_logger("speech_to_text")
+
+
+def _logs_frame(segment):
+    _ingest_log.info("segment", "Received AudioSegment: Format=%s, DataLen=%d, IsFinal=%s",
+                     segment.audio_format, len(segment.data), segment.is_final,
+                     session_id=segment.session_id, seq=segment.sequence_number, stage="ingest")
+    _stt_log.info("segment", "Calling NLUService at %s with text: '%s'", "localhost:50053", segment.transcript,
+                  session_id=segment.session_id, stage="stt")
+    _stt_log.info("segment", "NLU response: Intent='%s' (Conf: %.2f), Entities=%s",
+                  segment.intent, segment.intent_confidence, logs.lazy(_entities_summary, segment.entities),
+                  session_id=segment.session_id, stage="stt")
+    _ingest_log.info("segment", "Received transcription from STT: Transcript='%s', IsFinal=%s",
+                     segment.transcript, segment.is_final,
+                     session_id=segment.session_id, seq=segment.sequence_number, stage="ingest")
+
+
+def _run_mode(mode: str, frames: int, sink) -> dict:
+    segments = [_Segment(seq) for seq in range(1000)]
+    if mode == "print":
+        frame = _print_frame
+        redirect = contextlib.redirect_stdout(sink)
+    else:
+        frame = _logs_frame
+        rates = {} if mode == "logs-all" else logs.parse_sample_rates(config.LOG_SAMPLE_RATES)
+        # Large enough queue that the comparison measures formatting, not drops.
+        logs.configure(level="INFO", sample_rates=rates, max_queued=frames * 4 + 1, stream=sink)
+        redirect = contextlib.nullcontext()
+    with redirect:
+        thread_start, process_start = time.thread_time_ns(), time.process_time_ns()
+        for i in range(frames):
+            frame(segments[i % 1000])
+        caller_ns = time.thread_time_ns() - thread_start
+        if mode != "print":
+            logs.shutdown() # Waits for the writer thread, so its CPU is counted
+        process_ns = time.process_time_ns() - process_start
+    return {"caller_us_per_frame": caller_ns / frames / 1000.0,
+            "process_us_per_frame": process_ns / frames / 1000.0}
+
+
+@contextlib.contextmanager
+def _open_sink(kind: str):
+    if kind == "devnull":
+        with open(os.devnull, "w") as sink:
+            yield sink
+        return
+    read_fd, write_fd = os.pipe()
+    drain = threading.Thread(target=_drain, args=(read_fd,), daemon=True)
+    drain.start()
+    with os.fdopen(write_fd, "w", buffering=1) as sink:
+        yield sink
+    drain.join()
+
+
+def _drain(read_fd: int):
+    with os.fdopen(read_fd, "rb", buffering=0) as pipe:
+        while pipe.read(65536):
+            pass
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="CPU per frame of per-segment logging: print() vs observability.logs.")
+    parser.add_argument("--frames", type=int, default=50000)
+    parser.add_argument("--sink", choices=("pipe", "devnull"), default="pipe")
+    parser.add_argument("--json-out", help="Write the results as JSON.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    with _open_sink(args.sink) as sink:
+        results = {mode: _run_mode(mode, args.frames, sink) for mode in ("print", "logs-all", "logs")}
+    base = results["print"]["process_us_per_frame"]
+    print(f"CPU per frame (us), {args.frames} frames, sink={args.sink}, LOG_SAMPLE_RATES={config.LOG_SAMPLE_RATES!r}:")
+    for mode, result in results.items():
+        result["saved_us_per_frame"] = base - result["process_us_per_frame"]
+        print(f"  {mode:<9} caller={result['caller_us_per_frame']:7.2f} process={result['process_us_per_frame']:7.2f} "
+              f"saved={result['saved_us_per_frame']:7.2f}")
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump({"frames": args.frames, "sink": args.sink, "cpu": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+# benchmarks/metrics_overhead.py
+
+"""
+Measures the cost of recording a metric sample (observability.metrics).
+
+Reports nanoseconds per operation for counter increments, histogram
+observations (bound child, `labels()` lookup per call, and the `time()`
+context manager), single-threaded and with `--threads` threads recording
+concurrently (per-thread cells, so there is no lock to contend on), plus the
+time to render a scrape.
+
+Example:
+    python benchmarks/metrics_overhead.py --ops 1000000 --threads 8
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) # Repository root
+from observability import metrics
+
+
+def _loop_ns(op, ops: int) -> float:
+    start = time.perf_counter_ns()
+    for _ in range(ops):
+        op()
+    return (time.perf_counter_ns() - start) / ops
+
+
+def _operations(registry: metrics.Registry) -> dict:
+    counter = registry.register(metrics.Counter("bench_events_total", "Events."))
+    histogram = registry.register(metrics.Histogram("bench_seconds", "Latency.", ("service", "method")))
+    child = histogram.labels("nlu", "ProcessText")
+
+    def timed():
+        with child.time():
+            pass
+
+    return {
+        "empty loop": lambda: None,
+        "counter.inc": counter.inc,
+        "histogram.observe": lambda: child.observe(0.0123),
+        "labels().observe": lambda: histogram.labels("nlu", "ProcessText").observe(0.0123),
+        "time() block": timed,
+    }
+
+
+def _concurrent_ns(op, ops: int, threads: int) -> float:
+    """Wall-clock ns per operation per thread with `threads` threads recording at once."""
+    barrier = threading.Barrier(threads + 1)
+    results = []
+
+    def work():
+        barrier.wait()
+        results.append(_loop_ns(op, ops))
+
+    workers = [threading.Thread(target=work) for _ in range(threads)]
+    for w in workers:
+        w.start()
+    barrier.wait()
+    for w in workers:
+        w.join()
+    return sum(results) / len(results)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Cost of recording metric samples.")
+    parser.add_argument("--ops", type=int, default=500000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--json-out", help="Write the results as JSON.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    registry = metrics.Registry()
+    operations = _operations(registry)
+    report = {"ops": args.ops, "threads": args.threads, "ns_per_op": {}}
+    print(f"ns per operation ({args.ops} ops; loop overhead included, see 'empty loop'):")
+    print(f"  {'operation':<20} {'1 thread':>10} {f'{args.threads} threads, aggregate':>22}")
+    for name, op in operations.items():
+        _loop_ns(op, 10000) # Warm up (allocates this thread's cells)
+        single = _loop_ns(op, args.ops)
+        # Under the GIL the threads interleave, so this is the aggregate cost: wall time / total ops.
+        concurrent = _concurrent_ns(op, args.ops // args.threads, args.threads) / args.threads
+        report["ns_per_op"][name] = {"single": single, "concurrent": concurrent}
+        print(f"  {name:<20} {single:10.0f} {concurrent:22.0f}")
+
+    start = time.perf_counter_ns()
+    body = registry.render()
+    render_us = (time.perf_counter_ns() - start) / 1000
+    report["render_us"] = render_us
+    print(f"Scrape render: {render_us:.0f} us for {len(body.splitlines())} lines")
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
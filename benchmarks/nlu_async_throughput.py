@@ -0,0 +1,209 @@
+# benchmarks/nlu_async_throughput.py
+
+"""
+ProcessText throughput per NLUService process, threaded server vs asyncio
+server (NLU_ASYNC_SERVER; see ai_ml_services/nlu_service/README.md).
+
+Starts the Dialogflow CX stand-in (with --dialogflow-latency) and, for each
+server, one NLUService process (unchanged, `python -m nlu_service.service`,
+no local model, no result cache, so every turn is a DetectIntent call), then
+offers it an open-loop load: requests are sent on a fixed schedule, at each
+rate of --rates for --duration seconds, whether or not earlier ones have
+returned, with a --deadline-ms deadline. Caller turns are those of
+nlu_fast_path.py. Per step it reports the achieved rate (successful responses
+per second), errors (gRPC errors and error intents) and latency percentiles;
+per server, the highest offered rate served with at most --max-error-rate
+errors and a p99 within --max-p99-ms.
+
+All processes (stand-in, NLU, this load generator) share the machine's CPUs;
+pin them apart (`taskset`) to measure the NLU process alone.
+
+Example:
+    python benchmarks/nlu_async_throughput.py --rates 25 50 100 200 400 --dialogflow-latency fixed:200 \\
+        --max-p99-ms 400 --json-out nlu_throughput.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import grpc
+
+from bench_stats import summarize, format_summary
+from nlu_fast_path import AI_ML_DIR, NLU_DIR, make_turns
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+NLU_PORT = 50053 # Fixed in nlu_service/service.py
+
+sys.path.insert(0, NLU_DIR)
+import nlu_service_pb2
+import nlu_service_pb2_grpc
+
+SERVERS = {
+    # name: NLUService environment
+    "threaded": {"NLU_ASYNC_SERVER": "false"},
+    "asyncio": {"NLU_ASYNC_SERVER": "true"},
+}
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("localhost", 0))
+        return s.getsockname()[1]
+
+
+def wait_for_port(port: int, timeout: float, process: subprocess.Popen, name: str):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{name} exited with code {process.returncode} during start-up")
+        try:
+            with socket.create_connection(("localhost", port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"{name} did not start listening on port {port}")
+
+
+def spawn(name: str, argv: list, env: dict, cwd: str, port: int, workdir: str) -> subprocess.Popen:
+    log = open(os.path.join(workdir, f"{name}.log"), "w", encoding="utf-8")
+    process = subprocess.Popen(argv, cwd=cwd, env=env, stdout=log, stderr=subprocess.STDOUT)
+    wait_for_port(port, 30, process, name)
+    return process
+
+
+def stop(process: subprocess.Popen):
+    if process.poll() is None:
+        process.send_signal(signal.SIGINT)
+    try:
+        process.wait(timeout=15)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+async def offer(stub, texts: list, rate: float, duration: float, deadline: float) -> dict:
+    """Sends rate * duration ProcessText requests on schedule; the step's results."""
+    latencies, errors = [], 0
+
+    async def one(i: int):
+        nonlocal errors
+        start = time.perf_counter()
+        try:
+            response = await stub.ProcessText(
+                nlu_service_pb2.NLURequest(text=texts[i % len(texts)], session_id=f"call-{i // 4}"), timeout=deadline)
+        except grpc.RpcError:
+            errors += 1
+            return
+        if response.intent.startswith("error_") or not response.intent:
+            errors += 1
+        else:
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    loop = asyncio.get_running_loop()
+    count = int(rate * duration)
+    started = loop.time()
+    tasks = []
+    for i in range(count):
+        delay = started + i / rate - loop.time()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.ensure_future(one(i)))
+    await asyncio.gather(*tasks)
+    elapsed = loop.time() - started
+    return {
+        "offered_rps": rate,
+        "achieved_rps": len(latencies) / elapsed,
+        "requests": count,
+        "error_rate": errors / count if count else 0.0,
+        "latency_ms": summarize(latencies),
+    }
+
+
+async def run_steps(args, texts: list) -> list:
+    async with grpc.aio.insecure_channel(f"localhost:{NLU_PORT}") as channel:
+        stub = nlu_service_pb2_grpc.NLUServiceStub(channel)
+        await offer(stub, texts, min(args.rates), args.warmup, args.deadline_ms / 1000) # Connections, first calls
+        steps = []
+        for rate in args.rates:
+            step = await offer(stub, texts, rate, args.duration, args.deadline_ms / 1000)
+            steps.append(step)
+            print(format_summary(f"  {rate:g} req/s offered", step["latency_ms"])
+                  + f" achieved={step['achieved_rps']:7.1f} req/s errors={step['error_rate']:.1%}")
+        return steps
+
+
+def sustained_rps(steps: list, max_p99_ms: float, max_error_rate: float) -> float:
+    """The highest offered rate served within the p99 and error budgets (0 if none was)."""
+    ok = [s["offered_rps"] for s in steps
+          if s["error_rate"] <= max_error_rate and s["latency_ms"]["count"] and s["latency_ms"]["p99"] <= max_p99_ms]
+    return max(ok, default=0.0)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="NLUService ProcessText throughput, threaded vs asyncio server.")
+    parser.add_argument("--servers", nargs="+", choices=sorted(SERVERS), default=["threaded", "asyncio"])
+    parser.add_argument("--rates", type=float, nargs="+", default=[25, 50, 100, 200, 400],
+                        help="Offered load steps (requests per second).")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per step.")
+    parser.add_argument("--warmup", type=float, default=2.0, help="Seconds at the lowest rate before the steps.")
+    parser.add_argument("--deadline-ms", type=float, default=2000, help="ProcessText deadline.")
+    parser.add_argument("--dialogflow-latency", default="fixed:200", help="Stand-in DetectIntent latency (ms).")
+    parser.add_argument("--max-p99-ms", type=float, default=400, help="p99 budget of a sustained rate.")
+    parser.add_argument("--max-error-rate", type=float, default=0.001, help="Error budget of a sustained rate.")
+    parser.add_argument("--nlu-env", action="append", default=[], metavar="NAME=VALUE",
+                        help="Extra NLUService environment, e.g. NLU_MAX_WORKERS=50 (repeatable).")
+    parser.add_argument("--turns", type=int, default=2000, help="Distinct caller turns to cycle through.")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json-out", help="Write the results as JSON.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    texts = make_turns(args.turns, random.Random(args.seed))
+    dialogflow_port = free_port()
+    env = dict(os.environ)
+    env.update({
+        "PYTHONUNBUFFERED": "1",
+        "PYTHONPATH": os.pathsep.join(filter(None, [NLU_DIR, env.get("PYTHONPATH")])),
+        "DIALOGFLOW_PROJECT_ID": "bench-project", "DIALOGFLOW_AGENT_ID": "bench-agent",
+        "DIALOGFLOW_API_ENDPOINT": f"localhost:{dialogflow_port}", "DIALOGFLOW_USE_INSECURE_CHANNEL": "true",
+        "NLU_LOCAL_MODEL_PATH": "", "CACHE_NLU_RESULTS": "false", "METRICS_PORT": str(free_port()),
+    })
+    env.update(item.split("=", 1) for item in args.nlu_env)
+    report = {"config": vars(args), "servers": {}}
+    with tempfile.TemporaryDirectory() as workdir:
+        stand_in = spawn("dialogflow_stand_in", [
+            sys.executable, os.path.join(BENCH_DIR, "dialogflow_stand_in.py"), "--port", str(dialogflow_port),
+            "--latency", args.dialogflow_latency, "--max-workers", "1000", "--seed", str(args.seed),
+        ], env, BENCH_DIR, dialogflow_port, workdir)
+        try:
+            for name in args.servers:
+                print(f"{name} server:")
+                nlu = spawn(f"nlu-{name}", [sys.executable, "-m", "nlu_service.service"],
+                            dict(env, **SERVERS[name]), AI_ML_DIR, NLU_PORT, workdir)
+                try:
+                    steps = asyncio.run(run_steps(args, texts))
+                finally:
+                    stop(nlu)
+                sustained = sustained_rps(steps, args.max_p99_ms, args.max_error_rate)
+                report["servers"][name] = {"steps": steps, "sustained_rps": sustained}
+                print(f"  sustained: {sustained:g} req/s at p99 <= {args.max_p99_ms:g} ms")
+        finally:
+            stop(stand_in)
+
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
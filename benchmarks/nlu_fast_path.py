@@ -0,0 +1,205 @@
+# benchmarks/nlu_fast_path.py
+
+"""
+Accuracy and latency of the NLUService's local intent classifier
+(ai_ml_services/nlu_service/intent_classifier.py) and result cache
+(result_cache.py) against Dialogflow CX.
+
+Generates the caller turns of IVR calls (short answers repeating heavily,
+with fillers and disfluencies, plus requests with parameters and
+out-of-domain text), labels them as the Dialogflow stand-in's intent script
+would (that is the "logged Dialogflow result"), and trains a model on the
+training share with the labelling of train_intent_classifier.py. On the
+held-out turns it reports:
+
+  * per confidence threshold: the share of turns answered locally, the
+    accuracy of those answers (agreement with Dialogflow) and the coverage of
+    the turns the model could answer;
+  * classify latency percentiles (microseconds);
+  * ProcessText latency and Dialogflow calls with Dialogflow only, with the
+    result cache, with the fast path and with both: the NLU servicer
+    in-process, calling the Dialogflow stand-in (in-process too, on a free
+    port, with --dialogflow-latency) over its real client. The turns are
+    sent in order, --turns-per-call to a session; the cache starts empty.
+
+Example:
+    python benchmarks/nlu_fast_path.py --turns 20000 --dialogflow-latency lognormal:180,0.5 --json-out nlu.json
+"""
+
+import argparse
+import importlib
+import json
+import os
+import random
+import socket
+import sys
+import tempfile
+import time
+
+from bench_stats import summarize, format_summary
+from dialogflow_stand_in import DEFAULT_RULES, IntentScript, SessionsStandIn, build_server
+from stand_in_common import ErrorInjector, LatencyDistribution
+
+AI_ML_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "ai_ml_services")
+NLU_DIR = os.path.join(AI_ML_DIR, "nlu_service")
+
+# (weight, phrasings): what callers say, roughly as often as they say it
+TURNS = [
+    (30, ["yes", "yeah", "yep", "yes please", "sure", "correct", "yes that's right", "yeah sure", "yes it is"]),
+    (20, ["no", "nope", "no thanks", "no thank you", "no that's wrong", "no it isn't", "no not today"]),
+    (10, ["agent", "an agent please", "talk to an agent", "i need help", "help", "representative",
+          "can i speak to a representative", "customer support please", "get me support"]),
+    (8, ["hello", "hi", "hi there", "hey", "good morning", "good afternoon", "hello is anyone there"]),
+    (8, ["what's the weather in {city}", "weather for {city} tomorrow", "how is the weather in {city}",
+         "weather in {city} please", "is it raining in {city}", "what's the weather like"]),
+    (14, ["i want to pay my bill", "what's my balance", "i lost my card", "change my address",
+          "the second option", "i don't know", "maybe later", "what did you say", "can you repeat that",
+          "i'm calling about my order", "cancel my subscription", "it's about an appointment",
+          "my number is {number}", "thanks bye", "goodbye", "okay", "hmm"]),
+]
+CITIES = ["london", "paris", "berlin", "madrid", "rome", "oslo", "dublin", "lisbon", "vienna", "prague"]
+NUMBERS = ["five five five one two", "four two", "nine one one two", "seven three eight"]
+FILLERS = ["uh", "um", "well", "oh", "so", "er"]
+ENDINGS = ["", "", "", " please", " thanks", " thank you"]
+
+
+def make_turns(count: int, rng: random.Random) -> list:
+    weights = [weight for weight, _ in TURNS]
+    turns = []
+    for _ in range(count):
+        text = rng.choice(rng.choices(TURNS, weights)[0][1]).format(city=rng.choice(CITIES),
+                                                                    number=rng.choice(NUMBERS))
+        if rng.random() < 0.15:
+            text = f"{rng.choice(FILLERS)} {text}"
+        if rng.random() < 0.1:
+            text = f"{text.split()[0]} {text}" # Repeated first word
+        text += rng.choice(ENDINGS)
+        turns.append(text.capitalize() if rng.random() < 0.5 else text)
+    return turns
+
+
+def dialogflow_results(turns: list, script: IntentScript) -> list:
+    """(text, intent, parameter names), as the NLUService logs Dialogflow's answers."""
+    results = []
+    for text in turns:
+        rule, parameters = script.match(text)
+        results.append((text, rule["intent"] if rule else "no_intent_matched", sorted(parameters)))
+    return results
+
+
+def classify_latency_us(model, texts: list) -> dict:
+    samples = []
+    for text in texts:
+        start = time.perf_counter()
+        model.classify(text)
+        samples.append((time.perf_counter() - start) * 1e6)
+    return summarize(samples)
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("localhost", 0))
+        return s.getsockname()[1]
+
+
+class CallerContext:
+    """The servicer context of a call with no deadline."""
+
+    def time_remaining(self):
+        return None
+
+
+def process_text_latency(servicer, texts: list, turns_per_call: int, pb2) -> dict:
+    """ProcessText latency (ms) of `texts` through the NLU servicer."""
+    context = CallerContext()
+    samples = []
+    for i, text in enumerate(texts):
+        start = time.perf_counter()
+        servicer.ProcessText(pb2.NLURequest(text=text, session_id=f"call-{i // turns_per_call}"), context)
+        samples.append((time.perf_counter() - start) * 1000)
+    return summarize(samples)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="NLU local intent classifier and result cache accuracy and latency.")
+    parser.add_argument("--turns", type=int, default=20000, help="Caller turns to generate (train + hold-out).")
+    parser.add_argument("--holdout", type=float, default=0.2)
+    parser.add_argument("--thresholds", type=float, nargs="+", default=[0.5, 0.7, 0.8, 0.9, 0.95, 0.99])
+    parser.add_argument("--threshold", type=float, default=0.9, help="Threshold of the ProcessText comparison.")
+    parser.add_argument("--features", type=int, default=16, help="log2 of the number of hashed feature buckets.")
+    parser.add_argument("--epochs", type=int, default=100)
+    parser.add_argument("--dialogflow-latency", default="lognormal:180,0.5", help="Stand-in DetectIntent latency (ms).")
+    parser.add_argument("--requests", type=int, default=200, help="Hold-out turns sent through ProcessText.")
+    parser.add_argument("--turns-per-call", type=int, default=4)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json-out", help="Write the results as JSON.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    rng = random.Random(args.seed)
+    port = free_port()
+    os.environ.update({
+        "DIALOGFLOW_PROJECT_ID": "bench-project", "DIALOGFLOW_AGENT_ID": "bench-agent",
+        "DIALOGFLOW_API_ENDPOINT": f"localhost:{port}", "DIALOGFLOW_USE_INSECURE_CHANNEL": "true",
+        "NLU_LOCAL_MODEL_PATH": "", "NLU_LOCAL_CONFIDENCE_THRESHOLD": str(args.threshold),
+    })
+    sys.path[:0] = [NLU_DIR, AI_ML_DIR] # As service_runner.py: flat sibling imports, package-relative config
+    import intent_classifier
+    import nlu_service_pb2
+    import train_intent_classifier
+    service = importlib.import_module("nlu_service.service")
+
+    script = IntentScript(DEFAULT_RULES)
+    texts, labels, reasons = train_intent_classifier.label_examples(dialogflow_results(make_turns(args.turns, rng), script))
+    (train_texts, train_labels), (test_texts, test_labels) = train_intent_classifier.split(texts, labels, args.holdout)
+    start = time.perf_counter()
+    model = intent_classifier.train(train_texts, train_labels, 1 << args.features, args.epochs)
+    train_seconds = time.perf_counter() - start
+    print(f"{len(texts)} turns ({len(set(map(intent_classifier.normalize, texts)))} distinct), "
+          f"trained on {len(train_texts)} in {train_seconds:.1f} s; left to Dialogflow: "
+          + ", ".join(f"{intent} ({reason})" for intent, reason in sorted(reasons.items())))
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "intent_classifier.npz")
+        model.save(path)
+        model_bytes = os.path.getsize(path)
+    print(f"Model: {len(model.labels)} labels, {model.n_features} buckets, {model_bytes / 1024:.0f} KiB on disk")
+
+    report = {"turns": len(texts), "train_seconds": train_seconds, "model_bytes": model_bytes, "thresholds": {}}
+    print(f"\nHold-out: {len(test_texts)} turns")
+    print(f"{'threshold':>10} {'answered':>9} {'accuracy':>9} {'coverage':>9}")
+    for threshold in args.thresholds:
+        result = train_intent_classifier.evaluate(model, test_texts, test_labels, threshold)
+        report["thresholds"][threshold] = result
+        print(f"{threshold:>10.2f} {result['answered']:>9.1%} {result['accuracy']:>9.2%} {result['coverage']:>9.1%}")
+
+    report["classify_us"] = classify_latency_us(model, test_texts)
+    print("\n" + format_summary("classify (us)", report["classify_us"]))
+
+    stand_in = SessionsStandIn(script, LatencyDistribution(args.dialogflow_latency, random.Random(args.seed)),
+                               ErrorInjector(0.0))
+    server = build_server(stand_in, port)
+    server.start()
+    try:
+        requests = test_texts[:args.requests]
+        report["process_text"] = {}
+        for name, classifier, cached in (("dialogflow only", None, False), ("result cache", None, True),
+                                         ("fast path", model, False), ("fast path + cache", model, True)):
+            cache = service.result_cache.ResultCache(10000, 600, 60) if cached else None
+            servicer = service.NLUServiceServicer(classifier=classifier, cache=cache)
+            served = stand_in.requests_served
+            latency = process_text_latency(servicer, requests, args.turns_per_call, nlu_service_pb2)
+            calls = stand_in.requests_served - served
+            report["process_text"][name] = {"latency_ms": latency, "dialogflow_calls": calls}
+            print(format_summary(f"{name} (ms)", latency) + f" dialogflow_calls={calls}/{len(requests)}")
+    finally:
+        server.stop(0)
+
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
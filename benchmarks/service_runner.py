@@ -0,0 +1,210 @@
+# benchmarks/service_runner.py
+
+"""
+Runs one of the Python services unchanged, with a timing interceptor added to
+its gRPC server so benchmarks can see when each hop of a turn starts and ends.
+
+Every unary and server-streaming RPC the service handles is appended to
+`--events-out` as one JSON line:
+    {"service": "nlu", "method": "ProcessText", "session_id": "...",
+     "is_final": false, "text": "...", "start_ns": ..., "end_ns": ..., "ok": true}
+Events of server-streaming RPCs (TTS SynthesizeStream) also have "first_ns",
+when the first response was sent (null if none was); such a call is "ok" only
+if it sent at least one response.
+Timestamps are `time.time_ns()` so events from several processes on the same
+host can be compared with each other and with the benchmark client.
+
+Example:
+    python benchmarks/service_runner.py nlu --events-out /tmp/nlu.jsonl
+"""
+
+import argparse
+import importlib
+import inspect
+import json
+import os
+import sys
+import threading
+import time
+
+import grpc
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# name -> (layer directory, service package, module with serve(), port)
+SERVICES = {
+    "ingest": ("real_time_processing_engine", "streaming_data_manager", "manager", 50051),
+    "stt": ("real_time_processing_engine", "speech_to_text_service", "service", 50052),
+    "nlu": ("ai_ml_services", "nlu_service", "service", 50053),
+    "dm": ("ai_ml_services", "dialogue_management_service", "service", 50054),
+    "tts": ("real_time_processing_engine", "text_to_speech_service", "service", 50055),
+    "orchestrator": (os.path.join("business_logic_layer", "call_management_services"), "session_orchestrator_service",
+                     "service", 50056),
+}
+
+
+class EventLog:
+    """Appends timing events as JSON lines; shared by all server threads."""
+
+    def __init__(self, path: str):
+        self._file = open(path, "a", encoding="utf-8", buffering=1)
+        self._lock = threading.Lock()
+
+    def write(self, event: dict):
+        line = json.dumps(event, separators=(",", ":")) + "\n"
+        with self._lock:
+            self._file.write(line)
+
+    def close(self):
+        with self._lock:
+            self._file.close()
+
+
+class TimingInterceptor(grpc.ServerInterceptor):
+    """Records start/end wall-clock times of every unary-unary and unary-stream RPC."""
+
+    def __init__(self, service: str, log: EventLog):
+        self.service = service
+        self.log = log
+
+    def intercept_service(self, continuation, handler_call_details):
+        return self._timed(continuation(handler_call_details), handler_call_details)
+
+    def _writer(self, method: str):
+        def write(request, start_ns, ok, **extra):
+            self.log.write({
+                "service": self.service,
+                "method": method,
+                "session_id": getattr(request, "session_id", ""),
+                "is_final": bool(getattr(request, "is_final", False)),
+                "text": getattr(request, "text", "")[:80], # NLURequest: the transcript of the turn
+                "start_ns": start_ns,
+                "end_ns": time.time_ns(),
+                "ok": ok,
+                **extra,
+            })
+        return write
+
+    def _timed_stream(self, handler, method: str):
+        behavior = handler.unary_stream
+        write = self._writer(method)
+
+        if inspect.isasyncgenfunction(behavior): # grpc.aio servers
+            async def timed(request, context):
+                start_ns, first_ns, ok = time.time_ns(), None, False
+                try:
+                    async for response in behavior(request, context):
+                        first_ns = first_ns or time.time_ns()
+                        yield response
+                    ok = first_ns is not None
+                finally:
+                    write(request, start_ns, ok, first_ns=first_ns)
+        else:
+            def timed(request, context):
+                start_ns, first_ns, ok = time.time_ns(), None, False
+                try:
+                    for response in behavior(request, context):
+                        first_ns = first_ns or time.time_ns()
+                        yield response
+                    ok = first_ns is not None
+                finally:
+                    write(request, start_ns, ok, first_ns=first_ns)
+
+        return grpc.unary_stream_rpc_method_handler(
+            timed,
+            request_deserializer=handler.request_deserializer,
+            response_serializer=handler.response_serializer,
+        )
+
+    def _timed(self, handler, handler_call_details):
+        if handler is None:
+            return handler
+        method = handler_call_details.method.rsplit("/", 1)[-1]
+        if handler.unary_stream is not None:
+            return self._timed_stream(handler, method)
+        if handler.unary_unary is None:
+            return handler
+        behavior = handler.unary_unary
+        write = self._writer(method)
+
+        if inspect.iscoroutinefunction(behavior): # grpc.aio servers
+            async def timed(request, context):
+                start_ns = time.time_ns()
+                ok = False
+                try:
+                    response = await behavior(request, context)
+                    ok = True
+                    return response
+                finally:
+                    write(request, start_ns, ok)
+        else:
+            def timed(request, context):
+                start_ns = time.time_ns()
+                ok = False
+                try:
+                    response = behavior(request, context)
+                    ok = True
+                    return response
+                finally:
+                    write(request, start_ns, ok)
+
+        return grpc.unary_unary_rpc_method_handler(
+            timed,
+            request_deserializer=handler.request_deserializer,
+            response_serializer=handler.response_serializer,
+        )
+
+
+class AioTimingInterceptor(TimingInterceptor, grpc.aio.ServerInterceptor):
+
+    async def intercept_service(self, continuation, handler_call_details):
+        return self._timed(await continuation(handler_call_details), handler_call_details)
+
+
+def install_interceptor(interceptor: TimingInterceptor):
+    """Makes every grpc.server(...) and grpc.aio.server(...) created from now on include `interceptor`."""
+    original_server = grpc.server
+    original_aio_server = grpc.aio.server
+    aio_interceptor = AioTimingInterceptor(interceptor.service, interceptor.log)
+
+    def server_with_interceptor(*args, **kwargs):
+        kwargs["interceptors"] = [interceptor] + list(kwargs.get("interceptors") or ())
+        return original_server(*args, **kwargs)
+
+    def aio_server_with_interceptor(*args, **kwargs):
+        kwargs["interceptors"] = [aio_interceptor] + list(kwargs.get("interceptors") or ())
+        return original_aio_server(*args, **kwargs)
+
+    grpc.server = server_with_interceptor
+    grpc.aio.server = aio_server_with_interceptor
+
+
+def load_serve(name: str):
+    """Imports a service the way it is laid out in the repo and returns its serve()."""
+    layer, package, module, _ = SERVICES[name]
+    layer_dir = os.path.join(REPO_ROOT, layer)
+    sys.path.insert(0, os.path.join(layer_dir, package)) # Generated *_pb2 modules and sibling imports
+    sys.path.insert(0, layer_dir) # Package-relative imports (from .config import ...)
+    return importlib.import_module(f"{package}.{module}").serve
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run a service with RPC timing events.")
+    parser.add_argument("service", choices=sorted(SERVICES))
+    parser.add_argument("--events-out", required=True, help="JSONL file to append timing events to.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    log = EventLog(args.events_out)
+    install_interceptor(TimingInterceptor(args.service, log))
+    serve = load_serve(args.service)
+    try:
+        serve()
+    finally:
+        log.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+# benchmarks/stand_in_common.py
+
+"""Helpers shared by the local cloud-API stand-ins (Deepgram, Dialogflow CX)."""
+
+import json
+import math
+import random
+
+
+class LatencyDistribution:
+    """
+    Samples simulated service latency in seconds.
+
+    Specs (all values in milliseconds):
+        "fixed:120"            always 120 ms
+        "uniform:80,200"       uniform between 80 and 200 ms
+        "normal:150,30"        normal(mean, stddev), clamped at 0
+        "lognormal:150,0.4"    log-normal with the given median and sigma (heavy tail, like real APIs)
+        "0" or ""              no added latency
+    """
+
+    def __init__(self, spec: str = "", rng: random.Random = None):
+        self.spec = spec or "fixed:0"
+        self.rng = rng or random.Random()
+        kind, _, params = self.spec.partition(":")
+        if not params:
+            kind, params = "fixed", kind
+        values = [float(v) for v in params.split(",") if v.strip()]
+        samplers = {
+            "fixed": lambda: values[0],
+            "uniform": lambda: self.rng.uniform(values[0], values[1]),
+            "normal": lambda: max(0.0, self.rng.gauss(values[0], values[1])),
+            "lognormal": lambda: self.rng.lognormvariate(math.log(max(values[0], 1e-6)), values[1]),
+        }
+        if kind not in samplers:
+            raise ValueError(f"Unknown latency distribution '{kind}'. Expected one of {sorted(samplers)}.")
+        self._sample_ms = samplers[kind]
+
+    def sample(self) -> float:
+        return self._sample_ms() / 1000.0
+
+    def __repr__(self):
+        return f"LatencyDistribution({self.spec!r})"
+
+
+class ErrorInjector:
+    """Decides, with a fixed probability, whether a request should fail."""
+
+    def __init__(self, error_rate: float = 0.0, rng: random.Random = None):
+        if not 0.0 <= error_rate <= 1.0:
+            raise ValueError("error_rate must be between 0 and 1")
+        self.error_rate = error_rate
+        self.rng = rng or random.Random()
+
+    def should_fail(self) -> bool:
+        return self.error_rate > 0 and self.rng.random() < self.error_rate
+
+
+def load_script(path: str, default):
+    """Loads a JSON script file, or returns `default` when no path is given."""
+    if not path:
+        return default
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
@@ -0,0 +1,230 @@
+# benchmarks/timer_wheel.py
+
+"""
+Compares the session orchestrator's hierarchical timing wheel
+(session_orchestrator_service/timing_wheel.py) with `loop.call_later` and a
+heapq-based timer task at 10k and 100k live timers.
+
+Phases, per implementation and timer count:
+  * schedule:  arm N timers 5-60 s out (no-input / max-call-duration style)
+  * reset:     move every timer once (what caller activity does per frame)
+  * churn CPU: every timer reset once per second, spread over 10 ms steps,
+               for --churn-seconds; process CPU as % of one core
+  * idle CPU:  N live timers, nothing due, for --idle-seconds
+  * expiry:    N timers due within one second; CPU per fired timer and
+               firing lateness (p50/p99)
+
+Example:
+    python benchmarks/timer_wheel.py --timers 10000 100000 --json-out timers.json
+"""
+
+import argparse
+import asyncio
+import heapq
+import itertools
+import json
+import os
+import random
+import sys
+import time
+
+from bench_stats import summarize
+
+sys.path.append(os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                             "business_logic_layer", "call_management_services", "session_orchestrator_service"))
+from timing_wheel import TimerService
+
+
+class CallLaterTimers:
+    """
+    One loop.call_later handle per timer, kept as [handle, callback, payload]
+    (a cancelled handle forgets its callback); cancel() marks the handle and
+    leaves it in the loop's heap.
+    """
+
+    batched = False
+
+    def start(self):
+        self._loop = asyncio.get_running_loop()
+        return self
+
+    async def stop(self):
+        pass
+
+    def schedule(self, delay_seconds, callback, payload=None):
+        return [self._loop.call_later(delay_seconds, callback, payload), callback, payload]
+
+    def reschedule(self, timer, delay_seconds):
+        timer[0].cancel()
+        timer[0] = self._loop.call_later(delay_seconds, timer[1], timer[2])
+        return timer
+
+    def cancel(self, timer):
+        timer[0].cancel()
+
+
+class HeapqTimers:
+    """A heap of [deadline, seq, callback, payload] driven by one task; cancel() is lazy (callback = None)."""
+
+    batched = False
+
+    def start(self):
+        self._loop = asyncio.get_running_loop()
+        self._heap = []
+        self._seq = itertools.count()
+        self._wake = asyncio.Event()
+        self._task = self._loop.create_task(self._run())
+        return self
+
+    async def stop(self):
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+
+    def schedule(self, delay_seconds, callback, payload=None):
+        entry = [self._loop.time() + delay_seconds, next(self._seq), callback, payload]
+        heapq.heappush(self._heap, entry)
+        if self._heap[0] is entry:
+            self._wake.set()
+        return entry
+
+    def reschedule(self, entry, delay_seconds):
+        callback = entry[2]
+        entry[2] = None
+        return self.schedule(delay_seconds, callback, entry[3])
+
+    def cancel(self, entry):
+        entry[2] = None
+
+    async def _run(self):
+        heap, loop = self._heap, self._loop
+        while True:
+            now = loop.time()
+            while heap and heap[0][0] <= now:
+                _, _, callback, payload = heapq.heappop(heap)
+                if callback is not None:
+                    callback(payload)
+            self._wake.clear()
+            timeout = heap[0][0] - loop.time() if heap else None
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+
+class WheelTimers(TimerService):
+    batched = True
+
+
+IMPLEMENTATIONS = {"timing_wheel": WheelTimers, "call_later": CallLaterTimers, "heapq": HeapqTimers}
+
+
+async def _cpu_over(seconds: float, step=None) -> float:
+    """Process CPU % of one core while the loop runs for `seconds` (calling `step()` every 10 ms)."""
+    cpu_start, wall_start = time.process_time(), time.perf_counter()
+    deadline = wall_start + seconds
+    while time.perf_counter() < deadline:
+        if step:
+            step()
+        await asyncio.sleep(0.01)
+    return 100.0 * (time.process_time() - cpu_start) / (time.perf_counter() - wall_start)
+
+
+async def _run_one(name: str, count: int, args) -> dict:
+    loop = asyncio.get_running_loop()
+    timers = IMPLEMENTATIONS[name]().start()
+    rng = random.Random(args.seed)
+    delays = [rng.uniform(5, 60) for _ in range(count)]
+    result = {}
+
+    def never(payload):
+        raise AssertionError("Timer fired during the schedule/idle phases")
+
+    start = time.perf_counter()
+    handles = [timers.schedule(delay, never) for delay in delays]
+    result["schedule_us"] = (time.perf_counter() - start) * 1e6 / count
+
+    start = time.perf_counter()
+    for i, handle in enumerate(handles):
+        handles[i] = timers.reschedule(handle, delays[i])
+    result["reset_us"] = (time.perf_counter() - start) * 1e6 / count
+
+    per_step = max(1, count // 100) # Every timer once per second in 10 ms steps
+    position = itertools.cycle(range(0, count, per_step))
+
+    def churn():
+        first = next(position)
+        for i in range(first, min(first + per_step, count)):
+            handles[i] = timers.reschedule(handles[i], delays[i])
+
+    result["churn_cpu_pct"] = await _cpu_over(args.churn_seconds, churn)
+    result["idle_cpu_pct"] = await _cpu_over(args.idle_seconds)
+    start = time.perf_counter()
+    for handle in handles:
+        timers.cancel(handle)
+    result["cancel_us"] = (time.perf_counter() - start) * 1e6 / count
+    handles.clear()
+
+    lateness = []
+
+    def fired(deadline):
+        lateness.append((loop.time() - deadline) * 1000)
+
+    def fired_batch(deadlines):
+        now = loop.time()
+        lateness.extend((now - deadline) * 1000 for deadline in deadlines)
+
+    on_fire = fired_batch if timers.batched else fired
+    base = loop.time() + 0.1 + count * 5e-6 # Arming all N must finish before the first is due
+    for i in range(count):
+        deadline = base + i / count
+        timers.schedule(deadline - loop.time(), on_fire, deadline)
+    cpu_start = time.process_time()
+    while len(lateness) < count and loop.time() < base + 5:
+        await asyncio.sleep(0.05)
+    result["expiry_cpu_us"] = (time.process_time() - cpu_start) * 1e6 / count
+    summary = summarize(lateness, (50, 99))
+    result["lateness_ms"] = {key: summary[key] for key in ("p50", "p99", "max")}
+    result["fired"] = len(lateness)
+    await timers.stop()
+    return result
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Timing wheel vs loop.call_later vs heapq at scale.")
+    parser.add_argument("--timers", type=int, nargs="+", default=[10000, 100000])
+    parser.add_argument("--implementations", nargs="+", default=list(IMPLEMENTATIONS), choices=list(IMPLEMENTATIONS))
+    parser.add_argument("--churn-seconds", type=float, default=3.0)
+    parser.add_argument("--idle-seconds", type=float, default=2.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json-out", help="Write the results as JSON.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    report = {"config": vars(args), "results": {}}
+    header = (f"{'implementation':<14} {'timers':>7} {'schedule':>9} {'reset':>7} {'cancel':>7} {'churn':>7} "
+              f"{'idle':>6} {'expiry':>7} {'late p50':>9} {'late p99':>9}")
+    print(header)
+    print(f"{'':<14} {'':>7} {'us/op':>9} {'us/op':>7} {'us/op':>7} {'%CPU':>7} {'%CPU':>6} {'us/tmr':>7} "
+          f"{'ms':>9} {'ms':>9}")
+    for count in args.timers:
+        for name in args.implementations:
+            result = asyncio.run(_run_one(name, count, args))
+            report["results"].setdefault(name, {})[str(count)] = result
+            late = result["lateness_ms"]
+            print(f"{name:<14} {count:>7} {result['schedule_us']:9.2f} {result['reset_us']:7.2f} "
+                  f"{result['cancel_us']:7.2f} {result['churn_cpu_pct']:7.1f} {result['idle_cpu_pct']:6.2f} "
+                  f"{result['expiry_cpu_us']:7.2f} {late['p50']:9.2f} {late['p99']:9.2f}")
+            if result["fired"] != count:
+                print(f"  warning: only {result['fired']} of {count} timers fired")
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+# benchmarks/tracing_overhead.py
+
+"""
+Measures the per-hop cost of the tracing interceptors (observability.tracing).
+
+Runs an in-process gRPC echo hop (client interceptor -> server interceptor ->
+handler that opens one internal span, like `dialogflow.detect_intent`) in
+three modes and reports the added latency per hop:
+
+* `off`:       tracing disabled (no interceptors, the production default)
+* `unsampled`: interceptors installed, turn not sampled (context propagation only)
+* `sampled`:   every span recorded and written by the collector
+
+The overhead per turn is the per-hop cost times `--hops-per-turn` (the final
+segment of a turn crosses ingest -> STT -> NLU -> DM -> TTS, i.e. 4 hops plus
+the root), reported as a percentage of `--turn-ms` (use the p50 of
+`eos_to_first_tts_byte` from e2e_latency.py).
+
+Example:
+    python benchmarks/tracing_overhead.py --calls 20000 --turn-ms 950
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from concurrent import futures
+
+import grpc
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))) # Repository root
+from observability import tracing
+
+from bench_stats import summarize
+
+
+def _identity(value):
+    return value
+
+
+def _run_mode(mode: str, calls: int, warmup: int, trace_dir: str) -> list:
+    tracer = None
+    if mode != "off":
+        tracer = tracing.init_tracer("bench", sample_rate=1.0 if mode == "sampled" else 1e-12, trace_dir=trace_dir)
+
+    def handle(request, context):
+        with tracing.span("work"):
+            return request
+
+    handler = grpc.method_handlers_generic_handler("bench.Echo", {
+        "Call": grpc.unary_unary_rpc_method_handler(handle, _identity, _identity),
+    })
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=4), interceptors=tracing.server_interceptors())
+    server.add_generic_rpc_handlers((handler,))
+    port = server.add_insecure_port("localhost:0")
+    server.start()
+    channel = grpc.insecure_channel(f"localhost:{port}")
+    call = tracing.intercept_channel(channel).unary_unary("/bench.Echo/Call")
+    payload = b"\x00" * 160 # One 20 ms PCMU frame
+    latencies = []
+    try:
+        for i in range(warmup + calls):
+            root = tracer.new_trace() if tracer else None
+            started = time.perf_counter_ns()
+            if root:
+                with tracer.span("root", parent=root):
+                    call(payload, timeout=5)
+            else:
+                call(payload, timeout=5)
+            if i >= warmup:
+                latencies.append((time.perf_counter_ns() - started) / 1000.0)
+    finally:
+        channel.close()
+        server.stop(0)
+        tracing.shutdown()
+    return latencies
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Per-hop overhead of the tracing interceptors.")
+    parser.add_argument("--calls", type=int, default=5000)
+    parser.add_argument("--warmup", type=int, default=500)
+    parser.add_argument("--hops-per-turn", type=int, default=5)
+    parser.add_argument("--turn-ms", type=float, default=1000.0, help="Reference per-turn latency.")
+    parser.add_argument("--json-out", help="Write the results as JSON.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    trace_dir = tempfile.mkdtemp(prefix="tracing-overhead-")
+    try:
+        results = {mode: summarize(_run_mode(mode, args.calls, args.warmup, trace_dir), percentiles=(50, 99))
+                   for mode in ("off", "unsampled", "sampled")}
+    finally:
+        shutil.rmtree(trace_dir)
+    base = results["off"]["p50"]
+    report = {"calls": args.calls, "hop_latency_us": results, "overhead": {}}
+    print(f"Hop latency (us), {args.calls} calls per mode:")
+    for mode, summary in results.items():
+        added_us = summary["p50"] - base
+        per_turn_pct = 100.0 * added_us * args.hops_per_turn / (args.turn_ms * 1000.0)
+        report["overhead"][mode] = {"added_us_per_hop_p50": added_us, "pct_of_turn": per_turn_pct}
+        print(f"  {mode:<10} p50={summary['p50']:8.1f} p99={summary['p99']:8.1f} "
+              f"added/hop={added_us:7.1f} us  per turn={per_turn_pct:.3f}% of {args.turn_ms:.0f} ms")
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+# benchmarks/tts_first_byte.py
+
+"""
+Time to the first audio byte of TTS `SynthesizeStream` against the length of
+the text, with the text synthesized whole and incrementally (split at
+sentences and clauses, segments rendered on the pipelined worker pool).
+
+Runs the TTS servicer in-process behind a real gRPC server on a free port.
+The placeholder engine renders silence, so `--render-ms-per-char` gives it
+the cost of a real engine; `--engine local` synthesizes audio with the local
+formant engine instead, spending `--render-ms-per-char` of CPU per character.
+`--encoding`/`--sample-rate` request another output format (e.g. MULAW at
+8000 for SIP); `--engine-rate` gives the local engine a fixed rate to be
+resampled from. The audio cache (memory tier only) is off unless
+`--warm`, which requests every text once before measuring.
+
+Per text length and mode it reports:
+  * first_byte_ms:  request sent -> first AudioChunk received
+  * last_byte_ms:   request sent -> the chunk with is_last received
+  * stall_ms:       how long a caller playing the chunks from the first one
+                    on, in real time, would wait for audio that has not
+                    arrived yet (0: synthesis stays ahead of playback)
+
+Example:
+    python benchmarks/tts_first_byte.py --lengths 40 100 200 400 --requests 20 --json-out tts.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent import futures
+
+import grpc
+
+from bench_stats import summarize
+
+TTS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                       "real_time_processing_engine", "text_to_speech_service")
+
+# Clauses of the kind the DM speaks, joined into texts of the requested lengths.
+CLAUSES = [
+    "I'm sorry,", "I can't fetch the actual weather for London for tomorrow right now,",
+    "but I hope it's a pleasant day!", "Hello there!", "How can I help you today?",
+    "Your appointment is confirmed for Tuesday at three,", "and a reminder will be sent the day before.",
+    "If you need anything else,", "just say so and I will connect you.",
+]
+
+
+def make_text(length: int, offset: int) -> str:
+    words = []
+    i = offset
+    while sum(len(w) + 1 for w in words) < length:
+        words.append(CLAUSES[i % len(CLAUSES)])
+        i += 1
+    return " ".join(words)
+
+
+def measure(stub, text: str, pb2, encoding: str = "LINEAR16", sample_rate_hertz: int = 0) -> dict:
+    start = time.perf_counter()
+    first = None
+    playback_at = None # When the next chunk is due to play
+    stall = 0.0
+    request = pb2.TTSRequest(text_to_synthesize=text, session_id="bench",
+                             audio_encoding=pb2.AudioEncoding.Value(encoding), sample_rate_hertz=sample_rate_hertz)
+    for chunk in stub.SynthesizeStream(request, timeout=30):
+        now = time.perf_counter()
+        if first is None:
+            first = playback_at = now
+        elif now > playback_at:
+            stall += now - playback_at
+            playback_at = now
+        playback_at += chunk.duration_ms / 1000
+    return {"first_byte_ms": (first - start) * 1000, "last_byte_ms": (time.perf_counter() - start) * 1000,
+            "stall_ms": stall * 1000}
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="TTS time to first audio byte vs text length.")
+    parser.add_argument("--lengths", type=int, nargs="+", default=[40, 100, 200, 400], help="Text lengths (chars).")
+    parser.add_argument("--requests", type=int, default=20, help="Requests per length and mode.")
+    parser.add_argument("--engine", choices=["placeholder", "local"], default="placeholder", help="TTS_ENGINE.")
+    parser.add_argument("--render-ms-per-char", type=float, default=2.0, help="Engine rendering cost.")
+    parser.add_argument("--encoding", choices=["LINEAR16", "MULAW", "ALAW"], default="LINEAR16",
+                        help="Requested audio encoding.")
+    parser.add_argument("--sample-rate", type=int, default=0, help="Requested sample rate (0: the service default).")
+    parser.add_argument("--engine-rate", type=int, default=0,
+                        help="LOCAL_ENGINE_SAMPLE_RATE_HERTZ (0: render at the requested rate).")
+    parser.add_argument("--workers", type=int, default=4, help="TTS_SYNTHESIS_WORKERS.")
+    parser.add_argument("--depth", type=int, default=2, help="TTS_PIPELINE_DEPTH.")
+    parser.add_argument("--warm", action="store_true", help="Request each text once first, with the cache on.")
+    parser.add_argument("--json-out", help="Write the results as JSON.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    os.environ["TTS_ENGINE"] = args.engine
+    os.environ["PLACEHOLDER_RENDER_MS_PER_CHAR"] = str(args.render_ms_per_char)
+    os.environ["LOCAL_ENGINE_MS_PER_CHAR"] = str(args.render_ms_per_char)
+    os.environ["LOCAL_ENGINE_SAMPLE_RATE_HERTZ"] = str(args.engine_rate)
+    os.environ["TTS_SYNTHESIS_WORKERS"] = str(args.workers)
+    os.environ["TTS_PIPELINE_DEPTH"] = str(args.depth)
+    if not args.warm:
+        os.environ["TTS_MEMORY_CACHE_BYTES"] = "0"
+    sys.path.insert(0, TTS_DIR)
+    import service
+    import tts_service_pb2
+    import tts_service_pb2_grpc
+
+    incremental_split = service.split_segments
+    modes = {"whole": lambda text: [text] if text.strip() else [], "incremental": incremental_split}
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=4))
+    tts_service_pb2_grpc.add_TextToSpeechServiceServicer_to_server(service.TextToSpeechServicer(), server)
+    port = server.add_insecure_port("127.0.0.1:0")
+    server.start()
+    stub = tts_service_pb2_grpc.TextToSpeechServiceStub(grpc.insecure_channel(f"127.0.0.1:{port}"))
+
+    report = {"config": vars(args), "results": {}}
+    print(f"{'length':>6} {'mode':<12} {'first p50':>10} {'first p95':>10} {'last p50':>9} {'stall p50':>10}")
+    try:
+        for length in args.lengths:
+            texts = [make_text(length, i) for i in range(args.requests)]
+            for mode, split in modes.items():
+                service.split_segments = split
+                if args.warm:
+                    for text in texts:
+                        measure(stub, text, tts_service_pb2, args.encoding, args.sample_rate)
+                rows = [measure(stub, text, tts_service_pb2, args.encoding, args.sample_rate) for text in texts]
+                result = {key: summarize([row[key] for row in rows]) for key in rows[0]}
+                result["mean_chars"] = sum(map(len, texts)) / len(texts)
+                report["results"].setdefault(str(length), {})[mode] = result
+                print(f"{length:>6} {mode:<12} {result['first_byte_ms']['p50']:10.1f} "
+                      f"{result['first_byte_ms']['p95']:10.1f} {result['last_byte_ms']['p50']:9.1f} "
+                      f"{result['stall_ms']['p50']:10.1f}")
+    finally:
+        service.split_segments = incremental_split
+        server.stop(0)
+    if args.json_out:
+        with open(args.json_out, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+import os
+
+# Per-session timers, run on one hierarchical timing wheel (timing_wheel.py).
+# TIMER_TICK_SECONDS is the wheel's resolution: a timer fires at most one tick
+# late and never early.
+TIMER_TICK_SECONDS = float(os.getenv("TIMER_TICK_SECONDS", "0.01"))
+# Caller silence after a bot prompt before the caller is reprompted; after
+# MAX_REPROMPTS unanswered reprompts the call is ended.
+NO_INPUT_TIMEOUT_SECONDS = float(os.getenv("NO_INPUT_TIMEOUT_SECONDS", "8"))
+MAX_REPROMPTS = int(os.getenv("MAX_REPROMPTS", "2"))
+# Silence after caller speech that ends the utterance when no final transcript arrived.
+UTTERANCE_END_TIMEOUT_SECONDS = float(os.getenv("UTTERANCE_END_TIMEOUT_SECONDS", "1.5"))
+# Hard limit on the length of a call.
+MAX_CALL_DURATION_SECONDS = float(os.getenv("MAX_CALL_DURATION_SECONDS", "3600"))
+
+# Leaf services a turn calls, in order: NLU -> DM -> TTS.
+NLU_SERVICE_ADDRESS = os.getenv("NLU_SERVICE_ADDRESS", "localhost:50053")
+DM_SERVICE_ADDRESS = os.getenv("DM_SERVICE_ADDRESS", "localhost:50054")
+TTS_SERVICE_ADDRESS = os.getenv("TTS_SERVICE_ADDRESS", "localhost:50055")
+
+# Per-turn latency budget, from the final transcript to synthesized audio. Each
+# stage's deadline is its own cap or the rest of the turn's budget, whichever
+# comes first; a turn whose budget runs out is dropped.
+TURN_BUDGET_SECONDS = float(os.getenv("TURN_BUDGET_SECONDS", "3.0"))
+NLU_STAGE_SECONDS = float(os.getenv("NLU_STAGE_SECONDS", "1.5"))
+DM_STAGE_SECONDS = float(os.getenv("DM_STAGE_SECONDS", "0.5"))
+TTS_STAGE_SECONDS = float(os.getenv("TTS_STAGE_SECONDS", "1.0"))
+# Spoken instead of the DM response when NLU or DM fails, and on no-input reprompts.
+FALLBACK_RESPONSE_TEXT = os.getenv("FALLBACK_RESPONSE_TEXT", "I'm sorry, I didn't catch that. Could you say it again?")
+REPROMPT_TEXT = os.getenv("REPROMPT_TEXT", "Are you still there?")
+VOICE_CONFIG_ID = os.getenv("VOICE_CONFIG_ID", "default_voice")
@@ -0,0 +1,386 @@
+# business_logic_layer/call_management_services/session_orchestrator_service/service.py
+
+import asyncio
+import atexit
+import itertools
+import os
+import sys
+import threading
+import time
+from concurrent import futures
+
+import grpc
+
+import session_orchestrator_pb2
+import session_orchestrator_pb2_grpc
+import nlu_service_pb2_grpc
+import dialogue_management_service_pb2_grpc
+import tts_service_pb2_grpc
+
+from config import (
+    TIMER_TICK_SECONDS,
+    NO_INPUT_TIMEOUT_SECONDS,
+    MAX_REPROMPTS,
+    UTTERANCE_END_TIMEOUT_SECONDS,
+    MAX_CALL_DURATION_SECONDS,
+    NLU_SERVICE_ADDRESS,
+    DM_SERVICE_ADDRESS,
+    TTS_SERVICE_ADDRESS,
+    REPROMPT_TEXT,
+)
+from timing_wheel import TimerService
+from turn_pipeline import BARGED_IN, SPOKEN, TurnPipeline
+
+# Shared observability package at the repository root
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "..")))
+from observability import admin, deadlines, logs, loop_monitor, metrics, tracing
+
+log = logs.get_logger("session_orchestrator")
+
+TIMERS_EXPIRED = metrics.counter(
+    "revo_orchestrator_timers_expired_total", "Per-session timers that fired, by kind.", ("kind",))
+CALLS_ENDED = metrics.counter("revo_orchestrator_calls_ended_total", "Calls ended by the orchestrator, by reason.",
+                              ("reason",))
+BARGE_INS = metrics.counter("revo_orchestrator_barge_ins_total",
+                            "Turns cancelled because the caller spoke over them, by the stage they were in.", ("stage",))
+
+# Timer kinds. NO_INPUT and REPROMPT share a session's prompt timer: the wait
+# after the first prompt is NO_INPUT, the wait after each reprompt is REPROMPT.
+NO_INPUT = "no_input"
+REPROMPT = "reprompt"
+UTTERANCE_END = "utterance_end"
+MAX_CALL_DURATION = "max_call_duration"
+
+# Events passed to on_event(session_id, event, detail).
+EVENT_REPROMPT = "reprompt"           # detail: reprompt number, from 1
+EVENT_UTTERANCE_END = "utterance_end" # detail: None
+EVENT_END_CALL = "end_call"           # detail: reason ("no_input" or "max_call_duration")
+
+
+class CallSession:
+    """Orchestrator state of one call; the timers are created once and rescheduled in place."""
+
+    __slots__ = ("session_id", "started", "reprompts", "prompt_timer", "utterance_timer", "call_timer")
+
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+        self.started = time.time()
+        self.reprompts = 0
+        self.prompt_timer = None
+        self.utterance_timer = None
+        self.call_timer = None
+
+
+class SessionOrchestrator:
+    """
+    Owns the per-session call-flow timers of every live call on one
+    TimerService (a hierarchical timing wheel driven by one asyncio task):
+
+    * no-input: the caller stays silent after a prompt -> EVENT_REPROMPT,
+      or EVENT_END_CALL after MAX_REPROMPTS unanswered reprompts.
+    * reprompt: the same wait after a reprompt was played.
+    * utterance-end: the caller stopped speaking and no final transcript
+      arrived -> EVENT_UTTERANCE_END.
+    * max-call-duration: -> EVENT_END_CALL.
+
+    Timers of one kind that expire in the same tick are handled in one batch.
+    All methods must be called on the loop running the TimerService.
+    """
+
+    def __init__(self, timers: TimerService = None, on_event=None,
+                 no_input_timeout_seconds: float = NO_INPUT_TIMEOUT_SECONDS,
+                 max_reprompts: int = MAX_REPROMPTS,
+                 utterance_end_timeout_seconds: float = UTTERANCE_END_TIMEOUT_SECONDS,
+                 max_call_duration_seconds: float = MAX_CALL_DURATION_SECONDS):
+        self.timers = TimerService(TIMER_TICK_SECONDS) if timers is None else timers
+        self.on_event = on_event # on_event(session_id, event, detail)
+        self.no_input_timeout_seconds = no_input_timeout_seconds
+        self.max_reprompts = max_reprompts
+        self.utterance_end_timeout_seconds = utterance_end_timeout_seconds
+        self.max_call_duration_seconds = max_call_duration_seconds
+        self.sessions = {}
+        self._expired = {kind: TIMERS_EXPIRED.labels(kind).inc
+                         for kind in (NO_INPUT, REPROMPT, UTTERANCE_END, MAX_CALL_DURATION)}
+
+    def __len__(self):
+        return len(self.sessions)
+
+    def start_session(self, session_id: str) -> CallSession:
+        session = self.sessions.get(session_id)
+        if session is None:
+            session = self.sessions[session_id] = CallSession(session_id)
+            session.call_timer = self.timers.schedule(self.max_call_duration_seconds, self._on_max_call_duration,
+                                                      session)
+        return session
+
+    def end_session(self, session_id: str) -> CallSession:
+        """Cancels the session's timers and forgets it."""
+        session = self.sessions.pop(session_id, None)
+        if session is not None:
+            for timer in (session.prompt_timer, session.utterance_timer, session.call_timer):
+                if timer is not None:
+                    self.timers.cancel(timer)
+        return session
+
+    def prompt_finished(self, session_id: str):
+        """The bot finished playing a prompt: starts waiting for the caller (no-input, or reprompt after one)."""
+        session = self.sessions.get(session_id)
+        if session is None:
+            return
+        callback = self._on_reprompt_timeout if session.reprompts else self._on_no_input
+        if session.prompt_timer is None or session.prompt_timer.callback != callback:
+            if session.prompt_timer is not None:
+                self.timers.cancel(session.prompt_timer)
+            session.prompt_timer = self.timers.schedule(self.no_input_timeout_seconds, callback, session)
+        else:
+            self.timers.reschedule(session.prompt_timer, self.no_input_timeout_seconds)
+
+    def caller_activity(self, session_id: str):
+        """
+        The caller is speaking (a voiced frame or an interim transcript):
+        stops the prompt timer and restarts the utterance-end timer. O(1);
+        meant to be called for every voiced frame.
+        """
+        session = self.sessions.get(session_id)
+        if session is None:
+            return
+        session.reprompts = 0
+        if session.prompt_timer is not None:
+            self.timers.cancel(session.prompt_timer)
+        if session.utterance_timer is None:
+            session.utterance_timer = self.timers.schedule(self.utterance_end_timeout_seconds,
+                                                           self._on_utterance_end, session)
+        else:
+            self.timers.reschedule(session.utterance_timer, self.utterance_end_timeout_seconds)
+
+    def utterance_finished(self, session_id: str):
+        """A final transcript arrived: the utterance-end timer is no longer needed."""
+        session = self.sessions.get(session_id)
+        if session is not None and session.utterance_timer is not None:
+            self.timers.cancel(session.utterance_timer)
+
+    def _emit(self, session: CallSession, event: str, detail=None):
+        if self.on_event is None:
+            return
+        try:
+            self.on_event(session.session_id, event, detail)
+        except Exception as e:
+            log.error("timer", "Handling %s failed: %s", event, e, session_id=session.session_id,
+                      stage="orchestrator")
+
+    def _live(self, batch: list) -> list:
+        # A timer of the batch may belong to a session ended earlier in the same tick.
+        sessions = self.sessions
+        return [session for session in batch if sessions.get(session.session_id) is session]
+
+    def _on_prompt_timeout(self, batch: list, kind: str):
+        for session in self._live(batch):
+            self._expired[kind]()
+            if session.reprompts >= self.max_reprompts:
+                log.info("lifecycle", "No input after %d reprompts; ending call", session.reprompts,
+                         session_id=session.session_id, stage="orchestrator")
+                self._end_call(session, NO_INPUT)
+            else:
+                session.reprompts += 1
+                self._emit(session, EVENT_REPROMPT, session.reprompts)
+
+    def _on_no_input(self, batch: list):
+        self._on_prompt_timeout(batch, NO_INPUT)
+
+    def _on_reprompt_timeout(self, batch: list):
+        self._on_prompt_timeout(batch, REPROMPT)
+
+    def _on_utterance_end(self, batch: list):
+        for session in self._live(batch):
+            self._expired[UTTERANCE_END]()
+            self._emit(session, EVENT_UTTERANCE_END)
+
+    def _on_max_call_duration(self, batch: list):
+        for session in self._live(batch):
+            self._expired[MAX_CALL_DURATION]()
+            log.info("lifecycle", "Call reached the %.0f s limit; ending call", self.max_call_duration_seconds,
+                     session_id=session.session_id, stage="orchestrator")
+            self._end_call(session, MAX_CALL_DURATION)
+
+    def _end_call(self, session: CallSession, reason: str):
+        CALLS_ENDED.labels(reason).inc()
+        self._emit(session, EVENT_END_CALL, reason)
+        self.end_session(session.session_id)
+
+
+class SessionOrchestratorServicer(session_orchestrator_pb2_grpc.SessionOrchestratorServiceServicer):
+    """
+    Implements the SessionOrchestratorService gRPC interface. The
+    SessionOrchestrator and the TurnPipeline run on an asyncio loop in a
+    daemon thread; the handlers hand each transcript to the loop and return
+    without waiting for the turn. A speech onset from the ingest path cancels
+    the session's turn in flight (barge-in).
+    """
+
+    def __init__(self, nlu_address: str = NLU_SERVICE_ADDRESS, dm_address: str = DM_SERVICE_ADDRESS,
+                 tts_address: str = TTS_SERVICE_ADDRESS):
+        self._turn_ids = itertools.count(1)
+        self.loop = asyncio.new_event_loop()
+        self.event_loop_thread = threading.Thread(target=self.loop.run_forever, name="orchestrator-loop", daemon=True)
+        self.event_loop_thread.start()
+        # Every session's turns and timers share this loop; one blocking callback stalls them all.
+        self.loop_monitor = loop_monitor.monitor(self.loop, "session_orchestrator")
+        asyncio.run_coroutine_threadsafe(self._start(nlu_address, dm_address, tts_address), self.loop).result(timeout=5)
+        log.info("lifecycle", "Turn pipeline: NLU at %s, DM at %s, TTS at %s", nlu_address, dm_address, tts_address)
+
+    async def _start(self, nlu_address, dm_address, tts_address):
+        # grpc.aio channels belong to the loop they are created on.
+        self.channels = [grpc.aio.insecure_channel(address) for address in (nlu_address, dm_address, tts_address)]
+        nlu_channel, dm_channel, tts_channel = self.channels
+        self.pipeline = TurnPipeline(
+            nlu_service_pb2_grpc.NLUServiceStub(nlu_channel),
+            dialogue_management_service_pb2_grpc.DialogueManagementServiceStub(dm_channel),
+            tts_service_pb2_grpc.TextToSpeechServiceStub(tts_channel),
+            on_turn_done=self._on_turn_done,
+        )
+        self.orchestrator = SessionOrchestrator(TimerService(TIMER_TICK_SECONDS).start(),
+                                                on_event=self._on_call_event)
+
+    def HandleTranscript(self, request: session_orchestrator_pb2.TranscriptEvent, context):
+        if deadlines.expired(context, "session_orchestrator", "HandleTranscript", session_id=request.session_id):
+            # A transcript this stale would start a turn the caller has stopped waiting for.
+            return session_orchestrator_pb2.TurnAck(session_id=request.session_id)
+        turn_id = next(self._turn_ids) if request.is_final else 0
+        self.loop.call_soon_threadsafe(self._handle_transcript, request, turn_id, tracing.current())
+        return session_orchestrator_pb2.TurnAck(
+            session_id=request.session_id,
+            turn_id=turn_id,
+            status_message="Turn started." if turn_id else "Caller activity recorded.",
+        )
+
+    def EndSession(self, request: session_orchestrator_pb2.EndSessionRequest, context):
+        cancelled = asyncio.run_coroutine_threadsafe(self._end_session(request.session_id), self.loop).result(
+            timeout=deadlines.remaining(context, 5))
+        log.info("lifecycle", "Session ended (%s)%s", request.reason or "unspecified",
+                 "; in-flight turn cancelled" if cancelled else "", session_id=request.session_id,
+                 stage="orchestrator")
+        return session_orchestrator_pb2.EndSessionResponse(session_id=request.session_id, cancelled_turn=cancelled)
+
+    def HandleSpeechOnset(self, request: session_orchestrator_pb2.SpeechOnsetEvent, context):
+        if deadlines.expired(context, "session_orchestrator", "HandleSpeechOnset", session_id=request.session_id):
+            return session_orchestrator_pb2.BargeInAck(session_id=request.session_id)
+        cancelled = asyncio.run_coroutine_threadsafe(
+            self._barge_in(request.session_id, request.sequence_number), self.loop).result(
+            timeout=deadlines.remaining(context, 5))
+        return session_orchestrator_pb2.BargeInAck(session_id=request.session_id, cancelled_turn=cancelled)
+
+    # The methods below run on self.loop.
+
+    async def _barge_in(self, session_id: str, sequence_number: int) -> bool:
+        """
+        The caller started speaking at AudioSegment `sequence_number`: the turn
+        answering them is stale, and its remaining RPCs are cancelled. A turn
+        answering a transcript from that segment or a later one is kept: the
+        onset is the start of the utterance the turn answers, reported late.
+        """
+        self.orchestrator.start_session(session_id)
+        self.orchestrator.caller_activity(session_id)
+        turn = self.pipeline.turns.get(session_id)
+        if turn is None:
+            return False
+        if turn.sequence_number is not None and turn.sequence_number >= sequence_number:
+            log.info("barge_in", "Speech onset at segment %d is not newer than turn %d's transcript (segment %d)",
+                     sequence_number, turn.turn_id, turn.sequence_number, session_id=session_id, stage="orchestrator")
+            return False
+        BARGE_INS.labels(turn.stage or "queued").inc()
+        log.info("barge_in", "Caller spoke over turn %d during %s; cancelling it", turn.turn_id, turn.stage,
+                 session_id=session_id, stage="orchestrator")
+        return self.pipeline.cancel(session_id, BARGED_IN)
+
+    def _handle_transcript(self, request, turn_id: int, trace_ctx):
+        session_id = request.session_id
+        self.orchestrator.start_session(session_id)
+        if not turn_id:
+            if request.transcript:
+                self.orchestrator.caller_activity(session_id)
+            return
+        self.orchestrator.caller_activity(session_id) # Stops the no-input timer if no interim came first
+        self.orchestrator.utterance_finished(session_id)
+        text = request.transcript
+        if not text or text.startswith("[STT"):
+            # Nothing usable was recognized ("[STT Timeout]", "[STT Error: ...]"): ask the caller again.
+            log.warning("turn", "No usable transcript (%r); speaking the fallback", text, session_id=session_id,
+                        stage="orchestrator")
+            self.pipeline.speak(turn_id, session_id, self.pipeline.fallback_text, trace_ctx, request.sequence_number)
+        else:
+            self.pipeline.start_turn(turn_id, session_id, text, trace_ctx, request.sequence_number)
+
+    async def _end_session(self, session_id: str) -> bool:
+        cancelled = self.pipeline.cancel(session_id)
+        self.orchestrator.end_session(session_id)
+        return cancelled
+
+    def _on_turn_done(self, turn):
+        if turn.outcome in SPOKEN:
+            self.orchestrator.prompt_finished(turn.session_id)
+
+    def _on_call_event(self, session_id: str, event: str, detail):
+        if event == EVENT_REPROMPT:
+            self.pipeline.speak(next(self._turn_ids), session_id, REPROMPT_TEXT)
+        elif event == EVENT_END_CALL:
+            self.pipeline.cancel(session_id)
+            log.info("lifecycle", "Ending call: %s", detail, session_id=session_id, stage="orchestrator")
+        elif event == EVENT_UTTERANCE_END:
+            log.info("turn", "Caller went silent without a final transcript", session_id=session_id,
+                     stage="orchestrator")
+
+    async def _stop(self):
+        for session_id in list(self.pipeline.turns):
+            self.pipeline.cancel(session_id)
+        await self.orchestrator.timers.stop()
+        for channel in self.channels:
+            await channel.close()
+
+    def cleanup(self):
+        if not self.loop.is_running():
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(self._stop(), self.loop).result(timeout=5)
+        except Exception as e:
+            log.warning("lifecycle", "Orchestrator shutdown incomplete: %s", e)
+        if self.loop_monitor:
+            self.loop_monitor.stop()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.event_loop_thread.join(timeout=5)
+
+
+def serve():
+    """
+    Starts the gRPC server for the SessionOrchestratorService.
+    """
+    logs.configure()
+    atexit.register(logs.shutdown)
+    tracing.init_tracer("session_orchestrator")
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=10),
+                         interceptors=metrics.server_interceptors("session_orchestrator") + tracing.server_interceptors())
+    servicer = SessionOrchestratorServicer()
+    session_orchestrator_pb2_grpc.add_SessionOrchestratorServiceServicer_to_server(servicer, server)
+    admin.add_to_server(server, "session_orchestrator")
+
+    port = "50056"
+    listen_addr = f'[::]:{port}'
+    server.add_insecure_port(listen_addr)
+
+    server.start()
+    metrics.start_http_server("session_orchestrator", 51056)
+    log.info("lifecycle", "SessionOrchestratorService server started, listening on port %s", port)
+
+    try:
+        while True:
+            time.sleep(86400)
+    except KeyboardInterrupt:
+        log.info("lifecycle", "SessionOrchestratorService server stopping...")
+        server.stop(0)
+        servicer.cleanup()
+        metrics.shutdown()
+        tracing.shutdown()
+        log.info("lifecycle", "SessionOrchestratorService server stopped.")
+
+
+if __name__ == '__main__':
+    serve()
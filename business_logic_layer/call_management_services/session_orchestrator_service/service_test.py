@@ -0,0 +1,99 @@
+import asyncio
+import unittest
+from unittest import mock
+
+import grpc
+
+import session_orchestrator_pb2
+from service import (EVENT_END_CALL, EVENT_REPROMPT, EVENT_UTTERANCE_END, SessionOrchestrator,
+                     SessionOrchestratorServicer)
+from timing_wheel import TimerService
+from turn_pipeline_test import FakeStubs
+
+
+def run_orchestrator(scenario, **timeouts):
+    """Runs `scenario(orchestrator)` on a fresh loop; returns the (session_id, event, detail) events."""
+    async def main():
+        events = []
+        orchestrator = SessionOrchestrator(TimerService(tick_seconds=0.005).start(),
+                                           on_event=lambda *event: events.append(event), **timeouts)
+        await scenario(orchestrator)
+        await orchestrator.timers.stop()
+        return events
+    return asyncio.run(main())
+
+
+class TestSessionOrchestrator(unittest.TestCase):
+
+    def test_reprompts_then_ends_call_on_no_input(self):
+        async def scenario(orchestrator):
+            orchestrator.start_session("call-1")
+            orchestrator.prompt_finished("call-1")
+            for _ in range(2):
+                await asyncio.sleep(0.04)
+                orchestrator.prompt_finished("call-1") # The reprompt was played
+            await asyncio.sleep(0.04)
+            self.assertNotIn("call-1", orchestrator.sessions)
+
+        events = run_orchestrator(scenario, no_input_timeout_seconds=0.02, max_reprompts=2)
+        self.assertEqual(events, [("call-1", EVENT_REPROMPT, 1), ("call-1", EVENT_REPROMPT, 2),
+                                  ("call-1", EVENT_END_CALL, "no_input")])
+
+    def test_caller_activity_stops_no_input_and_arms_utterance_end(self):
+        async def scenario(orchestrator):
+            orchestrator.start_session("call-1")
+            orchestrator.start_session("call-2")
+            orchestrator.prompt_finished("call-1")
+            for _ in range(6): # Speech keeps pushing the utterance-end timer out
+                orchestrator.caller_activity("call-1")
+                await asyncio.sleep(0.01)
+            orchestrator.caller_activity("call-2")
+            orchestrator.utterance_finished("call-2") # Final transcript arrived in time
+            await asyncio.sleep(0.06)
+
+        events = run_orchestrator(scenario, no_input_timeout_seconds=0.03, utterance_end_timeout_seconds=0.03)
+        self.assertEqual(events, [("call-1", EVENT_UTTERANCE_END, None)])
+
+    def test_max_call_duration_ends_the_call_and_cancels_its_timers(self):
+        async def scenario(orchestrator):
+            orchestrator.start_session("call-1")
+            orchestrator.prompt_finished("call-1")
+            await asyncio.sleep(0.05)
+            self.assertEqual(len(orchestrator), 0)
+            self.assertEqual(len(orchestrator.timers), 0)
+
+        events = run_orchestrator(scenario, no_input_timeout_seconds=1, max_call_duration_seconds=0.02)
+        self.assertEqual(events, [("call-1", EVENT_END_CALL, "max_call_duration")])
+
+
+class TestBargeIn(unittest.TestCase):
+
+    def setUp(self):
+        self.servicer = SessionOrchestratorServicer("localhost:1", "localhost:1", "localhost:1")
+        self.addCleanup(self.servicer.cleanup)
+        self.stubs = FakeStubs(nlu_delay=0.2) # Turns stay in flight for the test
+        pipeline = self.servicer.pipeline
+        pipeline.nlu_stub, pipeline.dm_stub, pipeline.tts_stub = self.stubs.nlu, self.stubs.dm, self.stubs.tts
+        self.context = mock.Mock(spec=grpc.ServicerContext)
+        self.context.time_remaining.return_value = None
+
+    def onset(self, sequence_number):
+        return self.servicer.HandleSpeechOnset(
+            session_orchestrator_pb2.SpeechOnsetEvent(session_id="call-1", sequence_number=sequence_number),
+            self.context).cancelled_turn
+
+    def test_only_an_onset_after_the_turns_transcript_cancels_it(self):
+        self.servicer.HandleTranscript(session_orchestrator_pb2.TranscriptEvent(
+            session_id="call-1", transcript="hi", is_final=True, sequence_number=50), self.context)
+
+        # The onset of the utterance the turn answers, reported after its final transcript
+        self.assertFalse(self.onset(10))
+        self.assertFalse(self.onset(50))
+        self.assertIn("call-1", self.servicer.pipeline.turns)
+        # The caller speaks over the answer
+        self.assertTrue(self.onset(51))
+        self.assertNotIn("call-1", self.servicer.pipeline.turns)
+
+
+if __name__ == "__main__":
+    unittest.main()
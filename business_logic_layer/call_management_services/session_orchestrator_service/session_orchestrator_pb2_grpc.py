@@ -0,0 +1,192 @@
+# Generated by the gRPC Python protocol compiler plugin. DO NOT EDIT!
+"""Client and server classes corresponding to protobuf-defined services."""
+import grpc
+import warnings
+
+import session_orchestrator_pb2 as session__orchestrator__pb2
+
+GRPC_GENERATED_VERSION = '1.72.1'
+GRPC_VERSION = grpc.__version__
+_version_not_supported = False
+
+try:
+    from grpc._utilities import first_version_is_lower
+    _version_not_supported = first_version_is_lower(GRPC_VERSION, GRPC_GENERATED_VERSION)
+except ImportError:
+    _version_not_supported = True
+
+if _version_not_supported:
+    raise RuntimeError(
+        f'The grpc package installed is at version {GRPC_VERSION},'
+        + f' but the generated code in session_orchestrator_pb2_grpc.py depends on'
+        + f' grpcio>={GRPC_GENERATED_VERSION}.'
+        + f' Please upgrade your grpc module to grpcio>={GRPC_GENERATED_VERSION}'
+        + f' or downgrade your generated code using grpcio-tools<={GRPC_VERSION}.'
+    )
+
+
+class SessionOrchestratorServiceStub(object):
+    """SessionOrchestratorService runs each caller turn (NLU -> DM -> TTS) and
+    the per-session call-flow timers.
+    """
+
+    def __init__(self, channel):
+        """Constructor.
+
+        Args:
+            channel: A grpc.Channel.
+        """
+        self.HandleTranscript = channel.unary_unary(
+                '/business_logic_layer.session_orchestrator.SessionOrchestratorService/HandleTranscript',
+                request_serializer=session__orchestrator__pb2.TranscriptEvent.SerializeToString,
+                response_deserializer=session__orchestrator__pb2.TurnAck.FromString,
+                _registered_method=True)
+        self.EndSession = channel.unary_unary(
+                '/business_logic_layer.session_orchestrator.SessionOrchestratorService/EndSession',
+                request_serializer=session__orchestrator__pb2.EndSessionRequest.SerializeToString,
+                response_deserializer=session__orchestrator__pb2.EndSessionResponse.FromString,
+                _registered_method=True)
+        self.HandleSpeechOnset = channel.unary_unary(
+                '/business_logic_layer.session_orchestrator.SessionOrchestratorService/HandleSpeechOnset',
+                request_serializer=session__orchestrator__pb2.SpeechOnsetEvent.SerializeToString,
+                response_deserializer=session__orchestrator__pb2.BargeInAck.FromString,
+                _registered_method=True)
+
+
+class SessionOrchestratorServiceServicer(object):
+    """SessionOrchestratorService runs each caller turn (NLU -> DM -> TTS) and
+    the per-session call-flow timers.
+    """
+
+    def HandleTranscript(self, request, context):
+        """Accepts a transcript and returns at once; the turn runs asynchronously.
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def EndSession(self, request, context):
+        """Cancels the session's in-flight turn and timers and forgets the session.
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def HandleSpeechOnset(self, request, context):
+        """Caller speech started: cancels the session's turn in flight (barge-in).
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+
+def add_SessionOrchestratorServiceServicer_to_server(servicer, server):
+    rpc_method_handlers = {
+            'HandleTranscript': grpc.unary_unary_rpc_method_handler(
+                    servicer.HandleTranscript,
+                    request_deserializer=session__orchestrator__pb2.TranscriptEvent.FromString,
+                    response_serializer=session__orchestrator__pb2.TurnAck.SerializeToString,
+            ),
+            'EndSession': grpc.unary_unary_rpc_method_handler(
+                    servicer.EndSession,
+                    request_deserializer=session__orchestrator__pb2.EndSessionRequest.FromString,
+                    response_serializer=session__orchestrator__pb2.EndSessionResponse.SerializeToString,
+            ),
+            'HandleSpeechOnset': grpc.unary_unary_rpc_method_handler(
+                    servicer.HandleSpeechOnset,
+                    request_deserializer=session__orchestrator__pb2.SpeechOnsetEvent.FromString,
+                    response_serializer=session__orchestrator__pb2.BargeInAck.SerializeToString,
+            ),
+    }
+    generic_handler = grpc.method_handlers_generic_handler(
+            'business_logic_layer.session_orchestrator.SessionOrchestratorService', rpc_method_handlers)
+    server.add_generic_rpc_handlers((generic_handler,))
+    server.add_registered_method_handlers('business_logic_layer.session_orchestrator.SessionOrchestratorService', rpc_method_handlers)
+
+
+ # This class is part of an EXPERIMENTAL API.
+class SessionOrchestratorService(object):
+    """SessionOrchestratorService runs each caller turn (NLU -> DM -> TTS) and
+    the per-session call-flow timers.
+    """
+
+    @staticmethod
+    def HandleTranscript(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/business_logic_layer.session_orchestrator.SessionOrchestratorService/HandleTranscript',
+            session__orchestrator__pb2.TranscriptEvent.SerializeToString,
+            session__orchestrator__pb2.TurnAck.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def EndSession(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/business_logic_layer.session_orchestrator.SessionOrchestratorService/EndSession',
+            session__orchestrator__pb2.EndSessionRequest.SerializeToString,
+            session__orchestrator__pb2.EndSessionResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def HandleSpeechOnset(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/business_logic_layer.session_orchestrator.SessionOrchestratorService/HandleSpeechOnset',
+            session__orchestrator__pb2.SpeechOnsetEvent.SerializeToString,
+            session__orchestrator__pb2.BargeInAck.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
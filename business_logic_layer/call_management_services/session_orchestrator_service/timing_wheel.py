@@ -0,0 +1,251 @@
+# business_logic_layer/call_management_services/session_orchestrator_service/timing_wheel.py
+
+"""
+Hierarchical timing wheel for the per-session timers of the orchestrator
+(no-input, utterance-end, max-call-duration, reprompt).
+
+`HierarchicalTimingWheel` is the data structure, in integer ticks:
+`levels` wheels of 2**bits_per_level slots each. Level 0 holds timers due
+within one rotation (64 ticks with the default 6 bits), level 1 within 64
+rotations, and so on; with a 10 ms tick, 4 levels cover 46 hours. A timer
+sits in the slot of its deadline at the lowest level that can hold it, and
+is moved down ("cascaded") when the level below wraps around, as in the
+classic Linux timer wheel (Varghese & Lauck, scheme 7).
+
+* schedule and cancel are O(1): a slot is a dict used as an ordered set, so
+  a timer is added or removed by one dict operation.
+* Expiry is batched per tick: advancing returns every timer of the slot at
+  once; each timer is cascaded at most `levels - 1` times in its life.
+
+`TimerService` drives a wheel from a single asyncio task. The task does not
+wake up every tick: it sleeps until the next tick with a non-empty level-0
+slot or the next level-0 wrap (where timers may cascade down), and not at
+all while the wheel is empty. Expired timers are dispatched grouped by
+callback, one `callback([payload, ...])` call per callback per tick.
+"""
+
+import asyncio
+import math
+
+
+class Timer:
+    """A scheduled timer; `deadline` is in ticks. Create through TimerService.schedule()."""
+
+    __slots__ = ("deadline", "callback", "payload", "_slot")
+
+    def __init__(self, deadline: int, callback, payload=None):
+        self.deadline = deadline
+        self.callback = callback
+        self.payload = payload
+        self._slot = None # The slot dict holding this timer while it is scheduled
+
+    @property
+    def active(self) -> bool:
+        return self._slot is not None
+
+
+class HierarchicalTimingWheel:
+
+    def __init__(self, bits_per_level: int = 6, levels: int = 4, start_tick: int = 0):
+        self.bits = bits_per_level
+        self.mask = (1 << bits_per_level) - 1
+        self.max_delta = (1 << (bits_per_level * levels)) - 1
+        self.wheels = [[{} for _ in range(1 << bits_per_level)] for _ in range(levels)]
+        self.tick = start_tick # Next tick to process
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    def add(self, timer: Timer):
+        """Schedules `timer` at timer.deadline; a deadline already passed fires at the next processed tick."""
+        deadline, tick, bits = timer.deadline, self.tick, self.bits
+        delta = deadline - tick
+        if delta <= self.mask: # Common case first: due (or overdue) within one rotation
+            slot = self.wheels[0][(deadline if delta >= 0 else tick) & self.mask]
+        else:
+            if delta > self.max_delta: # Parked at the top level and re-placed when it cascades
+                delta = self.max_delta
+                deadline = tick + delta
+            level = (delta.bit_length() - 1) // bits
+            slot = self.wheels[level][(deadline >> (bits * level)) & self.mask]
+        slot[timer] = None
+        timer._slot = slot
+        self._count += 1
+
+    def remove(self, timer: Timer) -> bool:
+        slot = timer._slot
+        if slot is None:
+            return False
+        del slot[timer]
+        timer._slot = None
+        self._count -= 1
+        return True
+
+    def _cascade(self, level: int, index: int):
+        slot = self.wheels[level][index]
+        if not slot:
+            return
+        self.wheels[level][index] = {}
+        self._count -= len(slot)
+        for timer in slot:
+            self.add(timer)
+
+    def advance(self, until_tick: int) -> list:
+        """Processes every tick up to and including `until_tick`; returns the expired timers in order."""
+        expired = []
+        mask, bits, level0 = self.mask, self.bits, self.wheels[0]
+        tick = self.tick
+        while tick <= until_tick:
+            index = tick & mask
+            if index == 0:
+                self.tick = tick # Cascaded timers are placed relative to this tick
+                for level in range(1, len(self.wheels)):
+                    level_index = (tick >> (bits * level)) & mask
+                    self._cascade(level, level_index)
+                    if level_index != 0:
+                        break
+            slot = level0[index]
+            if slot:
+                level0[index] = {}
+                self._count -= len(slot)
+                for timer in slot:
+                    timer._slot = None
+                expired.extend(slot)
+            tick += 1
+        self.tick = tick
+        return expired
+
+    def next_tick(self):
+        """
+        The next tick advance() has work at: a non-empty level-0 slot or a
+        level-0 wrap (possible cascade), whichever comes first; None when empty.
+        """
+        if not self._count:
+            return None
+        mask, level0 = self.mask, self.wheels[0]
+        tick = self.tick
+        for t in range(tick, tick + mask + 1):
+            if level0[t & mask] or (t & mask) == 0:
+                return t
+        return tick + mask + 1 # Unreachable: a rotation always contains a wrap
+
+
+class TimerService:
+    """
+    Runs a HierarchicalTimingWheel on the current asyncio loop from one task.
+    Not thread-safe: schedule, reschedule and cancel from the loop's thread
+    (use loop.call_soon_threadsafe from other threads).
+    """
+
+    def __init__(self, tick_seconds: float = 0.01, bits_per_level: int = 6, levels: int = 4, on_error=None):
+        self.tick_seconds = tick_seconds
+        self.wheel = HierarchicalTimingWheel(bits_per_level, levels)
+        self.on_error = on_error # on_error(callback, exception); exceptions are otherwise left to the loop's handler
+        self.dispatched = 0
+        self._loop = None
+        self._origin = 0.0
+        self._task = None
+        self._waiter = None
+        self._wake_tick = None
+        self._wake_handle = None
+
+    def __len__(self):
+        return len(self.wheel)
+
+    def start(self):
+        """Starts the driver task; call from a coroutine running on the loop."""
+        self._loop = asyncio.get_running_loop()
+        self._origin = self._loop.time()
+        self.wheel.tick = self._current_tick()
+        self._task = self._loop.create_task(self._run(), name="timing-wheel")
+        return self
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._wake_handle:
+            self._wake_handle.cancel()
+
+    def _current_tick(self) -> int:
+        return int((self._loop.time() - self._origin) / self.tick_seconds)
+
+    def _deadline_tick(self, delay_seconds: float) -> int:
+        # Rounded up so a timer never fires early; it fires at most one tick (plus loop lag) late.
+        return math.ceil((self._loop.time() + delay_seconds - self._origin) / self.tick_seconds)
+
+    def schedule(self, delay_seconds: float, callback, payload=None) -> Timer:
+        """Calls callback([payload, ...]) after `delay_seconds`, batched with the other timers of its tick."""
+        timer = Timer(self._deadline_tick(delay_seconds), callback, payload)
+        self.wheel.add(timer)
+        if self._waiter is not None and (self._wake_tick is None or timer.deadline < self._wake_tick):
+            self._wake_at(timer.deadline)
+        return timer
+
+    def reschedule(self, timer: Timer, delay_seconds: float) -> Timer:
+        """Moves `timer` (scheduled or already fired) to fire `delay_seconds` from now; reuses the object."""
+        self.wheel.remove(timer)
+        timer.deadline = self._deadline_tick(delay_seconds)
+        self.wheel.add(timer)
+        if self._waiter is not None and (self._wake_tick is None or timer.deadline < self._wake_tick):
+            self._wake_at(timer.deadline)
+        return timer
+
+    def cancel(self, timer: Timer) -> bool:
+        # The driver may still wake at the cancelled timer's tick; it finds nothing to do and sleeps again.
+        return self.wheel.remove(timer)
+
+    def _wake_at(self, tick: int):
+        """Moves the driver's next wake-up earlier, to `tick`."""
+        if self._wake_handle:
+            self._wake_handle.cancel()
+        self._wake_tick = tick
+        self._wake_handle = self._loop.call_at(self._origin + tick * self.tick_seconds, self._wake)
+
+    def _wake(self):
+        waiter = self._waiter
+        if waiter is not None and not waiter.done():
+            waiter.set_result(None)
+
+    async def _run(self):
+        loop = self._loop
+        while True:
+            now_tick = self._current_tick()
+            if not self.wheel:
+                self.wheel.tick = max(self.wheel.tick, now_tick) # Nothing to expire in between
+            else:
+                expired = self.wheel.advance(now_tick)
+                if expired:
+                    self._dispatch(expired)
+            self._waiter = loop.create_future()
+            self._wake_tick = self.wheel.next_tick()
+            self._wake_handle = None
+            if self._wake_tick is not None:
+                self._wake_handle = loop.call_at(self._origin + self._wake_tick * self.tick_seconds, self._wake)
+            try:
+                await self._waiter
+            finally:
+                self._waiter = None
+
+    def _dispatch(self, expired: list):
+        batches = {}
+        for timer in expired:
+            payloads = batches.get(timer.callback)
+            if payloads is None:
+                batches[timer.callback] = [timer.payload]
+            else:
+                payloads.append(timer.payload)
+        self.dispatched += len(expired)
+        for callback, payloads in batches.items():
+            try:
+                callback(payloads)
+            except Exception as e:
+                if self.on_error is None:
+                    self._loop.call_exception_handler({"message": "Timer callback failed", "exception": e})
+                else:
+                    self.on_error(callback, e)
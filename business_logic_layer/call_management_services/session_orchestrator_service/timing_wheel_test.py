@@ -0,0 +1,110 @@
+import asyncio
+import random
+import unittest
+
+from timing_wheel import HierarchicalTimingWheel, Timer, TimerService
+
+
+class TestHierarchicalTimingWheel(unittest.TestCase):
+
+    def test_timers_expire_exactly_at_their_deadline_across_levels(self):
+        wheel = HierarchicalTimingWheel(bits_per_level=3, levels=3) # 8 slots per level, 512 ticks of range
+        rng = random.Random(7)
+        deadlines = [rng.randrange(0, 600) for _ in range(500)] + [0, 7, 8, 63, 64, 511, 512, 1000]
+        for deadline in deadlines:
+            wheel.add(Timer(deadline, None, deadline))
+        self.assertEqual(len(wheel), len(deadlines))
+        fired = {}
+        for tick in range(1100):
+            for timer in wheel.advance(tick):
+                fired.setdefault(timer.payload, []).append(tick)
+        self.assertEqual(len(wheel), 0)
+        self.assertEqual(sum(len(ticks) for ticks in fired.values()), len(deadlines))
+        self.assertTrue(all(set(ticks) == {deadline} for deadline, ticks in fired.items()), fired)
+
+    def test_remove_and_overdue_timers(self):
+        wheel = HierarchicalTimingWheel(bits_per_level=3, levels=2)
+        keep, drop = Timer(100, None, "keep"), Timer(100, None, "drop")
+        wheel.add(keep)
+        wheel.add(drop)
+        self.assertTrue(wheel.remove(drop))
+        self.assertFalse(wheel.remove(drop))
+        self.assertFalse(drop.active)
+        self.assertEqual(wheel.advance(50), [])
+        wheel.add(Timer(10, None, "overdue"))
+        self.assertEqual([t.payload for t in wheel.advance(51)], ["overdue"])
+        self.assertEqual([t.payload for t in wheel.advance(100)], ["keep"])
+        self.assertFalse(keep.active)
+
+    def test_next_tick_skips_empty_slots_up_to_the_wrap(self):
+        wheel = HierarchicalTimingWheel(bits_per_level=6, levels=2, start_tick=1)
+        self.assertIsNone(wheel.next_tick())
+        wheel.add(Timer(30, None))
+        self.assertEqual(wheel.next_tick(), 30)
+        wheel.advance(30)
+        wheel.add(Timer(1000, None)) # Level 1: nothing to do before the level-0 wrap at 64
+        self.assertEqual(wheel.next_tick(), 64)
+
+
+class TestTimerService(unittest.TestCase):
+
+    def test_batches_expiry_per_callback_and_never_fires_early(self):
+        async def scenario():
+            loop = asyncio.get_running_loop()
+            service = TimerService(tick_seconds=0.005).start()
+            fired = []
+
+            def on_expiry(payloads):
+                fired.append((loop.time(), sorted(payloads)))
+
+            start = loop.time()
+            for i in range(100):
+                service.schedule(0.05, on_expiry, i)
+            cancelled = service.schedule(0.05, on_expiry, "cancelled")
+            service.cancel(cancelled)
+            moved = service.schedule(0.01, on_expiry, "moved")
+            service.reschedule(moved, 0.1)
+            await asyncio.sleep(0.2)
+            await service.stop()
+            return start, fired, len(service)
+
+        start, fired, remaining = asyncio.run(scenario())
+        self.assertEqual([payloads for _, payloads in fired], [list(range(100)), ["moved"]])
+        self.assertGreaterEqual(fired[0][0] - start, 0.05)
+        self.assertGreaterEqual(fired[1][0] - start, 0.1)
+        self.assertEqual(remaining, 0)
+
+    def test_earlier_timer_wakes_a_sleeping_driver(self):
+        async def scenario():
+            service = TimerService(tick_seconds=0.005).start()
+            fired = []
+            service.schedule(10, fired.extend, "late")
+            await asyncio.sleep(0.02) # The driver is now asleep until the late timer's level-0 wrap
+            service.schedule(0.02, fired.extend, "early")
+            await asyncio.sleep(0.1)
+            await service.stop()
+            return fired
+
+        self.assertEqual(asyncio.run(scenario()), ["early"])
+
+    def test_callback_errors_do_not_stop_the_driver(self):
+        async def scenario():
+            errors = []
+            service = TimerService(tick_seconds=0.005, on_error=lambda callback, e: errors.append(str(e))).start()
+            fired = []
+
+            def fail(payloads):
+                raise ValueError("boom")
+
+            service.schedule(0.01, fail)
+            service.schedule(0.01, fired.extend, 1)
+            service.schedule(0.03, fired.extend, 2)
+            await asyncio.sleep(0.08)
+            await service.stop()
+            return errors, fired
+
+        self.assertEqual(asyncio.run(scenario()), (["boom"], [1, 2]))
+
+
+if __name__ == "__main__":
+    unittest.main()
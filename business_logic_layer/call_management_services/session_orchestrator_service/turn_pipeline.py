@@ -0,0 +1,245 @@
+# business_logic_layer/call_management_services/session_orchestrator_service/turn_pipeline.py
+
+"""
+The caller-turn pipeline of the orchestrator: final transcript -> NLU ->
+DM -> TTS, as one asyncio task per turn on the orchestrator's loop.
+
+* Budget: a turn gets TURN_BUDGET_SECONDS from its final transcript. Each
+  stage's RPC deadline is its own cap or what is left of the turn's budget,
+  whichever is sooner; a turn with no budget left for a stage is dropped
+  ("expired") instead of being answered late.
+* Fallbacks: when NLU or DM fails, the fallback text is spoken instead of
+  the DM response; when TTS fails, the turn has failed.
+* Speech: TTS is called with SynthesizeStream, which sends the audio as it
+  is rendered; the TTS stage lasts until the stream's last chunk.
+* Cancellation: a session has at most one turn in flight. A new turn of the
+  session (the caller spoke again) or `cancel()` (end of session, or
+  barge-in: the caller started speaking over the turn) cancels the task,
+  which cancels the RPC in flight (grpc.aio) and skips the stages not yet
+  started, so no NLU, DM or TTS work is spent on an answer nobody hears.
+
+The stages of one turn depend on each other and run in order; turns of
+different sessions run concurrently on the one loop, without a thread each.
+"""
+
+import asyncio
+import os
+import sys
+import time
+
+import grpc
+
+import nlu_service_pb2
+import dialogue_management_service_pb2
+import tts_service_pb2
+
+from config import (
+    TURN_BUDGET_SECONDS,
+    NLU_STAGE_SECONDS,
+    DM_STAGE_SECONDS,
+    TTS_STAGE_SECONDS,
+    FALLBACK_RESPONSE_TEXT,
+    VOICE_CONFIG_ID,
+)
+
+# Shared observability package at the repository root
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "..")))
+from observability import logs, metrics, tracing
+
+log = logs.get_logger("session_orchestrator")
+
+STAGE_SECONDS = metrics.histogram(
+    "revo_orchestrator_stage_seconds", "Turn stage RPC latency, including failed and cancelled calls.", ("stage",))
+TURN_SECONDS = metrics.histogram(
+    "revo_orchestrator_turn_seconds", "Final transcript to the end of the turn, by outcome.", ("outcome",))
+TURNS = metrics.counter("revo_orchestrator_turns_total", "Caller turns by outcome.", ("outcome",))
+ACTIVE_TURNS = metrics.gauge("revo_orchestrator_active_turns", "Turns in flight.")
+
+NLU = "nlu"
+DM = "dm"
+TTS = "tts"
+
+# Turn outcomes.
+COMPLETED = "completed"   # The DM response was synthesized
+FALLBACK = "fallback"     # NLU or DM failed; the fallback text was synthesized
+FAILED = "failed"         # TTS failed
+EXPIRED = "expired"       # The turn's budget ran out before a stage could start
+CANCELLED = "cancelled"   # Superseded by a newer turn or end of session
+BARGED_IN = "barged_in"   # The caller started speaking over the turn
+
+SPOKEN = (COMPLETED, FALLBACK) # Outcomes after which the caller heard a prompt
+
+
+class Turn:
+    """One caller turn in flight; `outcome` is set when it ends."""
+
+    __slots__ = ("turn_id", "session_id", "text", "trace_ctx", "started", "deadline", "sequence_number", "task",
+                 "stage", "outcome")
+
+    def __init__(self, turn_id: int, session_id: str, text: str, trace_ctx, started: float, deadline: float,
+                 sequence_number: int = None):
+        self.turn_id = turn_id
+        self.session_id = session_id
+        self.text = text
+        self.trace_ctx = trace_ctx
+        self.started = started
+        self.deadline = deadline # loop.time() by which the turn must be done
+        self.sequence_number = sequence_number # AudioSegment of the transcript answered; None for a reprompt
+        self.task = None
+        self.stage = None # Stage running now
+        self.outcome = None
+
+
+class _StageFailed(Exception):
+    pass
+
+
+class _BudgetExhausted(Exception):
+    pass
+
+
+class TurnPipeline:
+    """
+    Runs turns on the current loop against grpc.aio stubs of the leaf
+    services. `on_turn_done(turn)` is called on the loop when a turn ends,
+    whatever its outcome. All methods must be called on the loop.
+    """
+
+    def __init__(self, nlu_stub, dm_stub, tts_stub, on_turn_done=None,
+                 budget_seconds: float = TURN_BUDGET_SECONDS,
+                 stage_seconds: dict = None,
+                 fallback_text: str = FALLBACK_RESPONSE_TEXT,
+                 voice_config_id: str = VOICE_CONFIG_ID):
+        self.nlu_stub = nlu_stub
+        self.dm_stub = dm_stub
+        self.tts_stub = tts_stub
+        self.on_turn_done = on_turn_done
+        self.budget_seconds = budget_seconds
+        self.stage_seconds = {NLU: NLU_STAGE_SECONDS, DM: DM_STAGE_SECONDS, TTS: TTS_STAGE_SECONDS}
+        self.stage_seconds.update(stage_seconds or {})
+        self.fallback_text = fallback_text
+        self.voice_config_id = voice_config_id
+        self.turns = {} # {session_id: Turn in flight}
+        self._stage_seconds = {stage: STAGE_SECONDS.labels(stage) for stage in (NLU, DM, TTS)}
+        ACTIVE_TURNS.set_function(lambda: len(self.turns))
+
+    def __len__(self):
+        return len(self.turns)
+
+    def start_turn(self, turn_id: int, session_id: str, text: str, trace_ctx=None, sequence_number: int = None) -> Turn:
+        """
+        Starts NLU -> DM -> TTS for `text`, cancelling the session's turn in
+        flight. `sequence_number` is that of the AudioSegment the transcript
+        came from.
+        """
+        return self._start(turn_id, session_id, text, trace_ctx, self._run_turn, sequence_number)
+
+    def speak(self, turn_id: int, session_id: str, text: str, trace_ctx=None, sequence_number: int = None) -> Turn:
+        """Starts a turn that only synthesizes `text` (a reprompt), cancelling the session's turn in flight."""
+        return self._start(turn_id, session_id, text, trace_ctx, self._run_prompt, sequence_number)
+
+    def cancel(self, session_id: str, outcome: str = CANCELLED) -> bool:
+        """Cancels the session's turn in flight with `outcome`; returns whether there was one."""
+        turn = self.turns.pop(session_id, None)
+        if turn is None:
+            return False
+        turn.outcome = outcome
+        turn.task.cancel()
+        return True
+
+    def _start(self, turn_id, session_id, text, trace_ctx, run, sequence_number) -> Turn:
+        if self.cancel(session_id):
+            log.info("turn", "Turn superseded by turn %d", turn_id, session_id=session_id, stage="orchestrator")
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+        turn = Turn(turn_id, session_id, text, trace_ctx, now, now + self.budget_seconds, sequence_number)
+        turn.task = loop.create_task(self._run(turn, run), name=f"turn-{session_id}-{turn_id}")
+        self.turns[session_id] = turn
+        return turn
+
+    async def _run(self, turn: Turn, run):
+        try:
+            turn.outcome = await run(turn)
+        except asyncio.CancelledError:
+            turn.outcome = turn.outcome or CANCELLED
+            raise
+        except _BudgetExhausted:
+            turn.outcome = EXPIRED
+        except _StageFailed:
+            turn.outcome = FAILED
+        except Exception as e:
+            log.error("turn", "Turn %d failed: %s", turn.turn_id, e, session_id=turn.session_id, stage="orchestrator")
+            turn.outcome = FAILED
+        finally:
+            if self.turns.get(turn.session_id) is turn:
+                del self.turns[turn.session_id]
+            elapsed = asyncio.get_running_loop().time() - turn.started
+            TURNS.labels(turn.outcome).inc()
+            TURN_SECONDS.labels(turn.outcome).observe(elapsed)
+            log.info("turn", "Turn %d %s after %.0f ms (stage: %s)", turn.turn_id, turn.outcome, elapsed * 1000,
+                     turn.stage, session_id=turn.session_id, stage="orchestrator")
+            if self.on_turn_done is not None:
+                try:
+                    self.on_turn_done(turn)
+                except Exception as e:
+                    log.error("turn", "on_turn_done failed: %s", e, session_id=turn.session_id, stage="orchestrator")
+
+    async def _run_turn(self, turn: Turn) -> str:
+        outcome = COMPLETED
+        try:
+            nlu_result = await self._call(turn, NLU, self.nlu_stub.ProcessText,
+                                          nlu_service_pb2.NLURequest(text=turn.text, session_id=turn.session_id))
+            dm_response = await self._call(turn, DM, self.dm_stub.ManageTurn,
+                                           dialogue_management_service_pb2.DialogueRequest(
+                                               session_id=turn.session_id, nlu_result=nlu_result))
+            text = dm_response.text_response
+        except _StageFailed:
+            outcome = FALLBACK
+            text = self.fallback_text
+        await self._synthesize(turn, text)
+        return outcome
+
+    async def _run_prompt(self, turn: Turn) -> str:
+        await self._synthesize(turn, turn.text)
+        return COMPLETED
+
+    async def _synthesize(self, turn: Turn, text: str):
+        await self._call(turn, TTS, self._receive_speech, tts_service_pb2.TTSRequest(
+            text_to_synthesize=text, session_id=turn.session_id, voice_config_id=self.voice_config_id))
+
+    async def _receive_speech(self, request, timeout=None, metadata=None) -> int:
+        """Reads one SynthesizeStream to its last chunk; returns the number of chunks."""
+        call = self.tts_stub.SynthesizeStream(request, timeout=timeout, metadata=metadata)
+        chunks = 0
+        try:
+            async for _ in call:
+                chunks += 1
+        finally:
+            call.cancel() # No-op once the stream has ended; stops synthesis when the turn is cancelled
+        return chunks
+
+    async def _call(self, turn: Turn, stage: str, method, request):
+        """Calls one stage within its deadline; raises _StageFailed or _BudgetExhausted."""
+        loop = asyncio.get_running_loop()
+        timeout = min(self.stage_seconds[stage], turn.deadline - loop.time())
+        if timeout <= 0:
+            log.warning("turn", "No budget left for %s", stage, session_id=turn.session_id, stage="orchestrator")
+            raise _BudgetExhausted(stage)
+        turn.stage = stage
+        metadata = ((tracing.TRACEPARENT_KEY, tracing.format_traceparent(turn.trace_ctx)),) if turn.trace_ctx else None
+        start, start_ns = loop.time(), time.time_ns()
+        error = ""
+        try:
+            return await method(request, timeout=timeout, metadata=metadata)
+        except grpc.RpcError as e:
+            error = e.code().name if isinstance(e, grpc.aio.AioRpcError) else type(e).__name__
+            log.error("rpc", "%s stage failed: %s", stage, logs.describe_rpc_error(e), session_id=turn.session_id,
+                      stage="orchestrator")
+            raise _StageFailed(stage) from e
+        except asyncio.CancelledError:
+            error = "Cancelled"
+            raise
+        finally:
+            self._stage_seconds[stage].observe(loop.time() - start)
+            tracing.record_span(f"call {stage}", start_ns, time.time_ns(), turn.trace_ctx,
+                                attrs={"turn_id": turn.turn_id}, error=error)
@@ -0,0 +1,175 @@
+import asyncio
+import unittest
+
+import grpc
+
+import dialogue_management_service_pb2
+import nlu_service_pb2
+import tts_service_pb2
+from turn_pipeline import BARGED_IN, CANCELLED, COMPLETED, EXPIRED, FALLBACK, TurnPipeline
+
+
+class FakeStage:
+    """An async stub method: records (request, timeout), waits `delay` seconds, then returns or raises."""
+
+    def __init__(self, response, delay=0.0, error=None):
+        self.response = response
+        self.delay = delay
+        self.error = error
+        self.calls = []
+
+    async def __call__(self, request, timeout=None, metadata=None):
+        self.calls.append((request, timeout))
+        await asyncio.sleep(self.delay)
+        if self.error:
+            raise grpc.aio.AioRpcError(self.error, grpc.aio.Metadata(), grpc.aio.Metadata(), "stage failed")
+        return self.response
+
+
+class FakeStream:
+    """An async unary-stream stub method: records (request, timeout); each call yields `chunks` after `delay` seconds."""
+
+    def __init__(self, chunks, delay=0.0):
+        self.chunks = chunks
+        self.delay = delay
+        self.calls = []
+        self.cancelled = 0
+
+    def __call__(self, request, timeout=None, metadata=None):
+        self.calls.append((request, timeout))
+        stage = self
+
+        class Call:
+            def __init__(self):
+                self.done = False
+
+            async def __aiter__(self):
+                await asyncio.sleep(stage.delay)
+                for chunk in stage.chunks:
+                    yield chunk
+                self.done = True
+
+            def cancel(self):
+                if not self.done:
+                    stage.cancelled += 1
+                return not self.done
+
+        return Call()
+
+
+class FakeStubs:
+    def __init__(self, nlu_delay=0.0, dm_delay=0.0, nlu_error=None, tts_delay=0.0):
+        self.nlu = type("NLU", (), {})()
+        self.nlu.ProcessText = FakeStage(nlu_service_pb2.NLUResponse(intent="greeting"), nlu_delay, nlu_error)
+        self.dm = type("DM", (), {})()
+        self.dm.ManageTurn = FakeStage(dialogue_management_service_pb2.DialogueResponse(text_response="Hello!"),
+                                       dm_delay)
+        self.tts = type("TTS", (), {})()
+        self.tts.SynthesizeStream = FakeStream([tts_service_pb2.AudioChunk(sequence_number=0),
+                                                tts_service_pb2.AudioChunk(sequence_number=1, is_last=True)],
+                                               tts_delay)
+
+
+def run_pipeline(stubs, scenario, **options):
+    """Runs `scenario(pipeline)` on a fresh loop; returns {turn_id: outcome} of the turns that ended."""
+    async def main():
+        outcomes = {}
+        pipeline = TurnPipeline(stubs.nlu, stubs.dm, stubs.tts,
+                                on_turn_done=lambda turn: outcomes.__setitem__(turn.turn_id, turn.outcome), **options)
+        await scenario(pipeline)
+        return outcomes
+    return asyncio.run(main())
+
+
+class TestTurnPipeline(unittest.TestCase):
+
+    def test_turn_runs_nlu_dm_tts_within_the_stage_caps(self):
+        stubs = FakeStubs()
+
+        async def scenario(pipeline):
+            await pipeline.start_turn(1, "call-1", "hi there").task
+
+        outcomes = run_pipeline(stubs, scenario, budget_seconds=2.0,
+                                stage_seconds={"nlu": 0.5, "dm": 0.2, "tts": 1.0})
+        self.assertEqual(outcomes, {1: COMPLETED})
+        (nlu_request, nlu_timeout), = stubs.nlu.ProcessText.calls
+        self.assertEqual((nlu_request.text, nlu_request.session_id), ("hi there", "call-1"))
+        self.assertEqual(nlu_timeout, 0.5)
+        (dm_request, dm_timeout), = stubs.dm.ManageTurn.calls
+        self.assertEqual(dm_request.nlu_result.intent, "greeting")
+        self.assertEqual(dm_timeout, 0.2)
+        (tts_request, tts_timeout), = stubs.tts.SynthesizeStream.calls
+        self.assertEqual(tts_request.text_to_synthesize, "Hello!")
+        self.assertLessEqual(tts_timeout, 1.0)
+        self.assertEqual(stubs.tts.SynthesizeStream.cancelled, 0) # Read to its last chunk
+
+    def test_nlu_failure_speaks_the_fallback(self):
+        stubs = FakeStubs(nlu_error=grpc.StatusCode.UNAVAILABLE)
+
+        async def scenario(pipeline):
+            with self.assertLogs("revo.session_orchestrator", level="ERROR"):
+                await pipeline.start_turn(1, "call-1", "hi").task
+
+        outcomes = run_pipeline(stubs, scenario, fallback_text="Say again?")
+        self.assertEqual(outcomes, {1: FALLBACK})
+        self.assertEqual(stubs.dm.ManageTurn.calls, [])
+        self.assertEqual(stubs.tts.SynthesizeStream.calls[0][0].text_to_synthesize, "Say again?")
+
+    def test_new_turn_cancels_the_turn_in_flight(self):
+        stubs = FakeStubs(dm_delay=0.05)
+
+        async def scenario(pipeline):
+            first = pipeline.start_turn(1, "call-1", "first")
+            await asyncio.sleep(0.01) # First turn is waiting for DM
+            second = pipeline.start_turn(2, "call-1", "second")
+            await asyncio.gather(first.task, second.task, return_exceptions=True)
+            self.assertEqual(len(pipeline), 0)
+
+        outcomes = run_pipeline(stubs, scenario)
+        self.assertEqual(outcomes, {1: CANCELLED, 2: COMPLETED})
+        self.assertEqual(len(stubs.tts.SynthesizeStream.calls), 1) # Only the second turn was spoken
+
+    def test_barge_in_cancels_the_synthesis_in_flight(self):
+        stubs = FakeStubs(tts_delay=0.05)
+
+        async def scenario(pipeline):
+            turn = pipeline.start_turn(1, "call-1", "hi")
+            await asyncio.sleep(0.01) # Waiting for TTS
+            self.assertEqual(turn.stage, "tts")
+            self.assertTrue(pipeline.cancel("call-1", BARGED_IN))
+            await asyncio.gather(turn.task, return_exceptions=True)
+            self.assertTrue(turn.task.cancelled())
+
+        outcomes = run_pipeline(stubs, scenario)
+        self.assertEqual(outcomes, {1: BARGED_IN})
+        self.assertEqual(stubs.tts.SynthesizeStream.cancelled, 1) # The stream was cut off, not read to the end
+
+    def test_barge_in_during_nlu_skips_dm_and_tts(self):
+        stubs = FakeStubs(nlu_delay=0.05)
+
+        async def scenario(pipeline):
+            turn = pipeline.start_turn(1, "call-1", "hi")
+            await asyncio.sleep(0.01)
+            pipeline.cancel("call-1", BARGED_IN)
+            await asyncio.gather(turn.task, return_exceptions=True)
+
+        outcomes = run_pipeline(stubs, scenario)
+        self.assertEqual(outcomes, {1: BARGED_IN})
+        self.assertEqual(stubs.dm.ManageTurn.calls, [])
+        self.assertEqual(stubs.tts.SynthesizeStream.calls, [])
+
+    def test_turn_with_no_budget_left_is_dropped(self):
+        stubs = FakeStubs(nlu_delay=0.06) # NLU overruns the turn's whole budget
+
+        async def scenario(pipeline):
+            await pipeline.start_turn(1, "call-1", "hi").task
+
+        outcomes = run_pipeline(stubs, scenario, budget_seconds=0.05, stage_seconds={"nlu": 1.0})
+        self.assertEqual(outcomes, {1: EXPIRED})
+        self.assertLessEqual(stubs.nlu.ProcessText.calls[0][1], 0.05) # NLU's deadline was the turn's budget
+        self.assertEqual(stubs.dm.ManageTurn.calls, [])
+        self.assertEqual(stubs.tts.SynthesizeStream.calls, [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,219 @@
+# observability/admin.py
+
+"""
+Admin gRPC service mounted on the port of every Python service.
+
+    admin.add_to_server(server, "nlu")
+    admin.add_to_server(server, "speech_to_text", sessions=servicer.sessions)
+
+* **Profile:** samples the stacks of all threads with `sys._current_frames()`
+  at `sample_rate_hz` for `duration_seconds` (wall clock, so threads blocked
+  in I/O or on locks show up too) and returns them aggregated as collapsed
+  stacks ("thread;outer frame;...;inner frame" -> samples), the input format
+  of flame graph tools. With `memory_top_n`, tracemalloc runs for the same
+  window and the largest allocation sites still alive at its end are
+  returned as well.
+* **ListSessions:** pages through the service's `sessions.SessionRegistry`
+  (bytes and frames in, queue depth, age, idle time, state, turns and turn
+  latency percentiles per session), filtered and ordered on request, e.g.
+  longest idle first to find leaked sessions.
+
+Nothing runs until an RPC asks for it: the sampler runs in the RPC's own
+handler thread and tracemalloc is stopped again afterwards, so the idle cost
+is zero. One profile runs at a time.
+
+`python -m observability.admin_cli` is the client.
+"""
+
+import collections
+import os
+import re
+import sys
+import threading
+import time
+import tracemalloc
+
+import grpc
+
+from . import admin_pb2, admin_pb2_grpc, config, logs, sessions as sessions_module
+
+log = logs.get_logger("admin")
+
+# Pool workers ("ThreadPoolExecutor-0_7") are folded into one flame graph root per pool.
+_THREAD_SUFFIX = re.compile(r"_\d+$")
+
+
+class StackSampler:
+    """Wall-clock stack sampler; call sample() once per tick from the sampling thread."""
+
+    def __init__(self, line_numbers: bool = False):
+        self.line_numbers = line_numbers
+        self.counts = collections.Counter() # collapsed stack -> samples
+        self.samples = 0
+        self._labels = {} # code object (or (code, line)) -> frame label
+        self._thread_names = {}
+
+    def _label(self, frame) -> str:
+        code = frame.f_code
+        key = (code, frame.f_lineno) if self.line_numbers else code
+        label = self._labels.get(key)
+        if label is None:
+            location = os.path.basename(code.co_filename)
+            if self.line_numbers:
+                location += f":{frame.f_lineno}"
+            label = self._labels[key] = f"{getattr(code, 'co_qualname', code.co_name)} ({location})".replace(";", ":")
+        return label
+
+    def _thread_name(self, thread_id: int) -> str:
+        name = self._thread_names.get(thread_id)
+        if name is None:
+            self._thread_names = {t.ident: _THREAD_SUFFIX.sub("", t.name) for t in threading.enumerate()}
+            name = self._thread_names.setdefault(thread_id, f"thread-{thread_id}")
+        return name
+
+    def sample(self, skip_thread_id: int = None):
+        for thread_id, frame in sys._current_frames().items():
+            if thread_id == skip_thread_id:
+                continue
+            stack = []
+            while frame is not None:
+                stack.append(self._label(frame))
+                frame = frame.f_back
+            stack.append(self._thread_name(thread_id))
+            stack.reverse()
+            self.counts[";".join(stack)] += 1
+        self.samples += 1
+
+    def run(self, duration_seconds: float, sample_rate_hz: float) -> float:
+        """Samples every other thread until `duration_seconds` have passed; returns the time taken."""
+        me = threading.get_ident()
+        interval = 1.0 / sample_rate_hz
+        start = time.perf_counter()
+        deadline = start + duration_seconds
+        next_tick = start
+        while True:
+            self.sample(me)
+            next_tick += interval
+            now = time.perf_counter()
+            if next_tick >= deadline:
+                break
+            if next_tick > now:
+                time.sleep(next_tick - now)
+            else:
+                next_tick = now # Fell behind; do not burst to catch up
+        return time.perf_counter() - start
+
+
+def memory_top(snapshot: tracemalloc.Snapshot, top_n: int) -> list:
+    """The `top_n` largest allocation sites of a snapshot, excluding tracemalloc's and the sampler's own."""
+    snapshot = snapshot.filter_traces((tracemalloc.Filter(False, tracemalloc.__file__),
+                                       tracemalloc.Filter(False, __file__)))
+    return [
+        admin_pb2.MemoryStat(location=f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}",
+                             size_bytes=stat.size, count=stat.count)
+        for stat in snapshot.statistics("lineno")[:top_n]
+    ]
+
+
+_SESSION_ORDER = {
+    admin_pb2.ListSessionsRequest.IDLE: (lambda s: s.last_activity, False),
+    admin_pb2.ListSessionsRequest.BYTES_IN: (lambda s: s.bytes_in, True),
+    admin_pb2.ListSessionsRequest.AGE: (lambda s: s.created, False),
+    admin_pb2.ListSessionsRequest.SESSION_ID: (lambda s: s.session_id, False),
+}
+
+
+def session_info(stats: sessions_module.SessionStats, now: float, queue_depth: int) -> admin_pb2.SessionInfo:
+    p50, p90, p99 = stats.latency_percentiles((50, 90, 99))
+    return admin_pb2.SessionInfo(
+        session_id=stats.session_id, state=stats.state, age_seconds=now - stats.created,
+        idle_seconds=now - stats.last_activity, last_activity_unix=stats.last_activity,
+        bytes_in=stats.bytes_in, frames_in=stats.frames_in, queue_depth=queue_depth, turns=stats.turns,
+        latency_p50_seconds=p50, latency_p90_seconds=p90, latency_p99_seconds=p99,
+    )
+
+
+class AdminServicer(admin_pb2_grpc.AdminServicer):
+
+    def __init__(self, service: str, sessions: sessions_module.SessionRegistry = None):
+        self.service = service
+        self.sessions = sessions
+        self._profile_lock = threading.Lock()
+
+    def Profile(self, request, context):
+        duration = min(request.duration_seconds or config.ADMIN_PROFILE_DEFAULT_SECONDS,
+                       config.ADMIN_PROFILE_MAX_SECONDS)
+        sample_rate_hz = min(request.sample_rate_hz or config.ADMIN_PROFILE_SAMPLE_HZ, 1000.0)
+        if duration <= 0 or sample_rate_hz <= 0:
+            context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
+            context.set_details("duration_seconds and sample_rate_hz must be positive")
+            return admin_pb2.ProfileResponse(service=self.service)
+        if not self._profile_lock.acquire(blocking=False):
+            context.set_code(grpc.StatusCode.RESOURCE_EXHAUSTED)
+            context.set_details("A profile is already running")
+            return admin_pb2.ProfileResponse(service=self.service)
+        try:
+            log.info("admin", "Profiling %s for %.1f s at %.0f Hz (memory top %d)", self.service, duration,
+                     sample_rate_hz, request.memory_top_n)
+            started_tracemalloc = request.memory_top_n > 0 and not tracemalloc.is_tracing()
+            if started_tracemalloc:
+                tracemalloc.start()
+            try:
+                sampler = StackSampler(request.line_numbers)
+                elapsed = sampler.run(duration, sample_rate_hz)
+                response = admin_pb2.ProfileResponse(service=self.service, samples=sampler.samples,
+                                                     duration_seconds=elapsed)
+                response.stacks.extend(admin_pb2.StackCount(stack=stack, count=count)
+                                       for stack, count in sampler.counts.most_common())
+                if request.memory_top_n > 0:
+                    response.memory_traced_bytes = tracemalloc.get_traced_memory()[0]
+                    response.memory.extend(memory_top(tracemalloc.take_snapshot(), request.memory_top_n))
+            finally:
+                if started_tracemalloc:
+                    tracemalloc.stop()
+            return response
+        finally:
+            self._profile_lock.release()
+
+    def ListSessions(self, request, context):
+        if self.sessions is None:
+            context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+            context.set_details(f"{self.service} keeps no per-session state")
+            return admin_pb2.ListSessionsResponse(service=self.service)
+        try:
+            offset = int(request.page_token or 0)
+        except ValueError:
+            offset = -1
+        if offset < 0:
+            context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
+            context.set_details(f"Invalid page_token {request.page_token!r}")
+            return admin_pb2.ListSessionsResponse(service=self.service)
+        page_size = min(request.page_size or 100, 1000)
+        now = time.time()
+        matching = [
+            stats for stats in self.sessions.snapshot()
+            if stats.session_id.startswith(request.session_id_prefix)
+            and (not request.state or stats.state == request.state)
+            and now - stats.last_activity >= request.min_idle_seconds
+        ]
+        key, reverse = _SESSION_ORDER.get(request.order_by, _SESSION_ORDER[admin_pb2.ListSessionsRequest.IDLE])
+        matching.sort(key=key, reverse=reverse)
+        page = matching[offset:offset + page_size]
+        response = admin_pb2.ListSessionsResponse(service=self.service, total_size=len(matching))
+        response.sessions.extend(session_info(stats, now, self.sessions.queue_depth_of(stats.session_id))
+                                 for stats in page)
+        if offset + page_size < len(matching):
+            response.next_page_token = str(offset + page_size)
+        return response
+
+
+def add_to_server(server, service: str, sessions: sessions_module.SessionRegistry = None) -> AdminServicer:
+    """
+    Mounts the admin service on `server`; `sessions` is the registry
+    ListSessions pages through. Returns None when ADMIN_ENABLED is off.
+    """
+    if not config.ADMIN_ENABLED:
+        return None
+    servicer = AdminServicer(service, sessions)
+    admin_pb2_grpc.add_AdminServicer_to_server(servicer, server)
+    return servicer
@@ -0,0 +1,119 @@
+# observability/admin_cli.py
+
+"""
+Client for the admin service (observability.admin) every Python service
+serves on its gRPC port.
+
+    python -m observability.admin_cli localhost:50052 profile --seconds 15 --out stt.folded
+    flamegraph.pl stt.folded > stt.svg # or load stt.folded into speedscope
+    python -m observability.admin_cli localhost:50052 sessions --min-idle 60
+
+`profile` writes the collapsed stacks ("frame;frame;... count" lines) to
+--out (stdout by default) and prints a summary, the hottest innermost frames
+and, with --memory-top, the largest allocation sites to stderr. `sessions`
+prints one line per live session (all pages, or `--limit` sessions).
+"""
+
+import argparse
+import collections
+import sys
+
+import grpc
+
+from . import admin_pb2, admin_pb2_grpc, logs
+
+
+def collapsed_lines(response: admin_pb2.ProfileResponse) -> list:
+    return [f"{s.stack} {s.count}" for s in response.stacks]
+
+
+def hottest_frames(response: admin_pb2.ProfileResponse, top: int) -> list:
+    """[(innermost frame, samples)] summed over all stacks, most sampled first."""
+    leaves = collections.Counter()
+    for s in response.stacks:
+        leaves[s.stack.rsplit(";", 1)[-1]] += s.count
+    return leaves.most_common(top)
+
+
+def profile(stub, args):
+    request = admin_pb2.ProfileRequest(duration_seconds=args.seconds, sample_rate_hz=args.hz,
+                                       memory_top_n=args.memory_top, line_numbers=args.line_numbers)
+    response = stub.Profile(request, timeout=args.seconds + 30)
+    lines = collapsed_lines(response)
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+    else:
+        print("\n".join(lines))
+    err = sys.stderr
+    print(f"{response.service}: {response.samples} samples in {response.duration_seconds:.1f} s, "
+          f"{len(response.stacks)} distinct stacks", file=err)
+    total = sum(s.count for s in response.stacks) or 1
+    print("Hottest innermost frames (share of thread samples):", file=err)
+    for frame, count in hottest_frames(response, args.top):
+        print(f"  {100.0 * count / total:5.1f}%  {frame}", file=err)
+    if response.memory:
+        print(f"Largest allocation sites ({response.memory_traced_bytes / 1024:.0f} KiB traced):", file=err)
+        for m in response.memory:
+            print(f"  {m.size_bytes / 1024:10.1f} KiB {m.count:8d} blocks  {m.location}", file=err)
+
+
+def list_sessions(stub, args):
+    request = admin_pb2.ListSessionsRequest(
+        page_size=min(args.limit, 1000) if args.limit else 1000, session_id_prefix=args.prefix, state=args.state,
+        min_idle_seconds=args.min_idle, order_by=admin_pb2.ListSessionsRequest.Order.Value(args.order.upper()))
+    response = stub.ListSessions(request, timeout=10)
+    shown = 0
+    print(f"{'session_id':<36} {'state':<10} {'age_s':>8} {'idle_s':>8} {'frames':>8} {'KiB_in':>9} "
+          f"{'queue':>5} {'turns':>5} {'p50_ms':>8} {'p90_ms':>8} {'p99_ms':>8}")
+    while True:
+        for s in response.sessions:
+            print(f"{s.session_id:<36} {s.state or '-':<10} {s.age_seconds:8.1f} {s.idle_seconds:8.1f} "
+                  f"{s.frames_in:8d} {s.bytes_in / 1024:9.1f} {s.queue_depth:5d} {s.turns:5d} "
+                  f"{s.latency_p50_seconds * 1000:8.1f} {s.latency_p90_seconds * 1000:8.1f} "
+                  f"{s.latency_p99_seconds * 1000:8.1f}")
+            shown += 1
+            if args.limit and shown >= args.limit:
+                break
+        if not response.next_page_token or (args.limit and shown >= args.limit):
+            break
+        request.page_token = response.next_page_token
+        response = stub.ListSessions(request, timeout=10)
+    print(f"{response.service}: {shown} of {response.total_size} matching sessions", file=sys.stderr)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Call the admin service of a running Python service.")
+    parser.add_argument("target", help="host:port of the service's gRPC server, e.g. localhost:50053")
+    commands = parser.add_subparsers(dest="command", required=True)
+    p = commands.add_parser("profile", help="Sample all threads' stacks and write collapsed stacks.")
+    p.add_argument("--seconds", type=float, default=10.0)
+    p.add_argument("--hz", type=float, default=100.0, help="Samples per second.")
+    p.add_argument("--memory-top", type=int, default=0, help="Also report the N largest allocation sites.")
+    p.add_argument("--line-numbers", action="store_true", help="Include line numbers in frame names.")
+    p.add_argument("--top", type=int, default=15, help="Hottest frames to print.")
+    p.add_argument("--out", help="File for the collapsed stacks (default: stdout).")
+    s = commands.add_parser("sessions", help="List live sessions with their statistics.")
+    s.add_argument("--prefix", default="", help="Only session ids starting with this.")
+    s.add_argument("--state", default="", help="Only sessions in this state, e.g. open.")
+    s.add_argument("--min-idle", type=float, default=0.0, help="Only sessions idle for at least this many seconds.")
+    s.add_argument("--order", choices=("idle", "bytes_in", "age", "session_id"), default="idle")
+    s.add_argument("--limit", type=int, default=0, help="Stop after this many sessions (0 = all).")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    with grpc.insecure_channel(args.target) as channel:
+        stub = admin_pb2_grpc.AdminStub(channel)
+        try:
+            if args.command == "profile":
+                profile(stub, args)
+            elif args.command == "sessions":
+                list_sessions(stub, args)
+        except grpc.RpcError as e:
+            sys.exit(f"{args.target}: {logs.describe_rpc_error(e)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+# Generated by the protocol buffer compiler.  DO NOT EDIT!
+# NO CHECKED-IN PROTOBUF GENCODE
+# source: observability/admin.proto
+# Protobuf Python Version: 6.30.0
+"""Generated protocol buffer code."""
+from google.protobuf import descriptor as _descriptor
+from google.protobuf import descriptor_pool as _descriptor_pool
+from google.protobuf import runtime_version as _runtime_version
+from google.protobuf import symbol_database as _symbol_database
+from google.protobuf.internal import builder as _builder
+_runtime_version.ValidateProtobufRuntimeVersion(
+    _runtime_version.Domain.PUBLIC,
+    6,
+    30,
+    0,
+    '',
+    'observability/admin.proto'
+)
+# @@protoc_insertion_point(imports)
+
+_sym_db = _symbol_database.Default()
+
+
+
+
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x19observability/admin.proto\x12\x13observability.admin\"n\n\x0eProfileRequest\x12\x18\n\x10\x64uration_seconds\x18\x01 \x01(\x01\x12\x16\n\x0esample_rate_hz\x18\x02 \x01(\x01\x12\x14\n\x0cmemory_top_n\x18\x03 \x01(\r\x12\x14\n\x0cline_numbers\x18\x04 \x01(\x08\"*\n\nStackCount\x12\r\n\x05stack\x18\x01 \x01(\t\x12\r\n\x05\x63ount\x18\x02 \x01(\x04\"A\n\nMemoryStat\x12\x10\n\x08location\x18\x01 \x01(\t\x12\x12\n\nsize_bytes\x18\x02 \x01(\x04\x12\r\n\x05\x63ount\x18\x03 \x01(\x04\"\xcc\x01\n\x0fProfileResponse\x12\x0f\n\x07service\x18\x01 \x01(\t\x12\x0f\n\x07samples\x18\x02 \x01(\x04\x12\x18\n\x10\x64uration_seconds\x18\x03 \x01(\x01\x12/\n\x06stacks\x18\x04 \x03(\x0b\x32\x1f.observability.admin.StackCount\x12/\n\x06memory\x18\x05 \x03(\x0b\x32\x1f.observability.admin.MemoryStat\x12\x1b\n\x13memory_traced_bytes\x18\x06 \x01(\x04\"\xfc\x01\n\x13ListSessionsRequest\x12\x11\n\tpage_size\x18\x01 \x01(\r\x12\x12\n\npage_token\x18\x02 \x01(\t\x12\x19\n\x11session_id_prefix\x18\x03 \x01(\t\x12\r\n\x05state\x18\x04 \x01(\t\x12\x18\n\x10min_idle_seconds\x18\x05 \x01(\x01\x12@\n\x08order_by\x18\x06 \x01(\x0e\x32..observability.admin.ListSessionsRequest.Order\"8\n\x05Order\x12\x08\n\x04IDLE\x10\x00\x12\x0c\n\x08\x42YTES_IN\x10\x01\x12\x07\n\x03\x41GE\x10\x02\x12\x0e\n\nSESSION_ID\x10\x03\"\x97\x02\n\x0bSessionInfo\x12\x12\n\nsession_id\x18\x01 \x01(\t\x12\r\n\x05state\x18\x02 \x01(\t\x12\x13\n\x0b\x61ge_seconds\x18\x03 \x01(\x01\x12\x14\n\x0cidle_seconds\x18\x04 \x01(\x01\x12\x1a\n\x12last_activity_unix\x18\x05 \x01(\x01\x12\x10\n\x08\x62ytes_in\x18\x06 \x01(\x04\x12\x11\n\tframes_in\x18\x07 \x01(\x04\x12\x13\n\x0bqueue_depth\x18\x08 \x01(\r\x12\r\n\x05turns\x18\t \x01(\r\x12\x1b\n\x13latency_p50_seconds\x18\n \x01(\x01\x12\x1b\n\x13latency_p90_seconds\x18\x0b \x01(\x01\x12\x1b\n\x13latency_p99_seconds\x18\x0c \x01(\x01\"\x88\x01\n\x14ListSessionsResponse\x12\x0f\n\x07service\x18\x01 \x01(\t\x12\x32\n\x08sessions\x18\x02 \x03(\x0b\x32 .observability.admin.SessionInfo\x12\x17\n\x0fnext_page_token\x18\x03 \x01(\t\x12\x12\n\ntotal_size\x18\x04 \x01(\r2\xc2\x01\n\x05\x41\x64min\x12T\n\x07Profile\x12#.observability.admin.ProfileRequest\x1a$.observability.admin.ProfileResponse\x12\x63\n\x0cListSessions\x12(.observability.admin.ListSessionsRequest\x1a).observability.admin.ListSessionsResponseb\x06proto3')
+
+_globals = globals()
+_builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
+_builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'observability.admin_pb2', _globals)
+if not _descriptor._USE_C_DESCRIPTORS:
+  DESCRIPTOR._loaded_options = None
+  _globals['_PROFILEREQUEST']._serialized_start=50
+  _globals['_PROFILEREQUEST']._serialized_end=160
+  _globals['_STACKCOUNT']._serialized_start=162
+  _globals['_STACKCOUNT']._serialized_end=204
+  _globals['_MEMORYSTAT']._serialized_start=206
+  _globals['_MEMORYSTAT']._serialized_end=271
+  _globals['_PROFILERESPONSE']._serialized_start=274
+  _globals['_PROFILERESPONSE']._serialized_end=478
+  _globals['_LISTSESSIONSREQUEST']._serialized_start=481
+  _globals['_LISTSESSIONSREQUEST']._serialized_end=733
+  _globals['_LISTSESSIONSREQUEST_ORDER']._serialized_start=677
+  _globals['_LISTSESSIONSREQUEST_ORDER']._serialized_end=733
+  _globals['_SESSIONINFO']._serialized_start=736
+  _globals['_SESSIONINFO']._serialized_end=1015
+  _globals['_LISTSESSIONSRESPONSE']._serialized_start=1018
+  _globals['_LISTSESSIONSRESPONSE']._serialized_end=1154
+  _globals['_ADMIN']._serialized_start=1157
+  _globals['_ADMIN']._serialized_end=1351
+# @@protoc_insertion_point(module_scope)
@@ -0,0 +1,156 @@
+# Generated by the gRPC Python protocol compiler plugin. DO NOT EDIT!
+"""Client and server classes corresponding to protobuf-defined services."""
+import grpc
+import warnings
+
+from observability import admin_pb2 as observability_dot_admin__pb2
+
+GRPC_GENERATED_VERSION = '1.72.1'
+GRPC_VERSION = grpc.__version__
+_version_not_supported = False
+
+try:
+    from grpc._utilities import first_version_is_lower
+    _version_not_supported = first_version_is_lower(GRPC_VERSION, GRPC_GENERATED_VERSION)
+except ImportError:
+    _version_not_supported = True
+
+if _version_not_supported:
+    raise RuntimeError(
+        f'The grpc package installed is at version {GRPC_VERSION},'
+        + f' but the generated code in observability/admin_pb2_grpc.py depends on'
+        + f' grpcio>={GRPC_GENERATED_VERSION}.'
+        + f' Please upgrade your grpc module to grpcio>={GRPC_GENERATED_VERSION}'
+        + f' or downgrade your generated code using grpcio-tools<={GRPC_VERSION}.'
+    )
+
+
+class AdminStub(object):
+    """Admin service mounted next to the servicer of every Python service (same
+    port). Nothing runs until an RPC asks for it.
+    Regenerate the Python code from the repository root with:
+    python -m grpc_tools.protoc -I . --python_out=. --grpc_python_out=. observability/admin.proto
+    """
+
+    def __init__(self, channel):
+        """Constructor.
+
+        Args:
+            channel: A grpc.Channel.
+        """
+        self.Profile = channel.unary_unary(
+                '/observability.admin.Admin/Profile',
+                request_serializer=observability_dot_admin__pb2.ProfileRequest.SerializeToString,
+                response_deserializer=observability_dot_admin__pb2.ProfileResponse.FromString,
+                _registered_method=True)
+        self.ListSessions = channel.unary_unary(
+                '/observability.admin.Admin/ListSessions',
+                request_serializer=observability_dot_admin__pb2.ListSessionsRequest.SerializeToString,
+                response_deserializer=observability_dot_admin__pb2.ListSessionsResponse.FromString,
+                _registered_method=True)
+
+
+class AdminServicer(object):
+    """Admin service mounted next to the servicer of every Python service (same
+    port). Nothing runs until an RPC asks for it.
+    Regenerate the Python code from the repository root with:
+    python -m grpc_tools.protoc -I . --python_out=. --grpc_python_out=. observability/admin.proto
+    """
+
+    def Profile(self, request, context):
+        """Samples the stacks of all threads for a bounded time and returns them
+        aggregated, plus an optional tracemalloc snapshot.
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def ListSessions(self, request, context):
+        """Lists the sessions the service keeps statistics for (StreamingDataManager
+        and SpeechToTextService); UNIMPLEMENTED in stateless services.
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+
+def add_AdminServicer_to_server(servicer, server):
+    rpc_method_handlers = {
+            'Profile': grpc.unary_unary_rpc_method_handler(
+                    servicer.Profile,
+                    request_deserializer=observability_dot_admin__pb2.ProfileRequest.FromString,
+                    response_serializer=observability_dot_admin__pb2.ProfileResponse.SerializeToString,
+            ),
+            'ListSessions': grpc.unary_unary_rpc_method_handler(
+                    servicer.ListSessions,
+                    request_deserializer=observability_dot_admin__pb2.ListSessionsRequest.FromString,
+                    response_serializer=observability_dot_admin__pb2.ListSessionsResponse.SerializeToString,
+            ),
+    }
+    generic_handler = grpc.method_handlers_generic_handler(
+            'observability.admin.Admin', rpc_method_handlers)
+    server.add_generic_rpc_handlers((generic_handler,))
+    server.add_registered_method_handlers('observability.admin.Admin', rpc_method_handlers)
+
+
+ # This class is part of an EXPERIMENTAL API.
+class Admin(object):
+    """Admin service mounted next to the servicer of every Python service (same
+    port). Nothing runs until an RPC asks for it.
+    Regenerate the Python code from the repository root with:
+    python -m grpc_tools.protoc -I . --python_out=. --grpc_python_out=. observability/admin.proto
+    """
+
+    @staticmethod
+    def Profile(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/observability.admin.Admin/Profile',
+            observability_dot_admin__pb2.ProfileRequest.SerializeToString,
+            observability_dot_admin__pb2.ProfileResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def ListSessions(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/observability.admin.Admin/ListSessions',
+            observability_dot_admin__pb2.ListSessionsRequest.SerializeToString,
+            observability_dot_admin__pb2.ListSessionsResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
@@ -0,0 +1,124 @@
+import threading
+import time
+import unittest
+from unittest import mock
+from concurrent import futures
+
+import grpc
+
+from observability import admin, admin_cli, admin_pb2, admin_pb2_grpc, sessions
+
+
+def _spin_until(stop_event):
+    while not stop_event.is_set():
+        sum(range(1000))
+
+
+class TestStackSampler(unittest.TestCase):
+
+    def test_samples_other_threads_as_collapsed_stacks(self):
+        stop = threading.Event()
+        worker = threading.Thread(target=_spin_until, args=(stop,), name="spinner_3")
+        worker.start()
+        try:
+            sampler = admin.StackSampler()
+            for _ in range(5):
+                sampler.sample(threading.get_ident())
+        finally:
+            stop.set()
+            worker.join()
+        self.assertEqual(sampler.samples, 5)
+        spinner = [(stack, count) for stack, count in sampler.counts.items() if stack.startswith("spinner;")]
+        self.assertTrue(spinner, sampler.counts) # Pool-style "_3" suffix folded away
+        self.assertTrue(all("_spin_until (admin_test.py)" in stack for stack, _ in spinner))
+        self.assertEqual(sum(count for _, count in spinner), 5)
+        self.assertFalse(any("test_samples_other_threads" in stack for stack in sampler.counts))
+
+
+class TestAdminService(unittest.TestCase):
+
+    def setUp(self):
+        self.server = grpc.server(futures.ThreadPoolExecutor(max_workers=4))
+        self.sessions = sessions.SessionRegistry("test", queue_depth=lambda session_id: 2)
+        admin.add_to_server(self.server, "test", sessions=self.sessions)
+        port = self.server.add_insecure_port("localhost:0")
+        self.server.start()
+        self.channel = grpc.insecure_channel(f"localhost:{port}")
+        self.stub = admin_pb2_grpc.AdminStub(self.channel)
+
+    def tearDown(self):
+        self.channel.close()
+        self.server.stop(None)
+
+    def test_profile_returns_stacks_and_memory_top(self):
+        stop = threading.Event()
+        retained = []
+
+        def allocate():
+            while not stop.is_set():
+                retained.append(bytearray(10000))
+                time.sleep(0.005)
+
+        workers = [threading.Thread(target=_spin_until, args=(stop,)), threading.Thread(target=allocate)]
+        for w in workers:
+            w.start()
+        try:
+            response = self.stub.Profile(admin_pb2.ProfileRequest(duration_seconds=0.3, sample_rate_hz=50,
+                                                                  memory_top_n=5), timeout=10)
+        finally:
+            stop.set()
+            for w in workers:
+                w.join()
+        self.assertEqual(response.service, "test")
+        self.assertGreaterEqual(response.samples, 10)
+        self.assertTrue(any("_spin_until" in s.stack for s in response.stacks))
+        self.assertTrue(any("admin_test.py" in m.location for m in response.memory), response.memory)
+        self.assertGreater(response.memory_traced_bytes, 0)
+        lines = admin_cli.collapsed_lines(response)
+        self.assertEqual(len(lines), len(response.stacks))
+        self.assertRegex(lines[0], r" \d+$")
+
+    def test_concurrent_profile_is_rejected(self):
+        first = self.stub.Profile.future(admin_pb2.ProfileRequest(duration_seconds=0.5), timeout=10)
+        time.sleep(0.1)
+        with self.assertRaises(grpc.RpcError) as raised:
+            self.stub.Profile(admin_pb2.ProfileRequest(duration_seconds=0.1), timeout=10)
+        self.assertEqual(raised.exception.code(), grpc.StatusCode.RESOURCE_EXHAUSTED)
+        self.assertGreater(first.result().samples, 0)
+
+    def test_list_sessions_filters_orders_and_pages(self):
+        for i in range(5):
+            stats = self.sessions.session(f"call-{i}")
+            stats.record_frame(100 * (i + 1))
+            stats.record_turn(0.1 * (i + 1))
+        self.sessions.session("other").state = "open"
+        self.sessions.get("call-0").last_activity -= 120 # Idle for two minutes
+
+        request = admin_pb2.ListSessionsRequest(session_id_prefix="call-", page_size=2,
+                                                order_by=admin_pb2.ListSessionsRequest.BYTES_IN)
+        first = self.stub.ListSessions(request, timeout=5)
+        self.assertEqual([s.session_id for s in first.sessions], ["call-4", "call-3"])
+        self.assertEqual((first.total_size, first.next_page_token), (5, "2"))
+        request.page_token = first.next_page_token
+        second = self.stub.ListSessions(request, timeout=5)
+        self.assertEqual([s.session_id for s in second.sessions], ["call-2", "call-1"])
+        info = second.sessions[0]
+        self.assertEqual((info.frames_in, info.bytes_in, info.turns, info.queue_depth), (1, 300, 1, 2))
+        self.assertAlmostEqual(info.latency_p99_seconds, 0.3)
+
+        idle = self.stub.ListSessions(admin_pb2.ListSessionsRequest(min_idle_seconds=60), timeout=5)
+        self.assertEqual([s.session_id for s in idle.sessions], ["call-0"])
+        self.assertGreaterEqual(idle.sessions[0].idle_seconds, 120)
+        self.assertEqual(idle.next_page_token, "")
+        by_state = self.stub.ListSessions(admin_pb2.ListSessionsRequest(state="open"), timeout=5)
+        self.assertEqual([s.session_id for s in by_state.sessions], ["other"])
+
+    def test_list_sessions_is_unimplemented_without_a_registry(self):
+        servicer = admin.AdminServicer("stateless")
+        context = mock.Mock()
+        servicer.ListSessions(admin_pb2.ListSessionsRequest(), context)
+        context.set_code.assert_called_once_with(grpc.StatusCode.UNIMPLEMENTED)
+
+
+if __name__ == "__main__":
+    unittest.main()
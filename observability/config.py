@@ -0,0 +1,58 @@
+import os
+
+# Per-turn distributed tracing. A trace is started for each caller turn (by
+# StreamingDataManager, or by any service called without trace context) and
+# propagated to downstream services in the `traceparent` gRPC metadata entry.
+# TRACE_SAMPLE_RATE is the fraction of turns whose spans are recorded; 0 turns
+# tracing off entirely (no interceptors are installed).
+TRACE_SAMPLE_RATE = float(os.getenv("TRACE_SAMPLE_RATE", "0"))
+# Spans are appended as JSON lines to TRACE_DIR/<service>-<pid>.jsonl.
+TRACE_DIR = os.getenv("TRACE_DIR", "traces")
+# Spans waiting to be written; when the writer falls behind, new spans are dropped.
+TRACE_MAX_QUEUED_SPANS = int(os.getenv("TRACE_MAX_QUEUED_SPANS", "10000"))
+TRACE_FLUSH_INTERVAL_SECONDS = float(os.getenv("TRACE_FLUSH_INTERVAL_SECONDS", "0.5"))
+
+# Structured logging (observability.logs). LOG_FORMAT is "text" or "json".
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text")
+# Per-category sampling for events below WARNING, as "category=rate,...".
+# Categories not listed are always logged. The per-segment categories are
+# sampled by default: one log line per 20 ms frame costs more CPU than the
+# frame's own processing.
+LOG_SAMPLE_RATES = os.getenv("LOG_SAMPLE_RATES", "segment=0.01,interim=0.05")
+# Records waiting to be written; when the writer falls behind, new records are dropped.
+LOG_MAX_QUEUED_RECORDS = int(os.getenv("LOG_MAX_QUEUED_RECORDS", "10000"))
+LOG_FLUSH_INTERVAL_SECONDS = float(os.getenv("LOG_FLUSH_INTERVAL_SECONDS", "0.1"))
+
+# Metrics (observability.metrics), served in the Prometheus text format at
+# http://METRICS_ADDR:<port>/metrics. Each service listens on its own default
+# port (gRPC port + 1000, e.g. 51053 for NLU) unless METRICS_PORT is set.
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() in ("1", "true", "yes")
+METRICS_ADDR = os.getenv("METRICS_ADDR", "0.0.0.0")
+METRICS_PORT = int(os.getenv("METRICS_PORT", "0"))
+
+# Event-loop monitor (observability.loop_monitor) for the asyncio loops run in
+# background threads. The lag probe runs every LOOP_LAG_PROBE_INTERVAL_SECONDS;
+# callbacks running at least LOOP_SLOW_CALLBACK_SECONDS are counted and logged,
+# with the blocked stack when LOOP_CAPTURE_STACKS is set (adds a watchdog thread).
+LOOP_MONITOR_ENABLED = os.getenv("LOOP_MONITOR_ENABLED", "true").lower() in ("1", "true", "yes")
+LOOP_LAG_PROBE_INTERVAL_SECONDS = float(os.getenv("LOOP_LAG_PROBE_INTERVAL_SECONDS", "0.005"))
+LOOP_SLOW_CALLBACK_SECONDS = float(os.getenv("LOOP_SLOW_CALLBACK_SECONDS", "0.05"))
+LOOP_CAPTURE_STACKS = os.getenv("LOOP_CAPTURE_STACKS", "false").lower() in ("1", "true", "yes")
+
+# Admin gRPC service (observability.admin), mounted on each service's own port.
+ADMIN_ENABLED = os.getenv("ADMIN_ENABLED", "true").lower() in ("1", "true", "yes")
+# Profile RPC: default and maximum sampling time, and the default sampling rate.
+ADMIN_PROFILE_DEFAULT_SECONDS = float(os.getenv("ADMIN_PROFILE_DEFAULT_SECONDS", "10"))
+ADMIN_PROFILE_MAX_SECONDS = float(os.getenv("ADMIN_PROFILE_MAX_SECONDS", "60"))
+ADMIN_PROFILE_SAMPLE_HZ = float(os.getenv("ADMIN_PROFILE_SAMPLE_HZ", "100"))
+
+# Per-session statistics (observability.sessions), listed by the admin
+# ListSessions RPC. At most SESSION_STATS_MAX_SESSIONS are kept (least recently
+# active evicted first); latency percentiles cover the last SESSION_LATENCY_WINDOW turns.
+SESSION_STATS_MAX_SESSIONS = int(os.getenv("SESSION_STATS_MAX_SESSIONS", "10000"))
+SESSION_LATENCY_WINDOW = int(os.getenv("SESSION_LATENCY_WINDOW", "32"))
+# Sessions without activity for SESSION_IDLE_TTL_SECONDS are evicted (and their
+# Deepgram stream or recording segment released); 0 disables idle eviction.
+SESSION_IDLE_TTL_SECONDS = float(os.getenv("SESSION_IDLE_TTL_SECONDS", "120"))
+SESSION_REAPER_INTERVAL_SECONDS = float(os.getenv("SESSION_REAPER_INTERVAL_SECONDS", "1"))
@@ -0,0 +1,60 @@
+# observability/deadlines.py
+
+"""
+Deadline propagation between the services.
+
+A caller's gRPC deadline reaches the server as `context.time_remaining()`.
+A server that calls further downstream passes on what is left of it, less
+the time it reserves for its own work once the downstream call returns,
+instead of a fixed timeout of its own. The service's fixed timeout is kept
+as the cap, and is what applies when the caller set no deadline.
+
+Work whose deadline has already passed is dropped before it starts: the
+caller has given up on it and would discard the answer. Dropped requests
+are counted in `revo_deadline_expired_total{service,method}` and end with
+DEADLINE_EXCEEDED.
+"""
+
+import math
+
+import grpc
+
+from . import logs, metrics
+
+log = logs.get_logger("deadlines")
+
+EXPIRED = metrics.counter(
+    "revo_deadline_expired_total", "Requests dropped because too little of the caller's deadline was left.",
+    ("service", "method"))
+
+
+def time_left(context) -> float:
+    """Seconds until the caller's deadline; math.inf when it set none."""
+    left = context.time_remaining()
+    return math.inf if left is None else left
+
+
+def remaining(context, cap: float, reserve: float = 0.0) -> float:
+    """
+    The timeout for a downstream call or wait: the caller's remaining
+    deadline less `reserve`, at most `cap`. May be zero or negative when the
+    deadline is (nearly) gone.
+    """
+    return min(cap, time_left(context) - reserve)
+
+
+def expired(context, service: str, method: str, reserve: float = 0.0, session_id=None) -> bool:
+    """
+    True when no more than `reserve` seconds of the caller's deadline are
+    left. The request is then counted as dropped and DEADLINE_EXCEEDED is set
+    on `context`; the servicer returns an empty response.
+    """
+    left = time_left(context)
+    if left > reserve:
+        return False
+    EXPIRED.labels(service, method).inc()
+    log.warning("deadline", "%s dropped: %.0f ms of the caller's deadline left", method, left * 1000,
+                session_id=session_id, stage=service)
+    context.set_code(grpc.StatusCode.DEADLINE_EXCEEDED)
+    context.set_details(f"Deadline exceeded before {method} started")
+    return True
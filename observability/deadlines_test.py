@@ -0,0 +1,42 @@
+import math
+import unittest
+from unittest import mock
+
+import grpc
+
+from observability import deadlines
+
+
+def context_with(time_remaining):
+    context = mock.Mock(spec=grpc.ServicerContext)
+    context.time_remaining.return_value = time_remaining
+    return context
+
+
+class TestDeadlines(unittest.TestCase):
+
+    def test_remaining_is_the_callers_deadline_less_the_reserve_capped(self):
+        self.assertAlmostEqual(deadlines.remaining(context_with(2.0), cap=10, reserve=0.5), 1.5)
+        self.assertEqual(deadlines.remaining(context_with(30.0), cap=10, reserve=0.5), 10)
+        self.assertLessEqual(deadlines.remaining(context_with(0.2), cap=10, reserve=0.5), 0)
+
+    def test_no_deadline_means_the_cap(self):
+        context = context_with(None)
+        self.assertEqual(deadlines.time_left(context), math.inf)
+        self.assertEqual(deadlines.remaining(context, cap=5), 5)
+
+    def test_expired_request_is_dropped_with_deadline_exceeded(self):
+        context = context_with(0.05)
+        with self.assertLogs("revo.deadlines", level="WARNING"):
+            self.assertTrue(deadlines.expired(context, "test_service", "Method", reserve=0.1))
+        context.set_code.assert_called_once_with(grpc.StatusCode.DEADLINE_EXCEEDED)
+        self.assertEqual(deadlines.EXPIRED.labels("test_service", "Method").value(), 1)
+
+    def test_request_with_time_left_is_not_touched(self):
+        context = context_with(1.0)
+        self.assertFalse(deadlines.expired(context, "test_service", "Other", reserve=0.1))
+        context.set_code.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
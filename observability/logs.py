@@ -0,0 +1,279 @@
+# observability/logs.py
+
+"""
+Structured, sampled, non-blocking logging for the services.
+
+    log = logs.get_logger("nlu")
+    log.info("request", "ProcessText for %s", text, session_id=sid, stage="nlu")
+
+* **Lazy formatting:** messages use %-style arguments and are only formatted
+  when an event is actually written, by the writer thread. Wrap expensive
+  arguments (e.g. entity joins) in `logs.lazy(func, ...)`.
+* **Per-category sampling:** every call names a category ("segment",
+  "interim", ...). Below WARNING, only 1 in N events of a category are kept
+  (LOG_SAMPLE_RATES, e.g. "segment=0.01,interim=0.05"); the check is a counter
+  increment, done before anything is allocated. Warnings and errors are never
+  sampled out.
+* **Non-blocking:** a kept event is appended to a bounded in-memory queue as a
+  tuple; a background writer formats and writes queued events to stdout. When
+  the queue is full, events are dropped and counted instead of blocking the
+  request thread.
+* **Structured fields:** `session_id`, `seq` and `stage`, plus any other
+  keyword fields, are written as `key=value` pairs (LOG_FORMAT=text) or JSON
+  object members (LOG_FORMAT=json).
+
+Until `configure()` is called (e.g. in unit tests) events are handed to the
+standard `logging` module as records of the `revo.<service>` logger, so
+`assertLogs` and the default last-resort handler work.
+"""
+
+import collections
+import itertools
+import json
+import logging
+import sys
+import threading
+import time
+import traceback
+
+from . import config
+
+_ROOT_LOGGER = "revo"
+
+_sampler = None # Set by configure(); None keeps every event
+_writer = None
+
+
+def parse_sample_rates(spec: str) -> dict:
+    """Parses "category=rate,category=rate" into {category: rate}."""
+    rates = {}
+    for item in (spec or "").split(","):
+        if "=" in item:
+            category, _, rate = item.partition("=")
+            rates[category.strip()] = float(rate)
+    return rates
+
+
+class Sampler:
+    """Keeps 1 in N events per category, deterministically (every Nth event)."""
+
+    def __init__(self, rates: dict):
+        # rate -> N; a rate of 0 drops every event of the category.
+        self._every = {category: (0 if rate <= 0 else max(1, round(1.0 / rate))) for category, rate in rates.items()}
+        self._counters = {category: itertools.count() for category in self._every}
+
+    def keep(self, category: str) -> bool:
+        every = self._every.get(category, 1)
+        if every == 1:
+            return True
+        if every == 0:
+            return False
+        # next() on itertools.count is atomic under the GIL; no lock needed.
+        return next(self._counters[category]) % every == 0
+
+
+class lazy:
+    """Defers an expensive log argument until the event is formatted: lazy(", ".join, names)."""
+
+    __slots__ = ("func", "args")
+
+    def __init__(self, func, *args):
+        self.func = func
+        self.args = args
+
+    def __str__(self):
+        return str(self.func(*self.args))
+
+
+class EventLogger:
+    """Logger for one service; the first argument of every call is the sampling category."""
+
+    __slots__ = ("service", "_logger")
+
+    def __init__(self, service: str):
+        self.service = service
+        self._logger = logging.getLogger(f"{_ROOT_LOGGER}.{service}")
+
+    def _log(self, level: int, category: str, msg: str, args: tuple, fields: dict, exc_info=None):
+        if not self._logger.isEnabledFor(level):
+            return
+        if exc_info is True:
+            exc_info = sys.exc_info()
+        writer = _writer
+        if writer is None:
+            # Not configured: plain `logging` record (makeRecord skips Logger.log's stack walk).
+            self._logger.handle(self._logger.makeRecord(self._logger.name, level, "", 0, msg, args, exc_info,
+                                                        extra={"category": category, "fields": fields}))
+            return
+        sampler = _sampler
+        if level < logging.WARNING and sampler is not None and not sampler.keep(category):
+            return
+        writer.record((time.time(), level, self.service, category, msg, args, fields, exc_info))
+
+    def debug(self, category: str, msg: str, *args, **fields):
+        self._log(logging.DEBUG, category, msg, args, fields)
+
+    def info(self, category: str, msg: str, *args, **fields):
+        self._log(logging.INFO, category, msg, args, fields)
+
+    def warning(self, category: str, msg: str, *args, **fields):
+        self._log(logging.WARNING, category, msg, args, fields)
+
+    def error(self, category: str, msg: str, *args, exc_info=None, **fields):
+        self._log(logging.ERROR, category, msg, args, fields, exc_info=exc_info)
+
+    def is_enabled(self, level: int = logging.INFO) -> bool:
+        return self._logger.isEnabledFor(level)
+
+
+def get_logger(service: str) -> EventLogger:
+    return EventLogger(service)
+
+
+def describe_rpc_error(error) -> str:
+    """`Code=UNAVAILABLE, Details='...'` for a grpc.RpcError raised by a call, str(error) otherwise."""
+    if callable(getattr(error, "code", None)) and callable(getattr(error, "details", None)):
+        return f"Code={error.code()}, Details='{error.details()}'"
+    return str(error)
+
+
+def _message(msg: str, args: tuple) -> str:
+    if not args:
+        return msg
+    try:
+        return msg % args
+    except (TypeError, ValueError) as e:
+        return f"{msg} {args!r} (log format error: {e})"
+
+
+def format_text(event: tuple) -> str:
+    """`2026-01-01T12:00:00.123Z INFO nlu request: message session_id=... seq=...`"""
+    created, level, service, category, msg, args, fields, exc_info = event
+    parts = [
+        time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(created)) + f".{int(created * 1000) % 1000:03d}Z",
+        logging.getLevelName(level),
+        service,
+        f"{category}:",
+        _message(msg, args),
+    ]
+    for key, value in fields.items():
+        if value is not None and value != "":
+            parts.append(f"{key}={value}")
+    line = " ".join(parts)
+    if exc_info:
+        line += "\n" + "".join(traceback.format_exception(*exc_info)).rstrip()
+    return line
+
+
+def format_json(event: tuple) -> str:
+    created, level, service, category, msg, args, fields, exc_info = event
+    record = {
+        "ts": created,
+        "level": logging.getLevelName(level),
+        "service": service,
+        "category": category,
+        "msg": _message(msg, args),
+    }
+    for key, value in fields.items():
+        if value is not None and value != "":
+            record[key] = value if isinstance(value, (int, float, bool)) else str(value)
+    if exc_info:
+        record["exc"] = "".join(traceback.format_exception(*exc_info)).rstrip()
+    return json.dumps(record, separators=(",", ":"))
+
+
+class EventWriter:
+    """
+    Queues log events and writes them from a background thread. Recording an
+    event only appends a tuple to a deque; formatting and I/O happen off the
+    request path. When the queue is full, events are dropped and counted.
+    """
+
+    def __init__(self, stream, formatter=format_text, max_queued: int = 10000, flush_interval_seconds: float = 0.1):
+        self.stream = stream
+        self.formatter = formatter
+        self.max_queued = max_queued
+        self.flush_interval_seconds = flush_interval_seconds
+        self.dropped = 0
+        self.written = 0
+        self._queue = collections.deque()
+        self._stop_event = threading.Event()
+        self._write_lock = threading.Lock()
+        self._thread = None
+
+    def record(self, event: tuple):
+        if len(self._queue) >= self.max_queued:
+            self.dropped += 1
+            return
+        self._queue.append(event)
+
+    def flush(self):
+        with self._write_lock:
+            if not self._queue:
+                return
+            lines = []
+            while self._queue:
+                lines.append(self.formatter(self._queue.popleft()))
+            self.stream.write("\n".join(lines) + "\n")
+            self.stream.flush()
+            self.written += len(lines)
+
+    def _run(self):
+        while not self._stop_event.wait(self.flush_interval_seconds):
+            try:
+                self.flush()
+            except (OSError, ValueError):
+                pass # Output closed; there is nowhere left to report it
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="log-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self.flush()
+
+
+def configure(level: str = None, fmt: str = None, sample_rates: dict = None, max_queued: int = None,
+              stream=None):
+    """
+    Routes all service loggers through the sampled, queue-backed writer.
+    Defaults come from observability.config. Call once from serve().
+    """
+    global _sampler, _writer
+    shutdown()
+    fmt = fmt or config.LOG_FORMAT
+    rates = parse_sample_rates(config.LOG_SAMPLE_RATES) if sample_rates is None else sample_rates
+    logging.getLogger(_ROOT_LOGGER).setLevel((level or config.LOG_LEVEL).upper())
+    _sampler = Sampler(rates)
+    _writer = EventWriter(stream or sys.stdout, formatter=format_json if fmt == "json" else format_text,
+                          max_queued=max_queued or config.LOG_MAX_QUEUED_RECORDS,
+                          flush_interval_seconds=config.LOG_FLUSH_INTERVAL_SECONDS)
+    _writer.start()
+
+
+def queued_records() -> int:
+    """Events waiting for the writer."""
+    return len(_writer._queue) if _writer else 0
+
+
+def dropped_records() -> int:
+    """Events dropped because the writer fell behind."""
+    return _writer.dropped if _writer else 0
+
+
+def shutdown():
+    """Writes out queued events and restores default logging behaviour."""
+    global _sampler, _writer
+    writer = _writer
+    _writer = None
+    _sampler = None
+    if writer:
+        writer.stop()
+    logging.getLogger(_ROOT_LOGGER).setLevel(logging.NOTSET)
@@ -0,0 +1,110 @@
+import io
+import json
+import logging
+import unittest
+
+from observability import logs
+
+
+class TestSampler(unittest.TestCase):
+
+    def test_parse_sample_rates(self):
+        self.assertEqual(logs.parse_sample_rates("segment=0.01, interim=0.5"), {"segment": 0.01, "interim": 0.5})
+        self.assertEqual(logs.parse_sample_rates(""), {})
+
+    def test_keeps_one_in_n_per_category(self):
+        sampler = logs.Sampler({"segment": 0.1, "off": 0.0})
+        kept = [sampler.keep("segment") for _ in range(100)]
+        self.assertEqual(sum(kept), 10)
+        self.assertTrue(kept[0])
+        self.assertFalse(any(sampler.keep("off") for _ in range(10)))
+        self.assertTrue(all(sampler.keep("unlisted") for _ in range(10)))
+
+
+class TestConfiguredLogging(unittest.TestCase):
+
+    def setUp(self):
+        self.stream = io.StringIO()
+        self.log = logs.get_logger("test_service")
+
+    def tearDown(self):
+        logs.shutdown()
+
+    def _lines(self):
+        logs.shutdown() # Stops the listener after writing everything queued
+        return self.stream.getvalue().splitlines()
+
+    def test_structured_text_output(self):
+        logs.configure(level="INFO", fmt="text", sample_rates={}, stream=self.stream)
+        self.log.info("request", "Received '%s'", "hello", session_id="s1", seq=7, stage="nlu")
+        self.log.debug("request", "not written")
+        line, = self._lines()
+        self.assertIn("INFO test_service request: Received 'hello' session_id=s1 seq=7 stage=nlu", line)
+
+    def test_json_output(self):
+        logs.configure(level="INFO", fmt="json", sample_rates={}, stream=self.stream)
+        self.log.warning("rpc", "No response from %s", "DM", session_id="s1", attempt=2)
+        event = json.loads(self._lines()[0])
+        self.assertEqual(event["service"], "test_service")
+        self.assertEqual(event["level"], "WARNING")
+        self.assertEqual(event["category"], "rpc")
+        self.assertEqual(event["msg"], "No response from DM")
+        self.assertEqual(event["session_id"], "s1")
+        self.assertEqual(event["attempt"], 2)
+
+    def test_sampling_never_drops_errors(self):
+        logs.configure(level="INFO", fmt="text", sample_rates={"segment": 0.0}, stream=self.stream)
+        for _ in range(5):
+            self.log.info("segment", "sampled out")
+        self.log.error("segment", "kept")
+        lines = self._lines()
+        self.assertEqual(len(lines), 1)
+        self.assertIn("kept", lines[0])
+
+    def test_lazy_arguments_are_not_formatted_when_filtered(self):
+        calls = []
+
+        def expensive():
+            calls.append(1)
+            return "value"
+
+        logs.configure(level="WARNING", fmt="text", sample_rates={}, stream=self.stream)
+        self.log.info("request", "%s", logs.lazy(expensive))
+        self.log.warning("request", "%s", logs.lazy(expensive))
+        self.assertIn("value", self._lines()[0])
+        self.assertEqual(len(calls), 1)
+
+    def test_full_queue_drops_events_instead_of_blocking(self):
+        writer = logs.EventWriter(self.stream, formatter=lambda event: event[4], max_queued=2)
+        for i in range(5):
+            writer.record((0.0, logging.INFO, "svc", "request", f"m{i}", (), {}, None))
+        writer.stop()
+        self.assertEqual(self.stream.getvalue().splitlines(), ["m0", "m1"])
+        self.assertEqual(writer.dropped, 3)
+
+    def test_exceptions_are_written_with_the_event(self):
+        logs.configure(level="INFO", fmt="text", sample_rates={}, stream=self.stream)
+        try:
+            raise ValueError("boom")
+        except ValueError:
+            self.log.error("rpc", "Call failed", exc_info=True)
+        output = "\n".join(self._lines())
+        self.assertIn("ERROR test_service rpc: Call failed", output)
+        self.assertIn("ValueError: boom", output)
+
+
+class TestUnconfiguredLogging(unittest.TestCase):
+
+    def test_records_propagate_to_standard_logging(self):
+        log = logs.get_logger("test_service")
+        with self.assertLogs("revo.test_service", level="INFO") as logged:
+            log.info("request", "Hello %s", "world", session_id="s1")
+        self.assertEqual(logged.output, ["INFO:revo.test_service:Hello world"])
+        self.assertEqual(logged.records[0].fields, {"session_id": "s1"})
+
+    def test_describe_rpc_error(self):
+        self.assertEqual(logs.describe_rpc_error(RuntimeError("boom")), "boom")
+
+
+if __name__ == "__main__":
+    unittest.main()
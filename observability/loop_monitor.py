@@ -0,0 +1,192 @@
+# observability/loop_monitor.py
+
+"""
+Event-loop lag and slow-callback monitor for the asyncio loops the services
+run in background threads (the STT Deepgram loop).
+
+One blocking callback on such a loop (a synchronous write, a slow
+`_on_deepgram_message`) stalls every session served by it, which shows up
+downstream as a timeout rather than as an error. A `LoopMonitor` makes those
+stalls visible:
+
+* **Scheduling lag:** a probe callback is scheduled every
+  LOOP_LAG_PROBE_INTERVAL_SECONDS with `loop.call_at()`; how late it actually
+  runs is observed in `revo_event_loop_lag_seconds{loop}`. The
+  `revo_event_loop_lag_current_seconds{loop}` gauge is computed when scraped,
+  so it keeps growing while the loop is blocked.
+* **Slow callbacks:** every callback run by a monitored loop is timed. One
+  that takes at least LOOP_SLOW_CALLBACK_SECONDS is counted in
+  `revo_event_loop_slow_callbacks_total{loop,callback}` (the coroutine's
+  qualified name for task steps, the function's otherwise) and logged as a
+  warning.
+* **Stacks (optional, LOOP_CAPTURE_STACKS):** a watchdog thread samples the
+  loop thread's stack while a callback is over the threshold, so the warning
+  shows where it was blocked, not just which task.
+
+Timing callbacks wraps `asyncio.Handle._run`, the method every loop
+callback goes through, while at least one loop is monitored. For other loops
+the wrapper costs one dict lookup per callback; asyncio's own debug mode
+(`slow_callback_duration`) would report the same but slows every task down.
+"""
+
+import asyncio
+import sys
+import threading
+import time
+import traceback
+
+from . import config, logs, metrics
+
+log = logs.get_logger("loop_monitor")
+
+LAG_BUCKETS = metrics.log_linear_buckets(0.0001, 10.0)
+
+LOOP_LAG_SECONDS = metrics.histogram(
+    "revo_event_loop_lag_seconds", "How late the periodic probe callback ran on the event loop.", ("loop",),
+    buckets=LAG_BUCKETS)
+LOOP_LAG_CURRENT = metrics.gauge(
+    "revo_event_loop_lag_current_seconds", "How overdue the next probe callback is; grows while the loop is blocked.",
+    ("loop",))
+SLOW_CALLBACKS = metrics.counter(
+    "revo_event_loop_slow_callbacks_total", "Callbacks that ran for at least the slow-callback threshold.",
+    ("loop", "callback"))
+SLOW_CALLBACK_SECONDS = metrics.histogram(
+    "revo_event_loop_slow_callback_seconds", "Run time of slow callbacks.", ("loop",))
+
+_monitors = {} # loop -> LoopMonitor
+_monitors_lock = threading.Lock()
+_original_run = asyncio.Handle._run
+
+
+def _timed_run(handle):
+    monitor = _monitors.get(handle._loop)
+    if monitor is None:
+        return _original_run(handle)
+    start = time.perf_counter()
+    monitor._current_start = start
+    try:
+        return _original_run(handle)
+    finally:
+        elapsed = time.perf_counter() - start
+        monitor._current_start = 0.0
+        if elapsed >= monitor.slow_callback_seconds:
+            monitor._slow_callback(handle, start, elapsed)
+
+
+def describe_callback(handle) -> tuple:
+    """(name, task name) of a loop callback: the coroutine's qualified name for task steps."""
+    callback = handle._callback
+    owner = getattr(callback, "__self__", None)
+    if isinstance(owner, asyncio.Future) and hasattr(owner, "get_coro"):
+        coro = owner.get_coro()
+        return getattr(coro, "__qualname__", type(coro).__name__), owner.get_name()
+    callback = getattr(callback, "func", callback) # functools.partial
+    return getattr(callback, "__qualname__", type(callback).__name__), ""
+
+
+class LoopMonitor:
+    """Measures scheduling lag and times callbacks on one event loop; see the module docstring."""
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, name: str, interval_seconds: float = 0.005,
+                 slow_callback_seconds: float = 0.05, capture_stacks: bool = False):
+        self.loop = loop
+        self.name = name
+        self.interval_seconds = interval_seconds
+        self.slow_callback_seconds = slow_callback_seconds
+        self.capture_stacks = capture_stacks
+        self._observe_lag = LOOP_LAG_SECONDS.labels(name).observe
+        self._observe_slow = SLOW_CALLBACK_SECONDS.labels(name).observe
+        self._expected = None # loop.time() the next probe is due at
+        self._timer = None
+        self._stopped = threading.Event()
+        self._loop_thread_id = None
+        self._current_start = 0.0 # perf_counter() when the running callback started, 0 when idle
+        self._stack = None # (callback start, formatted stack) sampled by the watchdog
+        self._watchdog = None
+
+    def start(self):
+        """Starts monitoring; safe to call from any thread, before or after the loop starts running."""
+        with _monitors_lock:
+            if not _monitors:
+                asyncio.Handle._run = _timed_run
+            _monitors[self.loop] = self
+        self._stopped.clear()
+        LOOP_LAG_CURRENT.labels(self.name).set_function(self.current_lag)
+        self.loop.call_soon_threadsafe(self._schedule_first_probe)
+        if self.capture_stacks:
+            self._watchdog = threading.Thread(target=self._watch, name=f"loop-watchdog-{self.name}", daemon=True)
+            self._watchdog.start()
+        return self
+
+    def stop(self):
+        self._stopped.set()
+        with _monitors_lock:
+            if _monitors.get(self.loop) is self:
+                del _monitors[self.loop]
+            if not _monitors:
+                asyncio.Handle._run = _original_run
+        timer = self._timer
+        if timer is not None and not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(timer.cancel)
+        if self._watchdog:
+            self._watchdog.join(timeout=1)
+            self._watchdog = None
+
+    def current_lag(self) -> float:
+        """Seconds the next probe is overdue (0 while the loop keeps up or is not monitored yet)."""
+        expected = self._expected
+        if expected is None or self._stopped.is_set():
+            return 0.0
+        return max(0.0, self.loop.time() - expected)
+
+    def _schedule_first_probe(self):
+        self._loop_thread_id = threading.get_ident()
+        self._schedule_probe()
+
+    def _schedule_probe(self):
+        if self._stopped.is_set():
+            return
+        self._expected = self.loop.time() + self.interval_seconds
+        self._timer = self.loop.call_at(self._expected, self._probe)
+
+    def _probe(self):
+        # The loop may run a timer up to its clock resolution early; count that as no lag.
+        self._observe_lag(max(0.0, self.loop.time() - self._expected))
+        self._schedule_probe()
+
+    def _slow_callback(self, handle, start: float, elapsed: float):
+        name, task = describe_callback(handle)
+        SLOW_CALLBACKS.labels(self.name, name).inc()
+        self._observe_slow(elapsed)
+        stack = self._stack
+        self._stack = None
+        if stack is not None and stack[0] == start:
+            log.warning("loop", "Slow callback %s took %.3f s; blocked at:\n%s", name, elapsed, stack[1],
+                        loop=self.name, task=task)
+        else:
+            log.warning("loop", "Slow callback %s took %.3f s", name, elapsed, loop=self.name, task=task)
+
+    def _watch(self):
+        # Polls at half the threshold, so a slow callback is sampled while it is still running.
+        interval = self.slow_callback_seconds / 2
+        while not self._stopped.wait(interval):
+            start = self._current_start
+            if not start or time.perf_counter() - start < self.slow_callback_seconds:
+                continue
+            if self._stack is not None and self._stack[0] == start:
+                continue # Already sampled this callback
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is not None and self._current_start == start:
+                self._stack = (start, "".join(traceback.format_stack(frame)).rstrip())
+
+
+def monitor(loop: asyncio.AbstractEventLoop, name: str) -> LoopMonitor:
+    """
+    Starts a LoopMonitor for `loop` with the observability.config settings and
+    returns it, or None when LOOP_MONITOR_ENABLED is off.
+    """
+    if not config.LOOP_MONITOR_ENABLED:
+        return None
+    return LoopMonitor(loop, name, interval_seconds=config.LOOP_LAG_PROBE_INTERVAL_SECONDS,
+                       slow_callback_seconds=config.LOOP_SLOW_CALLBACK_SECONDS,
+                       capture_stacks=config.LOOP_CAPTURE_STACKS).start()
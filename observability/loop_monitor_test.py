@@ -0,0 +1,71 @@
+import asyncio
+import threading
+import time
+import unittest
+
+from observability import loop_monitor
+
+
+async def _blocking_step(seconds):
+    time.sleep(seconds) # Deliberately blocks the loop
+    return "done"
+
+
+class TestLoopMonitor(unittest.TestCase):
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+        self.monitors = []
+
+    def tearDown(self):
+        for monitor in self.monitors:
+            monitor.stop()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join(timeout=5)
+        self.loop.close()
+
+    def _monitor(self, name, **kwargs):
+        monitor = loop_monitor.LoopMonitor(self.loop, name, **kwargs).start()
+        self.monitors.append(monitor)
+        return monitor
+
+    def test_probe_observes_lag_while_loop_is_blocked(self):
+        monitor = self._monitor("test-lag", interval_seconds=0.002, slow_callback_seconds=10)
+        time.sleep(0.05)
+        self.loop.call_soon_threadsafe(time.sleep, 0.1)
+        time.sleep(0.05)
+        self.assertGreater(monitor.current_lag(), 0.01) # Measured while the loop is still blocked
+        time.sleep(0.1)
+        counts, total = loop_monitor.LOOP_LAG_SECONDS.labels("test-lag").snapshot()
+        self.assertGreater(sum(counts), 10)
+        self.assertGreaterEqual(total, 0.05)
+
+    def test_slow_task_step_is_counted_under_its_coroutine_name(self):
+        self._monitor("test-slow", slow_callback_seconds=0.02)
+        with self.assertLogs("revo.loop_monitor", level="WARNING") as captured:
+            future = asyncio.run_coroutine_threadsafe(_blocking_step(0.05), self.loop)
+            self.assertEqual(future.result(timeout=5), "done")
+        self.assertEqual(loop_monitor.SLOW_CALLBACKS.labels("test-slow", "_blocking_step").value(), 1)
+        self.assertIn("_blocking_step", captured.output[0])
+
+    def test_watchdog_captures_the_blocked_stack(self):
+        self._monitor("test-stack", slow_callback_seconds=0.02, capture_stacks=True)
+        time.sleep(0.02) # Let the first probe record the loop thread
+        with self.assertLogs("revo.loop_monitor", level="WARNING") as captured:
+            asyncio.run_coroutine_threadsafe(_blocking_step(0.1), self.loop).result(timeout=5)
+        self.assertIn("blocked at:", captured.output[0])
+        self.assertIn("time.sleep(seconds)", captured.output[0])
+
+    def test_fast_callbacks_are_not_reported_and_stop_restores_asyncio(self):
+        monitor = self._monitor("test-fast", slow_callback_seconds=1.0)
+        self.assertIs(asyncio.Handle._run, loop_monitor._timed_run)
+        asyncio.run_coroutine_threadsafe(asyncio.sleep(0.01), self.loop).result(timeout=5)
+        self.assertEqual(loop_monitor.SLOW_CALLBACKS.labels("test-fast", "sleep").value(), 0)
+        monitor.stop()
+        self.assertIs(asyncio.Handle._run, loop_monitor._original_run)
+
+
+if __name__ == "__main__":
+    unittest.main()
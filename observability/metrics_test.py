@@ -0,0 +1,148 @@
+import asyncio
+import threading
+import unittest
+import urllib.request
+from concurrent import futures
+
+import grpc
+
+from observability import metrics
+
+
+def _identity(value):
+    return value
+
+
+class TestMetrics(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = metrics.Registry()
+
+    def test_counter_sums_increments_from_all_threads(self):
+        counter = self.registry.register(metrics.Counter("test_events_total", "Events."))
+
+        def work():
+            for _ in range(1000):
+                counter.inc()
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        counter.inc(5)
+        self.assertEqual(counter.value(), 8005)
+        self.assertIn("test_events_total 8005", self.registry.render())
+
+    def test_histogram_buckets_are_cumulative_with_sum_and_count(self):
+        histogram = self.registry.register(
+            metrics.Histogram("test_seconds", "Latency.", ("method",), buckets=(0.1, 1.0)))
+        child = histogram.labels("Call")
+        for value in (0.05, 0.1, 0.5, 2.0):
+            child.observe(value)
+        lines = self.registry.render().splitlines()
+        self.assertIn('test_seconds_bucket{method="Call",le="0.1"} 2', lines)
+        self.assertIn('test_seconds_bucket{method="Call",le="1.0"} 3', lines)
+        self.assertIn('test_seconds_bucket{method="Call",le="+Inf"} 4', lines)
+        self.assertIn('test_seconds_sum{method="Call"} 2.65', lines)
+        self.assertIn('test_seconds_count{method="Call"} 4', lines)
+
+    def test_gauge_function_is_evaluated_when_scraped(self):
+        items = []
+        gauge = self.registry.register(metrics.Gauge("test_depth", "Depth."))
+        gauge.set_function(lambda: len(items))
+        items.extend([1, 2, 3])
+        self.assertIn("test_depth 3", self.registry.render())
+
+    def test_registering_a_name_twice_returns_the_same_metric(self):
+        first = self.registry.register(metrics.Counter("test_total", "Total."))
+        self.assertIs(self.registry.register(metrics.Counter("test_total", "Total.")), first)
+        with self.assertRaises(ValueError):
+            self.registry.register(metrics.Gauge("test_total", "Total."))
+
+    def test_label_values_are_escaped_and_counted(self):
+        counter = self.registry.register(metrics.Counter("test_labelled_total", "Total.", ("name",)))
+        counter.labels('a"b').inc()
+        self.assertIn('test_labelled_total{name="a\\"b"} 1', self.registry.render())
+        with self.assertRaises(ValueError):
+            counter.labels("a", "b")
+
+    def test_log_linear_buckets(self):
+        buckets = metrics.log_linear_buckets(0.001, 0.008, per_doubling=2)
+        self.assertEqual(len(buckets), 7)
+        self.assertEqual(buckets[0], 0.001)
+        self.assertEqual(buckets[2], 0.002)
+        self.assertEqual(buckets[-1], 0.008)
+
+
+class TestServerInterceptorAndEndpoint(unittest.TestCase):
+
+    def test_rpc_latency_is_recorded_and_served(self):
+        def handle(request, context):
+            if request == b"fail":
+                context.abort(grpc.StatusCode.INVALID_ARGUMENT, "bad request")
+            return request
+
+        handler = grpc.method_handlers_generic_handler("test.Echo", {
+            "Call": grpc.unary_unary_rpc_method_handler(handle, _identity, _identity),
+        })
+        server = grpc.server(futures.ThreadPoolExecutor(max_workers=2),
+                             interceptors=[metrics.MetricsServerInterceptor("metrics_test")])
+        server.add_generic_rpc_handlers((handler,))
+        port = server.add_insecure_port("localhost:0")
+        server.start()
+        http_server = metrics.start_http_server("metrics_test", 0, addr="127.0.0.1")
+        try:
+            with grpc.insecure_channel(f"localhost:{port}") as channel:
+                call = channel.unary_unary("/test.Echo/Call")
+                call(b"ping", timeout=5)
+                with self.assertRaises(grpc.RpcError):
+                    call(b"fail", timeout=5)
+            url = f"http://127.0.0.1:{http_server.server_address[1]}/metrics"
+            with urllib.request.urlopen(url, timeout=5) as response:
+                self.assertTrue(response.headers["Content-Type"].startswith("text/plain"))
+                body = response.read().decode("utf-8")
+        finally:
+            metrics.shutdown()
+            server.stop(0)
+        self.assertIn('revo_grpc_server_handled_total{service="metrics_test",method="Call",code="OK"} 1', body)
+        self.assertIn('revo_grpc_server_handled_total{service="metrics_test",method="Call",code="INVALID_ARGUMENT"} 1',
+                      body)
+        self.assertIn('revo_grpc_server_handling_seconds_count{service="metrics_test",method="Call"} 2', body)
+
+    def test_aio_server_rpcs_are_recorded_whether_the_handler_is_a_coroutine_or_not(self):
+        async def handle(request, context):
+            if request == b"fail":
+                await context.abort(grpc.StatusCode.INVALID_ARGUMENT, "bad request")
+            return request
+
+        async def run():
+            handler = grpc.method_handlers_generic_handler("test.AioEcho", {
+                "Async": grpc.unary_unary_rpc_method_handler(handle, _identity, _identity),
+                "Sync": grpc.unary_unary_rpc_method_handler(lambda request, context: request, _identity, _identity),
+            })
+            with futures.ThreadPoolExecutor(max_workers=1) as pool:
+                server = grpc.aio.server(migration_thread_pool=pool,
+                                         interceptors=metrics.aio_server_interceptors("metrics_aio_test"))
+                server.add_generic_rpc_handlers((handler,))
+                port = server.add_insecure_port("localhost:0")
+                await server.start()
+                try:
+                    async with grpc.aio.insecure_channel(f"localhost:{port}") as channel:
+                        self.assertEqual(await channel.unary_unary("/test.AioEcho/Async")(b"ping", timeout=5), b"ping")
+                        with self.assertRaises(grpc.RpcError):
+                            await channel.unary_unary("/test.AioEcho/Async")(b"fail", timeout=5)
+                        self.assertEqual(await channel.unary_unary("/test.AioEcho/Sync")(b"ping", timeout=5), b"ping")
+                finally:
+                    await server.stop(0)
+
+        asyncio.run(run())
+        body = metrics.REGISTRY.render()
+        self.assertIn('revo_grpc_server_handled_total{service="metrics_aio_test",method="Async",code="OK"} 1', body)
+        self.assertIn('revo_grpc_server_handled_total{service="metrics_aio_test",method="Async",'
+                      'code="INVALID_ARGUMENT"} 1', body)
+        self.assertIn('revo_grpc_server_handled_total{service="metrics_aio_test",method="Sync",code="OK"} 1', body)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,236 @@
+# observability/sessions.py
+
+"""
+Per-session resource and latency statistics for the services that keep
+per-caller state (StreamingDataManager, SpeechToTextService), listed by the
+admin service's ListSessions RPC.
+
+    SESSIONS = sessions.SessionRegistry("speech_to_text")
+    ...
+    SESSIONS.session(request.session_id).record_frame(len(request.data))
+
+Each `SessionStats` is a fixed-size object: counters in `__slots__` and the
+latencies of the last SESSION_LATENCY_WINDOW turns in a preallocated ring
+(`array('d')`), so a long call costs the same memory as a short one. The
+registry holds at most SESSION_STATS_MAX_SESSIONS sessions; when it is full,
+the least recently active session is evicted (and, while the reaper runs,
+released through its `on_evict` like an idle one).
+
+Sessions idle for SESSION_IDLE_TTL_SECONDS are evicted by `reap()`, which
+`start_reaper(on_evict)` runs from a daemon thread; `on_evict(stats)` lets
+the service release what it holds for the session (a Deepgram stream, an
+open recording file). Expiry uses a min-heap of deadlines with one entry per
+session, pushed when the session is created. Recording activity never
+touches the heap: when an entry comes due, the session's `last_activity`
+decides whether it is evicted or re-armed at `last_activity + TTL`. A pass
+therefore costs O(log n) per due entry rather than a scan of all sessions,
+and each session is looked at about once per TTL.
+"""
+
+import array
+import collections
+import heapq
+import itertools
+import math
+import threading
+import time
+
+from . import config, logs, metrics
+
+log = logs.get_logger("sessions")
+
+SESSIONS_TRACKED = metrics.gauge("revo_sessions_tracked", "Sessions with live statistics.", ("service",))
+SESSIONS_EVICTED = metrics.counter(
+    "revo_sessions_evicted_total", "Sessions evicted, by reason (capacity, idle).", ("service", "reason"))
+REAP_SECONDS = metrics.histogram("revo_sessions_reap_seconds", "Duration of an idle-session reaper pass.", ("service",))
+
+
+class SessionStats:
+    """Counters and a turn-latency ring for one session. Updated without a lock; readers get a near snapshot."""
+
+    __slots__ = ("session_id", "created", "last_activity", "bytes_in", "frames_in", "turns", "state",
+                 "_latencies", "_window")
+
+    def __init__(self, session_id: str, latency_window: int = 32):
+        self.session_id = session_id
+        self.created = self.last_activity = time.time()
+        self.bytes_in = 0
+        self.frames_in = 0
+        self.turns = 0
+        self.state = "" # Service-specific, e.g. the Deepgram connection state in STT
+        self._window = latency_window
+        self._latencies = array.array("d", bytes(8 * latency_window))
+
+    def record_frame(self, nbytes: int):
+        self.frames_in += 1
+        self.bytes_in += nbytes
+        self.last_activity = time.time()
+
+    def record_turn(self, latency_seconds: float):
+        """Counts a completed turn; its latency replaces the oldest one in the ring."""
+        self._latencies[self.turns % self._window] = latency_seconds
+        self.turns += 1
+        self.last_activity = time.time()
+
+    def latencies(self) -> list:
+        """Latencies of the last (up to) `latency_window` turns, oldest first."""
+        turns, window = self.turns, self._window
+        if turns <= window:
+            return list(self._latencies[:turns])
+        start = turns % window
+        return list(self._latencies[start:]) + list(self._latencies[:start])
+
+    def latency_percentiles(self, percentiles=(50, 90, 99)) -> tuple:
+        """Nearest-rank percentiles over the latency window; zeros before the first turn."""
+        values = sorted(self.latencies())
+        if not values:
+            return tuple(0.0 for _ in percentiles)
+        return tuple(values[max(1, math.ceil(p / 100.0 * len(values))) - 1] for p in percentiles)
+
+
+class SessionRegistry:
+    """Live SessionStats by session id, least recently active first."""
+
+    def __init__(self, service: str, max_sessions: int = None, latency_window: int = None, queue_depth=None,
+                 idle_ttl_seconds: float = None):
+        self.service = service
+        self.max_sessions = max_sessions or config.SESSION_STATS_MAX_SESSIONS
+        self.latency_window = latency_window or config.SESSION_LATENCY_WINDOW
+        # Optional queue_depth(session_id) -> int, evaluated only when sessions are listed.
+        self.queue_depth = queue_depth
+        # 0 keeps idle sessions until they are removed or evicted for capacity.
+        self.idle_ttl_seconds = config.SESSION_IDLE_TTL_SECONDS if idle_ttl_seconds is None else idle_ttl_seconds
+        self._sessions = collections.OrderedDict()
+        self._lock = threading.Lock()
+        self._expiry = [] # Min-heap of (deadline, tiebreak, SessionStats), guarded by _lock
+        self._tiebreak = itertools.count()
+        self._reaper = None
+        self._reaper_stop = threading.Event()
+        # Sessions evicted for capacity, for the reaper's on_evict; collected only while it runs. Guarded by _lock.
+        self._capacity_evicted = None
+        self._evicted_capacity = SESSIONS_EVICTED.labels(service, "capacity").inc
+        self._evicted_idle = SESSIONS_EVICTED.labels(service, "idle").inc
+        self._reap_seconds = REAP_SECONDS.labels(service)
+        SESSIONS_TRACKED.labels(service).set_function(self.__len__)
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def session(self, session_id: str) -> SessionStats:
+        """The stats of `session_id`, created if new; marks it most recently active."""
+        with self._lock:
+            stats = self._sessions.get(session_id)
+            if stats is None:
+                stats = self._sessions[session_id] = SessionStats(session_id, self.latency_window)
+                if self.idle_ttl_seconds > 0:
+                    heapq.heappush(self._expiry, (stats.created + self.idle_ttl_seconds, next(self._tiebreak), stats))
+                if len(self._sessions) > self.max_sessions:
+                    _, evicted = self._sessions.popitem(last=False)
+                    self._evicted_capacity()
+                    if self._capacity_evicted is not None:
+                        self._capacity_evicted.append(evicted)
+            else:
+                self._sessions.move_to_end(session_id)
+        return stats
+
+    def get(self, session_id: str) -> SessionStats:
+        """The stats of `session_id`, or None; does not create or reorder."""
+        return self._sessions.get(session_id)
+
+    def remove(self, session_id: str) -> SessionStats:
+        with self._lock:
+            return self._sessions.pop(session_id, None)
+
+    def snapshot(self) -> list:
+        """All SessionStats, least recently active first."""
+        with self._lock:
+            return list(self._sessions.values())
+
+    def reap(self, now: float = None) -> list:
+        """Removes and returns the sessions idle for at least the TTL as of `now` (time.time())."""
+        if self.idle_ttl_seconds <= 0:
+            return []
+        now = time.time() if now is None else now
+        ttl = self.idle_ttl_seconds
+        evicted = []
+        with self._lock:
+            expiry = self._expiry
+            while expiry and expiry[0][0] <= now:
+                _, _, stats = heapq.heappop(expiry)
+                if self._sessions.get(stats.session_id) is not stats:
+                    continue # Removed (or removed and recreated) since it was scheduled
+                deadline = stats.last_activity + ttl
+                if deadline > now:
+                    heapq.heappush(expiry, (deadline, next(self._tiebreak), stats)) # Active since; re-arm
+                else:
+                    del self._sessions[stats.session_id]
+                    evicted.append(stats)
+        for _ in evicted:
+            self._evicted_idle()
+        return evicted
+
+    def take_capacity_evicted(self) -> list:
+        """Removes and returns the sessions evicted for capacity since the last call (while the reaper runs)."""
+        with self._lock:
+            evicted = self._capacity_evicted
+            if not evicted:
+                return []
+            self._capacity_evicted = []
+        return evicted
+
+    def start_reaper(self, on_evict=None, interval_seconds: float = None):
+        """
+        Runs reap() every `interval_seconds` (SESSION_REAPER_INTERVAL_SECONDS) on
+        a daemon thread and calls `on_evict(stats)` for each evicted session:
+        idle ones, and those evicted for capacity since the last pass (with a
+        TTL of 0, only those).
+        """
+        if self._reaper and self._reaper.is_alive():
+            return
+        interval_seconds = interval_seconds or config.SESSION_REAPER_INTERVAL_SECONDS
+        with self._lock:
+            self._capacity_evicted = []
+        self._reaper_stop.clear()
+        self._reaper = threading.Thread(target=self._run_reaper, args=(on_evict, interval_seconds),
+                                        name=f"session-reaper-{self.service}", daemon=True)
+        self._reaper.start()
+
+    def stop_reaper(self):
+        self._reaper_stop.set()
+        if self._reaper:
+            self._reaper.join(timeout=5)
+            self._reaper = None
+        with self._lock:
+            self._capacity_evicted = None
+
+    def _run_reaper(self, on_evict, interval_seconds: float):
+        while not self._reaper_stop.wait(interval_seconds):
+            with self._reap_seconds.time():
+                evicted = self.reap()
+            for stats in self.take_capacity_evicted():
+                log.info("lifecycle", "Evicting least recently active session at capacity (%d sessions; %d frames, "
+                         "%d turns)", self.max_sessions, stats.frames_in, stats.turns,
+                         session_id=stats.session_id, stage=self.service)
+                self._release(on_evict, stats)
+            for stats in evicted:
+                log.info("lifecycle", "Evicting session idle for %.0f s (%d frames, %d turns)",
+                         time.time() - stats.last_activity, stats.frames_in, stats.turns,
+                         session_id=stats.session_id, stage=self.service)
+                self._release(on_evict, stats)
+
+    def _release(self, on_evict, stats: SessionStats):
+        if on_evict is None or self._sessions.get(stats.session_id) is not None:
+            return # Or the caller came back since: what the service holds is the new session's
+        try:
+            on_evict(stats)
+        except Exception as e:
+            log.error("lifecycle", "Releasing evicted session failed: %s", e,
+                      session_id=stats.session_id, stage=self.service)
+
+    def queue_depth_of(self, session_id: str) -> int:
+        if self.queue_depth is None:
+            return 0
+        try:
+            return self.queue_depth(session_id)
+        except Exception:
+            return 0
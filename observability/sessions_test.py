@@ -0,0 +1,123 @@
+import threading
+import unittest
+
+from observability import sessions
+
+
+class TestSessionStats(unittest.TestCase):
+
+    def test_latency_ring_keeps_the_last_window_of_turns(self):
+        stats = sessions.SessionStats("call-1", latency_window=4)
+        self.assertEqual(stats.latency_percentiles(), (0.0, 0.0, 0.0))
+        for latency in (0.1, 0.2, 0.3):
+            stats.record_turn(latency)
+        self.assertEqual(stats.latencies(), [0.1, 0.2, 0.3])
+        for latency in (0.4, 0.5, 0.6):
+            stats.record_turn(latency)
+        self.assertEqual(stats.turns, 6)
+        self.assertEqual(stats.latencies(), [0.3, 0.4, 0.5, 0.6])
+        self.assertEqual(stats.latency_percentiles((50, 90, 99)), (0.4, 0.6, 0.6))
+
+    def test_record_frame_counts_bytes_and_activity(self):
+        stats = sessions.SessionStats("call-1")
+        created = stats.last_activity
+        stats.record_frame(160)
+        stats.record_frame(160)
+        self.assertEqual((stats.frames_in, stats.bytes_in), (2, 320))
+        self.assertGreaterEqual(stats.last_activity, created)
+
+
+class TestSessionRegistry(unittest.TestCase):
+
+    def test_least_recently_active_session_is_evicted_when_full(self):
+        registry = sessions.SessionRegistry("test_registry", max_sessions=2)
+        registry.session("a")
+        registry.session("b")
+        registry.session("a") # "b" is now the least recently active
+        registry.session("c")
+        self.assertEqual([s.session_id for s in registry.snapshot()], ["a", "c"])
+        self.assertIsNone(registry.get("b"))
+        self.assertEqual(sessions.SESSIONS_EVICTED.labels("test_registry", "capacity").value(), 1)
+
+    def test_queue_depth_function_errors_read_as_zero(self):
+        registry = sessions.SessionRegistry("test_queue", queue_depth=lambda session_id: {"a": 3}[session_id])
+        self.assertEqual(registry.queue_depth_of("a"), 3)
+        self.assertEqual(registry.queue_depth_of("missing"), 0)
+
+
+class TestIdleReaper(unittest.TestCase):
+
+    def test_reap_evicts_idle_sessions_and_rearms_active_ones(self):
+        registry = sessions.SessionRegistry("test_reap", idle_ttl_seconds=60)
+        idle, active = registry.session("idle"), registry.session("active")
+        start = idle.created
+        active.last_activity = start + 50 # Activity after it was scheduled
+        self.assertEqual(registry.reap(now=start + 30), [])
+        self.assertEqual(registry.reap(now=start + 61), [idle])
+        self.assertEqual([s.session_id for s in registry.snapshot()], ["active"])
+        self.assertEqual(registry.reap(now=start + 100), [])
+        self.assertEqual(registry.reap(now=start + 111), [active])
+        self.assertEqual(len(registry), 0)
+        self.assertEqual(sessions.SESSIONS_EVICTED.labels("test_reap", "idle").value(), 2)
+
+    def test_removed_and_recreated_sessions_are_not_reaped_early(self):
+        registry = sessions.SessionRegistry("test_recreate", idle_ttl_seconds=60)
+        old = registry.session("call")
+        registry.remove("call")
+        new = registry.session("call")
+        new.created = new.last_activity = old.created + 30
+        self.assertEqual(registry.reap(now=old.created + 61), []) # Only the old, stale entry was due
+        self.assertIs(registry.get("call"), new)
+
+    def test_due_entries_only_are_visited(self):
+        registry = sessions.SessionRegistry("test_scale", max_sessions=20000, idle_ttl_seconds=60)
+        for i in range(10000):
+            registry.session(f"call-{i}")
+        first = registry.get("call-0").created
+        self.assertEqual(registry.reap(now=first + 1), [])
+        self.assertEqual(len(registry._expiry), 10000)
+        self.assertEqual(len(registry.reap(now=first + 3600)), 10000)
+        self.assertEqual(registry._expiry, [])
+
+    def test_zero_ttl_disables_eviction(self):
+        registry = sessions.SessionRegistry("test_no_ttl", idle_ttl_seconds=0)
+        stats = registry.session("call")
+        self.assertEqual(registry.reap(now=stats.created + 10 ** 6), [])
+        self.assertEqual(registry._expiry, [])
+
+    def test_reaper_thread_calls_on_evict(self):
+        registry = sessions.SessionRegistry("test_thread", idle_ttl_seconds=0.05)
+        evicted = threading.Event()
+        registry.session("call")
+        registry.start_reaper(on_evict=lambda stats: evicted.set(), interval_seconds=0.01)
+        try:
+            self.assertTrue(evicted.wait(5))
+        finally:
+            registry.stop_reaper()
+        self.assertIsNone(registry.get("call"))
+
+    def test_sessions_evicted_for_capacity_are_released_by_the_reaper(self):
+        registry = sessions.SessionRegistry("test_capacity_release", max_sessions=2, idle_ttl_seconds=0)
+        released = []
+        done = threading.Event()
+
+        def on_evict(stats):
+            released.append(stats.session_id)
+            if len(released) == 3:
+                done.set()
+
+        registry.start_reaper(on_evict=on_evict, interval_seconds=0.01) # Runs with a TTL of 0 too
+        try:
+            for session_id in ("first", "second", "third", "fourth", "fifth"):
+                registry.session(session_id)
+            self.assertTrue(done.wait(5))
+        finally:
+            registry.stop_reaper()
+        self.assertEqual(released, ["first", "second", "third"])
+        self.assertEqual([s.session_id for s in registry.snapshot()], ["fourth", "fifth"])
+        registry.session("sixth") # The reaper is stopped: nothing is kept for it
+        self.assertEqual(registry.take_capacity_evicted(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+# observability/trace_report.py
+
+"""
+Summarises span files written by observability.tracing.
+
+A turn's trace holds one call chain per audio segment. For the turns with the
+slowest chain (normally the `is_final` segment, which waits for the final
+transcript and runs NLU -> DM -> TTS), prints that chain's span tree with
+durations so the slow hop stands out; also prints per-span-name latency
+percentiles across all traces.
+
+Example:
+    python -m observability.trace_report traces/ --top 5
+"""
+
+import argparse
+import glob
+import json
+import math
+import os
+
+
+def load_spans(paths: list) -> dict:
+    """Returns {trace_id: [span, ...]} from span files and/or directories of them."""
+    files = []
+    for path in paths:
+        files.extend(sorted(glob.glob(os.path.join(path, "*.jsonl"))) if os.path.isdir(path) else [path])
+    traces = {}
+    for file_path in files:
+        with open(file_path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    span = json.loads(line)
+                    traces.setdefault(span["trace_id"], []).append(span)
+    return traces
+
+
+def _percentile(sorted_values: list, p: float) -> float:
+    rank = max(1, math.ceil(p / 100.0 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def _roots_and_children(spans: list):
+    """Spans whose parent is not in the trace are roots (e.g. one per audio segment of a turn)."""
+    by_id = {s["span_id"]: s for s in spans}
+    children = {}
+    roots = []
+    for s in spans:
+        if s["parent_id"] in by_id:
+            children.setdefault(s["parent_id"], []).append(s)
+        else:
+            roots.append(s)
+    return roots, children
+
+
+def slowest_root(spans: list) -> dict:
+    """The longest root span; for a turn this is the segment whose call chain took longest."""
+    roots, _ = _roots_and_children(spans)
+    return max(roots, key=lambda r: r["duration_ns"])
+
+
+def format_tree(spans: list, root: dict) -> list:
+    """The subtree under `root` as indented lines with start offsets and durations."""
+    _, children = _roots_and_children(spans)
+    lines = []
+
+    def visit(span, depth):
+        offset_ms = (span["start_ns"] - root["start_ns"]) / 1e6
+        error = f"  ERROR {span['error']}" if span.get("error") else ""
+        label = f"{'  ' * depth}{span['service']}:{span['name']}"
+        lines.append(f"{label:<64} +{offset_ms:9.2f} ms {span['duration_ns'] / 1e6:9.2f} ms{error}")
+        for child in sorted(children.get(span["span_id"], []), key=lambda c: c["start_ns"]):
+            visit(child, depth + 1)
+
+    visit(root, 0)
+    return lines
+
+
+def name_summary(traces: dict) -> dict:
+    by_name = {}
+    for spans in traces.values():
+        for s in spans:
+            by_name.setdefault(f"{s['service']}:{s['name']}", []).append(s["duration_ns"] / 1e6)
+    summary = {}
+    for name, values in by_name.items():
+        values.sort()
+        summary[name] = {"count": len(values), "p50": _percentile(values, 50),
+                         "p95": _percentile(values, 95), "max": values[-1]}
+    return summary
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Summarise per-turn trace spans.")
+    parser.add_argument("paths", nargs="+", help="Span files or directories (TRACE_DIR).")
+    parser.add_argument("--top", type=int, default=3, help="Slowest traces to print in full.")
+    parser.add_argument("--session", help="Only traces with a span for this session_id.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    traces = load_spans(args.paths)
+    if args.session:
+        traces = {t: spans for t, spans in traces.items()
+                  if any(s.get("attrs", {}).get("session_id") == args.session for s in spans)}
+    if not traces:
+        print("No spans found.")
+        return
+    print(f"{len(traces)} traces")
+    print("Span latency (ms):")
+    for name, s in sorted(name_summary(traces).items(), key=lambda item: -item[1]["p95"]):
+        print(f"  {name:<48} n={s['count']:<7} p50={s['p50']:9.2f} p95={s['p95']:9.2f} max={s['max']:9.2f}")
+    slowest = sorted(((trace_id, spans, slowest_root(spans)) for trace_id, spans in traces.items()),
+                     key=lambda item: -item[2]["duration_ns"])[:args.top]
+    for trace_id, spans, root in slowest:
+        roots, _ = _roots_and_children(spans)
+        print(f"\nTrace {trace_id}: slowest call chain {root['duration_ns'] / 1e6:.2f} ms "
+              f"({len(roots)} call chains, {len(spans)} spans)")
+        for line in format_tree(spans, root):
+            print("  " + line)
+
+
+if __name__ == "__main__":
+    main()
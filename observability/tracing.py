@@ -0,0 +1,380 @@
+# observability/tracing.py
+
+"""
+Lightweight per-turn distributed tracing for the gRPC services.
+
+A turn (caller speech -> StreamingDataManager -> STT -> NLU -> DM -> TTS) is
+one trace. The trace context travels between services in the W3C-style
+`traceparent` gRPC metadata entry (`00-<trace id>-<parent span id>-<flags>`):
+
+* `server_interceptors()` (`aio_server_interceptors()` for grpc.aio servers)
+  continues the caller's trace (or starts a new one) and records a span per
+  RPC.
+* `intercept_channel(channel)` adds the current trace context to outgoing
+  calls and records a client span per call.
+* `span(name)` / `record_span(...)` record work inside a service, e.g.
+  Dialogflow `detect_intent` or a Deepgram connect.
+
+Sampling is decided once per trace, at its root, and carried in the
+`traceparent` flags, so a turn is either recorded in every service or in none.
+Unsampled turns only propagate the context. Recorded spans are queued and
+written as JSON lines by a background thread, one file per process:
+    {"trace_id": "...", "span_id": "...", "parent_id": "...", "service": "nlu",
+     "name": "dialogflow.detect_intent", "start_ns": ..., "duration_ns": ...,
+     "attrs": {...}, "error": "..."}
+Use `python -m observability.trace_report TRACE_DIR` to find the slow hop of
+the slowest turns.
+
+Tracing is off unless `init_tracer()` is called with a sample rate above 0
+(TRACE_SAMPLE_RATE); when off, every function here is a cheap no-op and no
+interceptors are installed.
+"""
+
+import collections
+import contextlib
+import contextvars
+import inspect
+import json
+import os
+import random
+import threading
+import time
+
+import grpc
+
+from . import config, logs
+
+log = logs.get_logger("tracing")
+
+TRACEPARENT_KEY = "traceparent"
+
+SpanContext = collections.namedtuple("SpanContext", ["trace_id", "span_id", "sampled"])
+
+_current = contextvars.ContextVar("revo_trace_context", default=None)
+_tracer = None # Set by init_tracer()
+
+
+def _new_trace_id() -> str:
+    return "%032x" % random.getrandbits(128)
+
+
+def _new_span_id() -> str:
+    return "%016x" % random.getrandbits(64)
+
+
+def format_traceparent(ctx: SpanContext) -> str:
+    return f"00-{ctx.trace_id}-{ctx.span_id}-{'01' if ctx.sampled else '00'}"
+
+
+def parse_traceparent(value: str):
+    """Returns the SpanContext encoded in a traceparent value, or None if it is malformed."""
+    parts = value.split("-") if value else ()
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    return SpanContext(parts[1], parts[2], parts[3] == "01")
+
+
+def current() -> SpanContext:
+    """The trace context of the code running now (None outside a traced call)."""
+    return _current.get()
+
+
+class SpanCollector:
+    """
+    Queues finished spans and writes them as JSON lines from a background thread.
+    Recording a span only appends a tuple to a deque; formatting and I/O happen
+    off the request path. When the queue is full, spans are dropped and counted.
+    """
+
+    def __init__(self, path: str, max_queued: int = 10000, flush_interval_seconds: float = 0.5):
+        self.path = path
+        self.max_queued = max_queued
+        self.flush_interval_seconds = flush_interval_seconds
+        self.dropped = 0
+        self.written = 0
+        self._queue = collections.deque()
+        self._stop_event = threading.Event()
+        self._write_lock = threading.Lock()
+        self._thread = None
+
+    def record(self, span: tuple):
+        if len(self._queue) >= self.max_queued:
+            self.dropped += 1
+            return
+        self._queue.append(span)
+
+    def flush(self):
+        with self._write_lock:
+            if not self._queue:
+                return
+            lines = []
+            while self._queue:
+                trace_id, span_id, parent_id, service, name, start_ns, end_ns, attrs, error = self._queue.popleft()
+                record = {
+                    "trace_id": trace_id,
+                    "span_id": span_id,
+                    "parent_id": parent_id,
+                    "service": service,
+                    "name": name,
+                    "start_ns": start_ns,
+                    "duration_ns": end_ns - start_ns,
+                }
+                if attrs:
+                    record["attrs"] = attrs
+                if error:
+                    record["error"] = error
+                lines.append(json.dumps(record, separators=(",", ":")))
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write("\n".join(lines) + "\n")
+            self.written += len(lines)
+
+    def _run(self):
+        while not self._stop_event.wait(self.flush_interval_seconds):
+            try:
+                self.flush()
+            except OSError as e:
+                log.error("tracing", "SpanCollector: Failed to write spans to %s: %s", self.path, e)
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="span-collector", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join(timeout=5)
+            self._thread = None
+        self.flush()
+
+
+class Tracer:
+    """Creates trace contexts and records spans for one service."""
+
+    def __init__(self, service: str, sample_rate: float, collector: SpanCollector):
+        self.service = service
+        self.sample_rate = sample_rate
+        self.collector = collector
+
+    def new_trace(self) -> SpanContext:
+        """Context for a new root; the sampling decision is made here."""
+        return SpanContext(_new_trace_id(), _new_span_id(), random.random() < self.sample_rate)
+
+    @contextlib.contextmanager
+    def span(self, name: str, parent: SpanContext = None, attrs: dict = None):
+        parent = parent or _current.get()
+        if parent is None:
+            parent = self.new_trace()
+            parent_id = ""
+        else:
+            parent_id = parent.span_id
+        if not parent.sampled:
+            token = _current.set(parent) # Still propagate the trace id downstream
+            try:
+                yield parent
+            finally:
+                _current.reset(token)
+            return
+        ctx = SpanContext(parent.trace_id, _new_span_id(), True)
+        token = _current.set(ctx)
+        start_ns = time.time_ns()
+        error = ""
+        try:
+            yield ctx
+        except BaseException as e:
+            error = type(e).__name__
+            raise
+        finally:
+            _current.reset(token)
+            self.collector.record((ctx.trace_id, ctx.span_id, parent_id, self.service, name,
+                                   start_ns, time.time_ns(), attrs, error))
+
+    def record_span(self, name: str, start_ns: int, end_ns: int, parent: SpanContext, attrs: dict = None,
+                    error: str = ""):
+        """Records a span measured elsewhere, e.g. from an async callback."""
+        if parent is None or not parent.sampled:
+            return
+        self.collector.record((parent.trace_id, _new_span_id(), parent.span_id, self.service, name,
+                               start_ns, end_ns, attrs, error))
+
+
+class _ClientCallDetails(
+        collections.namedtuple("_ClientCallDetails",
+                               ["method", "timeout", "metadata", "credentials", "wait_for_ready", "compression"]),
+        grpc.ClientCallDetails):
+    pass
+
+
+class TracingClientInterceptor(grpc.UnaryUnaryClientInterceptor):
+    """Sends the current trace context with each call and records a client span when sampled."""
+
+    def __init__(self, tracer: Tracer):
+        self.tracer = tracer
+
+    def intercept_unary_unary(self, continuation, client_call_details, request):
+        ctx = _current.get()
+        if ctx is None:
+            return continuation(client_call_details, request)
+        method = client_call_details.method.rsplit("/", 1)[-1]
+        with self.tracer.span(f"call {method}") as call_ctx:
+            metadata = list(client_call_details.metadata or ())
+            metadata.append((TRACEPARENT_KEY, format_traceparent(call_ctx)))
+            details = _ClientCallDetails(
+                client_call_details.method, client_call_details.timeout, metadata,
+                client_call_details.credentials, client_call_details.wait_for_ready,
+                client_call_details.compression,
+            )
+            return continuation(details, request)
+
+
+class TracingServerInterceptor(grpc.ServerInterceptor):
+    """
+    Continues the caller's trace (from `traceparent`) for each unary RPC, or
+    starts one. `root_context(request)` may supply the context for calls that
+    arrive without one, e.g. to group all frames of a turn into one trace.
+    """
+
+    def __init__(self, tracer: Tracer, root_context=None):
+        self.tracer = tracer
+        self.root_context = root_context
+
+    def intercept_service(self, continuation, handler_call_details):
+        return self._traced(continuation(handler_call_details), handler_call_details)
+
+    def _traced(self, handler, handler_call_details):
+        """`handler` with its unary behavior in a span; coroutine behaviors (grpc.aio) stay coroutines."""
+        if handler is None or handler.unary_unary is None:
+            return handler
+        method = handler_call_details.method.rsplit("/", 1)[-1]
+        parent = None
+        for key, value in handler_call_details.invocation_metadata or ():
+            if key == TRACEPARENT_KEY:
+                parent = parse_traceparent(value)
+                break
+        behavior = handler.unary_unary
+        tracer = self.tracer
+        root_context = self.root_context
+
+        def server_span(request):
+            ctx = parent or (root_context(request) if root_context else None) or tracer.new_trace()
+            session_id = getattr(request, "session_id", "")
+            return tracer.span(method, parent=ctx, attrs={"session_id": session_id} if ctx.sampled and session_id else None)
+
+        if inspect.iscoroutinefunction(behavior):
+            async def traced(request, context):
+                with server_span(request): # The RPC's own task, so the context does not leak into others
+                    return await behavior(request, context)
+        else:
+            def traced(request, context):
+                with server_span(request):
+                    return behavior(request, context)
+
+        return grpc.unary_unary_rpc_method_handler(
+            traced,
+            request_deserializer=handler.request_deserializer,
+            response_serializer=handler.response_serializer,
+        )
+
+
+class AioTracingServerInterceptor(TracingServerInterceptor, grpc.aio.ServerInterceptor):
+    """TracingServerInterceptor for grpc.aio servers."""
+
+    async def intercept_service(self, continuation, handler_call_details):
+        return self._traced(await continuation(handler_call_details), handler_call_details)
+
+
+class TurnContexts:
+    """
+    One trace per caller turn for services at the edge (StreamingDataManager):
+    all segments of a session share a trace until the `is_final` segment, after
+    which the next segment starts a new turn. Bounded, oldest sessions first out.
+    """
+
+    def __init__(self, tracer: Tracer, max_sessions: int = 10000):
+        self.tracer = tracer
+        self.max_sessions = max_sessions
+        self._contexts = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def context_for(self, request) -> SpanContext:
+        session_id = getattr(request, "session_id", "")
+        with self._lock:
+            ctx = self._contexts.get(session_id)
+            if ctx is None:
+                ctx = self.tracer.new_trace()
+                self._contexts[session_id] = ctx
+                if len(self._contexts) > self.max_sessions:
+                    self._contexts.popitem(last=False)
+            if getattr(request, "is_final", False):
+                del self._contexts[session_id]
+        return ctx
+
+
+def init_tracer(service: str, sample_rate: float = None, trace_dir: str = None) -> Tracer:
+    """
+    Enables tracing for this process (no-op when the sample rate is 0) and
+    returns the tracer, or None when tracing is off. Defaults come from
+    observability.config.
+    """
+    global _tracer
+    sample_rate = config.TRACE_SAMPLE_RATE if sample_rate is None else sample_rate
+    if sample_rate <= 0:
+        return None
+    trace_dir = trace_dir or config.TRACE_DIR
+    os.makedirs(trace_dir, exist_ok=True)
+    collector = SpanCollector(
+        os.path.join(trace_dir, f"{service}-{os.getpid()}.jsonl"),
+        max_queued=config.TRACE_MAX_QUEUED_SPANS,
+        flush_interval_seconds=config.TRACE_FLUSH_INTERVAL_SECONDS,
+    )
+    collector.start()
+    _tracer = Tracer(service, min(sample_rate, 1.0), collector)
+    log.info("lifecycle", "Tracing enabled for %s: sample rate %s, spans in %s", service, _tracer.sample_rate, collector.path)
+    return _tracer
+
+
+def shutdown():
+    """Writes out queued spans and disables tracing."""
+    global _tracer
+    if _tracer:
+        _tracer.collector.stop()
+        _tracer = None
+
+
+def get_tracer() -> Tracer:
+    return _tracer
+
+
+def server_interceptors(root_context=None) -> list:
+    """Interceptors to pass to grpc.server(); empty when tracing is off."""
+    if _tracer is None:
+        return []
+    return [TracingServerInterceptor(_tracer, root_context)]
+
+
+def aio_server_interceptors(root_context=None) -> list:
+    """server_interceptors() for grpc.aio.server()."""
+    if _tracer is None:
+        return []
+    return [AioTracingServerInterceptor(_tracer, root_context)]
+
+
+def intercept_channel(channel):
+    """Wraps a client channel so calls carry the trace context; unchanged when tracing is off."""
+    if _tracer is None:
+        return channel
+    return grpc.intercept_channel(channel, TracingClientInterceptor(_tracer))
+
+
+def span(name: str, attrs: dict = None):
+    """Context manager recording `name` as a child of the current span (no-op when off)."""
+    if _tracer is None or _current.get() is None:
+        return contextlib.nullcontext()
+    return _tracer.span(name, attrs=attrs)
+
+
+def record_span(name: str, start_ns: int, end_ns: int, parent: SpanContext, attrs: dict = None, error: str = ""):
+    if _tracer is not None:
+        _tracer.record_span(name, start_ns, end_ns, parent, attrs, error)
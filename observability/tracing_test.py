@@ -0,0 +1,205 @@
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from concurrent import futures
+
+import grpc
+
+from observability import tracing
+
+
+def _identity(value):
+    return value
+
+
+class TestTraceparent(unittest.TestCase):
+
+    def test_round_trip(self):
+        ctx = tracing.SpanContext("a" * 32, "b" * 16, True)
+        self.assertEqual(tracing.parse_traceparent(tracing.format_traceparent(ctx)), ctx)
+        unsampled = ctx._replace(sampled=False)
+        self.assertEqual(tracing.parse_traceparent(tracing.format_traceparent(unsampled)), unsampled)
+
+    def test_malformed_values_are_ignored(self):
+        for value in ("", "garbage", "00-abc-def-01", None):
+            self.assertIsNone(tracing.parse_traceparent(value))
+
+
+class TestTracer(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.collector = tracing.SpanCollector(os.path.join(self.tmp_dir, "spans.jsonl"))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def _written_spans(self):
+        self.collector.flush()
+        with open(self.collector.path, "r", encoding="utf-8") as f:
+            return [json.loads(line) for line in f]
+
+    def test_nested_spans_share_the_trace_and_link_parents(self):
+        tracer = tracing.Tracer("svc", 1.0, self.collector)
+        root = tracer.new_trace()
+        with tracer.span("outer", parent=root) as outer:
+            self.assertEqual(tracing.current(), outer)
+            with tracer.span("inner", attrs={"k": "v"}) as inner:
+                self.assertEqual(inner.trace_id, root.trace_id)
+        self.assertIsNone(tracing.current())
+
+        spans = {s["name"]: s for s in self._written_spans()}
+        self.assertEqual(spans["outer"]["parent_id"], root.span_id)
+        self.assertEqual(spans["inner"]["parent_id"], outer.span_id)
+        self.assertEqual(spans["inner"]["attrs"], {"k": "v"})
+        self.assertGreaterEqual(spans["outer"]["duration_ns"], spans["inner"]["duration_ns"])
+
+    def test_unsampled_trace_propagates_context_but_records_nothing(self):
+        tracer = tracing.Tracer("svc", 0.0, self.collector)
+        root = tracer.new_trace()
+        self.assertFalse(root.sampled)
+        with tracer.span("work", parent=root):
+            self.assertEqual(tracing.current(), root)
+        tracer.record_span("external", 1, 2, root)
+        self.collector.flush()
+        self.assertFalse(os.path.exists(self.collector.path))
+
+    def test_errors_are_recorded(self):
+        tracer = tracing.Tracer("svc", 1.0, self.collector)
+        with self.assertRaises(ValueError):
+            with tracer.span("failing", parent=tracer.new_trace()):
+                raise ValueError("boom")
+        self.assertEqual(self._written_spans()[0]["error"], "ValueError")
+
+    def test_collector_drops_spans_when_full(self):
+        collector = tracing.SpanCollector(os.path.join(self.tmp_dir, "small.jsonl"), max_queued=2)
+        tracer = tracing.Tracer("svc", 1.0, collector)
+        root = tracer.new_trace()
+        for i in range(5):
+            tracer.record_span(f"s{i}", 0, 1, root)
+        collector.flush()
+        self.assertEqual(collector.written, 2)
+        self.assertEqual(collector.dropped, 3)
+
+    def test_turn_contexts_start_a_new_trace_after_the_final_segment(self):
+        tracer = tracing.Tracer("svc", 1.0, self.collector)
+        turns = tracing.TurnContexts(tracer)
+
+        class Segment:
+            def __init__(self, session_id, is_final=False):
+                self.session_id = session_id
+                self.is_final = is_final
+
+        first = turns.context_for(Segment("s1"))
+        self.assertEqual(turns.context_for(Segment("s1")), first)
+        self.assertNotEqual(turns.context_for(Segment("s2")), first)
+        self.assertEqual(turns.context_for(Segment("s1", is_final=True)), first)
+        self.assertNotEqual(turns.context_for(Segment("s1")).trace_id, first.trace_id)
+
+
+class TestInterceptors(unittest.TestCase):
+    """A client -> server hop in one process, with tracing on both sides."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.tracer = tracing.init_tracer("test", sample_rate=1.0, trace_dir=self.tmp_dir)
+        self.seen = []
+
+        def handle(request, context):
+            self.seen.append(tracing.current())
+            return request
+
+        handler = grpc.method_handlers_generic_handler("test.Echo", {
+            "Call": grpc.unary_unary_rpc_method_handler(handle, _identity, _identity),
+        })
+        self.server = grpc.server(futures.ThreadPoolExecutor(max_workers=2),
+                                  interceptors=tracing.server_interceptors())
+        self.server.add_generic_rpc_handlers((handler,))
+        port = self.server.add_insecure_port("localhost:0")
+        self.server.start()
+        self.channel = grpc.insecure_channel(f"localhost:{port}")
+        self.call = tracing.intercept_channel(self.channel).unary_unary("/test.Echo/Call")
+
+    def tearDown(self):
+        self.channel.close()
+        self.server.stop(0)
+        tracing.shutdown()
+        shutil.rmtree(self.tmp_dir)
+
+    def test_trace_context_crosses_the_call(self):
+        root = self.tracer.new_trace()
+        with self.tracer.span("caller", parent=root):
+            self.assertEqual(self.call(b"ping", timeout=5), b"ping")
+        self.assertEqual(self.seen[0].trace_id, root.trace_id)
+
+        collector_path = self.tracer.collector.path
+        tracing.shutdown()
+        with open(collector_path, "r", encoding="utf-8") as f:
+            spans = {s["name"]: s for s in map(json.loads, f)}
+        self.assertEqual(set(spans), {"caller", "call Call", "Call"})
+        self.assertEqual(spans["call Call"]["parent_id"], spans["caller"]["span_id"])
+        self.assertEqual(spans["Call"]["parent_id"], spans["call Call"]["span_id"])
+
+    def test_server_starts_a_trace_when_called_without_context(self):
+        self.call(b"ping", timeout=5)
+        self.assertIsNotNone(self.seen[0])
+
+    def test_disabled_tracing_installs_nothing(self):
+        tracing.shutdown()
+        self.assertEqual(tracing.server_interceptors(), [])
+        self.assertIs(tracing.intercept_channel(self.channel), self.channel)
+        self.assertIsNone(tracing.init_tracer("test", sample_rate=0.0))
+
+
+class TestAioServerInterceptor(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.tracer = tracing.init_tracer("test", sample_rate=1.0, trace_dir=self.tmp_dir)
+
+    def tearDown(self):
+        tracing.shutdown()
+        shutil.rmtree(self.tmp_dir)
+
+    def test_coroutine_handlers_run_in_the_callers_trace(self):
+        seen = []
+
+        async def handle(request, context):
+            await asyncio.sleep(0)
+            seen.append(tracing.current())
+            return request
+
+        async def run():
+            handler = grpc.method_handlers_generic_handler("test.Echo", {
+                "Call": grpc.unary_unary_rpc_method_handler(handle, _identity, _identity),
+            })
+            server = grpc.aio.server(interceptors=tracing.aio_server_interceptors())
+            server.add_generic_rpc_handlers((handler,))
+            port = server.add_insecure_port("localhost:0")
+            await server.start()
+            try:
+                with grpc.insecure_channel(f"localhost:{port}") as channel:
+                    call = tracing.intercept_channel(channel).unary_unary("/test.Echo/Call")
+
+                    def call_in_trace(): # A blocking client, off the server's loop
+                        with self.tracer.span("caller", parent=root):
+                            return call(b"ping", timeout=5)
+
+                    await asyncio.get_running_loop().run_in_executor(None, call_in_trace)
+            finally:
+                await server.stop(0)
+
+        root = self.tracer.new_trace()
+        asyncio.run(run())
+        self.assertEqual(seen[0].trace_id, root.trace_id)
+
+    def test_disabled_tracing_installs_nothing(self):
+        tracing.shutdown()
+        self.assertEqual(tracing.aio_server_interceptors(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -20,6 +20,21 @@ if not DEEPGRAM_API_KEY:
     # DEEPGRAM_API_KEY = "YOUR_FALLBACK_KEY_IF_ANY_BUT_USUALLY_RAISE_ERROR"
     # raise ValueError("DEEPGRAM_API_KEY not found in environment variables.")
 
+# Optional: override the Deepgram API base URL, e.g. "http://localhost:8765" to use the
+# local stand-in in benchmarks/deepgram_stand_in.py. An http:// URL selects a plain
+# ws:// connection for live transcription.
+DEEPGRAM_URL = os.getenv("DEEPGRAM_URL", "")
+
+# Deadlines. Each wait below is bounded by the caller's remaining deadline,
+# less STT_RESERVED_SECONDS for building the response; the values here are the
+# caps, and the timeouts when the caller set no deadline. A segment that
+# arrives with no more than STT_RESERVED_SECONDS left is dropped.
+DEEPGRAM_CONNECT_TIMEOUT_SECONDS = float(os.getenv("DEEPGRAM_CONNECT_TIMEOUT_SECONDS", "10"))
+DEEPGRAM_SEND_TIMEOUT_SECONDS = float(os.getenv("DEEPGRAM_SEND_TIMEOUT_SECONDS", "5"))
+# Wait for Deepgram's final transcript after the is_final segment.
+FINAL_TRANSCRIPT_TIMEOUT_SECONDS = float(os.getenv("FINAL_TRANSCRIPT_TIMEOUT_SECONDS", "5"))
+STT_RESERVED_SECONDS = float(os.getenv("STT_RESERVED_SECONDS", "0.1"))
+
 # Other configurations for the STT service can be added here, for example:
 # DEFAULT_LANGUAGE = "en-US"
 # DEFAULT_MODEL = "nova-2"
@@ -2,6 +2,8 @@
 
 import grpc
 from concurrent import futures
+import os
+import sys
 import time
 import asyncio
 import atexit # For cleanup
@@ -10,13 +12,33 @@ import atexit # For cleanup
 import audio_stream_pb2
 import audio_stream_pb2_grpc
 
-# Import generated protobuf and gRPC modules for NLU
-import nlu_service_pb2
-import nlu_service_pb2_grpc
-
 # Deepgram SDK components
 from deepgram import DeepgramClient, LiveTranscriptionEvents, LiveOptions, DeepgramClientOptions
-from .config import DEEPGRAM_API_KEY
+from .config import (
+    DEEPGRAM_API_KEY,
+    DEEPGRAM_URL,
+    DEEPGRAM_CONNECT_TIMEOUT_SECONDS,
+    DEEPGRAM_SEND_TIMEOUT_SECONDS,
+    FINAL_TRANSCRIPT_TIMEOUT_SECONDS,
+    STT_RESERVED_SECONDS,
+)
+
+# Shared observability package at the repository root
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from observability import admin, deadlines, logs, loop_monitor, metrics, sessions, tracing
+
+log = logs.get_logger("speech_to_text")
+
+CONNECT_SECONDS = metrics.histogram("revo_stt_deepgram_connect_seconds", "Deepgram live connection setup time.")
+FIRST_INTERIM_SECONDS = metrics.histogram(
+    "revo_stt_time_to_first_interim_seconds", "Deepgram stream start to the stream's first transcript.")
+FINAL_SECONDS = metrics.histogram(
+    "revo_stt_time_to_final_seconds", "is_final segment received to Deepgram's final transcript (or timeout).")
+ACTIVE_STREAMS = metrics.gauge("revo_stt_active_streams", "Open Deepgram streams.")
+QUEUE_DEPTH = metrics.gauge("revo_stt_transcript_queue_depth", "Transcripts waiting in the per-session queues.")
+
+# The loop-side wait_for ends the final-transcript wait; the thread waits this much longer only if the loop stalls.
+_LOOP_SLACK_SECONDS = 0.05
 
 
 class SpeechToTextServicer(audio_stream_pb2_grpc.SpeechToTextServicer):
@@ -25,7 +47,7 @@ class SpeechToTextServicer(audio_stream_pb2_grpc.SpeechToTextServicer):
     """
     def __init__(self):
         if not DEEPGRAM_API_KEY:
-            print("CRITICAL: DEEPGRAM_API_KEY is not set. SpeechToTextServicer cannot function.")
+            log.error("lifecycle", "DEEPGRAM_API_KEY is not set. SpeechToTextServicer cannot function.")
             # In a real scenario, you might raise an exception or prevent server startup
 
         # It's important that DeepgramClientOptions is initialized correctly.
@@ -33,13 +55,25 @@ class SpeechToTextServicer(audio_stream_pb2_grpc.SpeechToTextServicer):
         # We ensure it's at least an empty string if not set, though Deepgram will reject it.
         dg_api_key_to_use = DEEPGRAM_API_KEY if DEEPGRAM_API_KEY else ""
 
-        self.deepgram_config_options = DeepgramClientOptions(api_key=dg_api_key_to_use, verbose=0) # verbose=0 for less SDK logging
-        self.deepgram_client = DeepgramClient(self.deepgram_config_options)
+        client_options_kwargs = {"api_key": dg_api_key_to_use, "verbose": 0} # verbose=0 for less SDK logging
+        if DEEPGRAM_URL:
+            client_options_kwargs["url"] = DEEPGRAM_URL
+            log.info("lifecycle", "Using Deepgram endpoint %s", DEEPGRAM_URL)
+        self.deepgram_config_options = DeepgramClientOptions(**client_options_kwargs)
+        self.deepgram_client = DeepgramClient(dg_api_key_to_use, self.deepgram_config_options)
 
         self.active_streams = {} # {session_id: dg_connection}
         self.transcription_results = {} # {session_id: asyncio.Queue}
+        self.stream_traces = {} # {session_id: (trace context, stream start ns)} until the first result arrives
         self.loop = None # Will be set in ensure_event_loop
+        self.loop_monitor = None # Lag and slow-callback monitor for self.loop, when this servicer runs it
+        # Per-session statistics for the admin ListSessions RPC; `state` is the Deepgram connection state.
+        self.sessions = sessions.SessionRegistry("speech_to_text", queue_depth=self._queue_depth)
+        ACTIVE_STREAMS.set_function(lambda: len(self.active_streams))
+        QUEUE_DEPTH.set_function(lambda: sum(q.qsize() for q in list(self.transcription_results.values())))
         self._ensure_event_loop_is_running_in_thread()
+        # Sessions that never send is_final would otherwise keep their stream and queue until exit.
+        self.sessions.start_reaper(on_evict=self._evict_idle_session)
 
         # Register cleanup function to be called on exit
         atexit.register(self.cleanup_all_streams_on_exit)
@@ -57,10 +91,27 @@ class SpeechToTextServicer(audio_stream_pb2_grpc.SpeechToTextServicer):
             import threading
             self.event_loop_thread = threading.Thread(target=self.loop.run_forever, daemon=True)
             self.event_loop_thread.start()
-            print("Asyncio event loop started in a new thread.")
+            log.info("lifecycle", "Asyncio event loop started in a new thread.")
+            # Every session's Deepgram callbacks share this loop; one blocking callback stalls them all.
+            self.loop_monitor = loop_monitor.monitor(self.loop, "speech_to_text")
+
 
+    def _queue_depth(self, session_id) -> int:
+        queue = self.transcription_results.get(session_id)
+        return queue.qsize() if queue else 0
+
+    def _evict_idle_session(self, stats):
+        """Reaper callback: finishes the idle session's Deepgram stream without waiting for it."""
+        if self.loop and self.loop.is_running():
+            asyncio.run_coroutine_threadsafe(self._close_deepgram_stream(stats.session_id), self.loop)
 
-    async def _on_deepgram_message(self, session_id, result, **kwargs):
+    def _set_stream_state(self, session_id, state):
+        stats = self.sessions.get(session_id)
+        if stats:
+            stats.state = state
+
+
+    async def _on_deepgram_message(self, session_id, queue, result, **kwargs):
         transcript = ""
         confidence = 0.0
         is_final_dg = False
@@ -69,31 +120,44 @@ class SpeechToTextServicer(audio_stream_pb2_grpc.SpeechToTextServicer):
             transcript = result.channel.alternatives[0].transcript
             confidence = result.channel.alternatives[0].confidence
             is_final_dg = True
-            print(f"Deepgram final transcript for {session_id}: '{transcript}' (Confidence: {confidence})")
+            log.info("transcript", "Deepgram final transcript: '%s' (Confidence: %s)", transcript, confidence,
+                     session_id=session_id, stage="stt")
         elif not result.is_final and result.channel and result.channel.alternatives and result.channel.alternatives[0].transcript:
             transcript = result.channel.alternatives[0].transcript
             # For interim results, confidence might not be as relevant or stable
-            print(f"Deepgram interim transcript for {session_id}: '{transcript}'")
+            log.info("interim", "Deepgram interim transcript: '%s'", transcript, session_id=session_id, stage="stt")
+
+        if transcript:
+            stream_trace = self.stream_traces.pop(session_id, None)
+            if stream_trace:
+                trace_ctx, stream_start_ns = stream_trace
+                now_ns = time.time_ns()
+                FIRST_INTERIM_SECONDS.observe((now_ns - stream_start_ns) / 1e9)
+                tracing.record_span("deepgram.first_interim", stream_start_ns, now_ns, trace_ctx,
+                                    attrs={"is_final": is_final_dg})
 
         if transcript: # Only put if there's something to put
-            if session_id in self.transcription_results:
-                await self.transcription_results[session_id].put({
+            # A stream still finishing in the background must not feed the session's next stream.
+            if self.transcription_results.get(session_id) is queue:
+                await queue.put({
                     "transcript": transcript,
                     "confidence": confidence,
                     "is_final": is_final_dg
                 })
             else:
-                print(f"Warning: Received transcript for {session_id} but no active queue.")
+                log.warning("transcript", "Received transcript for a closed stream; dropped.", session_id=session_id, stage="stt")
 
 
-    async def _get_or_create_deepgram_connection(self, session_id: str, audio_format_enum):
+    async def _get_or_create_deepgram_connection(self, session_id: str, audio_format_enum, trace_ctx=None):
         if session_id not in self.active_streams:
             if not DEEPGRAM_API_KEY: # Double check before attempting to connect
-                print(f"Cannot create Deepgram connection for {session_id}: API key not set.")
+                log.error("connection", "Cannot create Deepgram connection: API key not set.", session_id=session_id, stage="stt")
                 return None
             try:
-                print(f"Attempting to start Deepgram connection for {session_id} with format {audio_format_enum}")
-                dg_connection = self.deepgram_client.listen.live.v("1")
+                log.info("connection", "Attempting to start Deepgram connection with format %s", audio_format_enum,
+                         session_id=session_id, stage="stt")
+                # The asyncio client: start/send/finish are coroutines run on self.loop.
+                dg_connection = self.deepgram_client.listen.asynclive.v("1")
 
                 # Basic mapping from our AudioFormat enum to Deepgram encoding options
                 # This needs to be more robust based on actual RTP payload types / SDP negotiation.
@@ -119,7 +183,8 @@ class SpeechToTextServicer(audio_stream_pb2_grpc.SpeechToTextServicer):
                     # For now, this will likely lead to errors or poor transcription if Opus bytes are sent.
                     # A real implementation would need an Opus decoder here.
                     # Setting to linear16 as a placeholder if Opus was decoded.
-                    print(f"Warning: Received OPUS format for {session_id}. Deepgram expects uncompressed audio. Assuming pre-decoded to linear16 for now.")
+                    log.warning("connection", "Received OPUS format. Deepgram expects uncompressed audio. Assuming pre-decoded to linear16 for now.",
+                                session_id=session_id, stage="stt")
                     encoding = "linear16" # Assuming Opus is decoded to PCM elsewhere. This is key.
                     sample_rate = 16000 # Common for Opus wideband
 
@@ -135,52 +200,105 @@ class SpeechToTextServicer(audio_stream_pb2_grpc.SpeechToTextServicer):
                     channels=channels
                 )
 
-                # Run the start method in the event loop
-                await dg_connection.start(options)
+                # Create the queue before starting so no early transcript is dropped.
+                queue = asyncio.Queue()
+
+                # The async client awaits each handler, so handlers must be coroutine functions.
+                async def on_transcript(_, result, **kwargs):
+                    await self._on_deepgram_message(session_id, queue, result, **kwargs)
+
+                async def on_error(_, error, **kwargs):
+                    log.error("connection", "Deepgram error: %s", error, session_id=session_id, stage="stt")
+
+                async def on_close(_, *args, **kwargs):
+                    log.info("connection", "Deepgram connection closed.", session_id=session_id, stage="stt")
+                    if self.active_streams.get(session_id, dg_connection) is dg_connection: # Not a newer stream's
+                        self._set_stream_state(session_id, "closed")
 
-                dg_connection.on(LiveTranscriptionEvents.Transcript, lambda _, result, **kwargs: asyncio.create_task(self._on_deepgram_message(session_id, result, **kwargs)))
-                dg_connection.on(LiveTranscriptionEvents.Error, lambda _, error, **kwargs: print(f"Deepgram error for {session_id}: {error}"))
-                dg_connection.on(LiveTranscriptionEvents.Close, lambda _, **kwargs: print(f"Deepgram connection closed for {session_id}."))
+                dg_connection.on(LiveTranscriptionEvents.Transcript, on_transcript)
+                dg_connection.on(LiveTranscriptionEvents.Error, on_error)
+                dg_connection.on(LiveTranscriptionEvents.Close, on_close)
+
+                self.transcription_results[session_id] = queue
+
+                # Run the start method in the event loop
+                self._set_stream_state(session_id, "connecting")
+                connect_start_ns = time.time_ns()
+                started = await dg_connection.start(options)
+                connect_end_ns = time.time_ns()
+                CONNECT_SECONDS.observe((connect_end_ns - connect_start_ns) / 1e9)
+                tracing.record_span("deepgram.connect", connect_start_ns, connect_end_ns, trace_ctx,
+                                    error="" if started is not False else "ConnectFailed")
+                if started is False:
+                    raise RuntimeError("Deepgram connection could not be started")
 
                 self.active_streams[session_id] = dg_connection
-                self.transcription_results[session_id] = asyncio.Queue()
-                print(f"Deepgram connection started for {session_id} with encoding {encoding}, sample rate {sample_rate}")
+                self.stream_traces[session_id] = (trace_ctx, connect_end_ns)
+                self._set_stream_state(session_id, "open")
+                log.info("connection", "Deepgram connection started with encoding %s, sample rate %s", encoding, sample_rate,
+                         session_id=session_id, stage="stt")
             except Exception as e:
-                print(f"Error starting Deepgram connection for {session_id}: {e}")
+                log.error("connection", "Error starting Deepgram connection: %s", e, session_id=session_id, stage="stt")
+                self._set_stream_state(session_id, "failed")
                 if session_id in self.active_streams: # Clean up if partial setup
                     del self.active_streams[session_id]
+                self.transcription_results.pop(session_id, None)
                 return None
         return self.active_streams.get(session_id)
 
     async def _close_deepgram_stream(self, session_id):
-        if session_id in self.active_streams:
-            connection = self.active_streams.pop(session_id)
-            print(f"Deepgram connection finishing for {session_id}...")
+        # The stream's entries are removed before awaiting finish(), so a next
+        # utterance of the session can open a new stream in the meantime.
+        connection = self.active_streams.pop(session_id, None)
+        self.stream_traces.pop(session_id, None)
+        if self.transcription_results.pop(session_id, None) is not None:
+            log.debug("connection", "Transcription queue removed.", session_id=session_id, stage="stt")
+        if connection is not None:
+            log.info("connection", "Deepgram connection finishing...", session_id=session_id, stage="stt")
+            self._set_stream_state(session_id, "closing")
             await connection.finish()
-            print(f"Deepgram connection finished for {session_id}.")
-        if session_id in self.transcription_results:
-            del self.transcription_results[session_id]
-            print(f"Transcription queue removed for {session_id}.")
+            if session_id not in self.active_streams:
+                self._set_stream_state(session_id, "closed")
+            log.info("connection", "Deepgram connection finished.", session_id=session_id, stage="stt")
+
 
+    async def _wait_for_final_transcript(self, session_id):
+        """Returns the next final result for the session, skipping interim results still queued."""
+        queue = self.transcription_results[session_id]
+        while True:
+            result = await queue.get()
+            queue.task_done()
+            if result.get("is_final"):
+                return result
 
     def TranscribeAudioSegment(self, request: audio_stream_pb2.AudioSegment, context):
         session_id = request.session_id
         audio_data = request.data
         is_final_segment_from_client = request.is_final # Client signals end of their stream/utterance
+        session_stats = self.sessions.session(session_id)
+        session_stats.record_frame(len(audio_data))
 
         if not DEEPGRAM_API_KEY:
              return self._handle_stt_error(session_id, "[STT Error: API key not configured]")
 
+        if deadlines.expired(context, "speech_to_text", "TranscribeAudioSegment", STT_RESERVED_SECONDS, session_id):
+            return audio_stream_pb2.TranscriptionResponse(session_id=session_id)
+
         # Ensure event loop is available for async operations
         if not self.loop or not self.loop.is_running():
-            print("CRITICAL: Asyncio event loop not running in STT servicer.")
+            log.error("lifecycle", "Asyncio event loop not running in STT servicer.", session_id=session_id, stage="stt")
             return self._handle_stt_error(session_id, "[STT Error: Internal event loop issue]")
 
         # Schedule Deepgram connection and data sending on the event loop
         future_connection = asyncio.run_coroutine_threadsafe(
-            self._get_or_create_deepgram_connection(session_id, request.audio_format), self.loop
+            self._get_or_create_deepgram_connection(session_id, request.audio_format, tracing.current()), self.loop
         )
-        dg_connection = future_connection.result(timeout=10) # Wait for connection setup
+        try:
+            dg_connection = future_connection.result(
+                timeout=deadlines.remaining(context, DEEPGRAM_CONNECT_TIMEOUT_SECONDS, STT_RESERVED_SECONDS))
+        except TimeoutError:
+            # The connection is still set up on the loop and used by the session's next segment.
+            return self._handle_stt_error(session_id, "[STT Error: Deepgram connection timed out]")
 
         if not dg_connection:
             return self._handle_stt_error(session_id, "[STT Error: Failed to connect to Deepgram]")
@@ -188,10 +306,13 @@ class SpeechToTextServicer(audio_stream_pb2_grpc.SpeechToTextServicer):
         # Send audio data (this is a blocking call on the dg_connection object if not wrapped)
         # The SDK's send is designed to be called from a sync context if dg_connection was started in async.
         try:
-            dg_connection.send(audio_data)
-            # print(f"Sent {len(audio_data)} bytes to Deepgram for session {session_id}")
+            asyncio.run_coroutine_threadsafe(dg_connection.send(audio_data), self.loop).result(
+                timeout=deadlines.remaining(context, DEEPGRAM_SEND_TIMEOUT_SECONDS, STT_RESERVED_SECONDS))
+            log.debug("segment", "Sent %d bytes to Deepgram", len(audio_data), session_id=session_id,
+                      seq=request.sequence_number, stage="stt")
         except Exception as e:
-            print(f"Error sending data to Deepgram for {session_id}: {e}")
+            log.error("segment", "Error sending data to Deepgram: %s", e, session_id=session_id,
+                      seq=request.sequence_number, stage="stt")
             # Potentially close and try to re-establish on next segment, or mark session as error
             asyncio.run_coroutine_threadsafe(self._close_deepgram_stream(session_id), self.loop)
             return self._handle_stt_error(session_id, "[STT Error: Failed to send audio data]")
@@ -204,34 +325,41 @@ class SpeechToTextServicer(audio_stream_pb2_grpc.SpeechToTextServicer):
 
         # Only wait for a transcript if the client indicates this is the end of their segment stream / utterance
         if is_final_segment_from_client:
-            print(f"Client marked segment as is_final for {session_id}. Attempting to get final transcript from Deepgram.")
+            log.info("transcript", "Client marked segment as is_final. Attempting to get final transcript from Deepgram.",
+                     session_id=session_id, seq=request.sequence_number, stage="stt")
+            turn_start = time.perf_counter()
+            wait = max(0.0, deadlines.remaining(context, FINAL_TRANSCRIPT_TIMEOUT_SECONDS, STT_RESERVED_SECONDS))
             try:
-                result = asyncio.run_coroutine_threadsafe(
-                    asyncio.wait_for(self.transcription_results[session_id].get(), timeout=5.0), self.loop
-                ).result(timeout=5.5) # Wait for the async task to complete
+                with tracing.span("deepgram.final"), FINAL_SECONDS.time():
+                    result = asyncio.run_coroutine_threadsafe(
+                        asyncio.wait_for(self._wait_for_final_transcript(session_id), timeout=wait), self.loop
+                    ).result(timeout=wait + _LOOP_SLACK_SECONDS) # Wait for the async task to complete
+                session_stats.record_turn(time.perf_counter() - turn_start)
 
                 transcript_text = result.get("transcript", "")
                 transcript_confidence = result.get("confidence", 0.0)
                 is_final_transcript_from_dg = result.get("is_final", False) # This should be true if DG said it's final
-                self.transcription_results[session_id].task_done()
-                print(f"Retrieved from queue for {session_id}: '{transcript_text}', final_dg: {is_final_transcript_from_dg}")
+                log.info("transcript", "Retrieved from queue: '%s', final_dg: %s", transcript_text, is_final_transcript_from_dg,
+                         session_id=session_id, seq=request.sequence_number, stage="stt")
 
-                # Important: Close the Deepgram stream *only* if this `is_final_segment_from_client` truly means
-                # the end of all audio for this session_id. If more utterances are expected for the same session_id,
-                # we might not want to close it yet. For this implementation, assume one utterance per "session"
-                # or that is_final_segment_from_client implies end of the whole interaction with STT for this session_id.
-                asyncio.run_coroutine_threadsafe(self._close_deepgram_stream(session_id), self.loop).result(timeout=5)
+                # The utterance's stream is finished in the background: the transcript
+                # is returned now instead of after Deepgram's ~500 ms close handshake.
+                asyncio.run_coroutine_threadsafe(self._close_deepgram_stream(session_id), self.loop)
 
             except (asyncio.TimeoutError, TimeoutError): # TimeoutError for future.result()
-                print(f"Timeout waiting for Deepgram transcript for {session_id}")
+                log.warning("transcript", "Timeout waiting for Deepgram transcript", session_id=session_id,
+                            seq=request.sequence_number, stage="stt")
                 transcript_text = "[STT Timeout]"
+                session_stats.record_turn(time.perf_counter() - turn_start)
                 is_final_transcript_from_dg = True # Consider timeout as end of this attempt
-                asyncio.run_coroutine_threadsafe(self._close_deepgram_stream(session_id), self.loop).result(timeout=5)
+                asyncio.run_coroutine_threadsafe(self._close_deepgram_stream(session_id), self.loop)
             except Exception as e:
-                print(f"Error getting transcript from queue for {session_id}: {e}")
+                log.error("transcript", "Error getting transcript from queue: %s", e, session_id=session_id,
+                          seq=request.sequence_number, stage="stt")
                 transcript_text = f"[STT Error: {type(e).__name__}]"
+                session_stats.record_turn(time.perf_counter() - turn_start)
                 is_final_transcript_from_dg = True # Consider error as end of this attempt
-                asyncio.run_coroutine_threadsafe(self._close_deepgram_stream(session_id), self.loop).result(timeout=5)
+                asyncio.run_coroutine_threadsafe(self._close_deepgram_stream(session_id), self.loop)
         else:
             # Non-final segment from client. We don't block for a DG final transcript.
             # We could try to get an interim transcript non-blockingly if available.
@@ -241,28 +369,24 @@ class SpeechToTextServicer(audio_stream_pb2_grpc.SpeechToTextServicer):
                 transcript_confidence = interim_result.get("confidence", 0.0) # usually 0 for interim
                 is_final_transcript_from_dg = interim_result.get("is_final", False)
                 self.transcription_results[session_id].task_done()
-                print(f"Got interim for {session_id}: '{transcript_text}'")
+                log.info("interim", "Got interim: '%s'", transcript_text, session_id=session_id,
+                         seq=request.sequence_number, stage="stt")
             except asyncio.QueueEmpty:
-                # print(f"No interim transcript available yet for {session_id}")
                 pass # No transcript to return for this non-final segment yet.
             except Exception as e:
-                print(f"Error getting interim transcript from queue for {session_id}: {e}")
+                log.error("interim", "Error getting interim transcript from queue: %s", e, session_id=session_id,
+                          seq=request.sequence_number, stage="stt")
 
-
-        # Call NLUService
-        final_stt_response = audio_stream_pb2.TranscriptionResponse(
+        # The caller (StreamingDataManager) hands the transcript to the SessionOrchestrator.
+        return audio_stream_pb2.TranscriptionResponse(
             session_id=session_id,
             transcript=transcript_text,
             is_final=is_final_transcript_from_dg,
             confidence=float(transcript_confidence)
         )
-        self._call_nlu_service(session_id, transcript_text)
-
-        return final_stt_response
 
     def _handle_stt_error(self, session_id, error_transcript_text):
-        print(f"STT Error for {session_id}: {error_transcript_text}")
-        self._call_nlu_service(session_id, error_transcript_text) # Notify NLU even on STT error
+        log.error("transcript", "STT Error: %s", error_transcript_text, session_id=session_id, stage="stt")
         return audio_stream_pb2.TranscriptionResponse(
             session_id=session_id,
             transcript=error_transcript_text,
@@ -270,54 +394,35 @@ class SpeechToTextServicer(audio_stream_pb2_grpc.SpeechToTextServicer):
             confidence=0.0
         )
 
-    def _call_nlu_service(self, session_id, transcript_text):
-        # NLU call config (should be part of __init__ or class const)
-        nlu_service_address = 'localhost:50053'
-        try:
-            with grpc.insecure_channel(nlu_service_address) as nlu_channel:
-                nlu_stub = nlu_service_pb2_grpc.NLUServiceStub(nlu_channel)
-                nlu_request = nlu_service_pb2.NLURequest(
-                    text=transcript_text if transcript_text else "[No transcript from STT]", # Send empty or error string
-                    session_id=session_id
-                )
-                print(f"SpeechToTextService: Calling NLUService at {nlu_service_address} for SID {session_id} with text: '{nlu_request.text}'")
-                nlu_response = nlu_stub.ProcessText(nlu_request, timeout=10)
-                if nlu_response:
-                    entities_log = [(e.name, e.value, f"{e.confidence:.2f}") for e in nlu_response.entities]
-                    print(f"SpeechToTextService: NLU response for SID {nlu_response.session_id}: Intent='{nlu_response.intent}' (Conf: {nlu_response.intent_confidence:.2f}), Entities={entities_log}")
-                else:
-                    print(f"SpeechToTextService: No response from NLUService for SID {session_id}")
-        except grpc.RpcError as e:
-            print(f"SpeechToTextService: Error calling NLUService for SID {session_id}: Code={e.code()}, Details='{e.details()}'")
-        except Exception as e:
-            print(f"SpeechToTextService: Unexpected Python error calling NLUService for SID {session_id}: {e}")
-
     def cleanup_all_streams_on_exit(self):
-        print("SpeechToTextServicer: Cleaning up all active Deepgram streams on server exit...")
+        log.info("lifecycle", "Cleaning up all active Deepgram streams on server exit...")
+        self.sessions.stop_reaper()
         if self.loop and self.loop.is_running():
             for session_id in list(self.active_streams.keys()):
-                print(f"Stopping Deepgram stream for session: {session_id}")
+                log.info("lifecycle", "Stopping Deepgram stream", session_id=session_id)
                 future = asyncio.run_coroutine_threadsafe(self._close_deepgram_stream(session_id), self.loop)
                 try:
                     future.result(timeout=5) # Wait for cleanup to complete
                 except TimeoutError:
-                    print(f"Timeout cleaning up stream for session {session_id}")
+                    log.warning("lifecycle", "Timeout cleaning up stream", session_id=session_id)
                 except Exception as e:
-                     print(f"Exception during cleanup of stream {session_id}: {e}")
+                     log.error("lifecycle", "Exception during cleanup of stream: %s", e, session_id=session_id)
 
+            if self.loop_monitor:
+                self.loop_monitor.stop()
             # Gently stop the event loop
             self.loop.call_soon_threadsafe(self.loop.stop)
             # Wait for the thread to finish if it was started by this class
             if hasattr(self, 'event_loop_thread') and self.event_loop_thread.is_alive():
-                 print("Waiting for event loop thread to exit...")
+                 log.info("lifecycle", "Waiting for event loop thread to exit...")
                  self.event_loop_thread.join(timeout=5)
                  if self.event_loop_thread.is_alive():
-                     print("Event loop thread did not exit cleanly.")
+                     log.warning("lifecycle", "Event loop thread did not exit cleanly.")
                  else:
-                     print("Event loop thread exited.")
+                     log.info("lifecycle", "Event loop thread exited.")
         else:
-            print("No active event loop to clean up streams with.")
-        print("SpeechToTextServicer: Cleanup complete.")
+            log.info("lifecycle", "No active event loop to clean up streams with.")
+        log.info("lifecycle", "Cleanup complete.")
 
 
 # Original SpeechToTextService class (business logic) - can be removed or kept if refactored
@@ -327,26 +432,34 @@ servicer_instance = None # Global instance for atexit cleanup
 
 def serve():
     global servicer_instance
-    server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
+    logs.configure()
+    atexit.register(logs.shutdown) # Registered first so it runs after the servicer's atexit cleanup
+    tracing.init_tracer("speech_to_text")
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=10),
+                         interceptors=metrics.server_interceptors("speech_to_text") + tracing.server_interceptors())
     servicer_instance = SpeechToTextServicer() # Assign to global for cleanup
     audio_stream_pb2_grpc.add_SpeechToTextServicer_to_server(servicer_instance, server)
+    admin.add_to_server(server, "speech_to_text", sessions=servicer_instance.sessions)
 
     listen_addr = '[::]:50052'
     server.add_insecure_port(listen_addr)
 
-    print(f"SpeechToTextService gRPC server starting on {listen_addr}")
+    log.info("lifecycle", "SpeechToTextService gRPC server starting on %s", listen_addr)
     server.start()
-    print(f"Server started. Use Ctrl+C to stop.") # Changed message
+    metrics.start_http_server("speech_to_text", 51052)
+    log.info("lifecycle", "Server started. Use Ctrl+C to stop.")
     try:
         while True:
             time.sleep(86400)
     except KeyboardInterrupt:
-        print("KeyboardInterrupt received, shutting down server...")
+        log.info("lifecycle", "KeyboardInterrupt received, shutting down server...")
     finally:
         # atexit will handle servicer_instance.cleanup_all_streams_on_exit()
-        print("Stopping gRPC server...")
+        log.info("lifecycle", "Stopping gRPC server...")
         server.stop(10).wait() # Wait 10 seconds for graceful shutdown
-        print("gRPC server stopped.")
+        metrics.shutdown()
+        tracing.shutdown()
+        log.info("lifecycle", "gRPC server stopped.")
 
 
 if __name__ == "__main__":
@@ -4,8 +4,6 @@ import grpc # For mock_context and RpcError
 import asyncio # For asyncio.Queue and asyncio.TimeoutError
 
 import audio_stream_pb2
-import nlu_service_pb2
-import nlu_service_pb2_grpc
 
 # Import the servicer from the service module
 # Assuming 'service.py' is in the same directory or PYTHONPATH is set up
@@ -45,23 +43,10 @@ class TestSpeechToTextServicerWithDeepgram(unittest.TestCase):
         # .on() is used to register event handlers
         self.mock_dg_live_connection.on = mock.Mock()
 
-        # Mock the NLU client chain (channel and stub)
+        # STT is a leaf service: it must not open any outgoing gRPC channel
         self.grpc_channel_patcher = mock.patch('service.grpc.insecure_channel')
         self.mock_grpc_insecure_channel = self.grpc_channel_patcher.start()
 
-        self.nlu_stub_patcher = mock.patch('service.nlu_service_pb2_grpc.NLUServiceStub')
-        self.MockNLUServiceStubConstructor = self.nlu_stub_patcher.start()
-
-        self.mock_nlu_channel_instance = mock.Mock()
-        self.mock_nlu_channel_instance.__enter__.return_value = self.mock_nlu_channel_instance # For 'with' statement
-        self.mock_grpc_insecure_channel.return_value = self.mock_nlu_channel_instance
-
-        self.mock_nlu_stub_instance = self.MockNLUServiceStubConstructor.return_value
-        self.mock_nlu_stub_instance.ProcessText.return_value = nlu_service_pb2.NLUResponse(
-            intent="mock_nlu_intent",
-            session_id="test_session_123" # Ensure this matches or is handled
-        )
-
         # Instantiate the servicer. This will now use the mocked DeepgramClient.
         self.servicer = SpeechToTextServicer()
 
@@ -79,11 +64,11 @@ class TestSpeechToTextServicerWithDeepgram(unittest.TestCase):
         self.servicer.transcription_results[self.test_session_id] = asyncio.Queue()
 
         self.mock_grpc_context = mock.Mock(spec=grpc.ServicerContext)
+        self.mock_grpc_context.time_remaining.return_value = None # The caller set no deadline
 
     def tearDown(self):
         """Clean up after each test method."""
         self.deepgram_client_patcher.stop()
-        self.nlu_stub_patcher.stop()
         self.grpc_channel_patcher.stop()
 
         # Clean up any tasks that might have been created by the servicer's event loop
@@ -107,7 +92,7 @@ class TestSpeechToTextServicerWithDeepgram(unittest.TestCase):
         # Mock _get_or_create_deepgram_connection to return the connection directly
         # This avoids re-testing its internal logic here.
         # The mock_dg_live_connection is already set up in self.setUp.
-        async def mock_get_conn(sid, af): return self.mock_dg_live_connection
+        async def mock_get_conn(sid, af, trace_ctx=None): return self.mock_dg_live_connection
         self.servicer._get_or_create_deepgram_connection = mock.MagicMock(side_effect=mock_get_conn)
 
         # Simulate future.result() for _get_or_create_deepgram_connection
@@ -131,12 +116,17 @@ class TestSpeechToTextServicerWithDeepgram(unittest.TestCase):
         mock_future_close_stream = mock.Mock()
         mock_future_close_stream.result.return_value = None # _close_deepgram_stream returns None
 
+        mock_future_send = mock.Mock() # dg_connection.send() runs on the loop too
+        mock_future_send.result.return_value = None
+
         # Configure run_coroutine_threadsafe:
         # 1st call: _get_or_create_deepgram_connection
-        # 2nd call: asyncio.wait_for(self.transcription_results[session_id].get(), timeout=5.0)
-        # 3rd call: self._close_deepgram_stream(session_id)
+        # 2nd call: dg_connection.send(audio_data)
+        # 3rd call: asyncio.wait_for(self._wait_for_final_transcript(session_id), timeout=...)
+        # 4th call: self._close_deepgram_stream(session_id)
         mock_run_coro_threadsafe.side_effect = [
             mock_future_conn,
+            mock_future_send,
             mock_future_queue_get,
             mock_future_close_stream
         ]
@@ -158,31 +148,28 @@ class TestSpeechToTextServicerWithDeepgram(unittest.TestCase):
 
         # --- Assertions ---
         # Deepgram connection and send
-        self.servicer._get_or_create_deepgram_connection.assert_called_once_with(self.test_session_id, request.audio_format)
+        self.servicer._get_or_create_deepgram_connection.assert_called_once_with(
+            self.test_session_id, request.audio_format, None) # No trace context outside a traced RPC
         self.mock_dg_live_connection.send.assert_called_once_with(request.data)
 
         # Transcript result
         self.assertEqual(response.transcript, "Hello Deepgram")
-        self.assertEqual(response.confidence, 0.99)
+        self.assertAlmostEqual(response.confidence, 0.99, places=5) # float in the proto
         self.assertTrue(response.is_final)
         self.assertEqual(response.session_id, self.test_session_id)
 
-        # NLU call
-        self.mock_nlu_stub_instance.ProcessText.assert_called_once()
-        called_nlu_request = self.mock_nlu_stub_instance.ProcessText.call_args[0][0]
-        self.assertEqual(called_nlu_request.text, "Hello Deepgram")
-        self.assertEqual(called_nlu_request.session_id, self.test_session_id)
+        # No downstream call: the StreamingDataManager forwards the transcript
+        self.mock_grpc_insecure_channel.assert_not_called()
 
-        # Deepgram finish (due to is_final=True and successful transcript retrieval)
-        # This is asserted by _close_deepgram_stream being called, which calls finish.
-        # The mock_future_close_stream ensures this path is taken.
-        self.mock_dg_live_connection.finish.assert_called_once() # finish is async, check if it was awaited
+        # Deepgram finish (due to is_final=True) is scheduled, but not waited for
+        self.assertEqual(mock_run_coro_threadsafe.call_count, 4)
+        mock_future_close_stream.result.assert_not_called()
 
 
     @mock.patch('asyncio.run_coroutine_threadsafe')
     def test_transcribe_audio_segment_deepgram_connection_error(self, mock_run_coro_threadsafe):
         # Simulate _get_or_create_deepgram_connection failing (returning None)
-        async def mock_get_conn_fail(sid, af): return None
+        async def mock_get_conn_fail(sid, af, trace_ctx=None): return None
         self.servicer._get_or_create_deepgram_connection = mock.MagicMock(side_effect=mock_get_conn_fail)
 
         mock_future_conn_fail = mock.Mock()
@@ -195,15 +182,12 @@ class TestSpeechToTextServicerWithDeepgram(unittest.TestCase):
         self.assertEqual(response.transcript, "[STT Error: Failed to connect to Deepgram]")
         self.assertTrue(response.is_final)
         self.assertEqual(response.confidence, 0.0)
-        self.mock_nlu_stub_instance.ProcessText.assert_called_once_with(
-            nlu_service_pb2.NLURequest(text="[STT Error: Failed to connect to Deepgram]", session_id="dg_conn_error_session"),
-            timeout=10
-        )
+        self.mock_grpc_insecure_channel.assert_not_called()
 
     @mock.patch('asyncio.run_coroutine_threadsafe')
     def test_transcribe_audio_segment_timeout_getting_transcript(self, mock_run_coro_threadsafe):
         # Simulate successful connection
-        async def mock_get_conn(sid, af): return self.mock_dg_live_connection
+        async def mock_get_conn(sid, af, trace_ctx=None): return self.mock_dg_live_connection
         self.servicer._get_or_create_deepgram_connection = mock.MagicMock(side_effect=mock_get_conn)
         mock_future_conn = mock.Mock()
         mock_future_conn.result.return_value = self.mock_dg_live_connection
@@ -215,8 +199,12 @@ class TestSpeechToTextServicerWithDeepgram(unittest.TestCase):
         mock_future_close_stream = mock.Mock() # For the close call in finally/except
         mock_future_close_stream.result.return_value = None
 
+        mock_future_send = mock.Mock()
+        mock_future_send.result.return_value = None
+
         mock_run_coro_threadsafe.side_effect = [
             mock_future_conn,
+            mock_future_send,
             mock_future_queue_get_timeout,
             mock_future_close_stream
         ]
@@ -227,20 +215,17 @@ class TestSpeechToTextServicerWithDeepgram(unittest.TestCase):
         self.assertEqual(response.transcript, "[STT Timeout]")
         self.assertTrue(response.is_final)
         self.mock_dg_live_connection.send.assert_called_once_with(request.data) # Ensure data was sent
-        self.mock_dg_live_connection.finish.assert_called_once() # Ensure stream was closed
-        self.mock_nlu_stub_instance.ProcessText.assert_called_once_with(
-            nlu_service_pb2.NLURequest(text="[STT Timeout]", session_id=self.test_session_id),
-            timeout=10
-        )
+        self.assertEqual(mock_run_coro_threadsafe.call_count, 4) # Stream close was scheduled
+        self.mock_grpc_insecure_channel.assert_not_called()
 
-    def test_transcribe_audio_segment_non_final_no_interim(self, mock_dg_api_key_is_set_for_tests_in_class_decorator):
+    def test_transcribe_audio_segment_non_final_no_interim(self):
         # This test relies on the class-level DEEPGRAM_API_KEY mock
         # It also needs to mock the async parts like other tests.
         # We'll use a simplified path where get_nowait() on the queue raises QueueEmpty.
 
         with mock.patch('asyncio.run_coroutine_threadsafe') as mock_run_coro_threadsafe_local:
             # Simulate successful connection
-            async def mock_get_conn(sid, af): return self.mock_dg_live_connection
+            async def mock_get_conn(sid, af, trace_ctx=None): return self.mock_dg_live_connection
             self.servicer._get_or_create_deepgram_connection = mock.MagicMock(side_effect=mock_get_conn)
             mock_future_conn = mock.Mock()
             mock_future_conn.result.return_value = self.mock_dg_live_connection
@@ -262,15 +247,23 @@ class TestSpeechToTextServicerWithDeepgram(unittest.TestCase):
             self.assertFalse(response.is_final)
             self.mock_dg_live_connection.send.assert_called_once_with(request.data)
             self.mock_dg_live_connection.finish.assert_not_called() # Finish should not be called for non-final client segment
-            self.mock_nlu_stub_instance.ProcessText.assert_called_once_with(
-                 nlu_service_pb2.NLURequest(text="[No transcript from STT]", session_id=non_final_session_id), # Empty transcript sent to NLU
-                 timeout=10
-            )
+            self.mock_grpc_insecure_channel.assert_not_called()
+
+
+    @mock.patch('asyncio.run_coroutine_threadsafe')
+    def test_transcribe_audio_segment_past_its_deadline_is_dropped(self, mock_run_coro_threadsafe):
+        self.mock_grpc_context.time_remaining.return_value = 0.0
+
+        request = audio_stream_pb2.AudioSegment(session_id=self.test_session_id, data=b"data", is_final=True)
+        response = self.servicer.TranscribeAudioSegment(request, self.mock_grpc_context)
 
+        self.assertEqual(response.transcript, "")
+        self.mock_grpc_context.set_code.assert_called_once_with(grpc.StatusCode.DEADLINE_EXCEEDED)
+        mock_run_coro_threadsafe.assert_not_called() # Nothing was sent to Deepgram
 
     # Test for API key not set
     @mock.patch('service.DEEPGRAM_API_KEY', None) # Override class-level patch for this test
-    def test_transcribe_audio_segment_no_api_key(self, _): # Param for the DEEPGRAM_API_KEY patch
+    def test_transcribe_audio_segment_no_api_key(self): # mock.patch with a value passes no argument
         # Re-initialize servicer with API key as None
         # The __init__ has a check, but TranscribeAudioSegment also checks.
         # We need to ensure the servicer instance used by the test reflects this.
@@ -289,11 +282,7 @@ class TestSpeechToTextServicerWithDeepgram(unittest.TestCase):
 
             self.assertEqual(response.transcript, "[STT Error: API key not configured]")
             self.assertTrue(response.is_final)
-            # NLU call should still happen with the error message
-            self.mock_nlu_stub_instance.ProcessText.assert_called_once_with(
-                 nlu_service_pb2.NLURequest(text="[STT Error: API key not configured]", session_id="no_api_key_session"),
-                 timeout=10
-            )
+            self.mock_grpc_insecure_channel.assert_not_called()
 
 
 if __name__ == '__main__':
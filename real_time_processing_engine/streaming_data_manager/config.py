@@ -0,0 +1,43 @@
+import os
+
+# Call recording. When enabled, every ingested AudioSegment is appended to a
+# per-session recording under RECORDINGS_DIR, split into segments of
+# RECORDING_SEGMENT_SECONDS. Sealed segments are later compacted in the background.
+ENABLE_CALL_RECORDING = os.getenv("ENABLE_CALL_RECORDING", "false").lower() == "true"
+RECORDINGS_DIR = os.getenv("RECORDINGS_DIR", "recordings")
+RECORDING_SEGMENT_SECONDS = int(os.getenv("RECORDING_SEGMENT_SECONDS", "60"))
+
+# Background compaction of sealed recording segments.
+# COMPACTION_CODEC: "flac" (requires the optional `soundfile` package) or "dpcm-zlib"
+# (built-in lossless codec). Leave empty to pick "flac" when available.
+COMPACTION_CODEC = os.getenv("COMPACTION_CODEC", "")
+# Worker processes run at the lowest CPU priority; keep this small so compaction
+# never competes with live call handling.
+COMPACTION_WORKERS = int(os.getenv("COMPACTION_WORKERS", "1"))
+# Upper bound on raw recording bytes fed to the compactor per second.
+COMPACTION_MAX_BYTES_PER_SECOND = int(os.getenv("COMPACTION_MAX_BYTES_PER_SECOND", str(4 * 1024 * 1024)))
+COMPACTION_POLL_INTERVAL_SECONDS = float(os.getenv("COMPACTION_POLL_INTERVAL_SECONDS", "30"))
+
+# SessionOrchestratorService, which receives every transcript and runs the caller turns.
+ORCHESTRATOR_SERVICE_ADDRESS = os.getenv("ORCHESTRATOR_SERVICE_ADDRESS", "localhost:50056")
+
+# Deadline of the STT call. A caller (the Voice Gateway) that sets a deadline
+# gets its remaining time passed on to STT, less INGEST_RESERVED_SECONDS for
+# this service's own work after STT returns; STT_TIMEOUT_SECONDS is the cap,
+# and the timeout when the caller set no deadline. A segment that arrives with
+# no more than INGEST_RESERVED_SECONDS left is recorded but not sent to STT.
+STT_TIMEOUT_SECONDS = float(os.getenv("STT_TIMEOUT_SECONDS", "10"))
+INGEST_RESERVED_SECONDS = float(os.getenv("INGEST_RESERVED_SECONDS", "0.05"))
+
+# Barge-in. Each session's frames go through a speech onset detector; when
+# the caller starts speaking, the SessionOrchestrator is told so and cancels
+# the turn it is answering. A G.711 frame is voiced when at least
+# SPEECH_ONSET_VOICED_RATIO of its samples reach SPEECH_ONSET_AMPLITUDE_THRESHOLD
+# (linear 16-bit scale; 1000 is about -30 dBFS). Speech is confirmed after
+# SPEECH_ONSET_MIN_SPEECH_SECONDS of voiced frames, and a new onset needs
+# SPEECH_ONSET_MIN_SILENCE_SECONDS of silence first.
+BARGE_IN_ENABLED = os.getenv("BARGE_IN_ENABLED", "true").lower() == "true"
+SPEECH_ONSET_AMPLITUDE_THRESHOLD = int(os.getenv("SPEECH_ONSET_AMPLITUDE_THRESHOLD", "1000"))
+SPEECH_ONSET_VOICED_RATIO = float(os.getenv("SPEECH_ONSET_VOICED_RATIO", "0.2"))
+SPEECH_ONSET_MIN_SPEECH_SECONDS = float(os.getenv("SPEECH_ONSET_MIN_SPEECH_SECONDS", "0.2"))
+SPEECH_ONSET_MIN_SILENCE_SECONDS = float(os.getenv("SPEECH_ONSET_MIN_SILENCE_SECONDS", "0.5"))
@@ -2,11 +2,46 @@
 
 import grpc
 from concurrent import futures
+import os
+import sys
 import time # For the main loop of serve()
 
 # Import generated protobuf and gRPC modules
 import audio_stream_pb2
 import audio_stream_pb2_grpc
+import session_orchestrator_pb2
+import session_orchestrator_pb2_grpc
+
+from config import (
+    ENABLE_CALL_RECORDING,
+    RECORDINGS_DIR,
+    RECORDING_SEGMENT_SECONDS,
+    COMPACTION_CODEC,
+    COMPACTION_WORKERS,
+    COMPACTION_MAX_BYTES_PER_SECOND,
+    COMPACTION_POLL_INTERVAL_SECONDS,
+    ORCHESTRATOR_SERVICE_ADDRESS,
+    STT_TIMEOUT_SECONDS,
+    INGEST_RESERVED_SECONDS,
+    BARGE_IN_ENABLED,
+    SPEECH_ONSET_AMPLITUDE_THRESHOLD,
+    SPEECH_ONSET_VOICED_RATIO,
+    SPEECH_ONSET_MIN_SPEECH_SECONDS,
+    SPEECH_ONSET_MIN_SILENCE_SECONDS,
+)
+from recording_store import RecordingStore
+from recording_compactor import RecordingCompactor
+from speech_onset import SpeechOnsetDetector
+
+# Shared observability package at the repository root
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from observability import admin, deadlines, logs, metrics, sessions, tracing
+
+log = logs.get_logger("streaming_data_manager")
+
+SEGMENTS = metrics.counter("revo_ingest_segments_total", "Audio segments received.")
+SEGMENT_BYTES = metrics.counter("revo_ingest_segment_bytes_total", "Audio payload bytes received.")
+SPEECH_ONSETS = metrics.counter("revo_ingest_speech_onsets_total", "Caller speech onsets reported to the orchestrator.")
 
 # Placeholder for actual import path resolution if these become proper packages
 # from ..speech_to_text_service.service import SpeechToTextService
@@ -17,43 +52,139 @@ class StreamIngestServicer(audio_stream_pb2_grpc.StreamIngestServicer):
     """
     Implements the StreamIngest gRPC service.
     """
-    def __init__(self):
+    def __init__(self, recording_store: RecordingStore = None):
         # Configuration for STT service endpoint
         self.stt_service_address = 'localhost:50052' # Make this configurable in a real app
+        # Optional call recorder; every ingested segment is appended to it.
+        self.recording_store = recording_store
+        # Per-session statistics for the admin ListSessions RPC.
+        self.sessions = sessions.SessionRegistry("streaming_data_manager")
+        # Transcripts go to the orchestrator on one long-lived channel; its calls are not waited for.
+        self.orchestrator_stub = session_orchestrator_pb2_grpc.SessionOrchestratorServiceStub(
+            tracing.intercept_channel(grpc.insecure_channel(ORCHESTRATOR_SERVICE_ADDRESS)))
+        # Per-session speech onset detectors for barge-in.
+        self.onset_detectors = {} # {session_id: SpeechOnsetDetector}
+
+    def evict_idle_session(self, stats):
+        """Reaper callback: closes the open recording segment of a session that stopped sending and ends its session."""
+        if self.recording_store:
+            self.recording_store.seal_session(stats.session_id)
+        self.onset_detectors.pop(stats.session_id, None)
+        future = self.orchestrator_stub.EndSession.future(
+            session_orchestrator_pb2.EndSessionRequest(session_id=stats.session_id, reason="idle"), timeout=5)
+        future.add_done_callback(lambda f: self._log_orchestrator_error(f, stats.session_id, "EndSession"))
+
+    def _forward_transcript(self, request, stt_response):
+        """Hands a transcript to the SessionOrchestrator; the turn runs there, so the call is not waited for."""
+        event = session_orchestrator_pb2.TranscriptEvent(
+            session_id=stt_response.session_id or request.session_id,
+            transcript=stt_response.transcript,
+            is_final=stt_response.is_final,
+            confidence=stt_response.confidence,
+            sequence_number=request.sequence_number,
+        )
+        future = self.orchestrator_stub.HandleTranscript.future(event, timeout=5)
+        future.add_done_callback(lambda f: self._log_orchestrator_error(f, event.session_id, "HandleTranscript"))
+
+    def _detect_speech_onset(self, request):
+        """Tells the SessionOrchestrator when the caller starts speaking, so it can stop answering (barge-in)."""
+        detector = self.onset_detectors.get(request.session_id)
+        if detector is None:
+            detector = self.onset_detectors[request.session_id] = SpeechOnsetDetector(
+                SPEECH_ONSET_AMPLITUDE_THRESHOLD, SPEECH_ONSET_VOICED_RATIO, SPEECH_ONSET_MIN_SPEECH_SECONDS,
+                SPEECH_ONSET_MIN_SILENCE_SECONDS)
+        onset = detector.process(request.audio_format, request.data)
+        if request.is_final:
+            detector.reset()
+        if not onset:
+            return
+        SPEECH_ONSETS.inc()
+        log.info("barge_in", "Caller speech onset", session_id=request.session_id, seq=request.sequence_number,
+                 stage="ingest")
+        event = session_orchestrator_pb2.SpeechOnsetEvent(
+            session_id=request.session_id, sequence_number=request.sequence_number)
+        future = self.orchestrator_stub.HandleSpeechOnset.future(event, timeout=5)
+        future.add_done_callback(lambda f: self._log_orchestrator_error(f, event.session_id, "HandleSpeechOnset"))
+
+    @staticmethod
+    def _log_orchestrator_error(future, session_id, method):
+        error = future.exception()
+        if error is not None:
+            log.error("rpc", "Error calling SessionOrchestratorService.%s: %s", method, logs.describe_rpc_error(error),
+                      session_id=session_id, stage="ingest")
 
     def IngestAudioSegment(self, request: audio_stream_pb2.AudioSegment, context):
         """
-        Receives an audio segment from a client (e.g., Voice Gateway)
-        and forwards it to the SpeechToTextService.
+        Receives an audio segment from a client (e.g., Voice Gateway),
+        forwards it to the SpeechToTextService and hands the transcript, if
+        any, to the SessionOrchestratorService.
         """
-        print(f"StreamingDataManager: Received AudioSegment: SID={request.session_id}, Seq={request.sequence_number}, Format={request.audio_format}, DataLen={len(request.data)}, IsFinal={request.is_final}")
+        SEGMENTS.inc()
+        SEGMENT_BYTES.inc(len(request.data))
+        session_stats = self.sessions.session(request.session_id)
+        session_stats.record_frame(len(request.data))
+        log.info("segment", "Received AudioSegment: Format=%s, DataLen=%d, IsFinal=%s",
+                 request.audio_format, len(request.data), request.is_final,
+                 session_id=request.session_id, seq=request.sequence_number, stage="ingest")
 
         status_message = "Segment received by StreamingDataManager."
 
+        if self.recording_store:
+            try:
+                self.recording_store.append(request)
+            except Exception as e:
+                # Recording must never break the live call path.
+                log.error("recording", "Failed to record segment: %s", e,
+                          session_id=request.session_id, seq=request.sequence_number, stage="ingest")
+
+        if BARGE_IN_ENABLED:
+            self._detect_speech_onset(request)
+
+        # The caller's deadline, less what this handler needs after STT returns, is STT's deadline.
+        if deadlines.expired(context, "streaming_data_manager", "IngestAudioSegment", INGEST_RESERVED_SECONDS,
+                             request.session_id):
+            return audio_stream_pb2.IngestResponse(
+                session_id=request.session_id,
+                sequence_number=request.sequence_number,
+                status_message="Segment received, but its deadline has passed; not forwarded to STT.",
+            )
+        stt_timeout = deadlines.remaining(context, STT_TIMEOUT_SECONDS, INGEST_RESERVED_SECONDS)
+
+        call_start = time.perf_counter()
         try:
             # Create a channel and stub to call the SpeechToTextService
             with grpc.insecure_channel(self.stt_service_address) as channel:
-                stub = audio_stream_pb2_grpc.SpeechToTextStub(channel)
+                stub = audio_stream_pb2_grpc.SpeechToTextStub(tracing.intercept_channel(channel))
 
                 # Forward the received AudioSegment to SpeechToTextService
-                # print(f"StreamingDataManager: Forwarding segment to STT service at {self.stt_service_address}")
-                stt_response = stub.TranscribeAudioSegment(request, timeout=10) # Adding a timeout
+                stt_response = stub.TranscribeAudioSegment(request, timeout=stt_timeout)
 
                 if stt_response:
-                    print(f"StreamingDataManager: Received transcription from STT: SID={stt_response.session_id}, Seq={stt_response.sequence_number}, Transcript='{stt_response.transcript}', IsFinal={stt_response.is_final}")
+                    log.info("transcript" if request.is_final else "segment",
+                             "Received transcription from STT: Transcript='%s', IsFinal=%s",
+                             stt_response.transcript, stt_response.is_final,
+                             session_id=stt_response.session_id, seq=request.sequence_number, stage="ingest")
                     status_message = "Segment received and forwarded to STT. STT Response: " + stt_response.transcript
+                    if stt_response.transcript or stt_response.is_final:
+                        self._forward_transcript(request, stt_response)
                 else:
-                    print("StreamingDataManager: Received no response from STT service.")
+                    log.warning("rpc", "Received no response from STT service.",
+                                session_id=request.session_id, seq=request.sequence_number, stage="ingest")
                     status_message = "Segment received, but no response from STT service."
 
         except grpc.RpcError as e:
-            print(f"StreamingDataManager: Error calling SpeechToTextService: {e.code()} - {e.details()}")
+            log.error("rpc", "Error calling SpeechToTextService: %s", logs.describe_rpc_error(e),
+                      session_id=request.session_id, seq=request.sequence_number, stage="ingest")
             status_message = f"Segment received, but failed to forward to STT: {e.details()}"
             # Optionally, you could re-raise or handle specific error codes differently
         except Exception as e:
-            print(f"StreamingDataManager: An unexpected error occurred while calling STT: {e}")
+            log.error("rpc", "An unexpected error occurred while calling STT: %s", e,
+                      session_id=request.session_id, seq=request.sequence_number, stage="ingest")
             status_message = f"Segment received, but an unexpected error occurred during STT call: {e}"
 
+        if request.is_final:
+            # A turn ends with its is_final segment; its latency is the wait for the final transcript.
+            session_stats.record_turn(time.perf_counter() - call_start)
 
         return audio_stream_pb2.IngestResponse(
             session_id=request.session_id,
@@ -75,26 +206,26 @@ class StreamingDataManager:
         """
         self.stt_service = stt_service # This would be an instance of a client or logic class
         self._active_streams = {}
-        print("StreamingDataManager (logic class) initialized.")
+        log.info("lifecycle", "StreamingDataManager (logic class) initialized.")
         if self.stt_service:
-            print("STT Service instance provided.")
+            log.info("lifecycle", "STT Service instance provided.")
         else:
-            print("No STT Service instance provided at init.")
+            log.info("lifecycle", "No STT Service instance provided at init.")
 
     # ... (other methods like register_stream, unregister_stream remain for now) ...
     def register_stream(self, stream_id: str, stream_source_info: dict):
         if stream_id in self._active_streams:
-            print(f"Stream {stream_id} already registered.")
+            log.warning("stream", "Stream %s already registered.", stream_id)
             return False
-        print(f"Registering stream: {stream_id} with source info: {stream_source_info}")
+        log.info("stream", "Registering stream: %s with source info: %s", stream_id, stream_source_info)
         self._active_streams[stream_id] = {"source_info": stream_source_info, "status": "registered"}
         return True
 
     def unregister_stream(self, stream_id: str):
         if stream_id not in self._active_streams:
-            print(f"Stream {stream_id} not found for unregistration.")
+            log.warning("stream", "Stream %s not found for unregistration.", stream_id)
             return False
-        print(f"Unregistering stream: {stream_id}")
+        log.info("stream", "Unregistering stream: %s", stream_id)
         del self._active_streams[stream_id]
         return True
 
@@ -102,24 +233,59 @@ def serve():
     """
     Starts the gRPC server for the StreamingDataManager.
     """
-    server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
+    logs.configure()
+    # Every segment of a caller turn shares one trace; the is_final segment ends the turn.
+    tracer = tracing.init_tracer("streaming_data_manager")
+    turn_contexts = tracing.TurnContexts(tracer) if tracer else None
+    server = grpc.server(
+        futures.ThreadPoolExecutor(max_workers=10),
+        interceptors=metrics.server_interceptors("streaming_data_manager")
+        + tracing.server_interceptors(root_context=turn_contexts.context_for if turn_contexts else None),
+    )
+
+    recording_store = None
+    compactor = None
+    if ENABLE_CALL_RECORDING:
+        recording_store = RecordingStore(RECORDINGS_DIR, segment_seconds=RECORDING_SEGMENT_SECONDS)
+        compactor = RecordingCompactor(
+            recording_store,
+            codec=COMPACTION_CODEC,
+            max_workers=COMPACTION_WORKERS,
+            max_bytes_per_second=COMPACTION_MAX_BYTES_PER_SECOND,
+            poll_interval_seconds=COMPACTION_POLL_INTERVAL_SECONDS,
+        )
+        compactor.start()
+        log.info("lifecycle", "Call recording enabled. Recordings directory: %s", RECORDINGS_DIR)
+
     # The servicer is instantiated directly here.
     # If it needed access to a StreamingDataManager instance, you'd pass it here.
-    audio_stream_pb2_grpc.add_StreamIngestServicer_to_server(StreamIngestServicer(), server)
+    servicer = StreamIngestServicer(recording_store=recording_store)
+    audio_stream_pb2_grpc.add_StreamIngestServicer_to_server(servicer, server)
+    admin.add_to_server(server, "streaming_data_manager", sessions=servicer.sessions)
+    servicer.sessions.start_reaper(on_evict=servicer.evict_idle_session)
     
     listen_addr = '[::]:50051'
     server.add_insecure_port(listen_addr)
 
-    print(f"StreamingDataManager gRPC server starting on {listen_addr}")
+    log.info("lifecycle", "StreamingDataManager gRPC server starting on %s", listen_addr)
     server.start()
-    print(f"Server started. Waiting for termination...")
+    metrics.start_http_server("streaming_data_manager", 51051)
+    log.info("lifecycle", "Server started. Waiting for termination...")
     try:
         while True:
             time.sleep(86400)
     except KeyboardInterrupt:
-        print("Server stopping...")
+        log.info("lifecycle", "Server stopping...")
         server.stop(0)
-        print("Server stopped.")
+        servicer.sessions.stop_reaper()
+        if compactor:
+            compactor.stop()
+        if recording_store:
+            recording_store.close()
+        metrics.shutdown()
+        tracing.shutdown()
+        log.info("lifecycle", "Server stopped.")
+        logs.shutdown()
 
 if __name__ == "__main__":
     serve()
@@ -8,8 +8,32 @@ import audio_stream_pb2
 import audio_stream_pb2_grpc
 
 # The module under test
+from config import INGEST_RESERVED_SECONDS
 from manager import StreamIngestServicer # Assuming manager.py is in the same directory
 
+
+class FakeRpcError(grpc.RpcError):
+    """An RpcError as a failed call raises it; grpc.RpcError itself has no code() or details()."""
+
+    def __init__(self, code, details):
+        super().__init__(details)
+        self._code = code
+        self._details = details
+
+    def code(self):
+        return self._code
+
+    def details(self):
+        return self._details
+
+
+def stt_channel():
+    """A mock insecure_channel() result usable as `with ... as channel`."""
+    channel = mock.MagicMock()
+    channel.__enter__.return_value = channel
+    return channel
+
+
 class TestStreamIngestServicer(unittest.TestCase):
 
     def test_IngestAudioSegment_success(self):
@@ -25,11 +49,12 @@ class TestStreamIngestServicer(unittest.TestCase):
             is_final=False
         )
 
-        # Mock the gRPC context (not strictly needed for this servicer's current logic)
+        # Mock the gRPC context; the caller set no deadline
         mock_context = mock.Mock(spec=grpc.ServicerContext)
+        mock_context.time_remaining.return_value = None
 
-        # Mock the SpeechToTextStub and its TranscribeAudioSegment method
-        mock_stt_stub = mock.Mock(spec=audio_stream_pb2_grpc.SpeechToTextStub)
+        # The stub's methods are set in its __init__, so a spec'd Mock would not have them
+        mock_stt_stub = mock.Mock()
         mock_transcription_response = audio_stream_pb2.TranscriptionResponse(
             session_id=sample_segment.session_id,
             sequence_number=sample_segment.sequence_number,
@@ -38,13 +63,14 @@ class TestStreamIngestServicer(unittest.TestCase):
             confidence=0.88
         )
         mock_stt_stub.TranscribeAudioSegment.return_value = mock_transcription_response
+        # Transcripts go to the orchestrator, whose calls are not waited for
+        servicer.orchestrator_stub = mock.Mock()
 
         # Patch the grpc.insecure_channel and the SpeechToTextStub constructor
         # The target for patch should be where it's looked up (i.e., in the 'manager' module)
         with mock.patch('manager.grpc.insecure_channel') as mock_channel_constructor:
-            # Configure the mock channel to return a context manager that yields the mock_stt_stub
-            mock_channel_instance = mock.Mock()
-            mock_channel_instance.__enter__.return_value = mock_stt_stub # This is what 'with ... as channel' uses
+            # 'with grpc.insecure_channel(...) as channel' yields the channel itself
+            mock_channel_instance = stt_channel()
             mock_channel_constructor.return_value = mock_channel_instance
 
             # Patch the SpeechToTextStub to return our mock_stt_stub
@@ -58,8 +84,8 @@ class TestStreamIngestServicer(unittest.TestCase):
                 mock_channel_constructor.assert_called_once_with(servicer.stt_service_address)
 
                 # Check that SpeechToTextStub was instantiated with the channel from insecure_channel
-                # This is implicitly tested if TranscribeAudioSegment is called on mock_stt_stub correctly
-                mock_StubConstructor.assert_called_once_with(mock_channel_instance.__enter__.return_value)
+                # (tracing is off, so intercept_channel returns it unchanged)
+                mock_StubConstructor.assert_called_once_with(mock_channel_instance)
 
 
                 # Check that TranscribeAudioSegment was called on the stub with the correct request
@@ -71,60 +97,90 @@ class TestStreamIngestServicer(unittest.TestCase):
                 self.assertIn("Segment received and forwarded to STT", response.status_message)
                 self.assertIn("STT mock transcript", response.status_message)
 
+                # The final transcript is handed to the orchestrator without waiting for the turn
+                (event,), kwargs = servicer.orchestrator_stub.HandleTranscript.future.call_args
+                self.assertEqual((event.session_id, event.transcript, event.is_final, event.sequence_number),
+                                 (sample_segment.session_id, "STT mock transcript", True, 1))
+                servicer.orchestrator_stub.HandleTranscript.future.return_value.result.assert_not_called()
+
     def test_IngestAudioSegment_stt_rpc_error(self):
         """Test handling of gRPC RpcError when calling STT service."""
         servicer = StreamIngestServicer()
         sample_segment = audio_stream_pb2.AudioSegment(session_id="test_rpc_error", sequence_number=2)
         mock_context = mock.Mock(spec=grpc.ServicerContext)
+        mock_context.time_remaining.return_value = None
 
-        # Mock the STT stub to raise an RpcError
-        mock_stt_stub = mock.Mock(spec=audio_stream_pb2_grpc.SpeechToTextStub)
-
-        # Create a mock RpcError
-        # Note: Creating a real RpcError for testing can be complex as it's usually raised by the grpc library.
-        # We can simulate it by having the mock method raise it.
-        # For simplicity, we'll mock the error object itself if needed for specific attributes.
-        mock_rpc_error = grpc.RpcError("Simulated RpcError from STT")
-        # If you need to simulate specific codes or details:
-        # mock_rpc_error = mock.Mock(spec=grpc.RpcError)
-        # mock_rpc_error.code.return_value = grpc.StatusCode.UNAVAILABLE
-        # mock_rpc_error.details.return_value = "STT service down"
-        # For this test, a generic RpcError is fine.
-        mock_stt_stub.TranscribeAudioSegment.side_effect = mock_rpc_error
+        servicer.orchestrator_stub = mock.Mock()
 
+        # Mock the STT stub to raise an RpcError, as a failed call would
+        mock_stt_stub = mock.Mock()
+        mock_stt_stub.TranscribeAudioSegment.side_effect = FakeRpcError(grpc.StatusCode.UNAVAILABLE,
+                                                                        "STT service down")
 
         with mock.patch('manager.grpc.insecure_channel') as mock_channel_constructor:
-            mock_channel_instance = mock.Mock()
-            mock_channel_instance.__enter__.return_value = mock_stt_stub
-            mock_channel_constructor.return_value = mock_channel_instance
+            mock_channel_constructor.return_value = stt_channel()
             with mock.patch('manager.audio_stream_pb2_grpc.SpeechToTextStub', return_value=mock_stt_stub):
-                response = servicer.IngestAudioSegment(sample_segment, mock_context)
+                with self.assertLogs("revo.streaming_data_manager", level="ERROR"):
+                    response = servicer.IngestAudioSegment(sample_segment, mock_context)
 
                 mock_stt_stub.TranscribeAudioSegment.assert_called_once_with(sample_segment, timeout=10)
                 self.assertEqual(response.session_id, sample_segment.session_id)
                 self.assertIn("Segment received, but failed to forward to STT", response.status_message)
-                # self.assertIn("Simulated RpcError from STT", response.status_message) # Check specific error message if needed
+                self.assertIn("STT service down", response.status_message)
+                servicer.orchestrator_stub.HandleTranscript.future.assert_not_called() # No transcript to hand on
 
     def test_IngestAudioSegment_stt_unexpected_error(self):
         """Test handling of unexpected Python errors when calling STT service."""
         servicer = StreamIngestServicer()
         sample_segment = audio_stream_pb2.AudioSegment(session_id="test_unexpected_error", sequence_number=3)
         mock_context = mock.Mock(spec=grpc.ServicerContext)
+        mock_context.time_remaining.return_value = None
 
-        mock_stt_stub = mock.Mock(spec=audio_stream_pb2_grpc.SpeechToTextStub)
+        servicer.orchestrator_stub = mock.Mock()
+        mock_stt_stub = mock.Mock()
         mock_stt_stub.TranscribeAudioSegment.side_effect = ValueError("Unexpected Python error in STT call chain")
 
         with mock.patch('manager.grpc.insecure_channel') as mock_channel_constructor:
-            mock_channel_instance = mock.Mock()
-            mock_channel_instance.__enter__.return_value = mock_stt_stub
-            mock_channel_constructor.return_value = mock_channel_instance
+            mock_channel_constructor.return_value = stt_channel()
             with mock.patch('manager.audio_stream_pb2_grpc.SpeechToTextStub', return_value=mock_stt_stub):
-                response = servicer.IngestAudioSegment(sample_segment, mock_context)
+                with self.assertLogs("revo.streaming_data_manager", level="ERROR"):
+                    response = servicer.IngestAudioSegment(sample_segment, mock_context)
 
                 mock_stt_stub.TranscribeAudioSegment.assert_called_once_with(sample_segment, timeout=10)
                 self.assertEqual(response.session_id, sample_segment.session_id)
                 self.assertIn("Segment received, but an unexpected error occurred during STT call", response.status_message)
                 self.assertIn("Unexpected Python error", response.status_message)
+                servicer.orchestrator_stub.HandleTranscript.future.assert_not_called()
+
+    def test_IngestAudioSegment_passes_the_remaining_deadline_to_stt(self):
+        servicer = StreamIngestServicer()
+        sample_segment = audio_stream_pb2.AudioSegment(session_id="test_deadline", sequence_number=4)
+        mock_context = mock.Mock(spec=grpc.ServicerContext)
+        mock_context.time_remaining.return_value = 0.8
+        mock_stt_stub = mock.Mock()
+        mock_stt_stub.TranscribeAudioSegment.return_value = audio_stream_pb2.TranscriptionResponse(
+            session_id=sample_segment.session_id)
+
+        with mock.patch('manager.grpc.insecure_channel'), \
+                mock.patch('manager.audio_stream_pb2_grpc.SpeechToTextStub', return_value=mock_stt_stub):
+            servicer.IngestAudioSegment(sample_segment, mock_context)
+
+        timeout = mock_stt_stub.TranscribeAudioSegment.call_args[1]['timeout']
+        self.assertAlmostEqual(timeout, 0.8 - INGEST_RESERVED_SECONDS)
+
+    def test_IngestAudioSegment_drops_a_segment_past_its_deadline(self):
+        servicer = StreamIngestServicer()
+        sample_segment = audio_stream_pb2.AudioSegment(session_id="test_expired", sequence_number=5)
+        mock_context = mock.Mock(spec=grpc.ServicerContext)
+        mock_context.time_remaining.return_value = 0.0
+
+        with mock.patch('manager.grpc.insecure_channel') as mock_channel_constructor:
+            with self.assertLogs("revo.deadlines", level="WARNING"):
+                response = servicer.IngestAudioSegment(sample_segment, mock_context)
+
+        mock_channel_constructor.assert_not_called()
+        mock_context.set_code.assert_called_once_with(grpc.StatusCode.DEADLINE_EXCEEDED)
+        self.assertIn("deadline has passed", response.status_message)
 
 
 if __name__ == '__main__':
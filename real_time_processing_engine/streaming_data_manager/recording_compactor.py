@@ -0,0 +1,162 @@
+# real_time_processing_engine/streaming_data_manager/recording_compactor.py
+
+import os
+import sys
+import threading
+import time
+from concurrent import futures
+
+from recording_store import RecordingStore, compact_segment_file, default_compaction_codec
+
+# Shared observability package at the repository root
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from observability import logs
+
+log = logs.get_logger("streaming_data_manager")
+
+
+def _lower_worker_priority():
+    """Process-pool initializer: run compaction at the lowest CPU priority."""
+    try:
+        os.nice(19)
+    except (AttributeError, OSError):
+        pass # Not supported on this platform; the byte-rate throttle still applies.
+
+
+class RecordingCompactor:
+    """
+    Background job that re-encodes sealed pcm16 recording segments with a
+    lossless codec in a process pool and swaps their index entries.
+
+    Compaction is throttled two ways so it never competes with live calls:
+    worker processes run at nice 19, and the job feeds at most
+    `max_bytes_per_second` of raw audio to the pool.
+    """
+
+    def __init__(self, store: RecordingStore, codec: str = "", max_workers: int = 1,
+                 max_bytes_per_second: int = 4 * 1024 * 1024, poll_interval_seconds: float = 30.0):
+        self.store = store
+        self.codec = codec or default_compaction_codec()
+        self.max_workers = max(1, max_workers)
+        self.max_bytes_per_second = max_bytes_per_second
+        self.poll_interval_seconds = poll_interval_seconds
+        self._executor = None
+        self._thread = None
+        self._stop_event = threading.Event()
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "segments_compacted": 0,
+            "segments_failed": 0,
+            "raw_bytes": 0,
+            "stored_bytes": 0,
+            "worker_cpu_seconds": 0.0,
+            "wall_seconds": 0.0,
+        }
+
+    def _get_executor(self):
+        if self._executor is None:
+            self._executor = futures.ProcessPoolExecutor(max_workers=self.max_workers,
+                                                         initializer=_lower_worker_priority)
+        return self._executor
+
+    def run_once(self) -> int:
+        """
+        Compacts every segment that is currently sealed. Returns the number of
+        segments compacted in this pass.
+        """
+        candidates = self.store.compaction_candidates()
+        if not candidates:
+            return 0
+        executor = self._get_executor()
+        compacted = 0
+        pass_started = time.monotonic()
+        budget_started = pass_started
+        submitted_bytes = 0
+        pending = {}
+
+        for entry in candidates:
+            if self._stop_event.is_set():
+                break
+            # Byte-rate throttle: don't submit more than max_bytes_per_second on average.
+            if self.max_bytes_per_second > 0:
+                earliest = budget_started + submitted_bytes / self.max_bytes_per_second
+                delay = earliest - time.monotonic()
+                if delay > 0 and self._stop_event.wait(delay):
+                    break
+            # Keep at most one segment in flight per worker.
+            while len(pending) >= self.max_workers:
+                done, _ = futures.wait(pending, return_when=futures.FIRST_COMPLETED)
+                for fut in done:
+                    compacted += self._finish(pending.pop(fut), fut)
+            fut = executor.submit(compact_segment_file, self.store.path_for(entry),
+                                  self.store.compacted_path_for(entry, self.codec),
+                                  self.codec, entry["sample_rate"])
+            pending[fut] = entry
+            submitted_bytes += entry["raw_bytes"]
+
+        for fut in futures.as_completed(list(pending)):
+            compacted += self._finish(pending.pop(fut), fut)
+
+        with self._stats_lock:
+            self._stats["wall_seconds"] += time.monotonic() - pass_started
+        return compacted
+
+    def _finish(self, entry: dict, fut) -> int:
+        try:
+            stored_bytes, cpu_seconds = fut.result()
+        except Exception as e:
+            log.error("recording", "RecordingCompactor: Failed to compact segment %s: %s", entry['segment_id'], e)
+            with self._stats_lock:
+                self._stats["segments_failed"] += 1
+            return 0
+        self.store.commit_compaction(entry["segment_id"], self.codec, stored_bytes)
+        with self._stats_lock:
+            self._stats["segments_compacted"] += 1
+            self._stats["raw_bytes"] += entry["raw_bytes"]
+            self._stats["stored_bytes"] += stored_bytes
+            self._stats["worker_cpu_seconds"] += cpu_seconds
+        return 1
+
+    def get_stats(self) -> dict:
+        """
+        Returns cumulative compaction statistics, including the compression
+        ratio (raw / stored) and throughput in raw bytes per worker CPU second
+        and per wall-clock second.
+        """
+        with self._stats_lock:
+            stats = dict(self._stats)
+        stats["codec"] = self.codec
+        stats["compression_ratio"] = stats["raw_bytes"] / stats["stored_bytes"] if stats["stored_bytes"] else 0.0
+        stats["throughput_bytes_per_cpu_second"] = (
+            stats["raw_bytes"] / stats["worker_cpu_seconds"] if stats["worker_cpu_seconds"] else 0.0)
+        stats["throughput_bytes_per_second"] = (
+            stats["raw_bytes"] / stats["wall_seconds"] if stats["wall_seconds"] else 0.0)
+        return stats
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            try:
+                if self.run_once():
+                    stats = self.get_stats()
+                    log.info("recording", "RecordingCompactor: %d segments compacted with %s, ratio %.2fx, "
+                             "%.1f MB/s per worker CPU second", stats['segments_compacted'], stats['codec'],
+                             stats['compression_ratio'], stats['throughput_bytes_per_cpu_second'] / 1e6)
+            except Exception as e:
+                log.error("recording", "RecordingCompactor: Unexpected error during compaction pass: %s", e)
+            self._stop_event.wait(self.poll_interval_seconds)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="recording-compactor", daemon=True)
+            self._thread.start()
+            log.info("recording", "RecordingCompactor: Started with codec %s, %d worker(s), limit %d B/s",
+                     self.codec, self.max_workers, self.max_bytes_per_second)
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+            self._thread = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
@@ -0,0 +1,431 @@
+# real_time_processing_engine/streaming_data_manager/recording_store.py
+
+import hashlib
+import json
+import os
+import queue
+import re
+import struct
+import sys
+import threading
+import time
+import zlib
+from array import array
+
+import audio_stream_pb2
+
+try:
+    import soundfile # Optional: enables FLAC compaction
+except ImportError:
+    soundfile = None
+
+# Shared observability package at the repository root
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from observability import logs
+
+log = logs.get_logger("streaming_data_manager")
+
+# Segment codecs. "pcm16" and "opus-packets" are what the recorder writes;
+# "flac" and "dpcm-zlib" are produced by the compactor.
+CODEC_PCM16 = "pcm16"
+CODEC_OPUS_PACKETS = "opus-packets"
+CODEC_FLAC = "flac"
+CODEC_DPCM_ZLIB = "dpcm-zlib"
+
+COMPACTED_CODECS = (CODEC_FLAC, CODEC_DPCM_ZLIB)
+
+_FILE_EXTENSIONS = {
+    CODEC_PCM16: ".pcm",
+    CODEC_OPUS_PACKETS: ".opus-packets",
+    CODEC_FLAC: ".flac",
+    CODEC_DPCM_ZLIB: ".dpcmz",
+}
+
+STATE_OPEN = "open"
+STATE_SEALED = "sealed"
+STATE_COMPACTED = "compacted"
+
+
+def _ulaw_to_linear(u: int) -> int:
+    u = ~u & 0xFF
+    t = ((u & 0x0F) << 3) + 0x84
+    t <<= (u & 0x70) >> 4
+    return (0x84 - t) if (u & 0x80) else (t - 0x84)
+
+
+def _alaw_to_linear(a: int) -> int:
+    a ^= 0x55
+    t = (a & 0x0F) << 4
+    seg = (a & 0x70) >> 4
+    if seg == 0:
+        t += 8
+    elif seg == 1:
+        t += 0x108
+    else:
+        t = (t + 0x108) << (seg - 1)
+    return t if (a & 0x80) else -t
+
+
+# G.711 decode tables, built once at import time.
+_ULAW_TABLE = array('h', (_ulaw_to_linear(i) for i in range(256)))
+_ALAW_TABLE = array('h', (_alaw_to_linear(i) for i in range(256)))
+
+
+def _pcm16_to_le_bytes(samples: array) -> bytes:
+    if sys.byteorder == "big":
+        samples.byteswap()
+    return samples.tobytes()
+
+
+def _le_bytes_to_pcm16(data: bytes) -> array:
+    samples = array('h')
+    samples.frombytes(data[:len(data) - (len(data) % 2)])
+    if sys.byteorder == "big":
+        samples.byteswap()
+    return samples
+
+
+def to_storable(audio_format, data: bytes):
+    """
+    Maps an incoming AudioSegment payload to what the recorder writes to disk.
+
+    Returns:
+        tuple: (payload_bytes, codec, sample_rate). G.711 is expanded to 16-bit
+               little-endian linear PCM; Opus packets are kept as-is (length-prefixed)
+               because they are already compressed.
+    """
+    if audio_format == audio_stream_pb2.AudioFormat.Value('PCMU'):
+        return _pcm16_to_le_bytes(array('h', map(_ULAW_TABLE.__getitem__, data))), CODEC_PCM16, 8000
+    if audio_format == audio_stream_pb2.AudioFormat.Value('PCMA'):
+        return _pcm16_to_le_bytes(array('h', map(_ALAW_TABLE.__getitem__, data))), CODEC_PCM16, 8000
+    if audio_format == audio_stream_pb2.AudioFormat.Value('OPUS'):
+        return struct.pack("<H", len(data)) + data, CODEC_OPUS_PACKETS, 48000
+    # Unspecified: treated as linear16 @ 16 kHz, matching the STT service default.
+    return data, CODEC_PCM16, 16000
+
+
+# --- Compaction codecs -------------------------------------------------------
+# These are module-level functions so they can run in worker processes.
+
+def encode_dpcm_zlib(pcm: bytes) -> bytes:
+    """
+    Lossless: first-order prediction residuals taken modulo 2**16 (exactly
+    reversible), split into high/low byte planes and zlib-compressed.
+    """
+    samples = _le_bytes_to_pcm16(pcm)
+    hi = bytearray(len(samples))
+    lo = bytearray(len(samples))
+    prev = 0
+    for i, s in enumerate(samples):
+        r = (s - prev) & 0xFFFF
+        hi[i] = r >> 8
+        lo[i] = r & 0xFF
+        prev = s
+    return struct.pack("<I", len(samples)) + zlib.compress(bytes(hi) + bytes(lo), 9)
+
+
+def decode_dpcm_zlib(blob: bytes) -> bytes:
+    (count,) = struct.unpack_from("<I", blob)
+    planes = zlib.decompress(blob[4:])
+    hi, lo = planes[:count], planes[count:]
+    samples = array('h', bytes(2 * count))
+    acc = 0
+    for i in range(count):
+        acc = (acc + ((hi[i] << 8) | lo[i])) & 0xFFFF
+        samples[i] = acc - 0x10000 if acc & 0x8000 else acc
+    return _pcm16_to_le_bytes(samples)
+
+
+def encode_flac(pcm: bytes, sample_rate: int, out_path: str):
+    import numpy as np # soundfile depends on numpy
+    soundfile.write(out_path, np.frombuffer(pcm, dtype="<i2"), sample_rate, format="FLAC", subtype="PCM_16")
+
+
+def decode_flac(path: str) -> bytes:
+    data, _ = soundfile.read(path, dtype="int16")
+    return data.astype("<i2").tobytes()
+
+
+def default_compaction_codec() -> str:
+    return CODEC_FLAC if soundfile is not None else CODEC_DPCM_ZLIB
+
+
+def compact_segment_file(raw_path: str, out_path: str, codec: str, sample_rate: int):
+    """
+    Re-encodes one sealed pcm16 segment file. Runs in a worker process.
+
+    Returns:
+        tuple: (stored_bytes, cpu_seconds)
+    """
+    started = time.process_time()
+    with open(raw_path, "rb") as f:
+        pcm = f.read()
+    tmp_path = out_path + ".tmp"
+    if codec == CODEC_FLAC:
+        if soundfile is None:
+            raise RuntimeError("FLAC compaction requires the 'soundfile' package.")
+        encode_flac(pcm, sample_rate, tmp_path)
+    elif codec == CODEC_DPCM_ZLIB:
+        with open(tmp_path, "wb") as f:
+            f.write(encode_dpcm_zlib(pcm))
+    else:
+        raise ValueError(f"Unknown compaction codec: {codec}")
+    os.replace(tmp_path, out_path)
+    return os.path.getsize(out_path), time.process_time() - started
+
+
+def _safe_name(session_id: str) -> str:
+    """
+    On-disk directory name of a session: the session id with unsafe characters
+    replaced, plus a short hash of the raw id so that e.g. "a/b" and "a_b" do
+    not share a directory.
+    """
+    digest = hashlib.sha256(session_id.encode("utf-8")).hexdigest()[:10]
+    return f"{re.sub(r'[^A-Za-z0-9_.-]', '_', session_id)}-{digest}"
+
+
+class RecordingStore:
+    """
+    Append-only store for call audio, split into fixed-duration segments.
+
+    Each session's audio goes to an "open" segment file. A segment is sealed
+    when it reaches `segment_seconds` of audio or when the client sends an
+    `is_final` segment. Sealed segments are immutable, which is what lets the
+    compactor re-encode them in the background and then swap their index entry.
+
+    The index is a snapshot, `<root_dir>/index.json`, plus an append-only
+    journal, `<root_dir>/index.journal`, with one JSON line per entry change
+    (segment opened, sealed or compacted). Changes are queued under the lock
+    and written by a background thread, so neither `append()` nor the
+    compactor waits on index I/O. Every `journal_compaction_records` lines the
+    writer replaces the snapshot atomically (temp file, then `os.replace`) and
+    truncates the journal. On start-up the snapshot is loaded and the journal
+    replayed; a torn last line from a crash is skipped.
+    """
+
+    def __init__(self, root_dir: str, segment_seconds: int = 60, journal_compaction_records: int = 1000):
+        self.root_dir = root_dir
+        self.segment_seconds = segment_seconds
+        self.journal_compaction_records = max(1, journal_compaction_records)
+        self._index_path = os.path.join(root_dir, "index.json")
+        self._journal_path = os.path.join(root_dir, "index.journal")
+        self._lock = threading.Lock()
+        self._segments = {} # {segment_id: entry}
+        self._open = {} # {session_id: (file object, entry)}
+        self._next_seq = {} # {session directory name: next segment number}
+        self._changes = queue.Queue() # Entry snapshots for the index writer; None stops it
+        self._journal_records = 0 # Lines in the journal file; owned by the writer after start-up
+        os.makedirs(root_dir, exist_ok=True)
+        self._load_index()
+        self._persisted = {k: dict(v) for k, v in self._segments.items()} # The writer's view of the index
+        self._writer = threading.Thread(target=self._run_index_writer, name="recording-index-writer", daemon=True)
+        self._writer.start()
+
+    def _load_index(self):
+        if os.path.exists(self._index_path):
+            with open(self._index_path, "r", encoding="utf-8") as f:
+                self._segments = json.load(f).get("segments", {})
+        if os.path.exists(self._journal_path):
+            with open(self._journal_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue # Torn write from a crash
+                    self._segments[entry["segment_id"]] = entry
+                    self._journal_records += 1
+        for entry in self._segments.values():
+            # Segments that were open when the process stopped are sealed as-is.
+            if entry["state"] == STATE_OPEN:
+                entry["state"] = STATE_SEALED
+                path = os.path.join(self.root_dir, entry["path"])
+                entry["raw_bytes"] = entry["stored_bytes"] = os.path.getsize(path) if os.path.exists(path) else 0
+                self._changes.put(dict(entry))
+            name, seq = entry["segment_id"].rsplit("/", 1)
+            self._next_seq[name] = max(self._next_seq.get(name, 0), int(seq) + 1)
+        if self._segments:
+            log.info("recording", "RecordingStore: Loaded index with %d segments from %s", len(self._segments), self.root_dir)
+
+    def _journal_locked(self, entry: dict):
+        self._changes.put(dict(entry))
+
+    def _run_index_writer(self):
+        """Writes queued entry changes to the journal and compacts it into the snapshot."""
+        stopping = False
+        while not stopping:
+            batch = [self._changes.get()]
+            while True:
+                try:
+                    batch.append(self._changes.get_nowait())
+                except queue.Empty:
+                    break
+            entries = [entry for entry in batch if entry is not None]
+            stopping = len(entries) < len(batch)
+            try:
+                self._write_journal(entries)
+                if self._journal_records >= self.journal_compaction_records or (stopping and self._journal_records):
+                    self._write_snapshot()
+            except OSError as e:
+                log.error("recording", "RecordingStore: Failed to write the index: %s", e)
+            finally:
+                for _ in batch:
+                    self._changes.task_done()
+
+    def _write_journal(self, entries: list):
+        for entry in entries:
+            self._persisted[entry["segment_id"]] = entry
+        if not entries:
+            return
+        with open(self._journal_path, "a", encoding="utf-8") as f:
+            f.write("".join(json.dumps(entry) + "\n" for entry in entries))
+        self._journal_records += len(entries)
+
+    def _write_snapshot(self):
+        tmp_path = self._index_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"segments": self._persisted}, f)
+        os.replace(tmp_path, self._index_path)
+        # Replaying journal lines already in the snapshot is harmless, so a crash here loses nothing.
+        open(self._journal_path, "w", encoding="utf-8").close()
+        self._journal_records = 0
+
+    def flush(self):
+        """Blocks until every index change made so far has been written."""
+        self._changes.join()
+
+    def append(self, segment: audio_stream_pb2.AudioSegment):
+        """Appends one AudioSegment to its session's open recording segment."""
+        payload, codec, sample_rate = to_storable(segment.audio_format, segment.data)
+        with self._lock:
+            handle, entry = self._open.get(segment.session_id, (None, None))
+            if handle is not None and entry["codec"] != codec:
+                self._seal_locked(segment.session_id)
+                handle = None
+            if handle is None:
+                handle, entry = self._open_segment_locked(segment.session_id, codec, sample_rate)
+            handle.write(payload)
+            entry["raw_bytes"] += len(payload)
+            entry["stored_bytes"] = entry["raw_bytes"]
+            entry["duration_ms"] += self._payload_duration_ms(payload, codec, sample_rate)
+            if segment.is_final or entry["duration_ms"] >= self.segment_seconds * 1000:
+                self._seal_locked(segment.session_id)
+
+    @staticmethod
+    def _payload_duration_ms(payload: bytes, codec: str, sample_rate: int) -> float:
+        if codec == CODEC_PCM16:
+            return len(payload) / 2 / sample_rate * 1000
+        return 20.0 # Opus packets from the gateways carry 20 ms frames
+
+    def _open_segment_locked(self, session_id: str, codec: str, sample_rate: int):
+        name = _safe_name(session_id)
+        seq = self._next_seq.get(name, 0)
+        self._next_seq[name] = seq + 1
+        segment_id = f"{name}/{seq:06d}"
+        rel_path = segment_id + _FILE_EXTENSIONS[codec]
+        os.makedirs(os.path.join(self.root_dir, os.path.dirname(rel_path)), exist_ok=True)
+        handle = open(os.path.join(self.root_dir, rel_path), "ab")
+        entry = {
+            "segment_id": segment_id,
+            "session_id": session_id,
+            "path": rel_path,
+            "codec": codec,
+            "sample_rate": sample_rate,
+            "raw_bytes": 0,
+            "stored_bytes": 0,
+            "duration_ms": 0.0,
+            "state": STATE_OPEN,
+            "created_at": time.time(),
+        }
+        self._segments[segment_id] = entry
+        self._open[session_id] = (handle, entry)
+        self._journal_locked(entry)
+        return handle, entry
+
+    def _seal_locked(self, session_id: str):
+        handle, entry = self._open.pop(session_id)
+        handle.close()
+        entry["state"] = STATE_SEALED
+        self._journal_locked(entry)
+
+    def seal_session(self, session_id: str):
+        """Seals the session's open segment, if any (e.g. when a call ends)."""
+        with self._lock:
+            if session_id in self._open:
+                self._seal_locked(session_id)
+
+    def close(self):
+        """Seals every open segment and writes the index snapshot."""
+        with self._lock:
+            for session_id in list(self._open):
+                self._seal_locked(session_id)
+        if self._writer.is_alive():
+            self._changes.put(None)
+            self._writer.join()
+
+    def compaction_candidates(self) -> list[dict]:
+        """Snapshot of sealed pcm16 segments that have not been compacted yet."""
+        with self._lock:
+            return [dict(e) for e in self._segments.values()
+                    if e["state"] == STATE_SEALED and e["codec"] == CODEC_PCM16]
+
+    def path_for(self, entry: dict) -> str:
+        return os.path.join(self.root_dir, entry["path"])
+
+    def compacted_path_for(self, entry: dict, codec: str) -> str:
+        return os.path.join(self.root_dir, entry["segment_id"] + _FILE_EXTENSIONS[codec])
+
+    def commit_compaction(self, segment_id: str, codec: str, stored_bytes: int):
+        """
+        Atomically swaps a segment's index entry to its compacted file, then
+        removes the raw file. Readers that raced with the swap retry once.
+        """
+        with self._lock:
+            entry = self._segments[segment_id]
+            old_path = self.path_for(entry)
+            entry["path"] = entry["segment_id"] + _FILE_EXTENSIONS[codec]
+            entry["codec"] = codec
+            entry["stored_bytes"] = stored_bytes
+            entry["state"] = STATE_COMPACTED
+            self._journal_locked(entry)
+        try:
+            os.remove(old_path)
+        except FileNotFoundError:
+            pass
+
+    def segments_for_session(self, session_id: str) -> list[dict]:
+        with self._lock:
+            return sorted((dict(e) for e in self._segments.values() if e["session_id"] == session_id),
+                          key=lambda e: e["segment_id"])
+
+    def read_segment(self, segment_id: str) -> bytes:
+        """
+        Returns the segment's audio as written by the recorder (pcm16 little-endian,
+        or length-prefixed Opus packets), transparently decoding compacted segments.
+        """
+        for attempt in range(2):
+            with self._lock:
+                entry = dict(self._segments[segment_id])
+            try:
+                return self._read_entry(entry)
+            except FileNotFoundError:
+                if attempt == 1:
+                    raise
+        return b""
+
+    def _read_entry(self, entry: dict) -> bytes:
+        path = self.path_for(entry)
+        if entry["codec"] == CODEC_FLAC:
+            if soundfile is None:
+                raise RuntimeError("Reading FLAC segments requires the 'soundfile' package.")
+            if not os.path.exists(path):
+                raise FileNotFoundError(path)
+            return decode_flac(path)
+        with open(path, "rb") as f:
+            data = f.read()
+        if entry["codec"] == CODEC_DPCM_ZLIB:
+            return decode_dpcm_zlib(data)
+        return data
+
+    def read_session(self, session_id: str) -> bytes:
+        """Concatenated audio of all of a session's segments, in order."""
+        return b"".join(self.read_segment(e["segment_id"]) for e in self.segments_for_session(session_id))
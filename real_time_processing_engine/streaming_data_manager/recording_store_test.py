@@ -0,0 +1,149 @@
+import math
+import os
+import shutil
+import struct
+import tempfile
+import unittest
+
+import audio_stream_pb2
+
+from recording_store import (
+    RecordingStore,
+    CODEC_PCM16,
+    CODEC_DPCM_ZLIB,
+    CODEC_OPUS_PACKETS,
+    STATE_SEALED,
+    STATE_COMPACTED,
+    encode_dpcm_zlib,
+    decode_dpcm_zlib,
+    to_storable,
+)
+from recording_compactor import RecordingCompactor
+
+
+def _sine_pcm16(num_samples, sample_rate=8000, freq=440.0):
+    return b"".join(struct.pack("<h", int(8000 * math.sin(2 * math.pi * freq * i / sample_rate)))
+                    for i in range(num_samples))
+
+
+class TestCodecs(unittest.TestCase):
+
+    def test_dpcm_zlib_roundtrip_is_lossless(self):
+        pcm = _sine_pcm16(4000) + struct.pack("<hhhh", 32767, -32768, 32767, -32768) # Includes wraparound
+        encoded = encode_dpcm_zlib(pcm)
+        self.assertEqual(decode_dpcm_zlib(encoded), pcm)
+        self.assertLess(len(encoded), len(pcm))
+
+    def test_g711_expands_to_pcm16(self):
+        pcmu_silence = bytes([0xFF]) * 160 # µ-law zero
+        payload, codec, sample_rate = to_storable(audio_stream_pb2.AudioFormat.Value('PCMU'), pcmu_silence)
+        self.assertEqual(codec, CODEC_PCM16)
+        self.assertEqual(sample_rate, 8000)
+        self.assertEqual(payload, b"\x00\x00" * 160)
+
+        payload, _, _ = to_storable(audio_stream_pb2.AudioFormat.Value('PCMA'), bytes([0xD5]) * 10) # A-law near zero
+        self.assertEqual(len(payload), 20)
+        self.assertTrue(all(abs(v) <= 8 for v in struct.unpack("<10h", payload)))
+
+    def test_opus_is_stored_length_prefixed(self):
+        payload, codec, _ = to_storable(audio_stream_pb2.AudioFormat.Value('OPUS'), b"abc")
+        self.assertEqual(codec, CODEC_OPUS_PACKETS)
+        self.assertEqual(payload, b"\x03\x00abc")
+
+
+class TestRecordingStoreAndCompactor(unittest.TestCase):
+
+    def setUp(self):
+        self.root = tempfile.mkdtemp()
+        self.store = RecordingStore(self.root, segment_seconds=1)
+
+    def tearDown(self):
+        self.store.close()
+        shutil.rmtree(self.root, ignore_errors=True)
+
+    def _ingest(self, session_id, frames, is_final_last=True):
+        for seq, frame in enumerate(frames):
+            self.store.append(audio_stream_pb2.AudioSegment(
+                session_id=session_id,
+                sequence_number=seq,
+                data=frame,
+                is_final=is_final_last and seq == len(frames) - 1,
+            ))
+
+    def test_segments_seal_on_duration_and_is_final(self):
+        # 16 kHz linear16: 20 ms frames of 640 bytes; 60 frames = 1.2 s -> one full segment + remainder.
+        frames = [_sine_pcm16(320, sample_rate=16000)] * 60
+        self._ingest("call/1", frames)
+        segments = self.store.segments_for_session("call/1")
+        self.assertEqual(len(segments), 2)
+        self.assertTrue(all(s["state"] == STATE_SEALED for s in segments))
+        self.assertRegex(segments[0]["segment_id"], r"^call_1-[0-9a-f]+/000000$")
+        self.assertEqual(self.store.read_session("call/1"), b"".join(frames))
+
+    def test_compaction_swaps_index_and_reads_transparently(self):
+        frames = [_sine_pcm16(320, sample_rate=16000)] * 30
+        self._ingest("sess_a", frames)
+        raw = self.store.read_session("sess_a")
+        raw_path = self.store.path_for(self.store.segments_for_session("sess_a")[0])
+
+        compactor = RecordingCompactor(self.store, codec=CODEC_DPCM_ZLIB, max_workers=1, max_bytes_per_second=0)
+        try:
+            self.assertEqual(compactor.run_once(), 1)
+        finally:
+            compactor.stop()
+
+        entry = self.store.segments_for_session("sess_a")[0]
+        self.assertEqual(entry["state"], STATE_COMPACTED)
+        self.assertEqual(entry["codec"], CODEC_DPCM_ZLIB)
+        self.assertFalse(os.path.exists(raw_path))
+        self.assertEqual(self.store.read_session("sess_a"), raw)
+
+        stats = compactor.get_stats()
+        self.assertEqual(stats["segments_compacted"], 1)
+        self.assertEqual(stats["raw_bytes"], len(raw))
+        self.assertGreater(stats["compression_ratio"], 1.0)
+        self.assertEqual(self.store.compaction_candidates(), [])
+
+    def test_index_survives_restart(self):
+        self._ingest("sess_b", [_sine_pcm16(160)] * 5, is_final_last=False)
+        self.store.close() # Seals the open segment and persists the index
+        reopened = RecordingStore(self.root, segment_seconds=1)
+        segments = reopened.segments_for_session("sess_b")
+        self.assertEqual(len(segments), 1)
+        self.assertEqual(segments[0]["state"], STATE_SEALED)
+        reopened.append(audio_stream_pb2.AudioSegment(session_id="sess_b", data=b"\x00\x00", is_final=True))
+        self.assertEqual([s["segment_id"].rsplit("/", 1)[1] for s in reopened.segments_for_session("sess_b")],
+                         ["000000", "000001"])
+        reopened.close()
+
+    def test_session_ids_that_sanitize_alike_do_not_share_segments(self):
+        self._ingest("a/b", [b"\x01\x00" * 160])
+        self._ingest("a_b", [b"\x02\x00" * 160])
+        self.assertNotEqual(self.store.segments_for_session("a/b")[0]["path"],
+                            self.store.segments_for_session("a_b")[0]["path"])
+        self.assertEqual(self.store.read_session("a/b"), b"\x01\x00" * 160)
+        self.assertEqual(self.store.read_session("a_b"), b"\x02\x00" * 160)
+
+    def test_journal_is_replayed_after_a_crash_and_compacted_into_the_snapshot(self):
+        self.store.close()
+        self.store = RecordingStore(self.root, segment_seconds=1, journal_compaction_records=4)
+        for i in range(3):
+            self._ingest(f"sess_{i}", [_sine_pcm16(160)] * 2) # Opened and sealed: two journal lines each
+        self._ingest("sess_open", [_sine_pcm16(160)] * 2, is_final_last=False)
+        self.store.flush()
+        self.assertTrue(os.path.exists(os.path.join(self.root, "index.json")))
+
+        # No close(): the snapshot plus the journal must still hold every segment.
+        recovered = RecordingStore(self.root, segment_seconds=1)
+        try:
+            for i in range(3):
+                self.assertEqual(recovered.read_session(f"sess_{i}"), _sine_pcm16(160) * 2)
+            self.assertEqual([s["state"] for s in recovered.segments_for_session("sess_open")], [STATE_SEALED])
+        finally:
+            recovered.close()
+        with open(os.path.join(self.root, "index.journal"), "rb") as f:
+            self.assertEqual(f.read(), b"") # close() compacted it into index.json
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+# Generated by the protocol buffer compiler.  DO NOT EDIT!
+# NO CHECKED-IN PROTOBUF GENCODE
+# source: session_orchestrator.proto
+# Protobuf Python Version: 6.30.0
+"""Generated protocol buffer code."""
+from google.protobuf import descriptor as _descriptor
+from google.protobuf import descriptor_pool as _descriptor_pool
+from google.protobuf import runtime_version as _runtime_version
+from google.protobuf import symbol_database as _symbol_database
+from google.protobuf.internal import builder as _builder
+_runtime_version.ValidateProtobufRuntimeVersion(
+    _runtime_version.Domain.PUBLIC,
+    6,
+    30,
+    0,
+    '',
+    'session_orchestrator.proto'
+)
+# @@protoc_insertion_point(imports)
+
+_sym_db = _symbol_database.Default()
+
+
+
+
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x1asession_orchestrator.proto\x12)business_logic_layer.session_orchestrator\"x\n\x0fTranscriptEvent\x12\x12\n\nsession_id\x18\x01 \x01(\t\x12\x12\n\ntranscript\x18\x02 \x01(\t\x12\x10\n\x08is_final\x18\x03 \x01(\x08\x12\x12\n\nconfidence\x18\x04 \x01(\x02\x12\x17\n\x0fsequence_number\x18\x05 \x01(\r\"F\n\x07TurnAck\x12\x12\n\nsession_id\x18\x01 \x01(\t\x12\x0f\n\x07turn_id\x18\x02 \x01(\x04\x12\x16\n\x0estatus_message\x18\x03 \x01(\t\"7\n\x11\x45ndSessionRequest\x12\x12\n\nsession_id\x18\x01 \x01(\t\x12\x0e\n\x06reason\x18\x02 \x01(\t\"@\n\x12\x45ndSessionResponse\x12\x12\n\nsession_id\x18\x01 \x01(\t\x12\x16\n\x0e\x63\x61ncelled_turn\x18\x02 \x01(\x08\"?\n\x10SpeechOnsetEvent\x12\x12\n\nsession_id\x18\x01 \x01(\t\x12\x17\n\x0fsequence_number\x18\x02 \x01(\r\"8\n\nBargeInAck\x12\x12\n\nsession_id\x18\x01 \x01(\t\x12\x16\n\x0e\x63\x61ncelled_turn\x18\x02 \x01(\x08\x32\xb7\x03\n\x1aSessionOrchestratorService\x12\x82\x01\n\x10HandleTranscript\x12:.business_logic_layer.session_orchestrator.TranscriptEvent\x1a\x32.business_logic_layer.session_orchestrator.TurnAck\x12\x89\x01\n\nEndSession\x12<.business_logic_layer.session_orchestrator.EndSessionRequest\x1a=.business_logic_layer.session_orchestrator.EndSessionResponse\x12\x87\x01\n\x11HandleSpeechOnset\x12;.business_logic_layer.session_orchestrator.SpeechOnsetEvent\x1a\x35.business_logic_layer.session_orchestrator.BargeInAckB>Z<revovoiceai/business_logic_layer/protos/session_orchestratorb\x06proto3')
+
+_globals = globals()
+_builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
+_builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'session_orchestrator_pb2', _globals)
+if not _descriptor._USE_C_DESCRIPTORS:
+  _globals['DESCRIPTOR']._loaded_options = None
+  _globals['DESCRIPTOR']._serialized_options = b'Z<revovoiceai/business_logic_layer/protos/session_orchestrator'
+  _globals['_TRANSCRIPTEVENT']._serialized_start=73
+  _globals['_TRANSCRIPTEVENT']._serialized_end=193
+  _globals['_TURNACK']._serialized_start=195
+  _globals['_TURNACK']._serialized_end=265
+  _globals['_ENDSESSIONREQUEST']._serialized_start=267
+  _globals['_ENDSESSIONREQUEST']._serialized_end=322
+  _globals['_ENDSESSIONRESPONSE']._serialized_start=324
+  _globals['_ENDSESSIONRESPONSE']._serialized_end=388
+  _globals['_SPEECHONSETEVENT']._serialized_start=390
+  _globals['_SPEECHONSETEVENT']._serialized_end=453
+  _globals['_BARGEINACK']._serialized_start=455
+  _globals['_BARGEINACK']._serialized_end=511
+  _globals['_SESSIONORCHESTRATORSERVICE']._serialized_start=514
+  _globals['_SESSIONORCHESTRATORSERVICE']._serialized_end=953
+# @@protoc_insertion_point(module_scope)
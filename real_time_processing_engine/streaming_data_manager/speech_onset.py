@@ -0,0 +1,81 @@
+# real_time_processing_engine/streaming_data_manager/speech_onset.py
+
+"""
+Per-session speech onset detection on the ingested G.711 frames, for
+barge-in: the SessionOrchestrator cancels the turn it is answering as soon
+as the caller starts speaking over it, instead of at the caller's next final
+transcript a second or more later.
+
+A frame is voiced when at least `voiced_ratio` of its samples reach
+`amplitude_threshold`. Counting loud samples needs no decoding: a 256-byte
+table maps every G.711 code to 1 (loud) or 0, so a frame costs one
+`bytes.translate` and one `count`. Speech is confirmed ("onset") once
+`min_speech_seconds` of voiced frames have arrived without a silence of
+`min_silence_seconds` in between; the gaps between syllables do not reset
+it, a cough or click is too short to reach it. After an onset, the next one
+needs `min_silence_seconds` of silence or the end of the utterance (a
+segment with is_final) first.
+
+OPUS frames cannot be inspected without decoding them and are ignored.
+"""
+
+import audio_stream_pb2
+from recording_store import _ALAW_TABLE, _ULAW_TABLE
+
+_TABLES = {
+    audio_stream_pb2.AudioFormat.Value('PCMU'): _ULAW_TABLE,
+    audio_stream_pb2.AudioFormat.Value('PCMA'): _ALAW_TABLE,
+}
+_SAMPLE_RATE = 8000 # G.711: one byte per sample
+
+
+class SpeechOnsetDetector:
+    """Speech onset state of one session; `process()` is called with each of its frames, in order."""
+
+    __slots__ = ("_loud", "voiced_ratio", "_min_speech", "_min_silence", "in_speech", "_voiced", "_silence")
+
+    def __init__(self, amplitude_threshold: int, voiced_ratio: float, min_speech_seconds: float,
+                 min_silence_seconds: float):
+        self._loud = {audio_format: _loudness_table(table, amplitude_threshold)
+                      for audio_format, table in _TABLES.items()}
+        self.voiced_ratio = voiced_ratio
+        self._min_speech = round(min_speech_seconds * _SAMPLE_RATE) # Durations are counted in samples
+        self._min_silence = round(min_silence_seconds * _SAMPLE_RATE)
+        self.in_speech = False
+        self._voiced = 0  # Voiced samples since the last long silence
+        self._silence = 0 # Samples of silence in a row
+
+    def process(self, audio_format, data: bytes) -> bool:
+        """Takes one frame (an AudioSegment's format and data); True when speech onset is confirmed in it."""
+        loud = self._loud.get(audio_format)
+        if loud is None or not data:
+            return False
+        samples = len(data)
+        if data.translate(loud).count(1) >= self.voiced_ratio * samples:
+            self._silence = 0
+            self._voiced += samples
+            if not self.in_speech and self._voiced >= self._min_speech:
+                self.in_speech = True
+                return True
+            return False
+        self._silence += samples
+        if self._silence >= self._min_silence:
+            self.reset()
+        return False
+
+    def reset(self):
+        """The caller's utterance has ended (the gateway sent is_final); the next speech is a new onset."""
+        self.in_speech = False
+        self._voiced = 0
+        self._silence = 0
+
+
+_table_cache = {}
+
+
+def _loudness_table(decode_table, amplitude_threshold: int) -> bytes:
+    key = (id(decode_table), amplitude_threshold)
+    table = _table_cache.get(key)
+    if table is None:
+        table = _table_cache[key] = bytes(1 if abs(sample) >= amplitude_threshold else 0 for sample in decode_table)
+    return table
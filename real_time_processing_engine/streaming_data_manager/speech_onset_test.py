@@ -0,0 +1,59 @@
+import unittest
+
+import audio_stream_pb2
+
+from speech_onset import SpeechOnsetDetector
+
+PCMU = audio_stream_pb2.AudioFormat.Value('PCMU')
+PCMA = audio_stream_pb2.AudioFormat.Value('PCMA')
+OPUS = audio_stream_pb2.AudioFormat.Value('OPUS')
+
+SPEECH = bytes([0x00, 0x80]) * 80 # One 20 ms µ-law frame at full scale
+SILENCE = bytes([0xFF]) * 160     # One 20 ms µ-law frame of zeros
+
+
+def detector():
+    return SpeechOnsetDetector(amplitude_threshold=1000, voiced_ratio=0.2, min_speech_seconds=0.1,
+                               min_silence_seconds=0.2)
+
+
+def onsets(onset_detector, frames, audio_format=PCMU):
+    return [i for i, frame in enumerate(frames) if onset_detector.process(audio_format, frame)]
+
+
+class TestSpeechOnsetDetector(unittest.TestCase):
+
+    def test_onset_after_the_minimum_speech(self):
+        self.assertEqual(onsets(detector(), [SILENCE] * 5 + [SPEECH] * 10), [9]) # The 5th voiced frame
+
+    def test_short_noise_is_not_speech(self):
+        self.assertEqual(onsets(detector(), ([SPEECH] * 2 + [SILENCE] * 20) * 3), [])
+
+    def test_pauses_between_syllables_do_not_reset_the_onset(self):
+        syllables = ([SPEECH] * 2 + [SILENCE] * 3) * 4
+        self.assertEqual(onsets(detector(), syllables), [10]) # The 5th voiced frame
+
+    def test_a_new_onset_needs_silence_first(self):
+        frames = [SPEECH] * 10 + [SILENCE] * 5 + [SPEECH] * 10 + [SILENCE] * 10 + [SPEECH] * 10
+        self.assertEqual(onsets(detector(), frames), [4, 39])
+
+    def test_reset_at_the_end_of_an_utterance_allows_a_new_onset(self):
+        onset_detector = detector()
+        self.assertEqual(onsets(onset_detector, [SPEECH] * 10), [4])
+        onset_detector.reset() # No silence frames between utterances, as when the gateway only sends speech
+        self.assertEqual(onsets(onset_detector, [SPEECH] * 10), [4])
+
+    def test_quiet_frames_are_silence(self):
+        quiet = bytes([0xF0, 0x70]) * 80 # About +-100 of 32767
+        self.assertEqual(onsets(detector(), [quiet] * 20), [])
+
+    def test_alaw_frames_are_detected(self):
+        alaw_speech = bytes([0xAA, 0x2A]) * 80 # About +-32256
+        self.assertEqual(onsets(detector(), [alaw_speech] * 10, PCMA), [4])
+
+    def test_opus_frames_are_ignored(self):
+        self.assertEqual(onsets(detector(), [SPEECH] * 10, OPUS), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
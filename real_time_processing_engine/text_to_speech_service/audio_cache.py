@@ -0,0 +1,279 @@
+# real_time_processing_engine/text_to_speech_service/audio_cache.py
+
+"""
+Content-addressed cache of rendered TTS audio, consulted before any segment
+is rendered. The DM speaks a small set of fixed strings ("Hello there! How
+can I help you today?", the reprompts, the fallback), so most segments of
+most responses have been rendered before.
+
+* Key: SHA-256 of the normalized text, the voice, the audio encoding and the
+  sample rate. Normalizing folds Unicode forms and runs of whitespace only;
+  case and punctuation change the prosody and stay.
+* Memory tier: byte-bounded LRU of the audio, evicting the least recently
+  used entries beyond its budget.
+* Disk tier: one file per key under a directory that survives restarts, read
+  through a memory map (the pages come from the OS page cache, shared with
+  other TTS processes on the host), byte-bounded as well. Files are written
+  to a temporary name and renamed, so a reader never sees half a file. A
+  disk hit is promoted to the memory tier.
+* Single-flight: concurrent misses for the same key wait for the one render
+  in progress instead of rendering it again.
+
+Lookups are counted in `revo_tts_cache_lookups_total{result}` (memory_hit,
+disk_hit, shared, miss) and the audio served from the cache in
+`revo_tts_cache_served_bytes_total{tier}`.
+"""
+
+import collections
+import hashlib
+import mmap
+import os
+import sys
+import threading
+import unicodedata
+
+# Shared observability package at the repository root
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from observability import logs, metrics
+
+log = logs.get_logger("text_to_speech")
+
+LOOKUPS = metrics.counter("revo_tts_cache_lookups_total", "TTS audio cache lookups by result.", ("result",))
+SERVED_BYTES = metrics.counter("revo_tts_cache_served_bytes_total", "Audio bytes served from the TTS cache.",
+                               ("tier",))
+TIER_BYTES = metrics.gauge("revo_tts_cache_bytes", "Audio bytes held by the TTS cache.", ("tier",))
+
+MEMORY = "memory"
+DISK = "disk"
+
+_SUFFIX = ".audio"
+
+
+def cache_key(text: str, voice_config_id: str, encoding: str, sample_rate_hertz: int) -> str:
+    """Content address of the audio of `text` in the given voice and format."""
+    normalized = " ".join(unicodedata.normalize("NFC", text).split())
+    material = "\x1f".join((normalized, voice_config_id, encoding, str(sample_rate_hertz)))
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class MemoryTier:
+    """Thread-safe LRU of {key: audio bytes}, evicting the least recently used beyond `max_bytes`."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        with self._lock:
+            audio = self._entries.get(key)
+            if audio is not None:
+                self._entries.move_to_end(key)
+            return audio
+
+    def put(self, key, audio: bytes):
+        if len(audio) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.size -= len(old)
+            self._entries[key] = audio
+            self.size += len(audio)
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+
+
+class DiskTier:
+    """
+    Files `<directory>/<key[:2]>/<key>.audio`, evicting the least recently
+    used beyond `max_bytes`. The index is rebuilt from the directory at
+    start, oldest files first.
+    """
+
+    def __init__(self, directory: str, max_bytes: int):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries = collections.OrderedDict() # {key: size}
+        self._lock = threading.Lock()
+        self._load()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+        try:
+            with open(self._path(key), "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                return mapped[:]
+        except (OSError, ValueError) as e: # Removed behind our back, or emptied
+            log.warning("cache", "Dropping unreadable cache file for %s: %s", key, e, stage="tts")
+            self._forget(key)
+            return None
+
+    def put(self, key, audio: bytes):
+        if not audio or len(audio) > self.max_bytes:
+            return
+        path = self._path(key)
+        temp = f"{path}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(temp, "wb") as f:
+                f.write(audio)
+            os.replace(temp, path)
+        except OSError as e:
+            log.warning("cache", "Could not write cache file for %s: %s", key, e, stage="tts")
+            return
+        with self._lock:
+            self.size += len(audio) - self._entries.pop(key, 0)
+            self._entries[key] = len(audio)
+            evicted = []
+            while self.size > self.max_bytes:
+                old_key, old_size = self._entries.popitem(last=False)
+                self.size -= old_size
+                evicted.append(old_key)
+        for old_key in evicted:
+            self._remove(old_key)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key + _SUFFIX)
+
+    def _forget(self, key):
+        with self._lock:
+            self.size -= self._entries.pop(key, 0)
+
+    def _remove(self, key):
+        _remove_file(self._path(key))
+
+    def _load(self):
+        found = []
+        os.makedirs(self.directory, exist_ok=True)
+        for shard in os.scandir(self.directory):
+            if not shard.is_dir():
+                continue
+            for entry in os.scandir(shard.path):
+                if entry.name.endswith(".tmp"): # Left by a crash mid-write
+                    _remove_file(entry.path)
+                elif entry.name.endswith(_SUFFIX):
+                    stat = entry.stat()
+                    found.append((stat.st_mtime, entry.name[:-len(_SUFFIX)], stat.st_size))
+        for _, key, size in sorted(found):
+            self._entries[key] = size
+            self.size += size
+        while self.size > self.max_bytes:
+            key, size = self._entries.popitem(last=False)
+            self.size -= size
+            self._remove(key)
+
+
+def _remove_file(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+class _Flight:
+    """One render in progress; the lookups of its key that arrive meanwhile wait for it."""
+
+    __slots__ = ("done", "audio", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.audio = None
+        self.error = None
+
+
+class AudioCache:
+    """The memory tier in front of the (optional) disk tier, with single-flight rendering on a miss."""
+
+    def __init__(self, memory: MemoryTier, disk: DiskTier = None):
+        self.memory = memory
+        self.disk = disk
+        self._flights = {}
+        self._lock = threading.Lock()
+        self._memory_hit = LOOKUPS.labels("memory_hit").inc
+        self._memory_served = SERVED_BYTES.labels(MEMORY).inc
+        TIER_BYTES.labels(MEMORY).set_function(lambda: memory.size)
+        if disk is not None:
+            TIER_BYTES.labels(DISK).set_function(lambda: disk.size)
+            log.info("cache", "Disk cache at %s: %d entries, %d bytes", disk.directory, len(disk), disk.size,
+                     stage="tts")
+
+    def get(self, key):
+        """The audio of `key` if it is in the memory tier, else None. Never touches the disk."""
+        audio = self.memory.get(key)
+        if audio is not None:
+            self._memory_hit()
+            self._memory_served(len(audio))
+        return audio
+
+    def put(self, key, audio: bytes):
+        """Stores audio rendered elsewhere (warm-up) in both tiers."""
+        self.memory.put(key, audio)
+        if self.disk is not None:
+            self.disk.put(key, audio)
+
+    def preload(self, key) -> bool:
+        """Makes sure `key` is in the memory tier, loading it from disk if needed; False if it is in neither."""
+        if self.memory.get(key) is not None:
+            return True
+        audio = self.disk.get(key) if self.disk is not None else None
+        if audio is None:
+            return False
+        self.memory.put(key, audio)
+        return True
+
+    def get_or_render(self, key, render):
+        """
+        The audio of `key` from memory, disk, a render of the same key in
+        progress, or else `render()`, whose result is cached in both tiers.
+        """
+        audio = self.get(key)
+        if audio is not None:
+            return audio
+        with self._lock:
+            flight = self._flights.get(key)
+            owner = flight is None
+            if owner:
+                flight = self._flights[key] = _Flight()
+        if not owner:
+            LOOKUPS.labels("shared").inc()
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.audio
+        try:
+            flight.audio = self._load_or_render(key, render)
+            return flight.audio
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    def _load_or_render(self, key, render):
+        if self.disk is not None:
+            audio = self.disk.get(key)
+            if audio is not None:
+                LOOKUPS.labels("disk_hit").inc()
+                SERVED_BYTES.labels(DISK).inc(len(audio))
+                self.memory.put(key, audio)
+                return audio
+        LOOKUPS.labels("miss").inc()
+        audio = render()
+        self.memory.put(key, audio)
+        if self.disk is not None:
+            self.disk.put(key, audio)
+        return audio
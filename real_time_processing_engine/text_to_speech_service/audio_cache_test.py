@@ -0,0 +1,125 @@
+import os
+import tempfile
+import threading
+import time
+import unittest
+
+from audio_cache import AudioCache, DiskTier, MemoryTier, cache_key
+
+
+class TestCacheKey(unittest.TestCase):
+
+    def test_key_ignores_whitespace_runs_and_unicode_forms_only(self):
+        key = cache_key("Café, hello there!", "v", "LINEAR16", 16000)
+        self.assertEqual(cache_key(" Café,  hello there! ", "v", "LINEAR16", 16000), key)
+        self.assertNotEqual(cache_key("café, hello there!", "v", "LINEAR16", 16000), key)
+        self.assertNotEqual(cache_key("Café, hello there!", "w", "LINEAR16", 16000), key)
+        self.assertNotEqual(cache_key("Café, hello there!", "v", "MULAW", 16000), key)
+        self.assertNotEqual(cache_key("Café, hello there!", "v", "LINEAR16", 8000), key)
+
+
+class TestMemoryTier(unittest.TestCase):
+
+    def test_least_recently_used_entries_are_evicted_beyond_the_byte_bound(self):
+        memory = MemoryTier(max_bytes=10)
+        memory.put("a", b"aaaa")
+        memory.put("b", b"bbbb")
+        memory.get("a")
+        memory.put("c", b"cccc")
+        self.assertIsNone(memory.get("b"))
+        self.assertEqual((memory.get("a"), memory.get("c"), memory.size), (b"aaaa", b"cccc", 8))
+        memory.put("too_big", b"x" * 11)
+        self.assertIsNone(memory.get("too_big"))
+
+
+class TestDiskTier(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def test_entries_survive_a_restart(self):
+        DiskTier(self.directory.name, 1024).put("ab12", b"audio")
+        disk = DiskTier(self.directory.name, 1024)
+        self.assertEqual((len(disk), disk.size), (1, 5))
+        self.assertEqual(disk.get("ab12"), b"audio")
+
+    def test_least_recently_used_files_are_removed_beyond_the_byte_bound(self):
+        disk = DiskTier(self.directory.name, 10)
+        disk.put("aa01", b"1111")
+        disk.put("bb02", b"2222")
+        disk.get("aa01")
+        disk.put("cc03", b"3333")
+        self.assertIsNone(disk.get("bb02"))
+        self.assertFalse(os.path.exists(os.path.join(self.directory.name, "bb", "bb02.audio")))
+        self.assertEqual(disk.get("aa01"), b"1111")
+
+    def test_partial_writes_are_removed_and_missing_files_are_misses(self):
+        os.makedirs(os.path.join(self.directory.name, "aa"))
+        partial = os.path.join(self.directory.name, "aa", "aa01.audio.123.tmp")
+        open(partial, "wb").close()
+        disk = DiskTier(self.directory.name, 1024)
+        self.assertFalse(os.path.exists(partial))
+        disk.put("bb02", b"2222")
+        os.remove(os.path.join(self.directory.name, "bb", "bb02.audio"))
+        with self.assertLogs("revo.text_to_speech", level="WARNING"):
+            self.assertIsNone(disk.get("bb02"))
+        self.assertEqual(disk.size, 0)
+
+
+class TestAudioCache(unittest.TestCase):
+
+    def test_a_miss_renders_once_and_fills_both_tiers(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = AudioCache(MemoryTier(1024), DiskTier(directory, 1024))
+            self.assertEqual(cache.get_or_render("ab12", lambda: b"audio"), b"audio")
+            self.assertEqual(cache.get("ab12"), b"audio")
+            restarted = AudioCache(MemoryTier(1024), DiskTier(directory, 1024))
+            self.assertIsNone(restarted.get("ab12")) # Memory is empty after a restart
+            self.assertEqual(restarted.get_or_render("ab12", self.fail), b"audio") # From disk
+            self.assertEqual(restarted.get("ab12"), b"audio") # Promoted to memory
+
+    def test_concurrent_misses_share_one_render(self):
+        cache = AudioCache(MemoryTier(1024))
+        renders = []
+
+        def render():
+            renders.append(1)
+            time.sleep(0.05)
+            return b"audio"
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(cache.get_or_render("ab12", render)))
+                   for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual((len(renders), results), (1, [b"audio"] * 5))
+
+    def test_a_failed_render_fails_its_waiters_and_is_not_cached(self):
+        cache = AudioCache(MemoryTier(1024))
+
+        def render():
+            time.sleep(0.05)
+            raise RuntimeError("engine down")
+
+        errors = []
+
+        def lookup():
+            try:
+                cache.get_or_render("ab12", render)
+            except RuntimeError as e:
+                errors.append(str(e))
+
+        threads = [threading.Thread(target=lookup) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, ["engine down"] * 3)
+        self.assertEqual(cache.get_or_render("ab12", lambda: b"audio"), b"audio")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,119 @@
+# real_time_processing_engine/text_to_speech_service/audio_format.py
+
+"""
+The output stage of synthesis: the engine's LINEAR16 audio, converted to the
+format the caller asked for (TTSRequest audio_encoding and sample_rate_hertz),
+e.g. the 8 kHz G.711 mu-law of a SIP call.
+
+    audio = render_as(engine.render, "Hello there!", "default_voice", MULAW, 8000, render_rate=24000)
+
+An engine that can render at any rate (engines.TTSEngine.sample_rate_hertz
+is 0) is asked for the target rate, and only the G.711 encoding is left. An
+engine with a fixed rate is resampled with a polyphase windowed-sinc filter
+(one matrix product per filter phase over strided views of the input, no
+copies), and the resampled samples are rounded and looked up in the
+64 Ki-entry G.711 table of their 16-bit value directly, without a LINEAR16
+copy at the target rate in between.
+
+The segment pipeline caches the converted audio per format, so a cached
+segment is sent as it is, with no conversion per call or per frame.
+"""
+
+import functools
+import math
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+LINEAR16 = "LINEAR16" # 16-bit signed little-endian PCM
+MULAW = "MULAW"       # G.711 mu-law, 8 bits per sample
+ALAW = "ALAW"         # G.711 A-law, 8 bits per sample
+
+BYTES_PER_SAMPLE = {LINEAR16: 2, MULAW: 1, ALAW: 1}
+
+MIN_SAMPLE_RATE_HERTZ = 8000
+MAX_SAMPLE_RATE_HERTZ = 48000
+
+_TAPS = 16 # Filter taps on each side of an output sample, at the lower of the two rates
+
+
+def _mulaw_table():
+    """G.711 mu-law code of every 16-bit sample (indexed by the sample as uint16)."""
+    pcm = np.arange(65536, dtype=np.uint16).view(np.int16).astype(np.int32) >> 2 # 14 bits
+    magnitude = np.minimum(np.abs(pcm), 8159) + 0x21 # Clipped, biased
+    exponent = np.floor(np.log2(magnitude)).astype(np.int32) - 5
+    mantissa = (magnitude >> (exponent + 1)) & 0x0F
+    code = np.where(exponent >= 8, 0x7F, (exponent << 4) | mantissa)
+    return (code ^ np.where(pcm < 0, 0x7F, 0xFF)).astype(np.uint8)
+
+
+def _alaw_table():
+    """G.711 A-law code of every 16-bit sample (indexed by the sample as uint16)."""
+    pcm = np.arange(65536, dtype=np.uint16).view(np.int16).astype(np.int32) >> 3 # 13 bits
+    negative = pcm < 0
+    magnitude = np.where(negative, -pcm - 1, pcm)
+    segment = np.searchsorted(np.array([0x1F, 0x3F, 0x7F, 0xFF, 0x1FF, 0x3FF, 0x7FF, 0xFFF]), magnitude)
+    mantissa = (magnitude >> np.maximum(segment, 1)) & 0x0F
+    code = np.where(segment >= 8, 0x7F, (segment << 4) | mantissa)
+    return (code ^ np.where(negative, 0x55, 0xD5)).astype(np.uint8)
+
+
+_TABLES = {MULAW: _mulaw_table(), ALAW: _alaw_table()}
+
+
+def supported(encoding: str, sample_rate_hertz: int) -> bool:
+    return encoding in BYTES_PER_SAMPLE and MIN_SAMPLE_RATE_HERTZ <= sample_rate_hertz <= MAX_SAMPLE_RATE_HERTZ
+
+
+@functools.lru_cache(maxsize=16)
+def _filter_bank(from_rate: int, to_rate: int):
+    """
+    Polyphase windowed-sinc low-pass for `from_rate` -> `to_rate`: output
+    sample n lies `phase / up` of the way past input sample `n * down // up`,
+    and is the dot product of the inputs at `offsets` from there with
+    `bank[phase]`.
+    """
+    divisor = math.gcd(from_rate, to_rate)
+    up, down = to_rate // divisor, from_rate // divisor
+    cutoff = min(1.0, to_rate / from_rate) # Of the input Nyquist frequency
+    half = math.ceil(_TAPS / cutoff)
+    offsets = np.arange(-half + 1, half + 1)
+    distance = offsets[None, :] - np.arange(up)[:, None] / up
+    window = 0.5 + 0.5 * np.cos(np.pi * np.clip(distance / half, -1.0, 1.0)) # Hann
+    return up, down, offsets, cutoff * np.sinc(cutoff * distance) * window
+
+
+def _encode(samples, encoding: str) -> bytes:
+    pcm = np.clip(np.rint(samples), -32768, 32767).astype("<i2")
+    return pcm.tobytes() if encoding == LINEAR16 else _TABLES[encoding][pcm.view(np.uint16)].tobytes()
+
+
+def convert(audio: bytes, from_rate: int, encoding: str, to_rate: int) -> bytes:
+    """LINEAR16 `audio` at `from_rate` as `encoding` at `to_rate`."""
+    if from_rate == to_rate:
+        if encoding == LINEAR16:
+            return audio
+        return _TABLES[encoding][np.frombuffer(audio, dtype="<i2").view(np.uint16)].tobytes()
+    samples = np.frombuffer(audio, dtype="<i2").astype(np.float64)
+    up, down, offsets, bank = _filter_bank(from_rate, to_rate)
+    # Window w of the padded input holds the taps of the output samples based at input sample w
+    windows = sliding_window_view(np.pad(samples, (-offsets[0], offsets[-1] + down)), len(offsets))
+    total = (len(samples) * up + down - 1) // down
+    resampled = np.empty(total)
+    for first in range(min(up, total)): # Outputs first, first + up, ... are based `down` inputs apart
+        count = (total - first + up - 1) // up
+        base = first * down // up
+        resampled[first::up] = windows[base:base + (count - 1) * down + 1:down] @ bank[first * down % up]
+    return _encode(resampled, encoding)
+
+
+def render_as(render, text: str, voice_config_id: str, encoding: str, sample_rate_hertz: int,
+              render_rate: int = 0) -> bytes:
+    """
+    `text` rendered by `render(text, voice_config_id, rate)` at `render_rate`
+    (0: at `sample_rate_hertz`) and converted to `encoding` at
+    `sample_rate_hertz`. A module function, so that warm-up can run it in
+    worker processes.
+    """
+    rate = render_rate or sample_rate_hertz
+    return convert(render(text, voice_config_id, rate), rate, encoding, sample_rate_hertz)
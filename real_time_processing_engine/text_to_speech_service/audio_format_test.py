@@ -0,0 +1,73 @@
+import unittest
+
+import numpy as np
+
+import audio_format
+from audio_format import ALAW, LINEAR16, MULAW
+
+
+def tone(frequency, rate, seconds=0.5, amplitude=10000):
+    t = np.arange(int(rate * seconds)) / rate
+    return (amplitude * np.sin(2 * np.pi * frequency * t)).astype("<i2").tobytes()
+
+
+def peak(audio, trim=64):
+    return np.abs(np.frombuffer(audio, dtype="<i2")[trim:-trim]).max()
+
+
+class TestG711(unittest.TestCase):
+
+    def test_reference_codes(self):
+        samples = np.array([0, -1, 32767, -32768, 1000, -1000], dtype="<i2").tobytes()
+        self.assertEqual(audio_format.convert(samples, 8000, MULAW, 8000), bytes([0xFF, 0x7E, 0x80, 0x00, 0xCE, 0x4E]))
+        self.assertEqual(audio_format.convert(samples, 8000, ALAW, 8000), bytes([0xD5, 0x55, 0xAA, 0x2A, 0xFA, 0x7A]))
+
+    def test_codes_follow_the_sample_value(self):
+        samples = np.arange(-32768, 32768, 16, dtype=np.int32).astype("<i2")
+        for encoding in (MULAW, ALAW):
+            codes = np.frombuffer(audio_format.convert(samples.tobytes(), 8000, encoding, 8000), dtype=np.uint8)
+            positive = codes[samples >= 0] ^ (0xFF if encoding == MULAW else 0xD5)
+            self.assertTrue(np.all(np.diff(positive.astype(int)) >= 0), encoding)
+
+
+class TestConvert(unittest.TestCase):
+
+    def test_same_format_is_passed_through(self):
+        audio = tone(440, 16000)
+        self.assertIs(audio_format.convert(audio, 16000, LINEAR16, 16000), audio)
+
+    def test_downsampling_keeps_the_band_and_removes_what_is_above_it(self):
+        self.assertEqual(len(audio_format.convert(tone(1000, 16000), 16000, LINEAR16, 8000)), 8000)
+        self.assertAlmostEqual(peak(audio_format.convert(tone(1000, 16000), 16000, LINEAR16, 8000)), 10000, delta=200)
+        self.assertLess(peak(audio_format.convert(tone(6000, 16000), 16000, LINEAR16, 8000)), 200) # Would alias
+        self.assertAlmostEqual(peak(audio_format.convert(tone(1000, 24000), 24000, LINEAR16, 8000)), 10000, delta=200)
+
+    def test_upsampling_to_an_uneven_rate(self):
+        audio = audio_format.convert(tone(440, 16000), 16000, LINEAR16, 22050)
+        self.assertEqual(len(audio), 2 * 11025)
+        self.assertAlmostEqual(peak(audio), 10000, delta=200)
+
+    def test_resampling_and_encoding_in_one_pass(self):
+        audio = tone(1000, 24000)
+        self.assertEqual(audio_format.convert(audio, 24000, MULAW, 8000),
+                         audio_format.convert(audio_format.convert(audio, 24000, LINEAR16, 8000), 8000, MULAW, 8000))
+
+    def test_render_as_asks_the_engine_for_its_own_rate(self):
+        rates = []
+
+        def render(text, voice_config_id, sample_rate_hertz):
+            rates.append(sample_rate_hertz)
+            return tone(440, sample_rate_hertz)
+
+        self.assertEqual(len(audio_format.render_as(render, "Hi.", "v", MULAW, 8000)), 4000)
+        self.assertEqual(len(audio_format.render_as(render, "Hi.", "v", MULAW, 8000, render_rate=24000)), 4000)
+        self.assertEqual(rates, [8000, 24000])
+
+    def test_supported_formats(self):
+        self.assertTrue(audio_format.supported(MULAW, 8000))
+        self.assertFalse(audio_format.supported(MULAW, 4000))
+        self.assertFalse(audio_format.supported("OPUS", 48000))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,39 @@
+# real_time_processing_engine/text_to_speech_service/audio_frames.py
+
+"""
+Cuts the audio a TTS engine renders, in blocks of whatever size it produces
+(a word, a phrase, a vocoder window), into the fixed-duration frames that
+SynthesizeStream sends.
+
+A frame is yielded as soon as the blocks rendered so far fill it; nothing
+waits for the rest of the text. Whatever is left at the end, shorter than a
+frame and possibly empty, is yielded last with `is_last` set, so the caller
+learns that the stream is complete without a frame of lookahead.
+"""
+
+BYTES_PER_SAMPLE = 2 # LINEAR16
+
+
+def frame_bytes(sample_rate_hertz: int, frame_ms: int, bytes_per_sample: int = BYTES_PER_SAMPLE) -> int:
+    """Size of one frame of `frame_ms` (LINEAR16 unless `bytes_per_sample` says otherwise)."""
+    return sample_rate_hertz * frame_ms // 1000 * bytes_per_sample
+
+
+def duration_ms(audio: bytes, sample_rate_hertz: int, bytes_per_sample: int = BYTES_PER_SAMPLE) -> int:
+    return len(audio) * 1000 // (sample_rate_hertz * bytes_per_sample)
+
+
+def frames(blocks, size: int):
+    """Yields (frame, is_last) for the audio of `blocks`: frames of `size` bytes, then the shorter remainder."""
+    pending = bytearray()
+    for block in blocks:
+        pending += block
+        full = len(pending) - len(pending) % size
+        if not full:
+            continue
+        view = memoryview(pending)
+        for offset in range(0, full, size):
+            yield bytes(view[offset:offset + size]), False
+        view.release()
+        del pending[:full]
+    yield bytes(pending), True
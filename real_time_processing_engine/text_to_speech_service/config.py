@@ -0,0 +1,72 @@
+import os
+
+# Streaming synthesis (SynthesizeStream). Audio is sent in the encoding and at
+# the sample rate of the request (by default 16-bit little-endian mono PCM at
+# TTS_SAMPLE_RATE_HERTZ), in frames of TTS_FRAME_MS each; a frame goes out as
+# soon as the engine has rendered it, the last one may be shorter.
+TTS_SAMPLE_RATE_HERTZ = int(os.getenv("TTS_SAMPLE_RATE_HERTZ", "16000"))
+TTS_FRAME_MS = int(os.getenv("TTS_FRAME_MS", "20"))
+# Speaking rate of the placeholder engine, which renders silence of the
+# length the text would take to say.
+PLACEHOLDER_CHARS_PER_SECOND = float(os.getenv("PLACEHOLDER_CHARS_PER_SECOND", "15"))
+# Rendering time per character of the placeholder engine, to stand in for a
+# real engine's cost in tests and benchmarks.
+PLACEHOLDER_RENDER_MS_PER_CHAR = float(os.getenv("PLACEHOLDER_RENDER_MS_PER_CHAR", "0"))
+
+# Incremental synthesis. The text is split at sentence and clause boundaries
+# (clauses shorter than TTS_MIN_SEGMENT_CHARS are merged with a neighbour) and
+# the segments are rendered on a pool of TTS_SYNTHESIS_WORKERS threads shared by
+# all requests, up to TTS_PIPELINE_DEPTH segments of a request at a time
+# (counting the one being sent), so the first segment's audio is sent while the
+# next ones are still being rendered.
+TTS_MIN_SEGMENT_CHARS = int(os.getenv("TTS_MIN_SEGMENT_CHARS", "10"))
+TTS_SYNTHESIS_WORKERS = int(os.getenv("TTS_SYNTHESIS_WORKERS", "4"))
+TTS_PIPELINE_DEPTH = int(os.getenv("TTS_PIPELINE_DEPTH", "2"))
+# Rendered segment audio is cached, keyed by its text, voice and format: in
+# memory (an LRU of TTS_MEMORY_CACHE_BYTES) and, unless TTS_DISK_CACHE_DIR is
+# empty, in files under TTS_DISK_CACHE_DIR (up to TTS_DISK_CACHE_BYTES), which
+# survive restarts.
+TTS_MEMORY_CACHE_BYTES = int(os.getenv("TTS_MEMORY_CACHE_BYTES", str(32 * 1024 * 1024)))
+TTS_DISK_CACHE_DIR = os.getenv("TTS_DISK_CACHE_DIR", "tts_cache")
+TTS_DISK_CACHE_BYTES = int(os.getenv("TTS_DISK_CACHE_BYTES", str(1024 * 1024 * 1024)))
+
+# Warm-up. Before the server starts listening, the segments of every fixed
+# response are rendered into the audio cache, in each of TTS_WARMUP_VOICES
+# (comma-separated), so the first caller gets them from memory too. The
+# responses are the DM's templates in TTS_WARMUP_RESPONSES_FILE (segments with
+# a "{field}" filled in per turn are skipped) and the texts in TTS_WARMUP_TEXTS
+# ("|"-separated, e.g. the orchestrator's REPROMPT_TEXT). Rendering runs in
+# TTS_WARMUP_PROCESSES processes (0: in this one); whatever is not done after
+# TTS_WARMUP_TIMEOUT_SECONDS is left to the first call that needs it. Every
+# segment is warmed in each of TTS_WARMUP_FORMATS, "ENCODING/RATE" items
+# (LINEAR16, MULAW or ALAW), comma-separated: the formats callers ask for.
+TTS_WARMUP_ENABLED = os.getenv("TTS_WARMUP_ENABLED", "true").lower() == "true"
+TTS_WARMUP_RESPONSES_FILE = os.getenv(
+    "TTS_WARMUP_RESPONSES_FILE",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "ai_ml_services",
+                 "dialogue_management_service", "rules", "static_responses.json"))
+TTS_WARMUP_TEXTS = os.getenv("TTS_WARMUP_TEXTS", "")
+TTS_WARMUP_VOICES = os.getenv("TTS_WARMUP_VOICES", "default_voice")
+TTS_WARMUP_PROCESSES = int(os.getenv("TTS_WARMUP_PROCESSES", "4"))
+TTS_WARMUP_TIMEOUT_SECONDS = float(os.getenv("TTS_WARMUP_TIMEOUT_SECONDS", "60"))
+TTS_WARMUP_FORMATS = os.getenv("TTS_WARMUP_FORMATS", f"LINEAR16/{TTS_SAMPLE_RATE_HERTZ},MULAW/8000")
+
+# Synthesis engine (engines.py): "placeholder" renders silence; "local" is a
+# deterministic formant synthesizer (needs NumPy) with LOCAL_ENGINE_MS_PER_CHAR
+# of CPU per character and LOCAL_ENGINE_LATENCY_MS of waiting per segment, for
+# benchmarks and load tests without a vendor engine. It renders at the rate a
+# request asks for, unless LOCAL_ENGINE_SAMPLE_RATE_HERTZ fixes its rate (like a
+# vendor engine's 24 kHz), and its audio is then resampled to the request's.
+TTS_ENGINE = os.getenv("TTS_ENGINE", "placeholder")
+LOCAL_ENGINE_CHARS_PER_SECOND = float(os.getenv("LOCAL_ENGINE_CHARS_PER_SECOND", "15"))
+LOCAL_ENGINE_MS_PER_CHAR = float(os.getenv("LOCAL_ENGINE_MS_PER_CHAR", "1"))
+LOCAL_ENGINE_LATENCY_MS = float(os.getenv("LOCAL_ENGINE_LATENCY_MS", "0"))
+LOCAL_ENGINE_SAMPLE_RATE_HERTZ = int(os.getenv("LOCAL_ENGINE_SAMPLE_RATE_HERTZ", "0"))
+
+# Voice models (ai_ml_services/voice_cloning_service/voice_registry.py): one
+# directory per voice_config_id under TTS_VOICES_DIR, memory-mapped on first use
+# and evicted least recently used beyond TTS_VOICE_MEMORY_BYTES of mapped files.
+# PrefetchVoices hints are loaded on TTS_VOICE_PREFETCH_WORKERS threads.
+TTS_VOICES_DIR = os.getenv("TTS_VOICES_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "voices"))
+TTS_VOICE_MEMORY_BYTES = int(os.getenv("TTS_VOICE_MEMORY_BYTES", str(512 * 1024 * 1024)))
+TTS_VOICE_PREFETCH_WORKERS = int(os.getenv("TTS_VOICE_PREFETCH_WORKERS", "1"))
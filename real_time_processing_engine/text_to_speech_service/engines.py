@@ -0,0 +1,81 @@
+# real_time_processing_engine/text_to_speech_service/engines.py
+
+"""
+The synthesis engines behind TextToSpeechServicer. An engine renders one
+segment (text_segments.py) of text to LINEAR16 audio; segmenting, caching,
+conversion to the requested format (audio_format.py), framing and streaming
+are the servicer's, the same for every engine.
+
+    engine = create_engine("local")
+    audio = engine.render("Hello there!", "default_voice", 16000)
+
+* "placeholder": silence as long as the text takes to say. Free to render.
+* "local": local_engine.LocalEngine, a deterministic formant synthesizer
+  with a configurable compute cost per character, for benchmarks and load
+  tests that need the output path to do real work without a vendor.
+
+`render()` is called from several threads at once (the segment pool) and,
+during warm-up, in worker processes, so an engine is thread-safe and
+picklable. An engine given the voice registry
+(ai_ml_services/voice_cloning_service/voice_registry.py) looks the voice up
+in it per segment; an id it does not have gets the engine's own voice.
+"""
+
+import time
+
+import audio_frames
+from config import (
+    PLACEHOLDER_CHARS_PER_SECOND,
+    PLACEHOLDER_RENDER_MS_PER_CHAR,
+    LOCAL_ENGINE_CHARS_PER_SECOND,
+    LOCAL_ENGINE_MS_PER_CHAR,
+    LOCAL_ENGINE_LATENCY_MS,
+    LOCAL_ENGINE_SAMPLE_RATE_HERTZ,
+)
+
+
+class TTSEngine:
+    """Interface of a synthesis engine."""
+
+    name = ""
+    sample_rate_hertz = 0 # The only rate the engine renders at; 0: any rate asked for
+
+    def render(self, text: str, voice_config_id: str, sample_rate_hertz: int) -> bytes:
+        """The LINEAR16 audio of `text` (one segment) in the voice, at `sample_rate_hertz`."""
+        raise NotImplementedError
+
+
+class PlaceholderEngine(TTSEngine):
+    """
+    LINEAR16 silence as long as the text takes to say at `chars_per_second`
+    (one character more per word, for the space after it), after
+    `render_ms_per_char` of simulated (sleeping) rendering.
+    """
+
+    name = "placeholder"
+
+    def __init__(self, chars_per_second: float = PLACEHOLDER_CHARS_PER_SECOND,
+                 render_ms_per_char: float = PLACEHOLDER_RENDER_MS_PER_CHAR):
+        self.chars_per_second = chars_per_second
+        self.render_ms_per_char = render_ms_per_char
+
+    def render(self, text: str, voice_config_id: str, sample_rate_hertz: int) -> bytes:
+        if self.render_ms_per_char:
+            time.sleep(len(text) * self.render_ms_per_char / 1000)
+        chars = sum(len(word) + 1 for word in text.split())
+        return bytes(round(chars * sample_rate_hertz / self.chars_per_second) * audio_frames.BYTES_PER_SAMPLE)
+
+
+def create_engine(name: str, registry=None) -> TTSEngine:
+    """
+    The engine called `name`, configured from config.py, synthesizing in the
+    voices of `registry` (a VoiceRegistry) if given; ValueError for an
+    unknown name.
+    """
+    if name == PlaceholderEngine.name:
+        return PlaceholderEngine()
+    if name == "local":
+        from local_engine import LocalEngine # Needs NumPy
+        return LocalEngine(LOCAL_ENGINE_CHARS_PER_SECOND, LOCAL_ENGINE_MS_PER_CHAR, LOCAL_ENGINE_LATENCY_MS, registry,
+                           LOCAL_ENGINE_SAMPLE_RATE_HERTZ)
+    raise ValueError(f"Unknown TTS engine '{name}'")
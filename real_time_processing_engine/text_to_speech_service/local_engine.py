@@ -0,0 +1,139 @@
+# real_time_processing_engine/text_to_speech_service/local_engine.py
+
+"""
+A local, deterministic formant synthesizer: an engine (engines.py) that does
+real per-character work without a vendor or a network, for benchmarks and
+load tests of the output path. It does not try to be intelligible.
+
+Each character gets one slot of 1 / `chars_per_second` seconds:
+
+* vowels: a glottal pulse train at the voice's pitch (falling over the
+  segment), shaped by the vowel's first three formants;
+* voiced consonants: the same source with weak, low formants (a murmur);
+* unvoiced consonants: noise;
+* spaces are a slot of silence, clause punctuation a 150 ms pause and
+  sentence punctuation a 300 ms one.
+
+Slots have 5 ms ramps so they do not click. The whole segment is computed
+as NumPy array operations; there is no per-sample Python loop. The voice
+(pitch and a formant scale) is read from the first two values of the
+voice's `embedding` in the voice registry, or else derived from the voice id;
+the noise is seeded by the voice id and the text. The same request always
+renders the same bytes.
+
+The synthesis itself is cheap; `ms_per_char` of CPU time (on the rendering
+thread, in NumPy calls that release the GIL like a native engine would) is
+the floor of what a character costs, and `latency_ms` is added once per
+segment as a wait, like the queueing in front of a remote or GPU engine.
+`sample_rate_hertz` makes it an engine with a fixed rate, whose audio the
+output stage (audio_format.py) must resample.
+"""
+
+import time
+import unicodedata
+import zlib
+
+import numpy as np
+
+from engines import TTSEngine
+
+_SILENCE, _VOWEL, _VOICED, _UNVOICED = range(4)
+
+_VOWEL_FORMANTS = {
+    "a": (730, 1090, 2440), "e": (530, 1840, 2480), "i": (270, 2290, 3010),
+    "o": (570, 840, 2410), "u": (300, 870, 2240), "y": (270, 2290, 3010),
+}
+_MURMUR_FORMANTS = (250, 1100, 2400)
+_FORMANT_AMPLITUDES = np.array([1.0, 0.5, 0.25])
+_PAUSE_SECONDS = {**dict.fromkeys(",;:", 0.15), **dict.fromkeys(".!?", 0.3)}
+_GAIN = {_SILENCE: (0.0, 0.0), _VOWEL: (1.0, 0.0), _VOICED: (0.4, 0.02), _UNVOICED: (0.0, 0.25)} # (voiced, noise)
+_RAMP_SECONDS = 0.005
+_LEVEL = 0.3 # Peak level, of full scale
+
+
+def _tables():
+    """Per-byte (ASCII) lookup tables: kind, formants (3), pause seconds (0: one slot)."""
+    kind = np.full(256, _SILENCE, dtype=np.int8)
+    formants = np.tile(np.array(_MURMUR_FORMANTS, dtype=np.float64), (256, 1))
+    pause = np.zeros(256)
+    for code in range(256):
+        char = chr(code)
+        if char in _VOWEL_FORMANTS:
+            kind[code] = _VOWEL
+            formants[code] = _VOWEL_FORMANTS[char]
+        elif char in "bdgjlmnrvwz0123456789":
+            kind[code] = _VOICED
+        elif char.isalpha() and char.isascii():
+            kind[code] = _UNVOICED
+        elif char in _PAUSE_SECONDS:
+            pause[code] = _PAUSE_SECONDS[char]
+    voiced_gain = np.array([_GAIN[k][0] for k in kind])
+    noise_gain = np.array([_GAIN[k][1] for k in kind])
+    return formants, pause, voiced_gain, noise_gain
+
+
+_FORMANTS, _PAUSE, _VOICED_GAIN, _NOISE_GAIN = _tables()
+_BURN = np.random.default_rng(0).standard_normal((64, 64)) * 0.01
+
+
+class LocalEngine(TTSEngine):
+
+    name = "local"
+
+    def __init__(self, chars_per_second: float = 15.0, ms_per_char: float = 0.0, latency_ms: float = 0.0,
+                 registry=None, sample_rate_hertz: int = 0):
+        self.chars_per_second = chars_per_second
+        self.ms_per_char = ms_per_char
+        self.latency_ms = latency_ms
+        self.registry = registry
+        self.sample_rate_hertz = sample_rate_hertz
+
+    def render(self, text: str, voice_config_id: str, sample_rate_hertz: int) -> bytes:
+        cpu_start = time.thread_time()
+        if self.latency_ms:
+            time.sleep(self.latency_ms / 1000)
+        audio = self._synthesize(text, voice_config_id, sample_rate_hertz)
+        if self.ms_per_char:
+            _spend_cpu(cpu_start + len(text) * self.ms_per_char / 1000)
+        return audio
+
+    def _synthesize(self, text: str, voice_config_id: str, rate: int) -> bytes:
+        codes = np.frombuffer(unicodedata.normalize("NFKD", text).lower().encode("ascii", "ignore"), dtype=np.uint8)
+        if not len(codes):
+            return b""
+        slot = rate / self.chars_per_second
+        lengths = np.where(_PAUSE[codes] > 0, _PAUSE[codes] * rate, slot).round().astype(np.int64)
+        total = int(lengths.sum())
+        owner = np.repeat(np.arange(len(codes)), lengths) # The character each sample belongs to
+        position = np.arange(total) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        t = np.arange(total) / rate
+
+        pitch, formant_scale = self._voice(voice_config_id)
+        f0 = pitch * (1.0 - 0.15 * t / t[-1]) if total > 1 else np.full(total, pitch)
+        pulse = np.exp(-8.0 * (np.cumsum(f0) / rate % 1.0)) # One decaying pulse per glottal period
+        formants = _FORMANTS[codes][owner] * formant_scale
+        voiced = pulse * (np.sin(2 * np.pi * formants * t[:, None]) @ _FORMANT_AMPLITUDES)
+        noise = np.random.default_rng(zlib.crc32(f"{voice_config_id}\x1f{text}".encode("utf-8"))).standard_normal(total)
+
+        ramp = max(1.0, _RAMP_SECONDS * rate)
+        envelope = np.minimum(1.0, np.minimum(position, lengths[owner] - position) / ramp)
+        signal = envelope * (_VOICED_GAIN[codes][owner] * voiced / _FORMANT_AMPLITUDES.sum()
+                             + _NOISE_GAIN[codes][owner] * noise)
+        return (np.clip(signal * _LEVEL, -1.0, 1.0) * 32767).astype("<i2").tobytes()
+
+    def _voice(self, voice_config_id: str):
+        """(pitch in Hz, formant scale) of the voice."""
+        voice = self.registry.get(voice_config_id) if self.registry is not None and voice_config_id else None
+        embedding = voice.arrays.get("embedding") if voice is not None else None
+        if embedding is not None and embedding.size >= 2:
+            low, high = 1.0 / (1.0 + np.exp(-embedding.ravel()[:2].astype(np.float64))) # 0-1 each
+            return 95.0 + 130.0 * low, 0.9 + 0.2 * high
+        seed = zlib.crc32(voice_config_id.encode("utf-8"))
+        return 95.0 + seed % 130, 0.9 + (seed >> 8) % 21 / 100 # 95-224 Hz, 0.90-1.10
+
+
+def _spend_cpu(until_thread_time: float):
+    """Burns this thread's CPU until `until_thread_time` in small matrix products, which release the GIL."""
+    work = _BURN
+    while time.thread_time() < until_thread_time:
+        work = np.tanh(_BURN @ work)
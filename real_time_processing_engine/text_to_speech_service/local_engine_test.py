@@ -0,0 +1,67 @@
+import os
+import sys
+import tempfile
+import time
+import unittest
+
+import numpy as np
+
+from engines import create_engine
+from local_engine import LocalEngine
+
+# Voice registry of the voice cloning service, from the repository root
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from ai_ml_services.voice_cloning_service.voice_registry import VoiceRegistry, save_voice
+
+TEXT = "Hello there, how can I help you today?"
+
+
+class TestLocalEngine(unittest.TestCase):
+
+    def test_rendering_is_deterministic_per_text_and_voice(self):
+        engine = LocalEngine()
+        audio = engine.render(TEXT, "voice_a", 16000)
+        self.assertEqual(engine.render(TEXT, "voice_a", 16000), audio)
+        self.assertNotEqual(engine.render(TEXT, "voice_b", 16000), audio)
+        self.assertNotEqual(engine.render("Hello there, how can I help you?", "voice_a", 16000), audio)
+
+    def test_audio_is_as_long_as_the_text_takes_to_say(self):
+        engine = LocalEngine(chars_per_second=15)
+        # 36 one-slot characters, a 150 ms pause for the comma and a 300 ms one for the question mark
+        self.assertEqual(len(engine.render(TEXT, "v", 8000)), 2 * (36 * round(8000 / 15) + 1200 + 2400))
+        self.assertEqual(engine.render("", "v", 8000), b"")
+
+    def test_letters_are_sounded_and_spaces_are_silent(self):
+        samples = np.frombuffer(LocalEngine(chars_per_second=10).render("a b", "v", 16000), dtype="<i2")
+        vowel, space, consonant = samples[:1600], samples[1600:3200], samples[3200:]
+        self.assertGreater(np.abs(vowel).max(), 3000)
+        self.assertEqual(np.abs(space).max(), 0)
+        self.assertGreater(np.abs(consonant).max(), 300)
+
+    def test_a_registered_voice_is_read_from_its_embedding(self):
+        directory = tempfile.mkdtemp()
+        save_voice(directory, "low", {"embedding": np.array([-3.0, 0.0], dtype=np.float32)})
+        save_voice(directory, "high", {"embedding": np.array([3.0, 0.0], dtype=np.float32)})
+        registry = VoiceRegistry(directory, 1 << 20)
+        self.addCleanup(registry.shutdown)
+        engine = LocalEngine(registry=registry)
+        self.assertLess(engine._voice("low")[0], 110)
+        self.assertGreater(engine._voice("high")[0], 210)
+        self.assertEqual(engine._voice("unregistered"), LocalEngine()._voice("unregistered"))
+        self.assertEqual(len(registry), 2)
+
+    def test_compute_cost_per_character(self):
+        engine = LocalEngine(ms_per_char=1.0)
+        start = time.thread_time()
+        engine.render("x" * 50, "v", 16000)
+        self.assertGreaterEqual(time.thread_time() - start, 0.05)
+
+    def test_engines_are_created_by_name(self):
+        self.assertEqual(create_engine("local").name, "local")
+        self.assertEqual(create_engine("placeholder").name, "placeholder")
+        with self.assertRaises(ValueError):
+            create_engine("vendor")
+
+
+if __name__ == "__main__":
+    unittest.main()
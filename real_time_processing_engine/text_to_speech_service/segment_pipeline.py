@@ -0,0 +1,91 @@
+# real_time_processing_engine/text_to_speech_service/segment_pipeline.py
+
+"""
+Renders the segments of a response (text_segments.py) on a worker pool shared
+by all requests and hands their audio back in order.
+
+A request keeps up to `depth` of its segments queued or rendering: while
+segment 1 is being sent (and played), segment 2 is already rendering. The
+time to the first audio is therefore the time to render the first segment,
+not the whole text. A segment found in the audio cache (audio_cache.py)
+costs no rendering: a memory hit is handed back without going through the
+pool; the disk lookup and, on a miss, the render run on the pool.
+
+Segments are rendered in the format the request asked for (audio_format.py:
+the engine's audio resampled and encoded on the same pool thread) and cached
+per format, so a cached segment goes out with no conversion at all.
+
+Per-request depth bounds how far ahead a request renders audio its caller may
+never hear (barge-in); the pool size bounds rendering across requests.
+"""
+
+import collections
+from concurrent import futures
+import os
+import sys
+
+import audio_format
+from audio_cache import cache_key
+
+# Shared observability package at the repository root
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from observability import metrics
+
+SEGMENT_SECONDS = metrics.histogram("revo_tts_segment_render_seconds", "Rendering time per text segment.")
+
+
+class SegmentPipeline:
+    """
+    `render(text, voice_config_id, sample_rate_hertz) -> bytes` renders one
+    segment as LINEAR16; it is called on the pool's threads, at
+    `render_rate` if the engine has a fixed rate (0: at the requested rate).
+    """
+
+    def __init__(self, render, workers: int, depth: int, cache=None, render_rate: int = 0):
+        self.render = render
+        self.depth = max(1, depth)
+        self.cache = cache
+        self.render_rate = render_rate
+        self._executor = futures.ThreadPoolExecutor(max_workers=workers, thread_name_prefix="tts-segment")
+
+    def blocks(self, segments, voice_config_id: str, sample_rate_hertz: int, encoding: str = audio_format.LINEAR16):
+        """
+        Yields the audio of each of `segments`, in `encoding` at
+        `sample_rate_hertz`, in order, as soon as it is rendered. Closing the generator (the caller cancelled) cancels the
+        segments not yet started.
+        """
+        queued = collections.deque()
+        segments = iter(segments)
+        try:
+            while True:
+                while len(queued) < self.depth:
+                    segment = next(segments, None)
+                    if segment is None:
+                        break
+                    queued.append(self._submit(segment, voice_config_id, encoding, sample_rate_hertz))
+                if not queued:
+                    return
+                yield queued.popleft().result()
+        finally:
+            for future in queued:
+                future.cancel()
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+    def _submit(self, text, voice_config_id, encoding, sample_rate_hertz):
+        if self.cache is None:
+            return self._executor.submit(self._render, text, voice_config_id, encoding, sample_rate_hertz)
+        key = cache_key(text, voice_config_id, encoding, sample_rate_hertz)
+        audio = self.cache.get(key)
+        if audio is not None:
+            future = futures.Future()
+            future.set_result(audio)
+            return future
+        return self._executor.submit(self.cache.get_or_render, key,
+                                     lambda: self._render(text, voice_config_id, encoding, sample_rate_hertz))
+
+    def _render(self, text, voice_config_id, encoding, sample_rate_hertz):
+        with SEGMENT_SECONDS.time():
+            return audio_format.render_as(self.render, text, voice_config_id, encoding, sample_rate_hertz,
+                                          self.render_rate)
@@ -0,0 +1,68 @@
+import threading
+import time
+import unittest
+
+from audio_cache import AudioCache, MemoryTier
+from segment_pipeline import SegmentPipeline
+
+
+class FakeEngine:
+    """Renders a segment as its UTF-8 text after `delay` seconds; records the order segments start in."""
+
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.started = []
+        self.lock = threading.Lock()
+
+    def __call__(self, text, voice_config_id, sample_rate_hertz):
+        with self.lock:
+            self.started.append(text)
+        time.sleep(self.delay)
+        return text.encode()
+
+
+class TestSegmentPipeline(unittest.TestCase):
+
+    def test_segments_come_back_in_order(self):
+        engine = FakeEngine()
+        pipeline = SegmentPipeline(engine, workers=4, depth=3)
+        segments = [f"segment {i}" for i in range(10)]
+        self.assertEqual(list(pipeline.blocks(segments, "voice", 16000)), [s.encode() for s in segments])
+        pipeline.shutdown()
+
+    def test_next_segment_renders_while_the_first_is_sent(self):
+        engine = FakeEngine(delay=0.05)
+        pipeline = SegmentPipeline(engine, workers=2, depth=2)
+        blocks = pipeline.blocks(["one", "two", "three"], "voice", 16000)
+        start = time.perf_counter()
+        self.assertEqual(next(blocks), b"one")
+        self.assertEqual(engine.started, ["one", "two"]) # "two" started together with "one"
+        self.assertEqual(next(blocks), b"two")
+        self.assertLess(time.perf_counter() - start, 0.09) # Not one render after the other
+        blocks.close()
+        pipeline.shutdown()
+
+    def test_closing_cancels_segments_not_started(self):
+        engine = FakeEngine(delay=0.05)
+        pipeline = SegmentPipeline(engine, workers=1, depth=3)
+        blocks = pipeline.blocks(["one", "two", "three", "four"], "voice", 16000)
+        next(blocks) # "two" is now rendering, "three" queued behind it
+        blocks.close()
+        time.sleep(0.12)
+        self.assertEqual(engine.started, ["one", "two"])
+        pipeline.shutdown()
+
+    def test_cached_segments_are_not_rendered_again(self):
+        engine = FakeEngine()
+        pipeline = SegmentPipeline(engine, workers=2, depth=2, cache=AudioCache(MemoryTier(1024)))
+        list(pipeline.blocks(["Hello there!", "How are you?"], "voice", 16000))
+        blocks = list(pipeline.blocks(["Hello   there!", "Goodbye."], "voice", 16000))
+        self.assertEqual(blocks, [b"Hello there!", b"Goodbye."])
+        self.assertEqual(engine.started, ["Hello there!", "How are you?", "Goodbye."])
+        list(pipeline.blocks(["Hello there!"], "other_voice", 16000))
+        self.assertEqual(engine.started[-1], "Hello there!") # Another voice is another segment
+        pipeline.shutdown()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -2,6 +2,8 @@
 
 import grpc
 from concurrent import futures
+import os
+import sys
 import time # Required for server.wait_for_termination() in a loop
 
 # Import generated protobuf and gRPC modules
@@ -9,21 +11,72 @@ import time # Required for server.wait_for_termination() in a loop
 import tts_service_pb2
 import tts_service_pb2_grpc
 
-# Optional: for more advanced logging
-# import logging
-# logging.basicConfig(level=logging.INFO)
+import audio_format
+import audio_frames
+from config import (
+    TTS_SAMPLE_RATE_HERTZ,
+    TTS_FRAME_MS,
+    TTS_ENGINE,
+    TTS_SYNTHESIS_WORKERS,
+    TTS_PIPELINE_DEPTH,
+    TTS_MEMORY_CACHE_BYTES,
+    TTS_DISK_CACHE_DIR,
+    TTS_DISK_CACHE_BYTES,
+    TTS_WARMUP_ENABLED,
+    TTS_WARMUP_RESPONSES_FILE,
+    TTS_WARMUP_TEXTS,
+    TTS_WARMUP_VOICES,
+    TTS_WARMUP_PROCESSES,
+    TTS_WARMUP_TIMEOUT_SECONDS,
+    TTS_WARMUP_FORMATS,
+    TTS_VOICES_DIR,
+    TTS_VOICE_MEMORY_BYTES,
+    TTS_VOICE_PREFETCH_WORKERS,
+)
+from audio_cache import AudioCache, DiskTier, MemoryTier
+from engines import create_engine
+from segment_pipeline import SegmentPipeline
+from text_segments import split_segments
+import warmup
+
+# Shared observability package at the repository root
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from observability import admin, deadlines, logs, metrics, tracing
+# Voice models, shared with the voice cloning service
+from ai_ml_services.voice_cloning_service.voice_registry import VoiceRegistry
+
+log = logs.get_logger("text_to_speech")
+
+STREAM_SECONDS = metrics.histogram(
+    "revo_tts_stream_seconds", "SynthesizeStream request to its end, including failed and cancelled streams.")
+FIRST_CHUNK_SECONDS = metrics.histogram(
+    "revo_tts_first_chunk_seconds", "SynthesizeStream request to its first audio frame being sent.")
+STREAMED_SECONDS = metrics.counter("revo_tts_streamed_audio_seconds_total", "Seconds of audio sent by SynthesizeStream.")
 
 
 class TextToSpeechServicer(tts_service_pb2_grpc.TextToSpeechServiceServicer):
     """
     Implements the TextToSpeechService gRPC interface.
     """
+    def __init__(self, pipeline: SegmentPipeline = None, registry: VoiceRegistry = None):
+        if registry is None:
+            registry = VoiceRegistry(TTS_VOICES_DIR, TTS_VOICE_MEMORY_BYTES, TTS_VOICE_PREFETCH_WORKERS)
+        self.registry = registry
+        if pipeline is None:
+            engine = create_engine(TTS_ENGINE, registry)
+            pipeline = SegmentPipeline(engine.render, TTS_SYNTHESIS_WORKERS, TTS_PIPELINE_DEPTH,
+                                       AudioCache(MemoryTier(TTS_MEMORY_CACHE_BYTES)), engine.sample_rate_hertz)
+        self.pipeline = pipeline
+
     def SynthesizeText(self, request: tts_service_pb2.TTSRequest, context):
         """
         Receives text and returns a status message.
         Placeholder for actual speech synthesis.
         """
-        print(f"TextToSpeechService: Received text '{request.text_to_synthesize}' for session_id '{request.session_id}'. Voice config: '{request.voice_config_id}'")
+        log.info("request", "Received text '%s'. Voice config: '%s'", request.text_to_synthesize, request.voice_config_id,
+                 session_id=request.session_id, stage="tts")
+        if deadlines.expired(context, "text_to_speech", "SynthesizeText", session_id=request.session_id):
+            return tts_service_pb2.TTSResponse(session_id=request.session_id)
 
         # Placeholder TTS logic:
         # In a real implementation, this method would:
@@ -32,11 +85,11 @@ class TextToSpeechServicer(tts_service_pb2_grpc.TextToSpeechServiceServicer):
         # 3. If streaming audio, it would return a stream of audio chunks.
         # 4. For non-streaming, it might return the audio data directly in TTSResponse (if small)
         #    or provide a way to fetch it (e.g., a URL or stream ID).
-        # For this placeholder, we just acknowledge receipt.
-        
+        # For this placeholder, we just acknowledge receipt. Nothing is synthesized,
+        # so there is no synthesis time to record (SynthesizeStream records its own).
         status_message = f"Text for session '{request.session_id}' (voice: '{request.voice_config_id if request.voice_config_id else 'default'}') received by TTS. Placeholder synthesis initiated."
-        
-        print(f"TextToSpeechService: Status for SID '{request.session_id}': {status_message}")
+
+        log.info("request", "Status: %s", status_message, session_id=request.session_id, stage="tts")
 
         return tts_service_pb2.TTSResponse(
             session_id=request.session_id,
@@ -44,21 +97,122 @@ class TextToSpeechServicer(tts_service_pb2_grpc.TextToSpeechServiceServicer):
             # audio_data and error_message fields are omitted for this placeholder
         )
 
+    def SynthesizeStream(self, request: tts_service_pb2.TTSRequest, context):
+        """
+        Streams the synthesized speech as AudioChunks of TTS_FRAME_MS, each
+        sent as soon as it is rendered. The text is rendered segment by
+        segment (sentences and clauses), so the first chunk goes out once the
+        first segment is rendered. Sequence numbers start at 0; the last chunk
+        has is_last set. The audio is in the request's encoding and sample
+        rate (default LINEAR16 at TTS_SAMPLE_RATE_HERTZ); anything else than
+        LINEAR16, MULAW or ALAW at 8-48 kHz is rejected with INVALID_ARGUMENT.
+        """
+        log.info("request", "Streaming text '%s'. Voice config: '%s'", request.text_to_synthesize,
+                 request.voice_config_id, session_id=request.session_id, stage="tts")
+        if deadlines.expired(context, "text_to_speech", "SynthesizeStream", session_id=request.session_id):
+            return
+        encoding = tts_service_pb2.AudioEncoding.Name(request.audio_encoding or tts_service_pb2.LINEAR16)
+        sample_rate = request.sample_rate_hertz or TTS_SAMPLE_RATE_HERTZ
+        if not audio_format.supported(encoding, sample_rate):
+            log.warning("request", "Unsupported output format %s at %d Hz", encoding, sample_rate,
+                        session_id=request.session_id, stage="tts")
+            context.set_code(grpc.StatusCode.INVALID_ARGUMENT)
+            context.set_details(f"Unsupported output format {encoding} at {sample_rate} Hz")
+            return
+        bytes_per_sample = audio_format.BYTES_PER_SAMPLE[encoding]
+        # The tracing interceptor only covers unary calls; the stream's span is recorded here.
+        parent = tracing.parse_traceparent(dict(context.invocation_metadata()).get(tracing.TRACEPARENT_KEY, ""))
+        start, start_ns = time.perf_counter(), time.time_ns()
+        audio_seconds = 0.0
+        sequence_number = 0
+        error = ""
+        blocks = self.pipeline.blocks(split_segments(request.text_to_synthesize), request.voice_config_id,
+                                      sample_rate, encoding)
+        frame_bytes = audio_frames.frame_bytes(sample_rate, TTS_FRAME_MS, bytes_per_sample)
+        try:
+            for frame, is_last in audio_frames.frames(blocks, frame_bytes):
+                if sequence_number == 0:
+                    FIRST_CHUNK_SECONDS.observe(time.perf_counter() - start)
+                duration_ms = audio_frames.duration_ms(frame, sample_rate, bytes_per_sample)
+                yield tts_service_pb2.AudioChunk(
+                    session_id=request.session_id,
+                    sequence_number=sequence_number,
+                    audio_data=frame,
+                    encoding=request.audio_encoding or tts_service_pb2.LINEAR16,
+                    sample_rate_hertz=sample_rate,
+                    duration_ms=duration_ms,
+                    is_last=is_last,
+                )
+                sequence_number += 1
+                audio_seconds += duration_ms / 1000
+        except GeneratorExit: # The caller cancelled the stream, e.g. on barge-in
+            error = "Cancelled"
+            raise
+        except Exception as e:
+            error = type(e).__name__
+            log.error("request", "Synthesis failed after %d chunks: %s", sequence_number, e,
+                      session_id=request.session_id, stage="tts")
+            context.set_code(grpc.StatusCode.INTERNAL)
+            context.set_details(f"Synthesis failed: {e}")
+            return
+        finally:
+            blocks.close() # Cancels the segments not rendered yet
+            STREAM_SECONDS.observe(time.perf_counter() - start)
+            STREAMED_SECONDS.inc(audio_seconds)
+            tracing.record_span("tts.synthesize_stream", start_ns, time.time_ns(), parent,
+                                attrs={"session_id": request.session_id, "chunks": sequence_number}, error=error)
+        log.info("request", "Streamed %d chunks (%.2f s of audio)", sequence_number, audio_seconds,
+                 session_id=request.session_id, stage="tts")
+
+    def PrefetchVoices(self, request: tts_service_pb2.PrefetchVoicesRequest, context):
+        """
+        Starts loading the requested voices in the background and returns at
+        once, with the ids of the voices there are none of.
+        """
+        unknown = self.registry.prefetch(request.voice_config_ids)
+        log.info("request", "Prefetching voices %s (unknown: %s)", list(request.voice_config_ids), unknown,
+                 session_id=request.session_id, stage="tts")
+        return tts_service_pb2.PrefetchVoicesResponse(unknown_voice_config_ids=unknown)
+
 def serve():
     """
     Starts the gRPC server for the TextToSpeechService.
     """
-    server = grpc.server(futures.ThreadPoolExecutor(max_workers=10))
+    logs.configure()
+    tracing.init_tracer("text_to_speech")
+    server = grpc.server(futures.ThreadPoolExecutor(max_workers=10),
+                         interceptors=metrics.server_interceptors("text_to_speech") + tracing.server_interceptors())
+    disk = DiskTier(TTS_DISK_CACHE_DIR, TTS_DISK_CACHE_BYTES) if TTS_DISK_CACHE_DIR else None
+    cache = AudioCache(MemoryTier(TTS_MEMORY_CACHE_BYTES), disk)
+    registry = VoiceRegistry(TTS_VOICES_DIR, TTS_VOICE_MEMORY_BYTES, TTS_VOICE_PREFETCH_WORKERS)
+    engine = create_engine(TTS_ENGINE, registry)
+    log.info("lifecycle", "Synthesis engine: %s, voices in %s", engine.name, TTS_VOICES_DIR, stage="tts")
+    servicer = TextToSpeechServicer(SegmentPipeline(
+        engine.render, TTS_SYNTHESIS_WORKERS, TTS_PIPELINE_DEPTH, cache, engine.sample_rate_hertz), registry)
+    if TTS_WARMUP_ENABLED: # Before the port is open: callers only ever see a warm cache
+        try:
+            segments = warmup.static_segments(warmup.warmup_texts(TTS_WARMUP_RESPONSES_FILE, TTS_WARMUP_TEXTS))
+            formats = warmup.parse_formats(TTS_WARMUP_FORMATS)
+        except (OSError, ValueError) as e:
+            log.warning("warmup", "No warm-up, the response templates or formats could not be read: %s", e,
+                        stage="tts")
+        else:
+            warmup.warm_up(cache, engine.render, segments,
+                           [voice.strip() for voice in TTS_WARMUP_VOICES.split(",") if voice.strip()],
+                           formats, processes=TTS_WARMUP_PROCESSES, timeout_seconds=TTS_WARMUP_TIMEOUT_SECONDS,
+                           render_rate=engine.sample_rate_hertz)
     tts_service_pb2_grpc.add_TextToSpeechServiceServicer_to_server(
-        TextToSpeechServicer(), server
+        servicer, server
     )
+    admin.add_to_server(server, "text_to_speech")
     
     port = "50055" # Define the port for Text-to-Speech service
     listen_addr = f'[::]:{port}'
     server.add_insecure_port(listen_addr)
     
     server.start()
-    print(f"TextToSpeechService server started, listening on port {port}")
+    metrics.start_http_server("text_to_speech", 51055)
+    log.info("lifecycle", "TextToSpeechService server started, listening on port %s", port)
 
     try:
         # Keep the server running until interrupted
@@ -66,9 +220,14 @@ def serve():
         while True:
             time.sleep(86400) # Sleep for a day, effectively keeping the thread alive
     except KeyboardInterrupt:
-        print("TextToSpeechService server stopping...")
+        log.info("lifecycle", "TextToSpeechService server stopping...")
         server.stop(0) # Graceful stop
-        print("TextToSpeechService server stopped.")
+        servicer.pipeline.shutdown()
+        registry.shutdown()
+        metrics.shutdown()
+        tracing.shutdown()
+        log.info("lifecycle", "TextToSpeechService server stopped.")
+        logs.shutdown()
 
 # Main guard to run the server when the script is executed
 if __name__ == '__main__':
@@ -1,10 +1,17 @@
+import tempfile
 import unittest
 from unittest import mock
 import grpc # For mocking context
+import numpy as np
 
 # Import service and message types
 from service import TextToSpeechServicer # The module under test
+from engines import PlaceholderEngine
 import tts_service_pb2
+import audio_frames
+from text_segments import split_segments
+from config import TTS_SAMPLE_RATE_HERTZ, TTS_FRAME_MS
+from ai_ml_services.voice_cloning_service.voice_registry import VoiceRegistry, save_voice
 
 class TestTextToSpeechServicer(unittest.TestCase):
 
@@ -12,6 +19,8 @@ class TestTextToSpeechServicer(unittest.TestCase):
         """Setup method to create a servicer instance for each test."""
         self.servicer = TextToSpeechServicer()
         self.mock_context = mock.Mock(spec=grpc.ServicerContext)
+        self.mock_context.time_remaining.return_value = None # The caller set no deadline
+        self.mock_context.invocation_metadata.return_value = ()
 
     def test_synthesize_text_placeholder_response_default_voice(self):
         """Test placeholder response with default voice_config_id."""
@@ -84,6 +93,91 @@ class TestTextToSpeechServicer(unittest.TestCase):
         self.assertEqual(response_2.session_id, session_id_2)
         self.assertEqual(response_2.status_message, expected_status_2)
 
+    def test_synthesize_text_past_its_deadline_is_dropped(self):
+        self.mock_context.time_remaining.return_value = 0.0
+        request = tts_service_pb2.TTSRequest(text_to_synthesize="Too late.", session_id="s_expired")
+        with self.assertLogs("revo.deadlines", level="WARNING"):
+            response = self.servicer.SynthesizeText(request, self.mock_context)
+        self.assertEqual(response.status_message, "")
+        self.mock_context.set_code.assert_called_once_with(grpc.StatusCode.DEADLINE_EXCEEDED)
+
+    def test_synthesize_stream_sends_fixed_duration_frames_in_order(self):
+        request = tts_service_pb2.TTSRequest(text_to_synthesize="Hello there, how can I help?", session_id="s_stream")
+        chunks = list(self.servicer.SynthesizeStream(request, self.mock_context))
+
+        self.assertEqual([c.sequence_number for c in chunks], list(range(len(chunks))))
+        self.assertEqual([c.is_last for c in chunks], [False] * (len(chunks) - 1) + [True])
+        frame_bytes = audio_frames.frame_bytes(TTS_SAMPLE_RATE_HERTZ, TTS_FRAME_MS)
+        for chunk in chunks[:-1]:
+            self.assertEqual(len(chunk.audio_data), frame_bytes)
+            self.assertEqual(chunk.duration_ms, TTS_FRAME_MS)
+        self.assertLess(len(chunks[-1].audio_data), frame_bytes)
+        for chunk in chunks:
+            self.assertEqual(chunk.session_id, "s_stream")
+            self.assertEqual(chunk.encoding, tts_service_pb2.LINEAR16)
+            self.assertEqual(chunk.sample_rate_hertz, TTS_SAMPLE_RATE_HERTZ)
+        audio = b"".join(c.audio_data for c in chunks)
+        self.assertEqual(audio, b"".join(PlaceholderEngine().render(segment, "", TTS_SAMPLE_RATE_HERTZ)
+                                         for segment in split_segments(request.text_to_synthesize)))
+
+    def test_synthesize_stream_past_its_deadline_sends_nothing(self):
+        self.mock_context.time_remaining.return_value = 0.0
+        request = tts_service_pb2.TTSRequest(text_to_synthesize="Too late.", session_id="s_expired")
+        with self.assertLogs("revo.deadlines", level="WARNING"):
+            chunks = list(self.servicer.SynthesizeStream(request, self.mock_context))
+        self.assertEqual(chunks, [])
+        self.mock_context.set_code.assert_called_once_with(grpc.StatusCode.DEADLINE_EXCEEDED)
+
+    def test_synthesize_stream_sends_the_requested_format(self):
+        request = tts_service_pb2.TTSRequest(text_to_synthesize="Hello there! How can I help you today?",
+                                             session_id="s_sip", audio_encoding=tts_service_pb2.MULAW,
+                                             sample_rate_hertz=8000)
+        chunks = list(self.servicer.SynthesizeStream(request, self.mock_context))
+        self.assertTrue(all(chunk.encoding == tts_service_pb2.MULAW and chunk.sample_rate_hertz == 8000
+                            for chunk in chunks))
+        self.assertEqual({len(chunk.audio_data) for chunk in chunks[:-1]}, {8000 * TTS_FRAME_MS // 1000})
+        self.assertEqual(chunks[0].duration_ms, TTS_FRAME_MS)
+        self.assertEqual(set(chunks[0].audio_data), {0xFF}) # The placeholder's silence, in mu-law
+
+    def test_synthesize_stream_rejects_an_unsupported_format(self):
+        request = tts_service_pb2.TTSRequest(text_to_synthesize="Hello.", session_id="s_bad",
+                                             audio_encoding=tts_service_pb2.ALAW, sample_rate_hertz=4000)
+        with self.assertLogs("revo.text_to_speech", level="WARNING"):
+            chunks = list(self.servicer.SynthesizeStream(request, self.mock_context))
+        self.assertEqual(chunks, [])
+        self.mock_context.set_code.assert_called_once_with(grpc.StatusCode.INVALID_ARGUMENT)
+
+    def test_prefetch_voices_loads_the_known_voices_in_the_background(self):
+        directory = tempfile.mkdtemp()
+        save_voice(directory, "acme-v1", {"embedding": np.zeros(8, dtype=np.float32)})
+        registry = VoiceRegistry(directory, 1 << 20)
+        servicer = TextToSpeechServicer(self.servicer.pipeline, registry)
+        request = tts_service_pb2.PrefetchVoicesRequest(voice_config_ids=["acme-v1", "nobody"], session_id="s_pre")
+        response = servicer.PrefetchVoices(request, self.mock_context)
+        self.assertEqual(list(response.unknown_voice_config_ids), ["nobody"])
+        registry.shutdown() # Waits for the prefetch
+        self.assertEqual(len(registry), 1)
+
+
+class TestFrames(unittest.TestCase):
+
+    def test_frames_are_sent_as_soon_as_the_rendered_audio_fills_them(self):
+        rendered = []
+
+        def blocks():
+            for block in (b"a" * 3, b"b" * 6, b"c" * 2):
+                rendered.append(block)
+                yield block
+
+        frames = audio_frames.frames(blocks(), 4)
+        self.assertEqual(next(frames), (b"aaab", False))
+        self.assertEqual(len(rendered), 2) # Before the third block is rendered
+        self.assertEqual(list(frames), [(b"bbbb", False), (b"bcc", True)])
+
+    def test_last_frame_is_empty_when_the_audio_fills_whole_frames(self):
+        self.assertEqual(list(audio_frames.frames([b"x" * 8], 4)), [(b"xxxx", False), (b"xxxx", False), (b"", True)])
+        self.assertEqual(list(audio_frames.frames([], 4)), [(b"", True)])
+
 
 if __name__ == '__main__':
     unittest.main()
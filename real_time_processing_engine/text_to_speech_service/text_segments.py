@@ -0,0 +1,63 @@
+# real_time_processing_engine/text_to_speech_service/text_segments.py
+
+"""
+Splits the text to synthesize into segments at sentence and clause
+boundaries, so SynthesizeStream can start sending the first segment's audio
+while the later ones are still being rendered.
+
+Every sentence end is a segment boundary. A clause boundary (",", ";", ":",
+a dash) is one only when the clause before it has at least
+`min_segment_chars` characters; shorter clauses are merged with the next one,
+and a short clause at the end of a sentence with the one before it, so no
+segment is a fragment too short to be spoken naturally. The segments keep
+their punctuation, which the engine needs for prosody.
+"""
+
+import re
+
+from config import TTS_MIN_SEGMENT_CHARS
+
+_CLOSERS = "\"'”’)]"
+_SENTENCE_END = re.compile(r"[.!?…]+[%s]*\s+" % re.escape(_CLOSERS))
+_CLAUSE_END = re.compile(r"(?:[,;:]|\s[-–—]+)[%s]*\s+" % re.escape(_CLOSERS))
+# A period after these is not a sentence end ("Dr. Smith").
+_ABBREVIATIONS = frozenset(("mr", "mrs", "ms", "dr", "st", "vs", "no", "e.g", "i.e"))
+
+
+def split_segments(text: str, min_segment_chars: int = TTS_MIN_SEGMENT_CHARS) -> list:
+    """The segments of `text`, in order; empty for blank text."""
+    segments = []
+    for sentence in _split(text, _SENTENCE_END, _is_sentence_end):
+        merged = []
+        pending = ""
+        for clause in _split(sentence, _CLAUSE_END):
+            pending = f"{pending} {clause}" if pending else clause
+            if len(pending) >= min_segment_chars:
+                merged.append(pending)
+                pending = ""
+        if pending:
+            if merged:
+                merged[-1] = f"{merged[-1]} {pending}"
+            else:
+                merged.append(pending)
+        segments.extend(merged)
+    return segments
+
+
+def _split(text: str, boundary, accept=None) -> list:
+    pieces = []
+    start = 0
+    for match in boundary.finditer(text):
+        if accept is not None and not accept(text, match):
+            continue
+        pieces.append(text[start:match.end()].strip())
+        start = match.end()
+    pieces.append(text[start:].strip())
+    return [piece for piece in pieces if piece]
+
+
+def _is_sentence_end(text: str, match) -> bool:
+    if text[match.start()] != ".":
+        return True
+    word = text[:match.start()].rsplit(None, 1)
+    return not word or word[-1].lower() not in _ABBREVIATIONS
@@ -0,0 +1,32 @@
+import unittest
+
+from text_segments import split_segments
+
+
+class TestSplitSegments(unittest.TestCase):
+
+    def test_sentences_are_segments(self):
+        self.assertEqual(split_segments("Hello there! How can I help you today?"),
+                         ["Hello there!", "How can I help you today?"])
+
+    def test_long_sentences_are_split_at_clauses(self):
+        text = "I'm sorry, I can't fetch the actual weather for London right now, but I hope it's a pleasant day!"
+        self.assertEqual(split_segments(text, min_segment_chars=10),
+                         ["I'm sorry,", "I can't fetch the actual weather for London right now,",
+                          "but I hope it's a pleasant day!"])
+
+    def test_short_clauses_are_merged(self):
+        self.assertEqual(split_segments("Yes, sir.", min_segment_chars=10), ["Yes, sir."])
+        self.assertEqual(split_segments("Well, yes, that works for me, okay?", min_segment_chars=10),
+                         ["Well, yes,", "that works for me, okay?"])
+
+    def test_abbreviations_and_decimals_do_not_end_a_sentence(self):
+        self.assertEqual(split_segments("Dr. Smith sees you at 3.30 today.", min_segment_chars=10),
+                         ["Dr. Smith sees you at 3.30 today."])
+
+    def test_blank_text_has_no_segments(self):
+        self.assertEqual(split_segments("  "), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
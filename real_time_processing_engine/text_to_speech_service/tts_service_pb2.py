@@ -24,7 +24,7 @@ _sym_db = _symbol_database.Default()
 
 
 
-DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x11tts_service.proto\x12\x1freal_time_processing_engine.tts\"U\n\nTTSRequest\x12\x1a\n\x12text_to_synthesize\x18\x01 \x01(\t\x12\x12\n\nsession_id\x18\x02 \x01(\t\x12\x17\n\x0fvoice_config_id\x18\x03 \x01(\t\"9\n\x0bTTSResponse\x12\x12\n\nsession_id\x18\x01 \x01(\t\x12\x16\n\x0estatus_message\x18\x02 \x01(\t2\x82\x01\n\x13TextToSpeechService\x12k\n\x0eSynthesizeText\x12+.real_time_processing_engine.tts.TTSRequest\x1a,.real_time_processing_engine.tts.TTSResponseB<Z:revovoiceai/real_time_processing_engine/protos/tts_serviceb\x06proto3')
+DESCRIPTOR = _descriptor_pool.Default().AddSerializedFile(b'\n\x11tts_service.proto\x12\x1freal_time_processing_engine.tts\"\xb8\x01\n\nTTSRequest\x12\x1a\n\x12text_to_synthesize\x18\x01 \x01(\t\x12\x12\n\nsession_id\x18\x02 \x01(\t\x12\x17\n\x0fvoice_config_id\x18\x03 \x01(\t\x12\x46\n\x0e\x61udio_encoding\x18\x04 \x01(\x0e\x32..real_time_processing_engine.tts.AudioEncoding\x12\x19\n\x11sample_rate_hertz\x18\x05 \x01(\r\"9\n\x0bTTSResponse\x12\x12\n\nsession_id\x18\x01 \x01(\t\x12\x16\n\x0estatus_message\x18\x02 \x01(\t\"\xd0\x01\n\nAudioChunk\x12\x12\n\nsession_id\x18\x01 \x01(\t\x12\x17\n\x0fsequence_number\x18\x02 \x01(\r\x12\x12\n\naudio_data\x18\x03 \x01(\x0c\x12@\n\x08\x65ncoding\x18\x04 \x01(\x0e\x32..real_time_processing_engine.tts.AudioEncoding\x12\x19\n\x11sample_rate_hertz\x18\x05 \x01(\r\x12\x13\n\x0b\x64uration_ms\x18\x06 \x01(\r\x12\x0f\n\x07is_last\x18\x07 \x01(\x08\"E\n\x15PrefetchVoicesRequest\x12\x18\n\x10voice_config_ids\x18\x01 \x03(\t\x12\x12\n\nsession_id\x18\x02 \x01(\t\":\n\x16PrefetchVoicesResponse\x12 \n\x18unknown_voice_config_ids\x18\x01 \x03(\t*R\n\rAudioEncoding\x12\x1e\n\x1a\x41UDIO_ENCODING_UNSPECIFIED\x10\x00\x12\x0c\n\x08LINEAR16\x10\x01\x12\t\n\x05MULAW\x10\x02\x12\x08\n\x04\x41LAW\x10\x03\x32\xf6\x02\n\x13TextToSpeechService\x12k\n\x0eSynthesizeText\x12+.real_time_processing_engine.tts.TTSRequest\x1a,.real_time_processing_engine.tts.TTSResponse\x12n\n\x10SynthesizeStream\x12+.real_time_processing_engine.tts.TTSRequest\x1a+.real_time_processing_engine.tts.AudioChunk0\x01\x12\x81\x01\n\x0ePrefetchVoices\x12\x36.real_time_processing_engine.tts.PrefetchVoicesRequest\x1a\x37.real_time_processing_engine.tts.PrefetchVoicesResponseB<Z:revovoiceai/real_time_processing_engine/protos/tts_serviceb\x06proto3')
 
 _globals = globals()
 _builder.BuildMessageAndEnumDescriptors(DESCRIPTOR, _globals)
@@ -32,10 +32,18 @@ _builder.BuildTopDescriptorsAndMessages(DESCRIPTOR, 'tts_service_pb2', _globals)
 if not _descriptor._USE_C_DESCRIPTORS:
   _globals['DESCRIPTOR']._loaded_options = None
   _globals['DESCRIPTOR']._serialized_options = b'Z:revovoiceai/real_time_processing_engine/protos/tts_service'
-  _globals['_TTSREQUEST']._serialized_start=54
-  _globals['_TTSREQUEST']._serialized_end=139
-  _globals['_TTSRESPONSE']._serialized_start=141
-  _globals['_TTSRESPONSE']._serialized_end=198
-  _globals['_TEXTTOSPEECHSERVICE']._serialized_start=201
-  _globals['_TEXTTOSPEECHSERVICE']._serialized_end=331
+  _globals['_AUDIOENCODING']._serialized_start=642
+  _globals['_AUDIOENCODING']._serialized_end=724
+  _globals['_TTSREQUEST']._serialized_start=55
+  _globals['_TTSREQUEST']._serialized_end=239
+  _globals['_TTSRESPONSE']._serialized_start=241
+  _globals['_TTSRESPONSE']._serialized_end=298
+  _globals['_AUDIOCHUNK']._serialized_start=301
+  _globals['_AUDIOCHUNK']._serialized_end=509
+  _globals['_PREFETCHVOICESREQUEST']._serialized_start=511
+  _globals['_PREFETCHVOICESREQUEST']._serialized_end=580
+  _globals['_PREFETCHVOICESRESPONSE']._serialized_start=582
+  _globals['_PREFETCHVOICESRESPONSE']._serialized_end=640
+  _globals['_TEXTTOSPEECHSERVICE']._serialized_start=727
+  _globals['_TEXTTOSPEECHSERVICE']._serialized_end=1101
 # @@protoc_insertion_point(module_scope)
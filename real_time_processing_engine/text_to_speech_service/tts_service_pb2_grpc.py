@@ -40,6 +40,16 @@ class TextToSpeechServiceStub(object):
                 request_serializer=tts__service__pb2.TTSRequest.SerializeToString,
                 response_deserializer=tts__service__pb2.TTSResponse.FromString,
                 _registered_method=True)
+        self.SynthesizeStream = channel.unary_stream(
+                '/real_time_processing_engine.tts.TextToSpeechService/SynthesizeStream',
+                request_serializer=tts__service__pb2.TTSRequest.SerializeToString,
+                response_deserializer=tts__service__pb2.AudioChunk.FromString,
+                _registered_method=True)
+        self.PrefetchVoices = channel.unary_unary(
+                '/real_time_processing_engine.tts.TextToSpeechService/PrefetchVoices',
+                request_serializer=tts__service__pb2.PrefetchVoicesRequest.SerializeToString,
+                response_deserializer=tts__service__pb2.PrefetchVoicesResponse.FromString,
+                _registered_method=True)
 
 
 class TextToSpeechServiceServicer(object):
@@ -53,6 +63,20 @@ class TextToSpeechServiceServicer(object):
         context.set_details('Method not implemented!')
         raise NotImplementedError('Method not implemented!')
 
+    def SynthesizeStream(self, request, context):
+        """Synthesizes text to speech, streaming each audio frame as soon as it is rendered
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
+    def PrefetchVoices(self, request, context):
+        """Loads the given voices in the background, so the first synthesis in them does not wait for the load
+        """
+        context.set_code(grpc.StatusCode.UNIMPLEMENTED)
+        context.set_details('Method not implemented!')
+        raise NotImplementedError('Method not implemented!')
+
 
 def add_TextToSpeechServiceServicer_to_server(servicer, server):
     rpc_method_handlers = {
@@ -61,6 +85,16 @@ def add_TextToSpeechServiceServicer_to_server(servicer, server):
                     request_deserializer=tts__service__pb2.TTSRequest.FromString,
                     response_serializer=tts__service__pb2.TTSResponse.SerializeToString,
             ),
+            'SynthesizeStream': grpc.unary_stream_rpc_method_handler(
+                    servicer.SynthesizeStream,
+                    request_deserializer=tts__service__pb2.TTSRequest.FromString,
+                    response_serializer=tts__service__pb2.AudioChunk.SerializeToString,
+            ),
+            'PrefetchVoices': grpc.unary_unary_rpc_method_handler(
+                    servicer.PrefetchVoices,
+                    request_deserializer=tts__service__pb2.PrefetchVoicesRequest.FromString,
+                    response_serializer=tts__service__pb2.PrefetchVoicesResponse.SerializeToString,
+            ),
     }
     generic_handler = grpc.method_handlers_generic_handler(
             'real_time_processing_engine.tts.TextToSpeechService', rpc_method_handlers)
@@ -99,3 +133,57 @@ class TextToSpeechService(object):
             timeout,
             metadata,
             _registered_method=True)
+
+    @staticmethod
+    def SynthesizeStream(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_stream(
+            request,
+            target,
+            '/real_time_processing_engine.tts.TextToSpeechService/SynthesizeStream',
+            tts__service__pb2.TTSRequest.SerializeToString,
+            tts__service__pb2.AudioChunk.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
+
+    @staticmethod
+    def PrefetchVoices(request,
+            target,
+            options=(),
+            channel_credentials=None,
+            call_credentials=None,
+            insecure=False,
+            compression=None,
+            wait_for_ready=None,
+            timeout=None,
+            metadata=None):
+        return grpc.experimental.unary_unary(
+            request,
+            target,
+            '/real_time_processing_engine.tts.TextToSpeechService/PrefetchVoices',
+            tts__service__pb2.PrefetchVoicesRequest.SerializeToString,
+            tts__service__pb2.PrefetchVoicesResponse.FromString,
+            options,
+            channel_credentials,
+            insecure,
+            call_credentials,
+            compression,
+            wait_for_ready,
+            timeout,
+            metadata,
+            _registered_method=True)
@@ -0,0 +1,139 @@
+# real_time_processing_engine/text_to_speech_service/warmup.py
+
+"""
+Startup warm-up of the audio cache. The fixed responses (the DM's greeting,
+help, rephrase and fallback templates, the orchestrator's reprompt) are
+known before any call arrives; their segments are rendered, in every voice
+callers may get and in every output format they may ask for (LINEAR16 for
+the web client, 8 kHz mu-law for SIP calls), before the server starts
+listening, so the first caller of the day hears them as soon as the
+thousandth does.
+
+Segments already on the disk tier (from the previous run) are only loaded
+into memory. The rest are rendered in a process pool, as synthesis is CPU
+bound. Segments of a template with a field filled in per turn ("...weather
+for {location}...") are skipped; its other segments are warmed.
+"""
+
+import json
+import os
+import sys
+import time
+from concurrent import futures
+
+import audio_format
+from audio_cache import cache_key
+from text_segments import split_segments
+
+# Shared observability package at the repository root
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from observability import logs, metrics
+
+log = logs.get_logger("text_to_speech")
+
+WARMUP_SECONDS = metrics.gauge("revo_tts_warmup_seconds", "Duration of the startup warm-up.")
+WARMUP_SEGMENTS = metrics.gauge(
+    "revo_tts_warmup_segments", "Fixed-response segments (per voice) of the startup warm-up, by result.", ("result",))
+WARMUP_COVERAGE = metrics.gauge(
+    "revo_tts_warmup_coverage_ratio", "Share of the fixed-response segments in the cache after warm-up.")
+
+# Warm-up results per segment and voice.
+CACHED = "cached"     # Already on disk (or in memory)
+RENDERED = "rendered"
+FAILED = "failed"
+TIMED_OUT = "timed_out"
+
+
+def warmup_texts(responses_file: str = "", extra_texts: str = "") -> list:
+    """The DM's response templates in `responses_file` and the "|"-separated `extra_texts`."""
+    texts = []
+    if responses_file:
+        with open(responses_file, encoding="utf-8") as f:
+            texts.extend(json.load(f).values())
+    texts.extend(text for text in extra_texts.split("|") if text.strip())
+    return texts
+
+
+def static_segments(texts) -> list:
+    """The distinct segments of `texts`, in order, leaving out those with a "{field}"."""
+    return list(dict.fromkeys(segment for text in texts for segment in split_segments(text) if "{" not in segment))
+
+
+def parse_formats(formats: str) -> list:
+    """[(encoding, sample_rate_hertz)] of comma-separated "ENCODING/RATE" items; ValueError if one is unsupported."""
+    parsed = []
+    for item in filter(None, (item.strip() for item in formats.split(","))):
+        encoding, _, rate = item.partition("/")
+        if not rate.isdigit() or not audio_format.supported(encoding.upper(), int(rate)):
+            raise ValueError(f"Unsupported warm-up format '{item}'")
+        parsed.append((encoding.upper(), int(rate)))
+    return parsed
+
+
+def warm_up(cache, render, segments, voices, formats, processes: int = 0, timeout_seconds: float = 60,
+            render_rate: int = 0) -> dict:
+    """
+    Puts the audio of `segments` in each of `voices` and each of `formats`
+    ([(encoding, sample_rate_hertz)]) into `cache`, rendering with
+    `render(text, voice_config_id, rate)` (at `render_rate`, 0: at each
+    format's rate) and converting, in `processes` processes (0: in this one).
+    Returns the report: segment counts by result, "coverage" (the share now
+    cached) and "seconds".
+    """
+    start = time.perf_counter()
+    jobs = {cache_key(segment, voice, encoding, rate): (segment, voice, encoding, rate)
+            for encoding, rate in formats for voice in voices for segment in segments}
+    counts = dict.fromkeys((CACHED, RENDERED, FAILED, TIMED_OUT), 0)
+    missing = []
+    for key in jobs:
+        if cache.preload(key):
+            counts[CACHED] += 1
+        else:
+            missing.append(key)
+    deadline = time.monotonic() + timeout_seconds
+    for key, audio, error in _render_all(render, render_rate, jobs, missing, processes, deadline):
+        if error is None:
+            cache.put(key, audio)
+            counts[RENDERED] += 1
+        else:
+            log.warning("warmup", "Could not render '%s' (%s, %s/%d): %s", *jobs[key], error, stage="tts")
+            counts[FAILED] += 1
+    counts[TIMED_OUT] = len(missing) - counts[RENDERED] - counts[FAILED]
+
+    report = dict(counts, segments=len(jobs), seconds=time.perf_counter() - start,
+                  coverage=(counts[CACHED] + counts[RENDERED]) / len(jobs) if jobs else 1.0)
+    WARMUP_SECONDS.set(report["seconds"])
+    WARMUP_COVERAGE.set(report["coverage"])
+    for result in counts:
+        WARMUP_SEGMENTS.labels(result).set(counts[result])
+    log.info("warmup", "Warm-up took %.2f s: %d of %d segments cached (%.0f%%): %d from disk, %d rendered, "
+             "%d failed, %d timed out", report["seconds"], counts[CACHED] + counts[RENDERED], len(jobs),
+             report["coverage"] * 100, counts[CACHED], counts[RENDERED], counts[FAILED], counts[TIMED_OUT],
+             stage="tts")
+    return report
+
+
+def _render_all(render, render_rate, jobs, keys, processes, deadline):
+    """Yields (key, audio, None) or (key, None, error) for the `keys` rendered before `deadline`."""
+    if not keys:
+        return
+    if processes <= 0:
+        for key in keys:
+            if time.monotonic() >= deadline:
+                break
+            try:
+                yield key, audio_format.render_as(render, *jobs[key], render_rate), None
+            except Exception as e:
+                yield key, None, e
+        return
+    executor = futures.ProcessPoolExecutor(max_workers=min(processes, len(keys)))
+    try:
+        pending = {executor.submit(audio_format.render_as, render, *jobs[key], render_rate): key for key in keys}
+        try:
+            for future in futures.as_completed(pending, timeout=max(0.0, deadline - time.monotonic())):
+                error = future.exception()
+                yield pending[future], None if error else future.result(), error
+        except futures.TimeoutError:
+            log.warning("warmup", "Warm-up timed out; the remaining segments are rendered on first use", stage="tts")
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
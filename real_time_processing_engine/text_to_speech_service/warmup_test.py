@@ -0,0 +1,89 @@
+import json
+import os
+import tempfile
+import time
+import unittest
+
+from audio_cache import AudioCache, DiskTier, MemoryTier, cache_key
+from engines import PlaceholderEngine
+import warmup
+
+RESPONSES = {
+    "greeting": "Hello there! How can I help you today?",
+    "get_weather": "I'm sorry, I can't fetch the weather for {location}{date_info} right now, but I hope it's a pleasant day!",
+    "fallback": "I'm sorry, I didn't quite understand that. Could you say it again?",
+}
+
+
+def slow_render(text, voice_config_id, sample_rate_hertz):
+    time.sleep(0.2)
+    return b"audio"
+
+
+def failing_render(text, voice_config_id, sample_rate_hertz):
+    if text.startswith("How"):
+        raise RuntimeError("engine down")
+    return b"audio"
+
+
+class TestWarmup(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.responses_file = os.path.join(self.directory.name, "responses.json")
+        with open(self.responses_file, "w", encoding="utf-8") as f:
+            json.dump(RESPONSES, f)
+
+    def cache(self):
+        return AudioCache(MemoryTier(1 << 20), DiskTier(os.path.join(self.directory.name, "cache"), 1 << 24))
+
+    def test_static_segments_skip_per_turn_fields_and_repeats(self):
+        texts = warmup.warmup_texts(self.responses_file, "Are you still there?|Hello there!")
+        self.assertEqual(warmup.static_segments(texts), [
+            "Hello there!", "How can I help you today?", "I'm sorry,", "but I hope it's a pleasant day!",
+            "I didn't quite understand that.", "Could you say it again?", "Are you still there?"])
+
+    def test_every_segment_and_voice_is_rendered_in_worker_processes(self):
+        segments = warmup.static_segments(warmup.warmup_texts(self.responses_file))
+        cache = self.cache()
+        report = warmup.warm_up(cache, PlaceholderEngine().render, segments, ["voice_a", "voice_b"],
+                                [("LINEAR16", 16000)], processes=2)
+        self.assertEqual((report["segments"], report["rendered"], report["coverage"]), (12, 12, 1.0))
+        for voice in ("voice_a", "voice_b"):
+            key = cache_key("Hello there!", voice, "LINEAR16", 16000)
+            self.assertEqual(cache.get(key), PlaceholderEngine().render("Hello there!", voice, 16000))
+
+    def test_every_format_is_warmed(self):
+        cache = self.cache()
+        report = warmup.warm_up(cache, PlaceholderEngine().render, ["Hello there!"], ["v"],
+                                warmup.parse_formats("LINEAR16/16000, mulaw/8000"), render_rate=24000)
+        self.assertEqual(report["rendered"], 2)
+        linear = cache.get(cache_key("Hello there!", "v", "LINEAR16", 16000))
+        mulaw = cache.get(cache_key("Hello there!", "v", "MULAW", 8000))
+        self.assertAlmostEqual(len(mulaw), len(linear) // 4, delta=1) # Half the rate, 1 byte per sample
+        self.assertEqual(set(mulaw), {0xFF}) # Silence
+        with self.assertRaises(ValueError):
+            warmup.parse_formats("MULAW/4000")
+
+    def test_a_restart_loads_the_segments_from_disk(self):
+        segments = ["Hello there!", "Are you still there?"]
+        warmup.warm_up(self.cache(), PlaceholderEngine().render, segments, ["voice_a"], [("LINEAR16", 16000)])
+        restarted = self.cache()
+        report = warmup.warm_up(restarted, self.fail, segments, ["voice_a"], [("LINEAR16", 16000)])
+        self.assertEqual((report["cached"], report["rendered"], report["coverage"]), (2, 0, 1.0))
+        self.assertIsNotNone(restarted.get(cache_key("Hello there!", "voice_a", "LINEAR16", 16000)))
+
+    def test_failures_and_timeouts_lower_the_coverage(self):
+        with self.assertLogs("revo.text_to_speech", level="WARNING"):
+            report = warmup.warm_up(self.cache(), failing_render, ["Hello there!", "How are you?"], ["v"],
+                                    [("LINEAR16", 16000)], processes=1)
+        self.assertEqual((report["rendered"], report["failed"], report["coverage"]), (1, 1, 0.5))
+        with self.assertLogs("revo.text_to_speech", level="WARNING"):
+            report = warmup.warm_up(self.cache(), slow_render, ["One.", "Two.", "Three."], ["v"],
+                                    [("LINEAR16", 16000)], processes=1, timeout_seconds=0.3)
+        self.assertEqual((report["rendered"], report["timed_out"]), (1, 2))
+
+
+if __name__ == "__main__":
+    unittest.main()